@@ -8,13 +8,17 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, request, jsonify, send_file, Response
 from flask_cors import CORS
 import json
+import time
 from datetime import datetime
 import traceback
 
-from analysis.analyze import generate_investment_report_with_pdf
+from report.report_store import get_report_store, TIMELINE_METRICS
+from server import warmup, prewarm, report_cache
+from server.admission import AdmissionRejected, get_admission_controller
+from infra import metrics, circuit
 
 app = Flask(__name__)
 CORS(app)  # Next.js 프론트엔드와의 CORS 문제 해결
@@ -27,6 +31,46 @@ def health_check():
         'timestamp': datetime.now().isoformat()
     })
 
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """워커 준비 상태 확인 (warm-up 완료 전에는 503, 외부 의존성 회로 상태는 참고용으로만 포함)"""
+    state = warmup.readiness()
+    state['circuits'] = circuit.circuit_states()
+    state['admission'] = get_admission_controller().stats()
+    state['timestamp'] = datetime.now().isoformat()
+    return jsonify(state), (200 if state['ready'] else 503)
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """파이프라인 단계별 지연 시간/호출 수/오류율 (Prometheus 텍스트 포맷, gunicorn에서는 모든 워커 합계)"""
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+def _stored_report_response(company_name, stored, **extra):
+    """report_cache 항목으로 만든 generate-report 응답 본문"""
+    data = {
+        'success': True,
+        'message': f'{company_name} 투자보고서가 성공적으로 생성되었습니다.',
+        'company_name': stored['company_name'],
+        'json_file': stored['json_file'],
+        'pdf_file': stored.get('pdf_file'),
+        'summary': stored['summary'],
+        'cached': True,
+        'generated_at': stored['generated_at'],
+        'age_seconds': stored['age_seconds'],
+        'fresh': stored['fresh'],
+        'revalidating': stored['revalidating'],
+    }
+    data.update(extra)
+    data['timestamp'] = datetime.now().isoformat()
+    return data
+
+def _generated_ts(entry):
+    """보고서 항목의 생성 시각 (epoch 초, 형식이 잘못되었으면 0)"""
+    try:
+        return datetime.fromisoformat(entry['generated_at']).timestamp()
+    except (KeyError, TypeError, ValueError):
+        return 0.0
+
 @app.route('/api/generate-report', methods=['POST'])
 def generate_report():
     """투자보고서 생성 API"""
@@ -48,10 +92,51 @@ def generate_report():
                 'message': '기업명이 비어있습니다.'
             }), 400
         
+        # 사전 생성 보고서와 저장 보고서 중 더 최근에 생성된 보고서를 바로 반환
+        # (force_refresh로 다시 만든 보고서를 그보다 오래된 사전 생성 보고서가 가리지 않도록 생성 시각 비교)
+        if not data.get('force_refresh'):
+            prebuilt = prewarm.lookup(company_name)
+            # 최근에 저장된 보고서 (soft TTL이 지났으면 백그라운드에서 다시 생성)
+            cached = report_cache.lookup(company_name)
+            if prebuilt and not (cached and _generated_ts(cached) > _generated_ts(prebuilt)):
+                print(f"⚡ {company_name} 사전 생성 보고서 반환 ({prebuilt['generated_at']})")
+                return jsonify({
+                    'success': True,
+                    'message': f'{company_name} 투자보고서가 성공적으로 생성되었습니다.',
+                    'company_name': prebuilt['company_name'],
+                    'json_file': prebuilt['json_file'],
+                    'pdf_file': prebuilt.get('pdf_file'),
+                    'summary': prebuilt.get('summary'),
+                    'prebuilt': True,
+                    'generated_at': prebuilt['generated_at'],
+                    'age_seconds': prebuilt['age_seconds'],
+                    'fresh': True,
+                    'timestamp': datetime.now().isoformat()
+                })
+            
+            if cached:
+                print(f"⚡ {company_name} 저장 보고서 반환 ({cached['generated_at']}, "
+                      f"{cached['age_seconds']:.0f}초 전, 재생성 {'중' if cached['revalidating'] else '안 함'})")
+                return jsonify(_stored_report_response(company_name, cached))
+        
         print(f"📊 {company_name} 투자보고서 생성 시작...")
         
-        # 투자보고서 생성
-        result = generate_investment_report_with_pdf(company_name)
+        # 투자보고서 생성 (같은 기업의 동시 요청은 한 번의 생성을 공유,
+        # 워커당 동시 생성 수/대기열 제한, 포화 상태면 저장된 보고서 또는 503)
+        try:
+            result = report_cache.build(company_name)
+        except AdmissionRejected as e:
+            stored = None if data.get('force_refresh') else report_cache.fallback(company_name)
+            if stored:
+                print(f"⚠️ {company_name} 요청 과부하로 저장 보고서 반환 ({stored['generated_at']}): {e}")
+                return jsonify(_stored_report_response(company_name, stored, shed=True))
+            print(f"⚠️ {company_name} 요청 과부하로 거절: {e}")
+            return jsonify({
+                'error': str(e),
+                'message': '요청이 많아 투자보고서를 생성할 수 없습니다. 잠시 후 다시 시도해주세요.',
+                'retry_after': e.retry_after,
+                'timestamp': datetime.now().isoformat()
+            }), 503, {'Retry-After': str(e.retry_after)}
         
         if 'error' in result:
             return jsonify({
@@ -68,19 +153,18 @@ def generate_report():
             'pdf_file': result.get('pdf_file'),
             'timestamp': datetime.now().isoformat()
         }
+        if result.get('stale_sources'):
+            # 공급자 장애로 마지막 캐시 데이터를 사용한 항목
+            response_data['stale_sources'] = result['stale_sources']
         
         # JSON 파일에서 요약 정보 추출
         try:
             with open(result['json_file'], 'r', encoding='utf-8') as f:
                 report_data = json.load(f)
             
-            response_data['summary'] = {
-                'current_price': report_data.get('stock_data', {}).get('current_price', 'N/A'),
-                'change': report_data.get('stock_data', {}).get('change', 'N/A'),
-                'change_percent': report_data.get('stock_data', {}).get('change_percent', 'N/A'),
-                'analysis_period': report_data.get('analysis_period', 'N/A'),
-                'news_count': report_data.get('news_count', 0)
-            }
+            response_data['summary'] = prewarm.report_summary(report_data)
+            # 히스토리 색인에 추가 (타임라인 조회 시 파일 재파싱 방지)
+            get_report_store().ingest_report(result['json_file'], report_data)
         except Exception as e:
             print(f"요약 정보 추출 중 오류: {e}")
             response_data['summary'] = None
@@ -149,14 +233,162 @@ def get_supported_companies():
             'count': 0
         }), 500
 
+@app.route('/api/screener', methods=['GET'])
+def screen_universe():
+    """지원 종목 전체 지표 순위 조회 (예: ?sort=momentum_20&top=10&min_volume_ratio=1.5)"""
+    from analysis.screener import get_screener, SCREENER_METRICS
+
+    try:
+        sort = request.args.get('sort', 'momentum_20')
+        order = request.args.get('order', 'desc')
+        top = int(request.args.get('top', 10))
+        filters = {}
+        for name in SCREENER_METRICS:
+            low = request.args.get(f'min_{name}')
+            high = request.args.get(f'max_{name}')
+            if low is not None or high is not None:
+                filters[name] = (float(low) if low is not None else None,
+                                 float(high) if high is not None else None)
+        refresh = request.args.get('refresh', '').lower() in ('1', 'true')
+        result = get_screener().screen(sort, top, order, filters, refresh)
+    except ValueError as e:
+        return jsonify({
+            'error': f'잘못된 조회 조건입니다: {e}',
+            'supported_metrics': SCREENER_METRICS
+        }), 400
+    except Exception as e:
+        print(f"종목 스크리닝 중 오류: {e}")
+        return jsonify({'error': '종목 스크리닝 중 오류가 발생했습니다.'}), 500
+
+    return jsonify(result)
+
+@app.route('/api/quotes/stream', methods=['GET'])
+def stream_quotes():
+    """
+    실시간 시세 스트림 (Server-Sent Events, 예: ?symbols=005930,SK하이닉스)
+
+    시세 허브가 구독 종목을 한 번만 조회하여 모든 연결에 나눠 주며 (gunicorn에서는 워커 하나가 조회하여 다른 워커와 공유),
+    연결 직후 캐시된 시세를 보내고 이후에는 바뀐 시세만 `quote` 이벤트로 전송
+    """
+    from fetch.quote_stream import (get_quote_hub, normalize_symbols, QuoteStreamFull,
+                                    QUOTE_STREAM_HEARTBEAT_SECONDS, QUOTE_STREAM_MAX_SECONDS)
+
+    try:
+        symbols = normalize_symbols(request.args.get('symbols', '').split(','))
+    except ValueError as e:
+        return jsonify({'error': f'잘못된 구독 요청입니다: {e}'}), 400
+
+    hub = get_quote_hub()
+    try:
+        subscription = hub.subscribe(symbols)
+    except QuoteStreamFull as e:
+        # 스트림이 워커 스레드를 모두 점유하지 않도록 연결 수를 제한
+        response = jsonify({'error': str(e)})
+        response.headers['Retry-After'] = str(int(QUOTE_STREAM_MAX_SECONDS))
+        return response, 503
+
+    def events():
+        deadline = time.monotonic() + QUOTE_STREAM_MAX_SECONDS
+        try:
+            yield 'retry: 3000\n\n'
+            while time.monotonic() < deadline:
+                quotes = subscription.next(timeout=QUOTE_STREAM_HEARTBEAT_SECONDS)
+                if quotes is None:
+                    break
+                if not quotes:
+                    yield ': keep-alive\n\n'
+                    continue
+                for quote in quotes:
+                    yield f"event: quote\ndata: {json.dumps(quote, ensure_ascii=False)}\n\n"
+        finally:
+            # 클라이언트가 연결을 끊으면 GeneratorExit로 여기까지 옴
+            hub.unsubscribe(subscription)
+
+    return Response(events(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+
+def _parse_history_args():
+    """히스토리 조회 공통 쿼리 파라미터 파싱 (start, end, page, page_size)"""
+    start_date = request.args.get('start')
+    end_date = request.args.get('end')
+    for value in (start_date, end_date):
+        if value:
+            datetime.strptime(value, '%Y-%m-%d')
+    page = int(request.args.get('page', 1))
+    page_size = int(request.args.get('page_size', 20))
+    return start_date, end_date, page, page_size
+
+@app.route('/api/reports/<company_name>', methods=['GET'])
+def get_report_history(company_name):
+    """기업의 과거 보고서 목록 조회"""
+    try:
+        start_date, end_date, page, page_size = _parse_history_args()
+    except ValueError:
+        return jsonify({
+            'error': '잘못된 조회 조건입니다.',
+            'message': 'start/end는 YYYY-MM-DD, page/page_size는 정수여야 합니다.'
+        }), 400
+    
+    try:
+        store = get_report_store()
+        store.sync()
+        return jsonify(store.list_reports(company_name, start_date, end_date, page, page_size))
+        
+    except Exception as e:
+        print(f"보고서 히스토리 조회 중 오류: {e}")
+        return jsonify({'error': '보고서 히스토리를 조회하는 중 오류가 발생했습니다.'}), 500
+
+@app.route('/api/reports/<company_name>/timeline', methods=['GET'])
+def get_report_timeline(company_name):
+    """기업 보고서의 주요 지표 시계열 조회"""
+    try:
+        start_date, end_date, page, page_size = _parse_history_args()
+        if 'page_size' not in request.args:
+            page_size = 200
+    except ValueError:
+        return jsonify({
+            'error': '잘못된 조회 조건입니다.',
+            'message': 'start/end는 YYYY-MM-DD, page/page_size는 정수여야 합니다.'
+        }), 400
+    
+    metrics_param = request.args.get('metrics')
+    metrics = [m.strip() for m in metrics_param.split(',') if m.strip()] if metrics_param else None
+    
+    try:
+        store = get_report_store()
+        store.sync()
+        return jsonify(store.metric_timeline(company_name, metrics, start_date, end_date, page, page_size))
+        
+    except ValueError as e:
+        return jsonify({
+            'error': str(e),
+            'supported_metrics': list(TIMELINE_METRICS.keys())
+        }), 400
+    except Exception as e:
+        print(f"보고서 타임라인 조회 중 오류: {e}")
+        return jsonify({'error': '보고서 타임라인을 조회하는 중 오류가 발생했습니다.'}), 500
+
 if __name__ == '__main__':
     print("🚀 투자보고서 생성 API 서버 시작")
     print("📍 서버 주소: http://localhost:5001")
     print("📋 API 엔드포인트:")
     print("   - GET  /api/health              : 서버 상태 확인")
+    print("   - GET  /api/ready               : 워커 준비 상태 (warm-up 완료 여부)")
+    print("   - GET  /api/metrics             : 단계별 지연 시간 지표 (Prometheus)")
     print("   - GET  /api/supported-companies : 지원 기업 목록")
     print("   - POST /api/generate-report     : 투자보고서 생성")
     print("   - GET  /api/download-pdf/<file> : PDF 다운로드")
+    print("   - GET  /api/reports/<company>   : 과거 보고서 목록")
+    print("   - GET  /api/reports/<company>/timeline : 주요 지표 시계열")
+    print("   - GET  /api/screener            : 전 종목 지표 순위 조회")
+    print("   - GET  /api/quotes/stream       : 실시간 시세 스트림 (SSE)")
     print("=" * 60)
+    print("💡 프로덕션 실행: gunicorn -c gunicorn.conf.py app:app")
     
+    # debug 모드의 reloader는 감시용 부모 프로세스와 실제 서버 자식 프로세스를 띄우므로
+    # 요청을 처리하는 자식(WERKZEUG_RUN_MAIN=true)에서만 warm-up (부모에서 prewarm/스레드 풀이 중복 실행되지 않도록)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warmup.start_warm_up()
     app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
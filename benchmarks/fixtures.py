@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""
+벤치마크용 로컬 데이터 제공자
+
+reports/*.json에 저장된 실제 보고서(OHLCV, GPT 보고서 본문)를 기록된 응답으로 사용하여
+yfinance / NewsAPI / OpenAI 대신 응답하는 스탠드인을 제공합니다. 네트워크 없이 동작합니다.
+
+- yfinance: 기록된 OHLCV로 Ticker.history()/info 응답 (요청 기간이 기록보다 길면 기록된 수익률을 반복하여 과거로 연장)
+- NewsAPI: 기록된 보고서 본문의 문단으로 기사 목록 구성 (기록된 news_count 개수)
+- OpenAI: 기록된 investment_report 본문 반환
+"""
+
+import glob
+import os
+import sys
+import types
+from typing import Dict, List, Any
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, 'src'))
+
+from fetch.ohlcv import load_report_file, get_historical_columns
+
+# yfinance period -> 거래일 수
+PERIOD_BARS = {
+    '5d': 5, '1mo': 22, '2mo': 43, '3mo': 65, '6mo': 126,
+    '1y': 250, '2y': 500, '5y': 1250, '10y': 2500,
+}
+
+
+class RecordedReport:
+    """reports/*.json 하나에서 읽은 기록 데이터"""
+
+    def __init__(self, report: Dict[str, Any]):
+        import numpy as np
+
+        stock_data = report['stock_data']
+        columns = get_historical_columns(stock_data)
+        # 기록 순서(최신 우선/과거 우선)와 무관하게 날짜 오름차순으로 정렬
+        order = np.argsort(np.array(columns['date']))
+        self.dates = [columns['date'][i] for i in order]
+        self.ohlc = np.array([[columns[name][i] for name in ('open', 'high', 'low', 'close')] for i in order],
+                             dtype=np.float64)
+        self.volume = np.array([columns['volume'][i] for i in order], dtype=np.int64)
+
+        self.company_name = report['company_name']
+        self.info = {
+            'longName': stock_data.get('company_name', self.company_name),
+            'marketCap': stock_data.get('market_cap', 0),
+            'trailingPE': stock_data.get('pe_ratio', 0),
+            'dividendYield': stock_data.get('dividend_yield', 0),
+            'currency': stock_data.get('currency', 'KRW'),
+        }
+        self.investment_report = report.get('investment_report', '')
+        self.news_count = max(1, int(report.get('news_count', 5) or 5))
+
+    def history(self, bars: int):
+        """
+        bars개의 일봉 DataFrame 반환 (날짜 오름차순)
+
+        기록보다 긴 기간은 기록된 일간 수익률을 반복 적용하여 과거 방향으로 연장
+        """
+        import numpy as np
+        import pandas as pd
+
+        recorded = len(self.dates)
+        if bars <= recorded:
+            ohlc = self.ohlc[-bars:]
+            volume = self.volume[-bars:]
+        else:
+            # 종가 대비 시가/고가/저가 비율과 일간 수익률을 순환 사용
+            ratios = self.ohlc / self.ohlc[:, 3:4]
+            returns = self.ohlc[1:, 3] / self.ohlc[:-1, 3]
+            extra = bars - recorded
+            closes = np.empty(extra)
+            close = self.ohlc[0, 3]
+            for i in range(extra):
+                close = close / returns[i % len(returns)]
+                closes[extra - 1 - i] = close
+            extra_ratios = ratios[np.arange(extra) % recorded]
+            ohlc = np.vstack([extra_ratios * closes[:, None], self.ohlc])
+            volume = np.concatenate([self.volume[np.arange(extra) % recorded], self.volume])
+
+        index = pd.bdate_range(end=self.dates[-1], periods=len(ohlc))
+        return pd.DataFrame({
+            'Open': ohlc[:, 0], 'High': ohlc[:, 1], 'Low': ohlc[:, 2], 'Close': ohlc[:, 3],
+            'Volume': volume,
+        }, index=index)
+
+    def articles(self, published: str = None) -> List[Dict[str, str]]:
+        """보고서 본문 문단으로 만든 NewsAPI 기사 목록 (published: 게시일, 기본값은 마지막 봉 날짜)"""
+        paragraphs = [p.strip() for p in self.investment_report.split('\n') if len(p.strip()) > 20]
+        if not paragraphs:
+            paragraphs = [f"{self.company_name} 관련 뉴스"]
+        return [
+            {
+                'title': f"{self.company_name} {paragraphs[i % len(paragraphs)][:40]}",
+                'description': paragraphs[i % len(paragraphs)],
+                'publishedAt': f"{published or self.dates[-1]}T00:00:00Z",
+            }
+            for i in range(self.news_count)
+        ]
+
+
+def load_recorded_reports(reports_dir: str = None) -> List[RecordedReport]:
+    reports_dir = reports_dir or os.path.join(ROOT_DIR, 'reports')
+    recorded = []
+    for path in sorted(glob.glob(os.path.join(reports_dir, '*.json'))):
+        try:
+            report = load_report_file(path)
+            if get_historical_columns(report.get('stock_data')).get('length', 0) >= 2:
+                recorded.append(RecordedReport(report))
+        except Exception as e:
+            print(f"기록 보고서 로드 실패 ({path}): {e}")
+    if not recorded:
+        raise RuntimeError(f"{reports_dir}에 사용할 수 있는 보고서 JSON이 없습니다.")
+    return recorded
+
+
+class FixtureProviders:
+    """
+    기록된 보고서를 기업/종목코드에 순환 배정하여 외부 API 대신 응답
+
+    지원 기업 수보다 기록 보고서가 적으므로 기업 i에는 기록 i % n을 사용
+    """
+
+    def __init__(self, recorded: List[RecordedReport]):
+        from fetch.stock_fetcher import KOREAN_COMPANIES
+
+        self.recorded = recorded
+        self.by_symbol = {}
+        self.by_company = {}
+        for i, (name, ticker) in enumerate(KOREAN_COMPANIES.items()):
+            fixture = recorded[i % len(recorded)]
+            self.by_symbol[f"{ticker}.KS"] = fixture
+            self.by_company[name] = fixture
+        self.calls = {'history': 0, 'info': 0, 'news': 0, 'llm': 0}
+
+    def for_symbol(self, symbol: str) -> RecordedReport:
+        return self.by_symbol.get(symbol, self.recorded[0])
+
+    def for_query(self, url: str) -> RecordedReport:
+        from urllib.parse import urlparse, parse_qs
+        query = parse_qs(urlparse(url).query).get('q', [''])[0]
+        return self.by_company.get(query, self.recorded[0])
+
+    def make_ticker_class(self):
+        providers = self
+
+        class FixtureTicker:
+            def __init__(self, symbol, *args, **kwargs):
+                self.symbol = symbol
+
+            def history(self, period='1mo', **kwargs):
+                providers.calls['history'] += 1
+                return providers.for_symbol(self.symbol).history(PERIOD_BARS.get(period, 22))
+
+            @property
+            def info(self):
+                providers.calls['info'] += 1
+                return dict(providers.for_symbol(self.symbol).info)
+
+        return FixtureTicker
+
+    def make_session(self):
+        providers = self
+
+        class FixtureResponse:
+            status_code = 200
+
+            def __init__(self, articles):
+                self._articles = articles
+
+            def json(self):
+                return {'status': 'ok', 'totalResults': len(self._articles), 'articles': self._articles}
+
+        class FixtureSession:
+            def get(self, url, *args, **kwargs):
+                from urllib.parse import urlparse, parse_qs
+                providers.calls['news'] += 1
+                # 실제 NewsAPI처럼 요청 기간(to) 안에 게시된 기사로 응답
+                published = parse_qs(urlparse(url).query).get('to', [None])[0]
+                return FixtureResponse(providers.for_query(url).articles(published))
+
+            def close(self):
+                pass
+
+        return FixtureSession()
+
+    def make_openai_client(self):
+        providers = self
+
+        def create(model=None, messages=None, **kwargs):
+            providers.calls['llm'] += 1
+            prompt = messages[-1]['content'] if messages else ''
+            fixture = next((r for r in providers.recorded if r.company_name in prompt), providers.recorded[0])
+            message = types.SimpleNamespace(content=fixture.investment_report)
+            return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)])
+
+        completions = types.SimpleNamespace(create=create)
+        return types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+
+    def install(self):
+        """yfinance.Ticker / 공유 HTTP 세션 / OpenAI 클라이언트를 스탠드인으로 교체"""
+        import yfinance
+        from fetch import http_session
+        from analysis import llm
+
+        yfinance.Ticker = self.make_ticker_class()
+        http_session._session = self.make_session()
+        http_session._session_pid = os.getpid()
+        llm._client = self.make_openai_client()
+        return self
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+모듈 import 시간 벤치마크
+
+`python -X importtime`으로 각 진입 모듈을 새 프로세스에서 import하여
+누적 import 시간과 함께 로드된 무거운 라이브러리를 보고합니다.
+
+사용법:
+    python benchmarks/import_time.py                     # 측정 결과 출력
+    python benchmarks/import_time.py --save              # 기준값 저장
+    python benchmarks/import_time.py --compare           # 기준값 대비 회귀 검사 (실패 시 exit 1)
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, 'src')
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'import_time_baseline.json')
+
+# 측정 대상 진입 모듈
+TARGETS = [
+    'app',
+    'analysis.analyze',
+    'analysis.outlook_generator',
+    'fetch.stock_fetcher',
+    'fetch.news_fetcher',
+    'report.pdf_generator',
+]
+
+# 시작 시점에 로드되면 안 되는 무거운 라이브러리
+HEAVY_MODULES = [
+    'openai', 'numpy', 'pandas', 'yfinance',
+    'matplotlib', 'seaborn', 'plotly', 'reportlab',
+]
+
+_LINE_PATTERN = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure(target: str) -> dict:
+    """
+    새 파이썬 프로세스에서 target을 import하고 -X importtime 출력을 파싱
+
+    Returns:
+    - {"total_ms": 누적 import 시간, "heavy": 로드된 무거운 라이브러리 목록}
+      import 실패 시 {"error": ...}
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT_DIR, SRC_DIR, env.get('PYTHONPATH')]))
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {target}'],
+        cwd=ROOT_DIR, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        last_line = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else ''
+        return {"error": last_line}
+
+    total_us = 0
+    loaded = set()
+    for line in result.stderr.splitlines():
+        match = _LINE_PATTERN.match(line)
+        if not match:
+            continue
+        cumulative, indent, module = int(match.group(2)), match.group(3), match.group(4)
+        loaded.add(module.split('.')[0])
+        # 들여쓰기가 한 칸인 줄이 최상위 import
+        if len(indent) == 1:
+            total_us += cumulative
+
+    return {
+        "total_ms": round(total_us / 1000, 1),
+        "heavy": [name for name in HEAVY_MODULES if name in loaded],
+    }
+
+
+def run(repeat: int) -> dict:
+    """모든 대상을 repeat회 측정하여 중앙값으로 정리"""
+    results = {}
+    for target in TARGETS:
+        samples = [measure(target) for _ in range(repeat)]
+        errors = [s for s in samples if 'error' in s]
+        if errors:
+            results[target] = errors[0]
+            continue
+        results[target] = {
+            "total_ms": round(statistics.median(s['total_ms'] for s in samples), 1),
+            "heavy": samples[-1]['heavy'],
+        }
+    return results
+
+
+def print_results(results: dict, baseline: dict = None):
+    print(f"{'모듈':<30} {'import(ms)':>12} {'기준(ms)':>10}  무거운 라이브러리")
+    print("-" * 90)
+    for target, result in results.items():
+        if 'error' in result:
+            print(f"{target:<30} {'실패':>12}  {result['error']}")
+            continue
+        base = (baseline or {}).get(target, {}).get('total_ms')
+        base_text = f"{base:>10.1f}" if base is not None else f"{'-':>10}"
+        heavy = ', '.join(result['heavy']) or '-'
+        print(f"{target:<30} {result['total_ms']:>12.1f} {base_text}  {heavy}")
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """기준값 대비 threshold 비율 이상 느려졌거나 새 무거운 라이브러리를 로드하면 회귀로 판단"""
+    regressions = []
+    for target, result in results.items():
+        base = baseline.get(target)
+        if not base or 'error' in base:
+            continue
+        if 'error' in result:
+            regressions.append(f"{target}: import 실패 ({result['error']})")
+            continue
+        if result['total_ms'] > base['total_ms'] * (1 + threshold):
+            regressions.append(f"{target}: {base['total_ms']}ms -> {result['total_ms']}ms")
+        new_heavy = set(result['heavy']) - set(base.get('heavy', []))
+        if new_heavy:
+            regressions.append(f"{target}: 새로 로드된 라이브러리 {sorted(new_heavy)}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모듈 import 시간 벤치마크")
+    parser.add_argument('--repeat', type=int, default=3, help="대상별 측정 횟수 (중앙값 사용)")
+    parser.add_argument('--save', action='store_true', help="결과를 기준값 파일로 저장")
+    parser.add_argument('--compare', action='store_true', help="기준값 대비 회귀 검사")
+    parser.add_argument('--threshold', type=float, default=0.25, help="허용 증가 비율 (기본 0.25 = 25%%)")
+    args = parser.parse_args()
+
+    baseline = None
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    results = run(max(1, args.repeat))
+    print_results(results, baseline)
+
+    if args.save:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n기준값 저장: {BASELINE_PATH}")
+
+    if args.compare:
+        if not baseline:
+            print("\n기준값 파일이 없습니다. 먼저 --save로 저장하세요.")
+            sys.exit(1)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\n❌ import 시간 회귀:")
+            for item in regressions:
+                print(f"   {item}")
+            sys.exit(1)
+        print("\n✅ 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+KIS(한국투자증권) Open API 로컬 목 서버
+
+reports/*.json에 기록된 OHLCV의 마지막 봉으로 현재가를 응답하여
+src/fetch/kis_client.py를 실제 계정이나 네트워크 없이 검증합니다.
+
+지원 엔드포인트:
+- POST /oauth2/tokenP                                       접근 토큰 발급
+- GET  /uapi/domestic-stock/v1/quotations/inquire-price     주식현재가 시세 (FHKST01010100)
+- GET  /uapi/domestic-stock/v1/quotations/intstock-multprice 관심종목 멀티 시세 (FHKST11300006)
+
+사용법:
+    python benchmarks/kis_mock_server.py --port 8765 [--token-ttl 86400] [--latency-ms 0]
+    KIS_BASE_URL=http://127.0.0.1:8765 KIS_APP_KEY=mock KIS_APP_SECRET=mock python app.py
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from zoneinfo import ZoneInfo
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import load_recorded_reports, FixtureProviders
+
+
+def _sign(change: float) -> str:
+    return '2' if change > 0 else '5' if change < 0 else '3'
+
+
+class KISMock:
+    """기록 데이터 기반 KIS 응답 생성기 (발급/조회 횟수를 세어 토큰 캐시와 일괄 조회를 확인)"""
+
+    def __init__(self, providers: FixtureProviders, token_ttl: int = 86400, latency_ms: int = 0):
+        self.providers = providers
+        self.token_ttl = token_ttl
+        self.latency = latency_ms / 1000
+        self.tokens = {}
+        self.calls = {'token': 0, 'price': 0, 'multi_price': 0}
+        self.lock = threading.Lock()
+
+    def issue_token(self, body):
+        if not body.get('appkey') or not body.get('appsecret'):
+            return 403, {'error_code': 'EGW00103', 'error_description': '유효하지 않은 AppKey입니다.'}
+        token = uuid.uuid4().hex
+        with self.lock:
+            self.calls['token'] += 1
+            self.tokens[token] = time.time() + self.token_ttl
+        # KIS는 만료 시각을 한국 시간으로 응답
+        expired = datetime.fromtimestamp(time.time() + self.token_ttl, ZoneInfo('Asia/Seoul'))
+        expired = expired.strftime('%Y-%m-%d %H:%M:%S')
+        return 200, {'access_token': token, 'token_type': 'Bearer', 'expires_in': self.token_ttl,
+                     'access_token_token_expired': expired}
+
+    def check_token(self, headers):
+        token = headers.get('authorization', '').replace('Bearer ', '')
+        with self.lock:
+            expires_at = self.tokens.get(token)
+        if expires_at is None or expires_at < time.time():
+            return {'rt_cd': '1', 'msg_cd': 'EGW00123', 'msg1': '기간이 만료된 token 입니다.'}
+        return None
+
+    def _bar(self, code):
+        fixture = self.providers.for_symbol(f"{code}.KS")
+        open_price, high, low, close = (float(value) for value in fixture.ohlc[-1])
+        previous = float(fixture.ohlc[-2][3]) if len(fixture.ohlc) > 1 else close
+        change = close - previous
+        rate = change / previous * 100 if previous else 0.0
+        return fixture, {
+            'open': open_price, 'high': high, 'low': low, 'close': close,
+            'change': change, 'rate': rate, 'volume': int(fixture.volume[-1]),
+        }
+
+    def price(self, params):
+        code = params.get('FID_INPUT_ISCD', [''])[0]
+        with self.lock:
+            self.calls['price'] += 1
+        fixture, bar = self._bar(code)
+        return {'rt_cd': '0', 'msg_cd': 'MCA00000', 'msg1': '정상처리 되었습니다.', 'output': {
+            'stck_prpr': f"{bar['close']:.0f}", 'prdy_vrss': f"{abs(bar['change']):.0f}",
+            'prdy_vrss_sign': _sign(bar['change']), 'prdy_ctrt': f"{abs(bar['rate']):.2f}",
+            'stck_oprc': f"{bar['open']:.0f}", 'stck_hgpr': f"{bar['high']:.0f}",
+            'stck_lwpr': f"{bar['low']:.0f}", 'acml_vol': str(bar['volume']),
+            'hts_avls': f"{float(fixture.info['marketCap'] or 0) / 100_000_000:.0f}",
+            'per': f"{float(fixture.info['trailingPE'] or 0):.2f}",
+        }}
+
+    def multi_price(self, params):
+        with self.lock:
+            self.calls['multi_price'] += 1
+        output = []
+        for i in range(1, 31):
+            code = params.get(f'FID_INPUT_ISCD_{i}', [''])[0]
+            if not code:
+                break
+            fixture, bar = self._bar(code)
+            output.append({
+                'inter_shrn_iscd': code, 'inter_kor_isnm': fixture.info['longName'],
+                'inter2_prpr': f"{bar['close']:.0f}", 'inter2_prdy_vrss': f"{abs(bar['change']):.0f}",
+                'prdy_vrss_sign': _sign(bar['change']), 'prdy_ctrt': f"{abs(bar['rate']):.2f}",
+                'inter2_oprc': f"{bar['open']:.0f}", 'inter2_hgpr': f"{bar['high']:.0f}",
+                'inter2_lwpr': f"{bar['low']:.0f}", 'acml_vol': str(bar['volume']),
+            })
+        return {'rt_cd': '0', 'msg_cd': 'MCA00000', 'msg1': '정상처리 되었습니다.', 'output': output}
+
+
+def make_handler(mock: KISMock):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def _send(self, status, payload):
+            body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            try:
+                body = json.loads(self.rfile.read(length) or b'{}')
+            except ValueError:
+                body = {}
+            if urlparse(self.path).path != '/oauth2/tokenP':
+                return self._send(404, {'msg1': 'not found'})
+            self._send(*mock.issue_token(body))
+
+        def do_GET(self):
+            if mock.latency:
+                time.sleep(mock.latency)
+            url = urlparse(self.path)
+            params = parse_qs(url.query)
+            expired = mock.check_token(self.headers)
+            if expired:
+                return self._send(500, expired)
+            tr_id = self.headers.get('tr_id', '')
+            if url.path.endswith('/quotations/inquire-price') and tr_id == 'FHKST01010100':
+                return self._send(200, mock.price(params))
+            if url.path.endswith('/quotations/intstock-multprice') and tr_id == 'FHKST11300006':
+                return self._send(200, mock.multi_price(params))
+            self._send(404, {'rt_cd': '1', 'msg_cd': 'OPSQ0001', 'msg1': f'지원하지 않는 요청: {url.path} {tr_id}'})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_mock_server(port: int = 0, token_ttl: int = 86400, latency_ms: int = 0):
+    """백그라운드 스레드로 목 서버 시작 (port=0이면 빈 포트), (server, mock) 반환"""
+    mock = KISMock(FixtureProviders(load_recorded_reports()), token_ttl, latency_ms)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(mock))
+    threading.Thread(target=server.serve_forever, name='kis-mock', daemon=True).start()
+    return server, mock
+
+
+def main():
+    parser = argparse.ArgumentParser(description='KIS Open API 로컬 목 서버')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--token-ttl', type=int, default=86400, help='발급 토큰 유효 기간 (초)')
+    parser.add_argument('--latency-ms', type=int, default=0, help='시세 응답 지연 (밀리초)')
+    args = parser.parse_args()
+
+    server, mock = start_mock_server(args.port, args.token_ttl, args.latency_ms)
+    print(f"KIS 목 서버: http://127.0.0.1:{server.server_address[1]}")
+    try:
+        while True:
+            time.sleep(60)
+            print(f"호출 수: {mock.calls}")
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
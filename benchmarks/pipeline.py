@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+보고서 파이프라인 오프라인 벤치마크
+
+reports/*.json에 기록된 실제 응답(fixtures.py)으로 yfinance / NewsAPI / OpenAI를 대체하여
+네트워크 없이 종단간 및 단계별 처리량을 측정합니다.
+
+측정 항목:
+- pipeline: generate_investment_report_with_pdf를 1/10/100개 기업에 대해 실행 (보고서/초, 단계별 평균 시간)
+- technical_analysis: analyze_technical_indicators (히스토리 길이별)
+- chart: PDFReportGenerator.create_stock_chart (히스토리 길이별)
+- pdf: PDFReportGenerator.generate_pdf_from_data (히스토리 길이별)
+
+사용법:
+    python benchmarks/pipeline.py                        # 전체 측정
+    python benchmarks/pipeline.py --quick                # 1/10개 기업, 짧은 히스토리만
+    python benchmarks/pipeline.py --save                 # 기준값 저장
+    python benchmarks/pipeline.py --compare              # 기준값 대비 회귀 검사 (실패 시 exit 1)
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(os.path.join(os.path.dirname(BENCH_DIR), 'src'))
+
+from fixtures import FixtureProviders, load_recorded_reports
+
+BASELINE_PATH = os.path.join(BENCH_DIR, 'pipeline_baseline.json')
+
+COMPANY_COUNTS = [1, 10, 100]
+HISTORY_LENGTHS = [22, 65, 250, 1250]
+QUICK_COMPANY_COUNTS = [1, 10]
+QUICK_HISTORY_LENGTHS = [22, 250]
+
+
+@contextlib.contextmanager
+def quiet():
+    """파이프라인의 진행 상황 print/경고 출력을 숨김"""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+
+
+def stock_data_for(providers, company_name, bars):
+    """기록 데이터로 bars개 히스토리를 가진 stock_data 딕셔너리 생성"""
+    from fetch.models import StockData
+    from fetch.ohlcv import history_to_columns
+
+    fixture = providers.by_company[company_name]
+    hist = fixture.history(bars)
+    latest = hist.iloc[-1]
+    stock = StockData(
+        symbol='BENCH.KS', company_name=company_name,
+        current_price=float(latest['Close']), open_price=float(latest['Open']),
+        high_price=float(latest['High']), low_price=float(latest['Low']),
+        volume=int(latest['Volume']), change=0.0, change_percent=0.0,
+        date=hist.index[-1].strftime('%Y-%m-%d'),
+        historical_data=history_to_columns(hist),
+    )
+    stock.week52_high = max(stock.historical_data['close'])
+    stock.week52_low = min(stock.historical_data['close'])
+    return stock
+
+
+def time_calls(func, repeat):
+    """func를 repeat회 호출한 소요 시간(초) 목록"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def summarize(samples):
+    median = statistics.median(samples)
+    return {
+        'median_ms': round(median * 1000, 3),
+        'min_ms': round(min(samples) * 1000, 3),
+        'ops_per_sec': round(1 / median, 2) if median > 0 else None,
+    }
+
+
+def bench_pipeline(providers, company_counts, workdir):
+    """generate_investment_report_with_pdf 종단간 처리량 + 단계별 평균 시간"""
+    from analysis.analyze import generate_investment_report_with_pdf
+    from fetch.stock_fetcher import KOREAN_COMPANIES
+    from infra import metrics
+
+    companies = list(KOREAN_COMPANIES.keys())
+    results = {}
+    for count in company_counts:
+        targets = [companies[i % len(companies)] for i in range(count)]
+        metrics.reset()
+        failures = 0
+        started = time.perf_counter()
+        with quiet():
+            for company in targets:
+                result = generate_investment_report_with_pdf(company)
+                if 'error' in result:
+                    failures += 1
+        elapsed = time.perf_counter() - started
+
+        stages = {
+            stage: round(stats['avg_seconds'] * 1000, 3)
+            for stage, stats in metrics.snapshot().items()
+        }
+        results[f'companies={count}'] = {
+            'total_s': round(elapsed, 3),
+            'reports_per_sec': round(count / elapsed, 3),
+            'failures': failures,
+            'stage_avg_ms': stages,
+        }
+        print(f"  pipeline companies={count:<4} {elapsed:8.2f}s  {count / elapsed:7.3f} reports/s")
+
+    # 생성된 보고서 파일 정리
+    for name in os.listdir(workdir):
+        if name.endswith(('.json', '.pdf', '.npz')):
+            os.remove(os.path.join(workdir, name))
+    return results
+
+
+def bench_stages(providers, history_lengths, repeat):
+    """히스토리 길이별 단계 처리량"""
+    from analysis.analyze import analyze_technical_indicators
+    from report.pdf_generator import PDFReportGenerator
+
+    company = next(iter(providers.by_company))
+    fixture = providers.by_company[company]
+    generator = PDFReportGenerator()
+    results = {'technical_analysis': {}, 'chart': {}, 'pdf': {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for bars in history_lengths:
+            stock = stock_data_for(providers, company, bars)
+            with quiet():
+                report_data = {
+                    'company_name': company,
+                    'report_date': '2025-01-01 00:00:00',
+                    'stock_data': stock.to_dict(),
+                    'technical_analysis': analyze_technical_indicators(stock),
+                    'market_sentiment': {},
+                    'news_count': fixture.news_count,
+                    'analysis_period': f'{bars}bars',
+                    'investment_report': fixture.investment_report,
+                }
+                key = f'bars={bars}'
+                results['technical_analysis'][key] = summarize(
+                    time_calls(lambda: analyze_technical_indicators(stock), repeat * 10))
+                results['chart'][key] = summarize(
+                    time_calls(lambda: generator.create_stock_chart(report_data['stock_data']), repeat))
+                pdf_path = os.path.join(tmp, 'bench.pdf')
+                results['pdf'][key] = summarize(
+                    time_calls(lambda: generator.generate_pdf_from_data(report_data, pdf_path), repeat))
+
+            print(f"  bars={bars:<5} technical={results['technical_analysis'][key]['median_ms']:8.3f}ms"
+                  f"  chart={results['chart'][key]['median_ms']:9.1f}ms"
+                  f"  pdf={results['pdf'][key]['median_ms']:9.1f}ms")
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    기준값 대비 회귀 목록 (중앙값 시간이 threshold 비율 이상 증가하거나 처리량이 같은 비율 이상 감소)
+    """
+    regressions = []
+    for group, entries in results.get('stages', {}).items():
+        for key, result in entries.items():
+            base = baseline.get('stages', {}).get(group, {}).get(key)
+            if base and result['median_ms'] > base['median_ms'] * (1 + threshold):
+                regressions.append(f"{group} {key}: {base['median_ms']}ms -> {result['median_ms']}ms")
+    for key, result in results.get('pipeline', {}).items():
+        base = baseline.get('pipeline', {}).get(key)
+        if base and result['reports_per_sec'] < base['reports_per_sec'] / (1 + threshold):
+            regressions.append(f"pipeline {key}: {base['reports_per_sec']} -> {result['reports_per_sec']} reports/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="보고서 파이프라인 오프라인 벤치마크")
+    parser.add_argument('--quick', action='store_true', help="1/10개 기업, 짧은 히스토리만 측정")
+    parser.add_argument('--companies', type=str, help="측정할 기업 수 목록 (예: 1,10,100)")
+    parser.add_argument('--bars', type=str, help="측정할 히스토리 길이 목록 (예: 22,250)")
+    parser.add_argument('--repeat', type=int, default=3, help="단계별 측정 반복 횟수 (중앙값 사용)")
+    parser.add_argument('--skip-pipeline', action='store_true', help="종단간 측정 생략")
+    parser.add_argument('--save', action='store_true', help="결과를 기준값 파일로 저장")
+    parser.add_argument('--compare', action='store_true', help="기준값 대비 회귀 검사")
+    parser.add_argument('--threshold', type=float, default=0.25, help="허용 저하 비율 (기본 0.25 = 25%%)")
+    args = parser.parse_args()
+
+    company_counts = QUICK_COMPANY_COUNTS if args.quick else COMPANY_COUNTS
+    history_lengths = QUICK_HISTORY_LENGTHS if args.quick else HISTORY_LENGTHS
+    if args.companies:
+        company_counts = [int(v) for v in args.companies.split(',')]
+    if args.bars:
+        history_lengths = [int(v) for v in args.bars.split(',')]
+
+    providers = FixtureProviders(load_recorded_reports()).install()
+    print(f"기록 보고서 {len(providers.recorded)}개로 외부 API 대체")
+
+    results = {'python': sys.version.split()[0]}
+    original_dir = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        # 파이프라인은 reports/ 상대 경로에 파일을 쓰므로 임시 디렉토리에서 실행
+        os.chdir(workdir)
+        try:
+            print("\n[단계별 처리량]")
+            results['stages'] = bench_stages(providers, history_lengths, max(1, args.repeat))
+            if not args.skip_pipeline:
+                print("\n[종단간 처리량: generate_investment_report_with_pdf]")
+                results['pipeline'] = bench_pipeline(providers, company_counts, os.path.join(workdir, 'reports'))
+        finally:
+            os.chdir(original_dir)
+    results['provider_calls'] = dict(providers.calls)
+
+    if args.save:
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"\n기준값 저장: {BASELINE_PATH}")
+
+    if args.compare:
+        if not os.path.exists(BASELINE_PATH):
+            print("\n기준값 파일이 없습니다. 먼저 --save로 저장하세요.")
+            sys.exit(1)
+        with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print("\n❌ 성능 회귀:")
+            for item in regressions:
+                print(f"   {item}")
+            sys.exit(1)
+        print("\n✅ 회귀 없음")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# gunicorn 프로덕션 서버 설정
+# 실행: gunicorn -c gunicorn.conf.py app:app
+#
+# 차트 렌더링/PDF 생성은 CPU 작업이므로 처리량은 pre-fork 워커 프로세스 수로 CPU 코어 수에 맞춰 확장하고,
+# 워커마다 gthread 스레드(GUNICORN_THREADS)를 두어 오래 열려 있는 연결이 워커 전체를 점유하지 않도록 함
+#
+# - 실시간 시세 스트림(/api/quotes/stream)은 연결마다 스레드 하나를 점유 (워커당 QUOTE_STREAM_MAX_CONNECTIONS개까지),
+#   상위 공급자 조회는 QUOTE_SHARED_DIR을 통해 워커 하나만 수행
+# - 보고서 생성은 워커당 ADMISSION_MAX_IN_FLIGHT개까지만 동시에 실행하고 나머지는 대기열/503으로 처리
+# - sync 워커(GUNICORN_THREADS=1)는 요청 처리 중 heartbeat를 보내지 않아 GUNICORN_TIMEOUT보다 긴 스트림 연결이
+#   워커 재시작을 일으키고, 요청을 하나씩만 받으므로 수락 제어 대기열도 동작하지 않음 → 운영에서는 사용하지 않음
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+bind = os.getenv("BIND", "0.0.0.0:5001")
+
+# 워커 수 (기본: CPU 코어 수)
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+# 워커당 요청 처리 스레드 수 (1이면 sync 워커)
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+worker_class = "gthread" if threads > 1 else "sync"
+
+# 수락 제어(server/admission.py)는 워커 단위이므로 서버 전체 동시 보고서 생성 수는 workers x ADMISSION_MAX_IN_FLIGHT,
+# 대기열은 workers x ADMISSION_MAX_QUEUE. 스레드가 실행 한도보다 많아야 대기열과 초과 요청 거절(load shedding)이 동작함
+if threads <= int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "2")):
+    print(f"⚠️ GUNICORN_THREADS({threads})가 ADMISSION_MAX_IN_FLIGHT 이하이므로 "
+          f"보고서 생성 요청이 대기열에 들어가지 않고 워커 스레드를 기다립니다 (load shedding 비활성)")
+
+# 워커마다 개별적으로 warm-up (부모 프로세스에서 만든 소켓/SQLite 연결을 공유하지 않음)
+preload_app = False
+
+# GPT 분석 + PDF 생성까지 한 요청이 수십 초 걸릴 수 있음
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "300"))
+# SIGTERM 수신 시 진행 중인 보고서 생성이 끝날 때까지 기다리는 시간
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "120"))
+keepalive = 5
+
+# matplotlib 등의 메모리 누적을 막기 위해 일정 요청 수마다 워커 재시작
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "500"))
+max_requests_jitter = 50
+
+# 인기 종목 보고서 사전 생성은 프로덕션 서버에서만 켬 (개발 서버/CLI 스크립트는 기본으로 끔)
+os.environ.setdefault("PREWARM_ENABLED", "1")
+
+# 워커별 /api/metrics 통계를 합쳐 노출하기 위한 디렉토리 (서버 실행마다 새로 만듦)
+os.environ.setdefault("METRICS_MULTIPROC_DIR",
+                      os.path.join(tempfile.gettempdir(), f"report_pipeline_metrics_{os.getpid()}"))
+# 워커 하나만 실시간 시세를 조회하고 나머지 워커와 나눠 쓰기 위한 디렉토리 (서버 실행마다 새로 만듦)
+os.environ.setdefault("QUOTE_SHARED_DIR",
+                      os.path.join(tempfile.gettempdir(), f"report_pipeline_quotes_{os.getpid()}"))
+
+accesslog = "-"
+errorlog = "-"
+
+
+def on_starting(server):
+    """이전 실행의 워커 통계/공유 시세가 섞이지 않도록 공유 디렉토리 초기화"""
+    for name in ("METRICS_MULTIPROC_DIR", "QUOTE_SHARED_DIR"):
+        if os.environ[name]:
+            shutil.rmtree(os.environ[name], ignore_errors=True)
+            os.makedirs(os.environ[name], exist_ok=True)
+
+
+def on_exit(server):
+    for name in ("METRICS_MULTIPROC_DIR", "QUOTE_SHARED_DIR"):
+        if os.environ[name]:
+            shutil.rmtree(os.environ[name], ignore_errors=True)
+
+
+def child_exit(server, worker):
+    """종료된 워커의 누적 통계를 보존하고 게이지/구독 종목은 집계에서 제외"""
+    from infra.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
+    # 종료된 워커의 구독 종목은 더 이상 조회하지 않도록 (비정상 종료여도 QUOTE_DEMAND_TTL_SECONDS 후에는 무시됨)
+    if os.environ["QUOTE_SHARED_DIR"]:
+        try:
+            os.remove(os.path.join(os.environ["QUOTE_SHARED_DIR"], "demand", f"{worker.pid}.json"))
+        except OSError:
+            pass
+
+
+def post_worker_init(worker):
+    """워커 시작 직후 백그라운드 warm-up 시작 (/api/ready는 완료 후 200)"""
+    from server.warmup import start_warm_up
+    start_warm_up()
+
+
+def worker_int(worker):
+    from server.warmup import shutdown
+    shutdown()
+
+
+def worker_exit(server, worker):
+    from server.warmup import shutdown
+    from infra.metrics import flush
+    shutdown()
+    # 마지막 기록 이후의 통계도 child_exit에서 합쳐지도록
+    flush()
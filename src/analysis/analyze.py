@@ -8,24 +8,33 @@ from datetime import datetime, timedelta
 # 프로젝트 루트 경로 추가
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
-from fetch.stock_fetcher import get_stock_data, KoreanStockFetcher
-from fetch.news_fetcher import get_latest_news
-from report.pdf_generator import generate_pdf_report_from_data
+from fetch.stock_fetcher import fetch_stock_data, KoreanStockFetcher
+from fetch.news_fetcher import fetch_latest_news, select_recent_news, NEWSAPI_PAGE_SIZE
+from fetch.ohlcv import get_historical_columns, dumps_report, externalize_history, load_report_file
+from fetch.models import PipelineError
+from fetch.orchestrator import ReportFetch
+from analysis.models import InvestmentReport
+from analysis.llm import chat_completion
+from analysis.prompt_builder import build_analysis_prompt, select_news
+from analysis.news_sentiment import analyze_news, describe_news_sentiment
+from infra.metrics import timed, has_error
+from infra.replay import provider_now
 
 load_dotenv()
 
-from openai import OpenAI
-import numpy as np
-
-client = OpenAI(api_key=os.getenv("GPT_KEY"))
+# numpy, openai, reportlab/matplotlib(pdf_generator)는 import 비용이 커서
+# 실제로 사용하는 함수 안에서만 로드 (app.py / CLI 스크립트 콜드 스타트 단축)
 
+@timed('technical_analysis')
 def analyze_technical_indicators(stock_info):
     """
     주가 데이터를 바탕으로 기술적 지표들을 분석하는 함수
     """
+    import numpy as np
+    
     try:
-        historical_data = stock_info.get('historical_data', [])
-        if not historical_data or len(historical_data) < 5:
+        historical = get_historical_columns(stock_info)
+        if historical['length'] < 5:
             return {
                 'short_trend': 'N/A (데이터 부족)',
                 'medium_trend': 'N/A (데이터 부족)', 
@@ -38,8 +47,8 @@ def analyze_technical_indicators(stock_info):
             }
         
         # 가격 데이터 추출 (최신순으로 정렬)
-        prices = [float(data['close']) for data in historical_data]
-        volumes = [float(data.get('volume', 0)) for data in historical_data]
+        prices = [float(price) for price in historical['close']]
+        volumes = [float(volume) for volume in historical['volume']]
         
         current_price = stock_info.get('current_price', prices[0] if prices else 0)
         
@@ -182,17 +191,21 @@ def analyze_technical_indicators(stock_info):
             'volume_ratio': 'N/A'
         }
 
+@timed('market_sentiment')
 def analyze_market_sentiment(stock_info):
     """
     시장 심리와 모멘텀을 분석하는 함수
     """
+    import numpy as np
+    
     try:
         current_price = stock_info.get('current_price', 0)
         change_percent = stock_info.get('change_percent', 0)
         week_52_high = stock_info.get('52_week_high', 0)
         week_52_low = stock_info.get('52_week_low', 0)
         volume = stock_info.get('volume', 0)
-        historical_data = stock_info.get('historical_data', [])
+        historical = get_historical_columns(stock_info)
+        closes = historical['close']
         
         # 1. 전반적 모멘텀 분석
         if isinstance(change_percent, (int, float)):
@@ -230,9 +243,9 @@ def analyze_market_sentiment(stock_info):
             price_position = "N/A"
         
         # 3. 거래량 패턴 분석
-        if historical_data and len(historical_data) >= 5:
-            recent_volumes = [float(data.get('volume', 0)) for data in historical_data[:5]]
-            recent_prices = [float(data['close']) for data in historical_data[:5]]
+        if historical['length'] >= 5:
+            recent_volumes = [float(v) for v in historical['volume'][:5]]
+            recent_prices = [float(p) for p in closes[:5]]
             
             # 거래량과 가격 변화의 상관관계
             price_changes = [recent_prices[i] - recent_prices[i+1] for i in range(len(recent_prices)-1)]
@@ -255,9 +268,9 @@ def analyze_market_sentiment(stock_info):
             volume_pattern = "N/A (데이터 부족)"
         
         # 4. 변동성 추세 분석
-        if historical_data and len(historical_data) >= 20:
-            recent_prices = [float(data['close']) for data in historical_data[:10]]
-            older_prices = [float(data['close']) for data in historical_data[10:20]]
+        if historical['length'] >= 20:
+            recent_prices = [float(p) for p in closes[:10]]
+            older_prices = [float(p) for p in closes[10:20]]
             
             recent_volatility = np.std(recent_prices) if len(recent_prices) > 1 else 0
             older_volatility = np.std(older_prices) if len(older_prices) > 1 else 0
@@ -296,38 +309,52 @@ def analyze_market_sentiment(stock_info):
             'volatility_trend': 'N/A (분석 오류)'
         }
 
+# 변동성 구간별 분석 기간: (변동성 하한 %, 주가 기간, 뉴스 일수, 변동성 수준, 선택 이유)
+VOLATILITY_PERIODS = [
+    (8, '2mo', 10, "높음", "변동성이 높아 안정적 분석을 위해 긴 기간 적용"),
+    (4, '1mo', 7, "중간", "적정 변동성으로 표준 분석 기간 적용"),
+    (0, '3mo', 14, "낮음", "변동성이 낮아 장기 트렌드 파악을 위해 긴 기간 적용"),
+]
+DEFAULT_NEWS_DAYS = 7
+
+def widest_analysis_window(period='1mo', news_days=DEFAULT_NEWS_DAYS):
+    """
+    adjust_analysis_period가 고를 수 있는 가장 긴 주가 기간과 뉴스 일수
+    (이 범위로 한 번만 조회한 뒤 선택된 기간은 로컬에서 잘라 사용)
+    """
+    from fetch.ohlcv_cache import period_rank
+    
+    periods = [period] + [bucket[1] for bucket in VOLATILITY_PERIODS]
+    days = [news_days] + [bucket[2] for bucket in VOLATILITY_PERIODS]
+    return max(periods, key=period_rank), max(days)
+
 def adjust_analysis_period(stock_info, default_period='1mo'):
     """
     주식의 변동성에 따라 분석 기간을 동적으로 조정하는 함수
     
-    변동성 기준:
+    변동성 기준 (VOLATILITY_PERIODS):
     - 높은 변동성 (8% 이상): 2개월 주가, 10일 뉴스 → 안정적 분석을 위한 긴 기간
     - 중간 변동성 (4-8%): 1개월 주가, 7일 뉴스 → 표준 분석 기간  
     - 낮은 변동성 (4% 미만): 3개월 주가, 14일 뉴스 → 트렌드 파악을 위한 긴 기간
+    
+    변동성은 최근 10일 종가로만 계산하므로 stock_info는 선택될 기간보다 긴 히스토리여도 됨
     """
+    import numpy as np
+    
     try:
-        historical_data = stock_info.get('historical_data', [])
-        if not historical_data or len(historical_data) < 10:
+        historical = get_historical_columns(stock_info)
+        if historical['length'] < 10:
             print("📊 데이터 부족으로 기본 기간 사용 (1개월 주가, 7일 뉴스)")
-            return default_period, 7
+            return default_period, DEFAULT_NEWS_DAYS
         
         # 최근 10일간의 변동성 계산
-        recent_prices = [float(data['close']) for data in historical_data[:10]]
+        recent_prices = [float(p) for p in historical['close'][:10]]
         volatility = np.std(recent_prices) / np.mean(recent_prices) * 100
         
         # 변동성에 따른 기간 조정
-        if volatility > 8:  # 높은 변동성
-            period, news_days = '2mo', 10
-            volatility_level = "높음"
-            reason = "변동성이 높아 안정적 분석을 위해 긴 기간 적용"
-        elif volatility > 4:  # 중간 변동성
-            period, news_days = '1mo', 7
-            volatility_level = "중간"
-            reason = "적정 변동성으로 표준 분석 기간 적용"
-        else:  # 낮은 변동성
-            period, news_days = '3mo', 14
-            volatility_level = "낮음"
-            reason = "변동성이 낮아 장기 트렌드 파악을 위해 긴 기간 적용"
+        for threshold, period, news_days, volatility_level, reason in VOLATILITY_PERIODS:
+            if volatility > threshold or threshold == 0:
+                break
         
         print(f"📊 변동성 분석 결과:")
         print(f"   - 변동성 수준: {volatility_level} ({volatility:.2f}%)")
@@ -339,11 +366,32 @@ def adjust_analysis_period(stock_info, default_period='1mo'):
     except Exception as e:
         print(f"❌ 변동성 분석 중 오류: {e}")
         print("📊 기본 기간 사용 (1개월 주가, 7일 뉴스)")
-        return default_period, 7
+        return default_period, DEFAULT_NEWS_DAYS
 
-def generate_investment_report(company_name, period='1mo', news_days=7):
+def last_analysis_text(company_name):
+    """
+    저장된 가장 최근 보고서의 GPT 분석 텍스트와 보고서 날짜 (OpenAI 장애 시 대체용)
+
+    Returns:
+    - (분석 텍스트, 보고서 날짜), 저장된 보고서가 없으면 (None, None)
+    """
+    from report.report_store import get_report_store
+    try:
+        store = get_report_store()
+        store.sync()
+        reports = store.list_reports(company_name, page_size=1)['reports']
+        if not reports:
+            return None, None
+        data = load_report_file(reports[0]['json_file'])
+    except Exception as e:
+        print(f"이전 보고서 조회 실패 ({company_name}): {e}")
+        return None, None
+    return data.get('investment_report') or None, reports[0]['report_date']
+
+@timed('investment_report')
+def build_investment_report(company_name, period='1mo', news_days=DEFAULT_NEWS_DAYS) -> InvestmentReport:
     """
-    주가 정보와 뉴스 정보를 기반으로 투자보고서를 생성하는 함수
+    주가 정보와 뉴스 정보를 기반으로 투자보고서를 생성하는 함수 (파이프라인 내부용)
     
     Parameters:
     - company_name: 회사명 (예: '삼성전자')
@@ -351,172 +399,120 @@ def generate_investment_report(company_name, period='1mo', news_days=7):
     - news_days: 뉴스 검색 기간 (기본값: 7일)
     
     Returns:
-    - GPT가 생성한 투자보고서 (JSON 형태)
+    - InvestmentReport 객체 (실패 시 PipelineError 발생)
     """
-    try:
-        print(f"=== {company_name} 투자보고서 생성 중 ===")
-        
-        # 1. 주가 데이터 가져오기
-        print("1. 주가 데이터 수집 중...")
-        stock_data = get_stock_data(company_name, period=period)
-        stock_info = json.loads(stock_data)
-        
-        if 'error' in stock_info:
-            return {"error": f"주가 데이터를 가져올 수 없습니다: {stock_info['error']}"}
-        
-        # 1.5. 변동성에 따른 동적 기간 조정
-        adjusted_period, adjusted_news_days = adjust_analysis_period(stock_info, period)
-        if adjusted_period != period or adjusted_news_days != news_days:
-            # 조정된 기간으로 다시 주가 데이터 가져오기
-            if adjusted_period != period:
-                print("📈 조정된 기간으로 주가 데이터를 다시 수집합니다...")
-                stock_data = get_stock_data(company_name, period=adjusted_period)
-                stock_info = json.loads(stock_data)
-            news_days = adjusted_news_days
-            period = adjusted_period
-        
-        # 2. 뉴스 데이터 가져오기
-        print("2. 관련 뉴스 수집 중...")
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=news_days)
-        
-        news_data = get_latest_news(
-            query=company_name,
-            from_date=start_date.strftime('%Y-%m-%d'),
-            to_date=end_date.strftime('%Y-%m-%d')
-            # num_articles는 기간에 따라 자동 계산됨
-        )
-        news_info = json.loads(news_data)
-        
-        # 3. 기술적 지표 및 추세 분석 추가
-        technical_analysis = analyze_technical_indicators(stock_info)
-        market_sentiment = analyze_market_sentiment(stock_info)
-        
-        # 4. GPT 프롬프트 구성 (더 상세한 기술적 분석 정보 포함)
-        prompt = f"""
-다음 정보를 바탕으로 {company_name}에 대한 전문적인 투자보고서를 작성해주세요.
-
-## 주가 현황:
-- 현재가: {stock_info.get('current_price', 'N/A')}원
-- 전일대비: {stock_info.get('change', 'N/A')}원 ({stock_info.get('change_percent', 'N/A')}%)
-- 거래량: {stock_info.get('volume', 'N/A')}주 (평균 대비 {technical_analysis.get('volume_ratio', 'N/A')})
-- 고가: {stock_info.get('high', 'N/A')}원
-- 저가: {stock_info.get('low', 'N/A')}원
-- 시가총액: {stock_info.get('market_cap', 'N/A')}
-- PER: {stock_info.get('pe_ratio', 'N/A')}
-- 배당수익률: {stock_info.get('dividend_yield', 'N/A')}
-- 52주 최고가: {stock_info.get('52_week_high', 'N/A')}원
-- 52주 최저가: {stock_info.get('52_week_low', 'N/A')}원
-
-## 기술적 분석 지표:
-- 단기 추세 (5일): {technical_analysis.get('short_trend', 'N/A')}
-- 중기 추세 (20일): {technical_analysis.get('medium_trend', 'N/A')}
-- 장기 추세 (60일): {technical_analysis.get('long_trend', 'N/A')}
-- 추세 강도: {technical_analysis.get('trend_strength', 'N/A')}
-- 변동성 수준: {technical_analysis.get('volatility_level', 'N/A')}
-- 현재가 vs 이동평균: {technical_analysis.get('price_vs_ma', 'N/A')}
-- 지지/저항 수준: {technical_analysis.get('support_resistance', 'N/A')}
-
-## 시장 심리 분석:
-- 전반적 모멘텀: {market_sentiment.get('momentum', 'N/A')}
-- 가격 위치 (52주 기준): {market_sentiment.get('price_position', 'N/A')}
-- 거래량 패턴: {market_sentiment.get('volume_pattern', 'N/A')}
-- 변동성 추세: {market_sentiment.get('volatility_trend', 'N/A')}
-
-## 최근 뉴스 (최근 {news_days}일):
-"""
+    print(f"=== {company_name} 투자보고서 생성 중 ===")
+    
+    # 변동성 구간이 고를 수 있는 가장 긴 기간으로 한 번만 조회 (기간 조정 시 재조회하지 않음)
+    fetch_period, fetch_news_days = widest_analysis_window(period, news_days)
+    # 재생 모드에서는 기록 시각 기준 (뉴스 요청 키와 기사 선택이 기록할 때와 같도록)
+    end_date = provider_now()
+    start_date = end_date - timedelta(days=fetch_news_days)
+    
+    with ReportFetch(company_name) as fetch:
+        # 1. 주가 데이터와 뉴스를 동시에 수집 (뉴스는 기간 조정 결과를 기다리지 않고 가장 넓은 기간으로 미리 조회)
+        print("1. 주가 데이터 및 관련 뉴스 수집 중...")
+        fetch.submit('stock', fetch_stock_data, company_name, period=fetch_period)
+        fetch.submit('news', fetch_latest_news,
+                     query=company_name,
+                     from_date=start_date.strftime('%Y-%m-%d'),
+                     to_date=end_date.strftime('%Y-%m-%d'),
+                     num_articles=NEWSAPI_PAGE_SIZE)
+        try:
+            stock_info = fetch.result('stock')
+        except PipelineError as e:
+            raise PipelineError(f"주가 데이터를 가져올 수 없습니다: {e}", **e.details)
         
-        # 뉴스 정보 추가
-        if news_info and len(news_info) > 0:
-            for i, news in enumerate(news_info[:5], 1):  # 상위 5개 뉴스만 사용
-                prompt += f"{i}. {news.get('title', 'N/A')}\n   - {news.get('description', 'N/A')}\n\n"
-        else:
-            prompt += "관련 뉴스를 찾을 수 없습니다.\n\n"
+        # 1.5. 변동성에 따른 동적 기간 조정 (조회한 히스토리에서 선택된 기간만 잘라 사용)
+        period, news_days = adjust_analysis_period(stock_info, period)
+        if period != fetch_period:
+            stock_info.trim_history(period)
         
-        prompt += """
-위 정보를 바탕으로 다음 구조로 투자보고서를 작성해주세요:
-
-1. **종목 개요** (기업 소개 및 현재 주가 상황)
-2. **기술적 분석** 
-   - 제공된 기술적 지표를 바탕으로 추세 방향성과 강도 분석
-   - 단기/중기/장기 추세의 일치성 또는 divergence 분석
-   - 현재 변동성 수준과 과거 대비 비교
-   - 거래량 패턴과 가격 움직임의 상관관계
-   - 지지/저항 수준 근처에서의 가격 행동 분석
-3. **기본적 분석** (재무지표, PER, 시가총액 등 분석)
-4. **시장 심리 및 모멘텀 분석**
-   - 현재 시장 심리 상태와 모멘텀 방향
-   - 52주 기준 가격 위치의 의미
-   - 거래량과 변동성 패턴이 시사하는 바
-5. **뉴스 및 시장 동향** (최근 뉴스가 주가에 미치는 영향 분석)
-6. **투자 의견** (매수/매도/보유 추천 및 근거)
-7. **위험 요소** (투자 시 주의해야 할 리스크 - 특히 상세히 작성)
-8. **목표가 및 시나리오 분석** 
-   - 기술적 분석을 바탕으로 한 단기 목표가 (1-3개월)
-   - 기본적 분석 기반 중장기 목표가 (3-12개월)
-   - 상승/하락 시나리오별 예상 주가 범위
-
-**중요한 분석 지침:**
-- 제공된 기술적 지표들을 적극 활용하여 차트 패턴과 추세를 구체적으로 분석하세요
-- 추세 강도와 변동성 수준을 고려한 동적인 분석을 제공하세요
-- 단기/중기/장기 추세 간의 상호작용과 시사점을 분석하세요
-- 거래량과 변동성 패턴을 통한 시장 참여자들의 심리 상태를 해석하세요
-- 투자 조언은 보수적이고 신중한 관점에서 제공하되, 기술적 신호도 반영하세요
-- 위험 요소를 충분히 강조하고 구체적으로 설명하세요
-- 목표가는 기술적/기본적 분석을 종합하여 현실적 범위로 설정하세요
-- 시장 변동성과 불확실성을 반드시 고려하세요
-
-각 섹션을 상세하고 전문적으로 작성해주세요. 특히 기술적 분석 부분에서는 제공된 지표들을 구체적으로 언급하며 분석하세요.
-"""
-
-        # 5. GPT API 호출
-        print("4. GPT 분석 중...")
-        response = client.chat.completions.create(
+        # 2. 뉴스 수집 완료 대기 (가장 넓은 기간의 기사 중 선택된 기간의 기사만 사용)
+        print("2. 관련 뉴스 수집 중...")
+        news_pool = fetch.result('news')
+    
+    # 기사 수는 선택된 기간에 따라 자동 계산됨
+    news_info = select_recent_news(news_pool, news_days, end_date.strftime('%Y-%m-%d'))
+    print(f"   {fetch_news_days}일 뉴스 {len(news_pool)}개 중 최근 {news_days}일 {len(news_info)}개 사용")
+    # 종목 관련도 순으로 정렬하고 통신사 전재 등 거의 같은 기사는 하나만 남김 (감성 분석과 프롬프트가 같은 목록 사용)
+    news_info, duplicates_removed = select_news(news_info, company_name, stock_info.get('symbol'))
+    
+    # 3. 기술적 지표 및 추세 분석 추가
+    technical_analysis = analyze_technical_indicators(stock_info)
+    market_sentiment = analyze_market_sentiment(stock_info)
+    
+    # 3.5. 뉴스 감성/토픽 분석 (로컬 키워드 기반, 기사 본문 대신 요약을 프롬프트에 전달)
+    news_analysis = analyze_news(news_info, company_name, stock_info.get('symbol'))
+    market_sentiment['news_sentiment'] = describe_news_sentiment(news_analysis)
+    
+    # 4. GPT 프롬프트 구성 (정렬/중복 제거된 뉴스를 토큰 예산 안에서 구성)
+    prompt = build_analysis_prompt(company_name, stock_info, technical_analysis,
+                                   market_sentiment, news_info, news_days, news_analysis=news_analysis,
+                                   duplicates_removed=duplicates_removed)
+    print(f"   프롬프트 토큰: {prompt.prompt_tokens}, 뉴스 {prompt.news_used}/{prompt.news_candidates}개 사용"
+          f" (중복 {prompt.duplicates_removed}개 제외)")
+    
+    # 공급자 장애로 마지막 캐시 데이터를 사용한 항목 (data_sources 키)
+    stale_sources = []
+    if stock_info.stale:
+        stale_sources.append('stock_data')
+    if any(article.stale for article in news_pool):
+        stale_sources.append('news_data')
+    
+    # 5. GPT API 호출 (실패하거나 회로가 열려 있으면 가장 최근 보고서의 분석을 stale로 표시하여 사용)
+    print("4. GPT 분석 중...")
+    try:
+        investment_report = chat_completion(
             model="gpt-4",
-            messages=[
-                {"role": "system", "content": """당신은 경험이 풍부하고 보수적인 주식 애널리스트입니다. 
-
-주요 분석 능력:
-- 기술적 분석: 차트 패턴, 추세선, 이동평균, 거래량 분석
-- 기본적 분석: 재무지표, 밸류에이션, 산업 분석
-- 시장 심리 분석: 모멘텀, 변동성, 투자자 심리
-
-분석 원칙:
-1. 제공된 기술적 지표를 구체적으로 언급하며 분석
-2. 단기/중기/장기 추세의 일치성과 divergence 해석
-3. 거래량과 가격 움직임의 상관관계 분석
-4. 변동성과 시장 심리를 고려한 위험 평가
-5. 보수적이고 현실적인 목표가 설정
-6. 시나리오별 분석 (상승/하락/횡보)
-
-항상 리스크를 충분히 고려하고, 불확실성을 강조하며, 객관적 데이터에 기반한 분석을 제공합니다."""},
-                {"role": "user", "content": prompt}
-            ],
+            messages=prompt.messages,
             temperature=0.5,
             max_tokens=2500
         )
+    except Exception as e:
+        previous, previous_date = last_analysis_text(company_name)
+        if previous is None:
+            raise PipelineError(f"GPT 분석 실패: {e}")
+        print(f"   GPT 분석 실패, {previous_date} 보고서의 분석 사용: {e}")
+        investment_report = f"※ 분석 서비스 장애로 {previous_date} 보고서의 분석을 표시합니다.\n\n{previous}"
+        stale_sources.append('analysis')
+    
+    # 5. 결과 구성
+    report = InvestmentReport(
+        company_name=company_name,
+        report_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        stock_data=stock_info,
+        technical_analysis=technical_analysis,
+        market_sentiment=market_sentiment,
+        news=news_info,
+        analysis_period=f"{period} (주가), {news_days}일 (뉴스)",
+        investment_report=investment_report,
+        news_analysis=news_analysis,
+        stale_sources=stale_sources
+    )
+    
+    print("4. 투자보고서 생성 완료!")
+    return report
+
+def generate_investment_report(company_name, period='1mo', news_days=7):
+    """
+    주가 정보와 뉴스 정보를 기반으로 투자보고서를 생성하는 함수 (외부 호출용)
+    
+    Parameters:
+    - company_name: 회사명 (예: '삼성전자')
+    - period: 주가 데이터 기간 (기본값: '1mo')
+    - news_days: 뉴스 검색 기간 (기본값: 7일)
+    
+    Returns:
+    - GPT가 생성한 투자보고서 (JSON 형태)
+    """
+    try:
+        report = build_investment_report(company_name, period, news_days)
+        return dumps_report(report.to_dict())
         
-        # 5. 결과 구성
-        report = {
-            "company_name": company_name,
-            "report_date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            "stock_data": stock_info,
-            "technical_analysis": technical_analysis,
-            "market_sentiment": market_sentiment,
-            "news_count": len(news_info) if news_info else 0,
-            "analysis_period": f"{period} (주가), {news_days}일 (뉴스)",
-            "investment_report": response.choices[0].message.content,
-            "data_sources": {
-                "stock_data": "Yahoo Finance",
-                "news_data": "NewsAPI",
-                "technical_analysis": "Custom Analysis",
-                "analysis": "OpenAI GPT-4"
-            }
-        }
-        
-        print("4. 투자보고서 생성 완료!")
-        return json.dumps(report, ensure_ascii=False, indent=2)
-        
+    except PipelineError as e:
+        print(f"투자보고서 생성 중 오류 발생: {str(e)}")
+        return json.dumps(e.to_dict(), ensure_ascii=False, indent=2)
     except Exception as e:
         print(f"투자보고서 생성 중 오류 발생: {str(e)}")
         return json.dumps({"error": f"투자보고서 생성 실패: {str(e)}"}, ensure_ascii=False, indent=2)
@@ -536,10 +532,14 @@ def generate_multiple_reports(company_names, period='1mo', news_days=7):
     reports = {}
     for company_name in company_names:
         print(f"\n{'='*50}")
-        report = generate_investment_report(company_name, period, news_days)
-        reports[company_name] = json.loads(report)
+        try:
+            reports[company_name] = build_investment_report(company_name, period, news_days).to_dict()
+        except PipelineError as e:
+            reports[company_name] = e.to_dict()
+        except Exception as e:
+            reports[company_name] = {"error": f"투자보고서 생성 실패: {str(e)}"}
     
-    return json.dumps(reports, ensure_ascii=False, indent=2)
+    return dumps_report(reports)
 
 def generate_multiple_reports_with_pdf(company_names, period='1mo', news_days=None):
     """
@@ -594,6 +594,7 @@ def generate_multiple_reports_with_pdf(company_names, period='1mo', news_days=No
     
     return results
 
+@timed('report_pipeline', is_error=has_error)
 def generate_investment_report_with_pdf(company_name, period='1mo', news_days=None, save_pdf=True):
     """
     주가 정보와 뉴스 정보를 기반으로 투자보고서를 생성하고 PDF로도 저장하는 함수
@@ -607,18 +608,20 @@ def generate_investment_report_with_pdf(company_name, period='1mo', news_days=No
     Returns:
     - 생성된 파일 경로들을 포함한 딕셔너리
     """
+    from report.pdf_generator import generate_pdf_report_from_data
+    
     try:
         print(f"=== {company_name} 투자보고서 생성 중 ===")
         
         # 1. 투자보고서 생성 (news_days가 None이면 변동성 기반 자동 결정)
-        if news_days is None:
-            report_json = generate_investment_report(company_name, period)
-        else:
-            report_json = generate_investment_report(company_name, period, news_days)
-        report_data = json.loads(report_json)
-        
-        if 'error' in report_data:
-            return {"error": f"투자보고서 생성 실패: {report_data['error']}"}
+        try:
+            if news_days is None:
+                report = build_investment_report(company_name, period)
+            else:
+                report = build_investment_report(company_name, period, news_days)
+        except PipelineError as e:
+            return {"error": f"투자보고서 생성 실패: {e}"}
+        report_data = report.to_dict()
         
         # 2. JSON 파일 저장
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
@@ -627,8 +630,9 @@ def generate_investment_report_with_pdf(company_name, period='1mo', news_days=No
         # reports 디렉토리가 없으면 생성
         os.makedirs('reports', exist_ok=True)
         
+        # 긴 히스토리는 NPZ 사이드카로 분리하여 저장 (메모리의 report_data는 인라인 유지)
         with open(json_filename, 'w', encoding='utf-8') as f:
-            f.write(report_json)
+            f.write(dumps_report(externalize_history(report_data, json_filename)))
         
         result = {
             "company_name": company_name,
@@ -636,6 +640,8 @@ def generate_investment_report_with_pdf(company_name, period='1mo', news_days=No
             "pdf_file": None,
             "status": "success"
         }
+        if report.stale_sources:
+            result["stale_sources"] = report.stale_sources
         
         # 3. PDF 파일 생성
         if save_pdf:
@@ -670,14 +676,15 @@ def convert_existing_report_to_pdf(json_file_path):
     Returns:
     - PDF 파일 경로 또는 None
     """
+    from report.pdf_generator import generate_pdf_report_from_data
+    
     try:
         if not os.path.exists(json_file_path):
             print(f"파일을 찾을 수 없습니다: {json_file_path}")
             return None
         
-        # JSON 파일 읽기
-        with open(json_file_path, 'r', encoding='utf-8') as f:
-            report_data = json.load(f)
+        # JSON 파일 읽기 (사이드카 히스토리 포함)
+        report_data = load_report_file(json_file_path)
         
         # PDF 파일명 생성
         base_name = os.path.splitext(json_file_path)[0]
@@ -0,0 +1,276 @@
+# 종목 비교 분석 모듈
+# 임의의 종목 집합(전체 100개 포함)에 대해 캐시된 OHLCV로 정렬된 일간 수익률 행렬을 한 번 만들고
+# 상관계수 행렬, KOSPI(^KS11) 대비 베타, 업종 대비 성과를 벡터 연산으로 계산
+# 결과는 비교 차트/상관계수 히트맵과 PDF 보고서에서 함께 사용
+
+import os
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional
+
+try:
+    from fetch.stock_fetcher import KOREAN_COMPANIES, KOREAN_SECTORS, get_sector
+    from fetch.ohlcv_cache import get_ohlcv_cache, PERIOD_TRADING_DAYS
+    from analysis.screener import build_price_matrix
+    from infra.metrics import span
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from fetch.stock_fetcher import KOREAN_COMPANIES, KOREAN_SECTORS, get_sector
+    from fetch.ohlcv_cache import get_ohlcv_cache, PERIOD_TRADING_DAYS
+    from analysis.screener import build_price_matrix
+    from infra.metrics import span
+
+BENCHMARK_SYMBOL = '^KS11'
+BENCHMARK_NAME = 'KOSPI'
+
+
+@dataclass(slots=True)
+class ComparisonResult:
+    """비교 분석 결과 (배열은 요청한 종목 순서)"""
+    symbols: List[str]
+    names: List[str]
+    sectors: List[str]
+    dates: List[str]
+    prices: Any                 # 종목 x 거래일 종가 (직전 값으로 채움)
+    benchmark_prices: Any       # 거래일별 KOSPI 지수 (없으면 None)
+    correlation: Any            # 종목 x 종목 일간 수익률 상관계수
+    beta: Any                   # KOSPI 대비 베타
+    total_return: Any           # 기간 수익률 (%)
+    sector_return: Dict[str, float] = field(default_factory=dict)   # 업종 평균 기간 수익률 (%)
+    relative_to_sector: Any = None      # 업종 평균 대비 초과 수익률 (%p)
+    benchmark_return: Optional[float] = None
+
+    def normalized_prices(self):
+        """첫 거래일을 100으로 맞춘 가격 (상장 전 구간은 NaN)"""
+        import numpy as np
+
+        first = _first_valid(self.prices)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.prices / first[:, None] * 100
+
+    def top_correlated(self, symbol: str, n: int = 5) -> List[Dict[str, Any]]:
+        """symbol과 수익률 상관계수가 높은 종목"""
+        import numpy as np
+
+        i = self.symbols.index(symbol)
+        row = self.correlation[i].copy()
+        row[i] = np.nan
+        order = [j for j in np.argsort(-np.nan_to_num(row, nan=-np.inf)) if not np.isnan(row[j])]
+        return [{'name': self.names[j], 'ticker': self.symbols[j], 'correlation': round(float(row[j]), 3)}
+                for j in order[:n]]
+
+    def chart_data(self) -> Dict[str, Any]:
+        """비교 차트/히트맵 렌더링 입력 (차트 워커 프로세스로 전달 가능한 값만 포함)"""
+        import numpy as np
+
+        benchmark_normalized = None
+        if self.benchmark_prices is not None:
+            valid = self.benchmark_prices[~np.isnan(self.benchmark_prices)]
+            if valid.size:
+                benchmark_normalized = self.benchmark_prices / valid[0] * 100
+        return {
+            'symbols': list(self.symbols),
+            'dates': list(self.dates),
+            'normalized': self.normalized_prices(),
+            'benchmark_name': BENCHMARK_NAME,
+            'benchmark_normalized': benchmark_normalized,
+            'benchmark_return': self.benchmark_return,
+            'total_return': self.total_return,
+            'sector_average': [self.sector_return.get(sector, np.nan) for sector in self.sectors],
+            'correlation': self.correlation,
+        }
+
+    def to_dict(self, max_matrix: int = 30) -> Dict[str, Any]:
+        """
+        보고서 JSON용 요약 (상관계수 행렬은 종목 수가 max_matrix 이하일 때만 포함)
+        """
+        def _value(v, digits=3):
+            v = float(v)
+            return None if v != v else round(v, digits)
+
+        rows = []
+        for i, symbol in enumerate(self.symbols):
+            rows.append({
+                'name': self.names[i],
+                'ticker': symbol,
+                'sector': self.sectors[i],
+                'total_return': _value(self.total_return[i], 2),
+                'beta': _value(self.beta[i]),
+                'relative_to_sector': _value(self.relative_to_sector[i], 2),
+            })
+
+        result = {
+            'start_date': self.dates[0] if self.dates else None,
+            'end_date': self.dates[-1] if self.dates else None,
+            'benchmark': BENCHMARK_NAME,
+            'benchmark_return': None if self.benchmark_return is None else round(self.benchmark_return, 2),
+            'sector_return': {name: round(value, 2) for name, value in self.sector_return.items()},
+            'stocks': rows,
+        }
+        if len(self.symbols) <= max_matrix:
+            result['correlation'] = [[_value(v) for v in row] for row in self.correlation]
+        return result
+
+
+def _first_valid(matrix):
+    """행별 첫 번째 유효 값"""
+    import numpy as np
+
+    valid = ~np.isnan(matrix)
+    first_index = np.where(valid.any(axis=1), valid.argmax(axis=1), 0)
+    return matrix[np.arange(matrix.shape[0]), first_index]
+
+
+def _daily_returns(prices):
+    import numpy as np
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return prices[:, 1:] / prices[:, :-1] - 1
+
+
+def correlation_matrix(returns):
+    """
+    결측(상장 전 구간)을 고려한 쌍별 상관계수 행렬
+
+    각 종목 쌍은 두 종목 모두 수익률이 있는 거래일만으로 평균/편차를 계산하므로 (pairwise complete)
+    pandas DataFrame.corr()와 같은 값이며, 겹치는 구간의 합계를 행렬 곱 몇 번으로 전체 쌍에 대해 계산
+    """
+    import numpy as np
+
+    valid = ~np.isnan(returns)
+    weights = valid.astype(np.float64)
+    # 상관계수는 종목별 상수 이동에 불변이므로 전체 구간 평균을 빼서 합계의 자릿수 손실만 줄임
+    with np.errstate(invalid='ignore'):
+        shifted = np.where(valid, returns - np.nanmean(returns, axis=1, keepdims=True), 0.0)
+
+    # [i, j] = 종목 i와 j가 모두 유효한 날의 합계
+    count = weights @ weights.T
+    sum_x = shifted @ weights.T
+    sum_sq = (shifted ** 2) @ weights.T
+    cross = shifted @ shifted.T
+    with np.errstate(invalid='ignore', divide='ignore'):
+        covariance = cross - sum_x * sum_x.T / count
+        var_x = sum_sq - sum_x ** 2 / count
+        corr = covariance / np.sqrt(var_x * var_x.T)
+    np.fill_diagonal(corr, 1.0)
+    return np.clip(corr, -1.0, 1.0)
+
+
+def market_beta(returns, market_returns):
+    """
+    벤치마크 대비 베타 (종목별로 벤치마크와 함께 유효한 거래일 기준)
+    """
+    import numpy as np
+
+    valid = ~np.isnan(returns) & ~np.isnan(market_returns)[None, :]
+    market = np.where(valid, market_returns[None, :], np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        market_mean = np.nanmean(market, axis=1, keepdims=True)
+        stock_mean = np.nanmean(np.where(valid, returns, np.nan), axis=1, keepdims=True)
+        market_dev = np.where(valid, market - market_mean, 0.0)
+        stock_dev = np.where(valid, returns - stock_mean, 0.0)
+        return (stock_dev * market_dev).sum(axis=1) / (market_dev ** 2).sum(axis=1)
+
+
+def _period_return(prices):
+    import numpy as np
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return (prices[:, -1] / _first_valid(prices) - 1) * 100
+
+
+def _display_symbol(symbol: str) -> str:
+    return symbol if symbol.startswith('^') else symbol.split('.')[0]
+
+
+def compare_symbols(symbols: List[str], period: str = '3mo', benchmark: str = BENCHMARK_SYMBOL,
+                    include_sector_peers: bool = True) -> ComparisonResult:
+    """
+    종목 집합 비교 분석
+
+    Parameters:
+    - symbols: 종목코드 목록 (예: ['005930', '000660'] 또는 '.KS' 접미사 포함)
+    - period: 비교 기간 (yfinance period)
+    - benchmark: 베타 계산 기준 지수 심볼
+    - include_sector_peers: 업종 평균을 요청 종목뿐 아니라 지원 종목 전체의 같은 업종 기업으로 계산
+
+    Returns:
+    - ComparisonResult (데이터가 없는 종목은 제외)
+    """
+    import numpy as np
+
+    requested = list(dict.fromkeys(_display_symbol(s) for s in symbols))
+    names_by_ticker = {}
+    for name, ticker in KOREAN_COMPANIES.items():
+        names_by_ticker.setdefault(ticker, name)
+
+    sectors = {ticker: get_sector(ticker) for ticker in requested}
+    peers = []
+    if include_sector_peers:
+        wanted = set(sectors.values()) - {'기타'}
+        for sector in wanted:
+            peers.extend(KOREAN_COMPANIES[name] for name in KOREAN_SECTORS[sector] if name in KOREAN_COMPANIES)
+    universe = list(dict.fromkeys(requested + peers))
+
+    with span('comparison_load'):
+        histories = get_ohlcv_cache().get_many(universe + [benchmark], period)
+
+    with span('comparison_compute'):
+        window = PERIOD_TRADING_DAYS.get(period, 63) + 1
+        matrix = build_price_matrix(histories, window)
+        row_of = {symbol: i for i, symbol in enumerate(matrix['symbols'])}
+        prices = matrix['close']
+
+        benchmark_prices = prices[row_of[benchmark]] if benchmark in row_of else None
+        stock_rows = [row_of[t] for t in universe if t in row_of]
+        stock_tickers = [t for t in universe if t in row_of]
+        returns = _daily_returns(prices[stock_rows]) if stock_rows else np.zeros((0, 0))
+        total = _period_return(prices[stock_rows]) if stock_rows else np.zeros(0)
+
+        # 업종 평균 수익률 (유효한 종목만 동일 가중)
+        sector_codes = [get_sector(t) for t in stock_tickers]
+        sector_names, inverse = np.unique(np.array(sector_codes, dtype=str), return_inverse=True)
+        has_value = ~np.isnan(total)
+        sums = np.bincount(inverse, weights=np.where(has_value, total, 0.0), minlength=len(sector_names))
+        counts = np.bincount(inverse, weights=has_value.astype(np.float64), minlength=len(sector_names))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            sector_mean = sums / counts
+
+        # 요청한 종목만 결과에 포함 (업종 평균 계산용 종목 제외)
+        keep = [i for i, t in enumerate(stock_tickers) if t in sectors]
+        returns = returns[keep]
+        if benchmark_prices is not None:
+            market_returns = _daily_returns(benchmark_prices[None, :])[0]
+            beta = market_beta(returns, market_returns)
+            benchmark_return = float(_period_return(benchmark_prices[None, :])[0])
+        else:
+            beta = np.full(len(keep), np.nan)
+            benchmark_return = None
+
+        kept_tickers = [stock_tickers[i] for i in keep]
+        return ComparisonResult(
+            symbols=kept_tickers,
+            names=[names_by_ticker.get(t, t) for t in kept_tickers],
+            sectors=[sectors[t] for t in kept_tickers],
+            dates=matrix['dates'],
+            prices=prices[[stock_rows[i] for i in keep]] if keep else np.zeros((0, len(matrix['dates']))),
+            benchmark_prices=benchmark_prices,
+            correlation=correlation_matrix(returns) if keep else np.zeros((0, 0)),
+            beta=beta,
+            total_return=total[keep],
+            sector_return={str(name): float(sector_mean[i]) for i, name in enumerate(sector_names)
+                           if name in set(sectors.values()) and not np.isnan(sector_mean[i])},
+            relative_to_sector=total[keep] - sector_mean[inverse[keep]] if keep else np.zeros(0),
+            benchmark_return=benchmark_return,
+        )
+
+
+def sector_peers(symbol: str, limit: int = 4) -> List[str]:
+    """같은 업종의 다른 지원 종목코드 (KOREAN_SECTORS 순서)"""
+    ticker = _display_symbol(symbol)
+    sector = get_sector(ticker)
+    if sector == '기타':
+        return []
+    peers = [KOREAN_COMPANIES[name] for name in KOREAN_SECTORS[sector]
+             if name in KOREAN_COMPANIES and KOREAN_COMPANIES[name] != ticker]
+    return list(dict.fromkeys(peers))[:limit]
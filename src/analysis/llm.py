@@ -0,0 +1,66 @@
+# OpenAI 클라이언트 모듈
+# openai 패키지는 import 비용이 크므로 첫 GPT 호출 시점에만 로드하고 클라이언트를 생성
+
+import os
+import sys
+import threading
+
+try:
+    from infra.metrics import timed
+    from infra.replay import wrap_openai_client
+    from infra.circuit import circuit, slow_call_seconds
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from infra.metrics import timed
+    from infra.replay import wrap_openai_client
+    from infra.circuit import circuit, slow_call_seconds
+
+# 요청 하나의 timeout (초, 기본: openai 회로의 지연 호출 기준) / SDK 자체 재시도 횟수
+# SDK 기본값(600초, 재시도 2회)이면 장애 시 보고서 요청 하나가 gunicorn timeout을 넘겨 붙잡혀 있게 되므로
+# timeout x (재시도 + 1)이 GUNICORN_TIMEOUT 안에 들어오도록 설정
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", str(slow_call_seconds('openai'))))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "1"))
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """프로세스 단위로 공유되는 OpenAI 클라이언트 반환 (최초 호출 시 생성)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                def create_client():
+                    from openai import OpenAI
+                    return OpenAI(api_key=os.getenv("GPT_KEY"), timeout=OPENAI_TIMEOUT_SECONDS,
+                                  max_retries=OPENAI_MAX_RETRIES)
+                # PROVIDER_MODE가 replay이면 실제 클라이언트 없이 기록된 응답을 반환
+                _client = wrap_openai_client(create_client)
+    return _client
+
+
+@timed('gpt')
+def chat_completion(messages, model="gpt-4", temperature=0.7, max_tokens=2000) -> str:
+    """
+    Chat Completions API 호출 후 응답 텍스트 반환
+
+    Parameters:
+    - messages: [{"role": ..., "content": ...}, ...]
+    - model: 사용할 모델명
+    - temperature / max_tokens: 생성 옵션
+
+    Returns:
+    - 첫 번째 응답 메시지 내용
+
+    Raises:
+    - CircuitOpenError: OpenAI 회로가 열려 있는 경우 (호출하지 않음)
+    """
+    with circuit('openai'):
+        response = get_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        )
+    return response.choices[0].message.content
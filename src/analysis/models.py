@@ -0,0 +1,53 @@
+# 분석 단계 결과 객체 모듈
+# 투자보고서는 파일 저장/HTTP 응답 직전에만 딕셔너리/JSON으로 변환
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Any
+
+from fetch.models import StockData, NewsArticle
+
+DEFAULT_DATA_SOURCES = {
+    "stock_data": "Yahoo Finance",
+    "news_data": "NewsAPI",
+    "technical_analysis": "Custom Analysis",
+    "analysis": "OpenAI GPT-4"
+}
+
+
+@dataclass(slots=True)
+class InvestmentReport:
+    """GPT 분석 결과를 포함한 투자보고서"""
+    company_name: str
+    report_date: str
+    stock_data: StockData
+    technical_analysis: Dict[str, Any]
+    market_sentiment: Dict[str, Any]
+    news: List[NewsArticle]
+    analysis_period: str
+    investment_report: str
+    data_sources: Dict[str, str] = field(default_factory=lambda: dict(DEFAULT_DATA_SOURCES))
+    news_analysis: Dict[str, Any] = field(default_factory=dict)
+    # 공급자 장애로 마지막 캐시 데이터를 사용한 항목 (data_sources 키)
+    stale_sources: List[str] = field(default_factory=list)
+
+    @property
+    def news_count(self) -> int:
+        return len(self.news)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """보고서 JSON 형태로 변환"""
+        data = {
+            "company_name": self.company_name,
+            "report_date": self.report_date,
+            "stock_data": self.stock_data.to_dict(),
+            "technical_analysis": self.technical_analysis,
+            "market_sentiment": self.market_sentiment,
+            "news_count": self.news_count,
+            "news_analysis": self.news_analysis,
+            "analysis_period": self.analysis_period,
+            "investment_report": self.investment_report,
+            "data_sources": self.data_sources
+        }
+        if self.stale_sources:
+            data["stale_sources"] = list(self.stale_sources)
+        return data
@@ -0,0 +1,225 @@
+# 로컬 뉴스 감성/토픽 분석 모듈
+# 한국어 금융 키워드 사전 기반 TF-IDF 점수로 기사별 감성(-1~1)과 토픽을 계산하고,
+# 핵심 문장을 추출하여 GPT 프롬프트와 market_sentiment에 요약 형태로 전달
+#
+# 기사별 점수는 본문 해시를 키로 캐시하므로 여러 기업 보고서가 같은 기사를 공유해도 한 번만 계산
+
+import hashlib
+import math
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+
+# 감성 키워드 (어간 기준 부분 문자열 매칭)
+POSITIVE_TERMS = [
+    '상승', '급등', '강세', '반등', '호재', '호실적', '최대 실적', '사상 최대', '신고가', '돌파',
+    '흑자', '증가', '성장', '개선', '회복', '확대', '수주', '상향', '매수', '기대',
+    '순매수', '호조', '수혜', '승인', '출시', '계약', '증익', '배당 확대', '자사주',
+]
+NEGATIVE_TERMS = [
+    '하락', '급락', '약세', '폭락', '악재', '부진', '적자', '감소', '둔화', '악화',
+    '우려', '리스크', '손실', '하향', '매도', '순매도', '소송', '제재', '리콜', '불확실',
+    '감익', '위기', '충격', '경고', '조사', '횡령', '파업', '지연', '철수',
+]
+
+# 토픽 키워드
+TOPIC_TERMS = {
+    '실적': ['실적', '영업이익', '매출', '순이익', '분기', '어닝', '컨센서스'],
+    '반도체/기술': ['반도체', 'HBM', 'D램', '낸드', '파운드리', 'AI', '배터리', '전기차'],
+    '수급': ['외국인', '기관', '개인', '순매수', '순매도', '공매도', '수급'],
+    '주주환원': ['배당', '자사주', '주주환원', '소각'],
+    '투자/M&A': ['인수', '합병', '투자', '지분', '증설', '공장'],
+    '규제/법률': ['규제', '소송', '제재', '조사', '공정위', '관세', '법원'],
+    '거시경제': ['금리', '환율', '인플레이션', '경기', '연준', '수출', '유가'],
+}
+
+# 금융 뉴스 대부분에 나오는 일반 용어 (IDF를 낮게 고정)
+COMMON_TERMS = {'상승', '하락', '증가', '감소', '기대', '우려', '확대', '개선', '매수', '매도'}
+# 고정 IDF (일반 용어 / 그 외 용어)
+# 기사 점수는 캐시되어 다른 요청에서 재사용되므로 함께 계산한 기사 묶음에 따라 달라지지 않도록 상수로 둠
+COMMON_TERM_IDF = 1.5
+SPECIFIC_TERM_IDF = 2.5
+
+_VOCABULARY = POSITIVE_TERMS + NEGATIVE_TERMS
+_POLARITY = [1.0] * len(POSITIVE_TERMS) + [-1.0] * len(NEGATIVE_TERMS)
+_IDF = [COMMON_TERM_IDF if term in COMMON_TERMS else SPECIFIC_TERM_IDF for term in _VOCABULARY]
+
+# 이 값 이상/이하이면 긍정/부정 기사로 분류
+SENTIMENT_THRESHOLD = 0.15
+# 기사 점수 캐시 크기
+SCORE_CACHE_SIZE = 5000
+
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?다])\s+')
+_TAG_PATTERN = re.compile(r'<[^>]+>|\[\+\d+ chars\]')
+
+_score_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _article_fields(article) -> (str, str):
+    title = _TAG_PATTERN.sub(' ', article.get('title', '') or '').strip()
+    description = _TAG_PATTERN.sub(' ', article.get('description', '') or '').strip()
+    return title, description
+
+
+def _article_key(title: str, description: str) -> str:
+    return hashlib.sha1(f"{title}\n{description}".encode('utf-8')).hexdigest()
+
+
+def _term_counts(texts: List[str], terms: List[str]):
+    """기사 x 용어 출현 횟수 행렬"""
+    import numpy as np
+    return np.array([[text.count(term) for term in terms] for text in texts], dtype=np.float64)
+
+
+def score_articles(articles: List[Any]) -> List[Dict[str, Any]]:
+    """
+    기사별 감성 점수와 토픽 계산 (캐시에 없는 기사만 한 번에 벡터 연산)
+
+    감성 점수: 제목 가중치 2배의 용어 빈도에 고정 IDF를 곱한 TF-IDF 벡터와 극성 벡터의 내적을
+    tanh로 -1~1 범위로 변환 (기사 하나의 본문에만 의존하므로 어떤 묶음에서 계산해도 같은 점수)
+
+    Returns:
+    - 기사 순서대로 {"score", "label", "topics", "positive_terms", "negative_terms"} 목록
+    """
+    import numpy as np
+
+    fields = [_article_fields(article) for article in articles]
+    keys = [_article_key(title, description) for title, description in fields]
+
+    with _cache_lock:
+        missing = [i for i, key in enumerate(keys) if key not in _score_cache]
+
+    if missing:
+        titles = [fields[i][0] for i in missing]
+        bodies = [f"{fields[i][0]} {fields[i][1]}" for i in missing]
+
+        # 제목에 나온 용어는 2배 가중치
+        tf = _term_counts(bodies, _VOCABULARY) + _term_counts(titles, _VOCABULARY)
+        tfidf = np.log1p(tf) * np.array(_IDF)
+        raw = tfidf @ np.array(_POLARITY)
+        scores = np.tanh(raw / 2.0)
+
+        topic_names = list(TOPIC_TERMS.keys())
+        topic_hits = np.stack([
+            (_term_counts(bodies, TOPIC_TERMS[name]) > 0).any(axis=1) for name in topic_names
+        ], axis=1) if bodies else np.zeros((0, len(topic_names)), dtype=bool)
+
+        positive_count = len(POSITIVE_TERMS)
+        with _cache_lock:
+            for row, i in enumerate(missing):
+                score = float(scores[row])
+                _score_cache[keys[i]] = {
+                    'score': round(score, 3),
+                    'label': _label(score),
+                    'topics': [name for name, hit in zip(topic_names, topic_hits[row]) if hit],
+                    'positive_terms': [t for t, c in zip(POSITIVE_TERMS, tf[row, :positive_count]) if c],
+                    'negative_terms': [t for t, c in zip(NEGATIVE_TERMS, tf[row, positive_count:]) if c],
+                }
+            while len(_score_cache) > SCORE_CACHE_SIZE:
+                _score_cache.popitem(last=False)
+
+    with _cache_lock:
+        results = []
+        for key in keys:
+            result = _score_cache.get(key)
+            if result is None:
+                # 다른 스레드가 캐시에서 밀어낸 경우 중립으로 처리
+                result = {'score': 0.0, 'label': '중립', 'topics': [], 'positive_terms': [], 'negative_terms': []}
+            else:
+                _score_cache.move_to_end(key)
+            results.append(result)
+        return results
+
+
+def _label(score: float) -> str:
+    if score >= SENTIMENT_THRESHOLD:
+        return '긍정'
+    if score <= -SENTIMENT_THRESHOLD:
+        return '부정'
+    return '중립'
+
+
+def extract_top_sentences(articles: List[Any], scores: List[Dict[str, Any]], keywords: List[str],
+                          limit: int = 3, max_chars: int = 120) -> List[str]:
+    """
+    감성 키워드와 종목 언급이 많은 문장 추출 (중복 문장 제외)
+    """
+    keywords = [k for k in keywords if k]
+    candidates = []
+    for position, (article, score) in enumerate(zip(articles, scores)):
+        title, description = _article_fields(article)
+        for sentence in [title] + _SENTENCE_SPLIT.split(description):
+            sentence = sentence.strip()
+            if len(sentence) < 10:
+                continue
+            hits = sum(sentence.count(t) for t in _VOCABULARY)
+            mentions = sum(sentence.count(k) for k in keywords)
+            weight = hits * (1 + abs(score['score'])) + 2 * mentions - 0.01 * position
+            if hits or mentions:
+                candidates.append((weight, sentence[:max_chars]))
+
+    selected, seen = [], set()
+    for _, sentence in sorted(candidates, key=lambda item: -item[0]):
+        normalized = re.sub(r'\W+', '', sentence)
+        if normalized in seen:
+            continue
+        seen.add(normalized)
+        selected.append(sentence)
+        if len(selected) >= limit:
+            break
+    return selected
+
+
+def analyze_news(articles: List[Any], company_name: str, symbol: Optional[str] = None) -> Dict[str, Any]:
+    """
+    뉴스 목록 전체의 감성/토픽 요약
+
+    Parameters:
+    - articles: 뉴스 기사 목록 (NewsArticle 또는 딕셔너리)
+    - company_name: 회사명 (핵심 문장 추출 시 종목 언급 가중치)
+    - symbol: 종목코드
+
+    Returns:
+    - {"article_count", "score", "label", "positive", "negative", "neutral", "topics", "top_sentences"}
+    """
+    articles = list(articles or [])
+    if not articles:
+        return {
+            'article_count': 0, 'score': 0.0, 'label': '중립',
+            'positive': 0, 'negative': 0, 'neutral': 0,
+            'topics': {}, 'top_sentences': [],
+        }
+
+    scores = score_articles(articles)
+    # 앞쪽(관련도 높은) 기사일수록 가중치를 크게
+    weights = [1.0 / math.sqrt(i + 1) for i in range(len(scores))]
+    overall = sum(w * s['score'] for w, s in zip(weights, scores)) / sum(weights)
+
+    topics: Dict[str, int] = {}
+    for score in scores:
+        for topic in score['topics']:
+            topics[topic] = topics.get(topic, 0) + 1
+    top_topics = dict(sorted(topics.items(), key=lambda item: -item[1])[:3])
+
+    symbol_code = (symbol or '').split('.')[0]
+    return {
+        'article_count': len(articles),
+        'score': round(overall, 3),
+        'label': _label(overall),
+        'positive': sum(1 for s in scores if s['label'] == '긍정'),
+        'negative': sum(1 for s in scores if s['label'] == '부정'),
+        'neutral': sum(1 for s in scores if s['label'] == '중립'),
+        'topics': top_topics,
+        'top_sentences': extract_top_sentences(articles, scores, [company_name, symbol_code]),
+    }
+
+
+def describe_news_sentiment(news_analysis: Dict[str, Any]) -> str:
+    """market_sentiment에 넣을 한 줄 요약"""
+    if not news_analysis or not news_analysis.get('article_count'):
+        return "뉴스 없음"
+    return (f"{news_analysis['label']} (점수 {news_analysis['score']:+.2f}, "
+            f"긍정 {news_analysis['positive']} / 부정 {news_analysis['negative']} / "
+            f"중립 {news_analysis['neutral']}건)")
@@ -13,24 +13,23 @@ try:
 except ImportError:
     from src.fetch.stock_fetcher import KoreanStockFetcher
 
-from openai import OpenAI
-
-# PDF 및 시각화 관련 import
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-import matplotlib.pyplot as plt
-import matplotlib.font_manager as fm
-import seaborn as sns
-import plotly.graph_objects as go
-import plotly.express as px
-from plotly.subplots import make_subplots
-import pandas as pd
-import numpy as np
+try:
+    from analysis.llm import get_client, chat_completion
+except ImportError:
+    from llm import get_client, chat_completion
+
+try:
+    from analysis.comparison import compare_symbols, sector_peers
+except ImportError:
+    from comparison import compare_symbols, sector_peers
+from fetch.ohlcv_cache import get_ohlcv_cache
+from fetch.orchestrator import ReportFetch
+from infra.metrics import span
+from report.charts import (setup_chart_style, submit_chart, chart_result, render_price_chart,
+                           render_comparison_chart, render_correlation_heatmap, render_interactive_chart)
+
+# openai, reportlab, matplotlib, seaborn, plotly는 import 비용이 커서
+# 해당 기능(GPT 호출, 차트, PDF)을 실제로 사용하는 시점에만 로드 (차트는 report.charts 워커 프로세스에서 렌더링)
 
 load_dotenv()
 
@@ -38,27 +37,30 @@ class InvestmentReportGenerator:
     """GPT API를 활용한 투자 보고서 생성기"""
     
     def __init__(self):
-        self.client = OpenAI(api_key=os.getenv("GPT_KEY"))
         self.stock_fetcher = KoreanStockFetcher()
         
-        # 한글 폰트 설정
-        self.setup_korean_font()
+        # PDF 폰트는 처음 사용할 때 설정
+        self.korean_font_name = None
+    
+    @property
+    def client(self):
+        """OpenAI 클라이언트 (최초 접근 시 생성)"""
+        return get_client()
+    
+    def _ensure_pdf_font(self):
+        """PDF 생성 전 한글 폰트를 한 번만 등록"""
+        if self.korean_font_name is None:
+            self.setup_pdf_korean_font()
         
     def setup_korean_font(self):
-        """한글 폰트 설정"""
-        # matplotlib 한글 폰트 설정
-        plt.rcParams['font.family'] = 'DejaVu Sans'
-        plt.rcParams['axes.unicode_minus'] = False
-        
-        # seaborn 스타일 설정
-        sns.set_style("whitegrid")
-        sns.set_palette("husl")
-        
-        # PDF용 한글 폰트 설정
-        self.setup_pdf_korean_font()
+        """한글 폰트 설정 (차트 스타일은 report.charts에서 프로세스당 한 번 설정)"""
+        setup_chart_style()
     
     def setup_pdf_korean_font(self):
         """PDF용 한글 폰트 설정"""
+        from reportlab.pdfbase import pdfmetrics
+        from reportlab.pdfbase.ttfonts import TTFont
+        
         try:
             # macOS에서 사용 가능한 한글 폰트들 (우선순위 순)
             korean_fonts = [
@@ -166,170 +168,75 @@ class InvestmentReportGenerator:
         
         return prompt
     
-    def generate_stock_price_chart(self, symbol: str, period: str = "6mo") -> str:
-        """주식 가격 차트 생성"""
+    def generate_stock_price_chart(self, symbol: str, period: str = "6mo", columns: Dict[str, Any] = None,
+                                   company_name: str = None) -> str:
+        """
+        주식 가격 차트 생성
+
+        Args:
+            symbol: 주식 심볼
+            period: 차트 기간
+            columns: 이미 받은 컬럼형 히스토리 (없으면 OHLCV 캐시에서 조회)
+            company_name: 차트 제목에 사용할 회사명 (없으면 시세 조회)
+        """
         try:
-            # 주식 데이터 가져오기
-            stock_data = self.stock_fetcher.get_stock_price_yahoo(symbol, period)
-            if 'error' in stock_data:
-                return None
-            
-            # Yahoo Finance에서 히스토리 데이터 가져오기
-            import yfinance as yf
-            ticker = yf.Ticker(f"{symbol}.KS")
-            hist = ticker.history(period=period)
-            
-            if hist.empty:
-                return None
-            
-            # 차트 생성
-            plt.figure(figsize=(12, 8))
-            
-            # 주가 차트
-            plt.subplot(2, 1, 1)
-            plt.plot(hist.index, hist['Close'], linewidth=2, color='blue', label='종가')
-            plt.plot(hist.index, hist['Open'], linewidth=1, color='red', alpha=0.7, label='시가')
-            plt.fill_between(hist.index, hist['High'], hist['Low'], alpha=0.3, color='gray', label='고가-저가')
-            
-            plt.title(f'{stock_data.get("company_name", symbol)} 주가 차트 ({period})', fontsize=14, fontweight='bold')
-            plt.ylabel('주가 (원)', fontsize=12)
-            plt.legend()
-            plt.grid(True, alpha=0.3)
-            
-            # 거래량 차트
-            plt.subplot(2, 1, 2)
-            plt.bar(hist.index, hist['Volume'], color='green', alpha=0.7, label='거래량')
-            plt.title('거래량', fontsize=12, fontweight='bold')
-            plt.ylabel('거래량 (주)', fontsize=12)
-            plt.legend()
-            plt.grid(True, alpha=0.3)
-            
-            plt.tight_layout()
-            
-            # 차트 저장
-            chart_path = os.path.join(os.path.dirname(__file__), '..', 'reports', f'chart_{symbol}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.png')
-            plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            return chart_path
+            if company_name is None:
+                stock_data = self.stock_fetcher.get_stock_price_yahoo(symbol, period)
+                if 'error' in stock_data:
+                    return None
+                company_name = stock_data.get("company_name", symbol)
+            if columns is None:
+                columns = get_ohlcv_cache().get(symbol, period)
+            
+            return render_price_chart(f'{company_name} 주가 차트 ({period})', symbol, columns)
             
         except Exception as e:
             print(f"차트 생성 중 오류: {str(e)}")
             return None
     
-    def generate_comparison_chart(self, symbols: List[str], period: str = "3mo") -> str:
-        """여러 주식 비교 차트 생성"""
+    def generate_comparison_chart(self, symbols: List[str], period: str = "3mo", comparison=None) -> str:
+        """
+        여러 주식 비교 차트 생성 (정규화 가격 + 기간 수익률/업종 평균)
+
+        Args:
+            symbols: 종목코드 목록
+            period: 비교 기간
+            comparison: 이미 계산한 ComparisonResult (없으면 계산)
+        """
         try:
-            plt.figure(figsize=(14, 10))
-            
-            # 서브플롯 생성
-            fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
-            
-            colors_list = ['blue', 'red', 'green', 'orange', 'purple']
-            
-            for i, symbol in enumerate(symbols[:5]):  # 최대 5개
-                try:
-                    import yfinance as yf
-                    ticker = yf.Ticker(f"{symbol}.KS")
-                    hist = ticker.history(period=period)
-                    
-                    if not hist.empty:
-                        # 정규화된 가격 (첫날을 100으로 설정)
-                        normalized_price = (hist['Close'] / hist['Close'].iloc[0]) * 100
-                        
-                        ax1.plot(hist.index, normalized_price, 
-                               linewidth=2, color=colors_list[i % len(colors_list)], 
-                               label=f'{symbol}')
-                        
-                        # 변동률 계산
-                        daily_return = hist['Close'].pct_change() * 100
-                        ax2.plot(hist.index, daily_return, 
-                               linewidth=1, color=colors_list[i % len(colors_list)], 
-                               alpha=0.7, label=f'{symbol}')
-                        
-                except Exception as e:
-                    print(f"주식 {symbol} 데이터 처리 중 오류: {str(e)}")
-                    continue
-            
-            # 첫 번째 차트 (정규화된 가격)
-            ax1.set_title('주식 가격 비교 (정규화)', fontsize=14, fontweight='bold')
-            ax1.set_ylabel('정규화된 가격 (첫날=100)', fontsize=12)
-            ax1.legend()
-            ax1.grid(True, alpha=0.3)
-            
-            # 두 번째 차트 (일간 변동률)
-            ax2.set_title('일간 변동률 비교', fontsize=14, fontweight='bold')
-            ax2.set_ylabel('변동률 (%)', fontsize=12)
-            ax2.set_xlabel('날짜', fontsize=12)
-            ax2.legend()
-            ax2.grid(True, alpha=0.3)
-            
-            plt.tight_layout()
-            
-            # 차트 저장
-            chart_path = os.path.join(os.path.dirname(__file__), '..', 'reports', f'comparison_chart_{datetime.now().strftime("%Y%m%d_%H%M%S")}.png')
-            plt.savefig(chart_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            return chart_path
+            if comparison is None:
+                comparison = compare_symbols(symbols, period)
+            return render_comparison_chart(comparison.chart_data())
             
         except Exception as e:
             print(f"비교 차트 생성 중 오류: {str(e)}")
             return None
     
-    def generate_interactive_chart(self, symbol: str, period: str = "6mo") -> str:
+    def generate_correlation_heatmap(self, comparison) -> str:
+        """종목 간 일간 수익률 상관계수 히트맵 생성"""
+        return render_correlation_heatmap(comparison.chart_data())
+    
+    def generate_interactive_chart(self, symbol: str, period: str = "6mo", columns: Dict[str, Any] = None) -> str:
         """인터랙티브 차트 생성 (Plotly)"""
         try:
-            import yfinance as yf
-            ticker = yf.Ticker(f"{symbol}.KS")
-            hist = ticker.history(period=period)
-            
-            if hist.empty:
-                return None
-            
-            # 캔들스틱 차트 생성
-            fig = make_subplots(rows=2, cols=1, 
-                              shared_xaxes=True,
-                              vertical_spacing=0.03,
-                              subplot_titles=(f'{symbol} 주가 차트', '거래량'),
-                              row_width=[0.7, 0.3])
-            
-            # 캔들스틱 차트
-            fig.add_trace(go.Candlestick(x=hist.index,
-                                        open=hist['Open'],
-                                        high=hist['High'],
-                                        low=hist['Low'],
-                                        close=hist['Close'],
-                                        name='OHLC'),
-                         row=1, col=1)
-            
-            # 거래량 차트
-            fig.add_trace(go.Bar(x=hist.index, y=hist['Volume'],
-                                name='거래량',
-                                marker_color='rgba(0, 128, 0, 0.5)'),
-                         row=2, col=1)
-            
-            # 레이아웃 설정
-            fig.update_layout(
-                title=f'{symbol} 주가 분석 차트',
-                yaxis_title='주가 (원)',
-                yaxis2_title='거래량',
-                xaxis_rangeslider_visible=False,
-                height=600
-            )
-            
-            # HTML 파일로 저장
-            html_path = os.path.join(os.path.dirname(__file__), '..', 'reports', f'interactive_chart_{symbol}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.html')
-            fig.write_html(html_path)
-            
-            return html_path
+            if columns is None:
+                columns = get_ohlcv_cache().get(symbol, period)
+            return render_interactive_chart(symbol, columns)
             
         except Exception as e:
             print(f"인터랙티브 차트 생성 중 오류: {str(e)}")
             return None
     
-    def create_pdf_report(self, report: Dict[str, Any], chart_path: str = None, comparison_chart_path: str = None) -> str:
+    def create_pdf_report(self, report: Dict[str, Any], chart_path: str = None, comparison_chart_path: str = None,
+                          correlation_chart_path: str = None) -> str:
         """PDF 보고서 생성"""
+        from reportlab.lib.pagesizes import A4
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.units import inch
+        from reportlab.lib import colors
+        self._ensure_pdf_font()
+        
         try:
             # PDF 파일 경로 설정
             if 'symbol' in report:
@@ -446,6 +353,45 @@ class InvestmentReportGenerator:
                 story.append(img)
                 story.append(Spacer(1, 15))
             
+            # 비교 분석 요약 (기간 수익률, KOSPI 대비 베타, 업종 대비 초과 수익률)
+            comparison = report.get('comparison')
+            if comparison and comparison.get('stocks'):
+                story.append(Paragraph("관련 기업 비교 분석", heading_style))
+                story.append(Spacer(1, 10))
+                
+                def _fmt(value, pattern):
+                    return pattern.format(value) if value is not None else '-'
+                
+                comparison_data = [['기업', '업종', '기간 수익률', f"베타({comparison.get('benchmark', 'KOSPI')})", '업종 대비']]
+                for stock in comparison['stocks'][:20]:
+                    comparison_data.append([
+                        stock['name'], stock['sector'],
+                        _fmt(stock['total_return'], "{:+.2f}%"),
+                        _fmt(stock['beta'], "{:.2f}"),
+                        _fmt(stock['relative_to_sector'], "{:+.2f}%p"),
+                    ])
+                
+                comparison_table = Table(comparison_data, colWidths=[1.5*inch, 1.3*inch, 1.1*inch, 1.1*inch, 1.0*inch])
+                comparison_table.setStyle(TableStyle([
+                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                    ('FONTNAME', (0, 0), (-1, -1), self.korean_font_name),
+                    ('FONTSIZE', (0, 0), (-1, -1), 9),
+                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+                ]))
+                story.append(comparison_table)
+                story.append(Spacer(1, 15))
+            
+            if correlation_chart_path and os.path.exists(correlation_chart_path):
+                story.append(Paragraph("수익률 상관계수", heading_style))
+                story.append(Spacer(1, 10))
+                
+                img = Image(correlation_chart_path, width=5*inch, height=5*inch)
+                story.append(img)
+                story.append(Spacer(1, 15))
+            
             # 분석 데이터 요약 테이블
             story.append(Spacer(1, 20))
             summary_title = "분석 데이터 요약".encode('utf-8').decode('utf-8')
@@ -510,20 +456,44 @@ class InvestmentReportGenerator:
             투자 보고서 딕셔너리
         """
         try:
-            # 1. 주식 정보 가져오기
-            print(f"주식 정보를 가져오는 중... (심볼: {symbol})")
-            stock_data = self.stock_fetcher.get_stock_price_yahoo(symbol, period)
-            
-            if 'error' in stock_data:
-                return {"error": f"주식 정보 조회 실패: {stock_data['error']}"}
-            
-            # 2. 관련 뉴스 가져오기
-            print("관련 뉴스를 가져오는 중...")
-            news_data = self.stock_fetcher.get_stock_news(symbol, num_articles=5, days_back=7)
-            
-            # 3. 시장 요약 정보 가져오기
-            print("시장 정보를 가져오는 중...")
-            market_data = self.stock_fetcher.get_market_summary()
+            base_symbol = symbol.split('.')[0]
+            related_symbols = [base_symbol] + sector_peers(base_symbol)
+            if len(related_symbols) < 2:
+                stock_list = self.stock_fetcher.get_korean_stock_list()
+                related_symbols += [stock['symbol'] for stock in stock_list[:4] if stock['symbol'] != base_symbol]
+            
+            with ReportFetch(symbol) as fetch:
+                # 1. 서로 독립적인 수집(주식 정보, 차트 히스토리, 비교 분석, 뉴스, 시장 요약)을 한꺼번에 시작
+                print(f"주식 정보, 관련 뉴스, 시장 정보를 가져오는 중... (심볼: {symbol})")
+                fetch.submit('stock', self.stock_fetcher.get_stock_quote, symbol)
+                # 차트 데이터는 한 번만 조회 (히스토리는 OHLCV 캐시, 관련 기업은 같은 업종 기업)
+                fetch.submit('columns', get_ohlcv_cache().get, symbol, period)
+                fetch.submit('comparison', compare_symbols, related_symbols, period)
+                fetch.submit('news', self.stock_fetcher.get_stock_news, symbol, num_articles=5, days_back=7)
+                fetch.submit('market', self.stock_fetcher.get_market_summary)
+                
+                stock_data = fetch.result('stock')
+                if 'error' in stock_data:
+                    return {"error": f"주식 정보 조회 실패: {stock_data['error']}"}
+                
+                columns = fetch.result('columns')
+                comparison = fetch.result('comparison')
+                comparison_data = comparison.chart_data()
+                
+                # 2. 차트는 워커 프로세스에서 병렬 렌더링하고, 그동안 남은 수집과 GPT 호출 진행
+                print("차트 렌더링을 시작하는 중...")
+                company_name = stock_data.get('company_name', symbol)
+                chart_jobs = {
+                    'chart_path': submit_chart(render_price_chart, f'{company_name} 주가 차트 ({period})',
+                                               base_symbol, columns),
+                    'comparison_chart_path': submit_chart(render_comparison_chart, comparison_data),
+                    'correlation_chart_path': submit_chart(render_correlation_heatmap, comparison_data),
+                    'interactive_chart_path': submit_chart(render_interactive_chart, base_symbol, columns),
+                }
+                
+                # 3. 관련 뉴스와 시장 요약 정보 수집 완료 대기
+                news_data = fetch.result('news')
+                market_data = fetch.result('market')
             
             if 'error' in market_data:
                 market_data = {"kospi": {"current": 0, "change_percent": 0}, 
@@ -534,7 +504,7 @@ class InvestmentReportGenerator:
             
             # 5. GPT API 호출
             print("GPT API를 통해 투자 보고서를 생성하는 중...")
-            response = self.client.chat.completions.create(
+            report_content = chat_completion(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "당신은 한국 주식 시장 전문 투자 분석가입니다. 객관적이고 전문적인 투자 보고서를 작성해주세요."},
@@ -544,23 +514,12 @@ class InvestmentReportGenerator:
                 temperature=0.7
             )
             
-            report_content = response.choices[0].message.content
-            
-            # 6. 차트 생성
-            print("주가 차트를 생성하는 중...")
-            chart_path = self.generate_stock_price_chart(symbol, period)
-            
-            # 7. 관련 기업 비교 차트 생성
-            print("관련 기업 비교 차트를 생성하는 중...")
-            stock_list = self.stock_fetcher.get_korean_stock_list()
-            related_symbols = [stock['symbol'] for stock in stock_list[:5]]  # 상위 5개
-            comparison_chart_path = self.generate_comparison_chart(related_symbols, period)
+            # 6. 차트 렌더링 완료 대기
+            print("차트 렌더링 완료를 기다리는 중...")
+            with span('outlook_chart_wait'):
+                chart_paths = {key: chart_result(future) for key, future in chart_jobs.items()}
             
-            # 8. 인터랙티브 차트 생성
-            print("인터랙티브 차트를 생성하는 중...")
-            interactive_chart_path = self.generate_interactive_chart(symbol, period)
-            
-            # 9. 결과 구성
+            # 7. 결과 구성
             result = {
                 "symbol": symbol,
                 "company_name": stock_data.get('company_name', 'N/A'),
@@ -570,9 +529,11 @@ class InvestmentReportGenerator:
                 "news_count": len([n for n in news_data if 'error' not in n]),
                 "market_data": market_data,
                 "report_content": report_content,
-                "chart_path": chart_path,
-                "comparison_chart_path": comparison_chart_path,
-                "interactive_chart_path": interactive_chart_path
+                "chart_path": chart_paths['chart_path'],
+                "comparison": comparison.to_dict(),
+                "comparison_chart_path": chart_paths['comparison_chart_path'],
+                "correlation_chart_path": chart_paths['correlation_chart_path'],
+                "interactive_chart_path": chart_paths['interactive_chart_path']
             }
             
             return result
@@ -588,14 +549,24 @@ class InvestmentReportGenerator:
             시장 투자 보고서 딕셔너리
         """
         try:
-            # 주요 주식들의 정보 가져오기
-            print("주요 주식들의 정보를 가져오는 중...")
             stock_list = self.stock_fetcher.get_korean_stock_list()
             symbols = [stock['symbol'] for stock in stock_list[:5]]  # 상위 5개만
-            stocks_data = self.stock_fetcher.get_multiple_stock_prices(symbols)
             
-            # 시장 요약 정보
-            market_data = self.stock_fetcher.get_market_summary()
+            # 주요 주식 정보, 시장 요약 정보, 비교 분석을 동시에 수집
+            print("주요 주식들의 정보를 가져오는 중...")
+            with ReportFetch('market') as fetch:
+                fetch.submit('stocks', self.stock_fetcher.get_multiple_stock_prices, symbols)
+                fetch.submit('market', self.stock_fetcher.get_market_summary)
+                fetch.submit('comparison', compare_symbols, symbols, "3mo")
+                
+                # 비교 차트는 워커 프로세스에서 렌더링 (남은 수집 및 GPT 호출과 병행)
+                comparison = fetch.result('comparison')
+                comparison_data = comparison.chart_data()
+                comparison_job = submit_chart(render_comparison_chart, comparison_data)
+                correlation_job = submit_chart(render_correlation_heatmap, comparison_data)
+                
+                stocks_data = fetch.result('stocks')
+                market_data = fetch.result('market')
             
             # 시장 분석 프롬프트 생성
             prompt = f"""
@@ -640,7 +611,7 @@ class InvestmentReportGenerator:
             
             # GPT API 호출
             print("GPT API를 통해 시장 보고서를 생성하는 중...")
-            response = self.client.chat.completions.create(
+            report_content = chat_completion(
                 model="gpt-4",
                 messages=[
                     {"role": "system", "content": "당신은 한국 주식 시장 전문 분석가입니다. 객관적이고 전문적인 시장 투자 보고서를 작성해주세요."},
@@ -650,10 +621,10 @@ class InvestmentReportGenerator:
                 temperature=0.7
             )
             
-            report_content = response.choices[0].message.content
-            
-            # 비교 차트 생성
-            comparison_chart_path = self.generate_comparison_chart(symbols, "3mo")
+            # 비교 차트 렌더링 완료 대기
+            with span('outlook_chart_wait'):
+                comparison_chart_path = chart_result(comparison_job)
+                correlation_chart_path = chart_result(correlation_job)
             
             result = {
                 "report_type": "market_report",
@@ -661,7 +632,9 @@ class InvestmentReportGenerator:
                 "market_data": market_data,
                 "analyzed_stocks": len([s for s in stocks_data if 'error' not in s]),
                 "report_content": report_content,
-                "comparison_chart_path": comparison_chart_path
+                "comparison": comparison.to_dict(),
+                "comparison_chart_path": comparison_chart_path,
+                "correlation_chart_path": correlation_chart_path
             }
             
             return result
@@ -727,6 +700,8 @@ class InvestmentReportGenerator:
                     f.write(f"주가 차트: {report['chart_path']}\n")
                 if 'comparison_chart_path' in report and report['comparison_chart_path']:
                     f.write(f"비교 차트: {report['comparison_chart_path']}\n")
+                if 'correlation_chart_path' in report and report['correlation_chart_path']:
+                    f.write(f"상관계수 차트: {report['correlation_chart_path']}\n")
                 if 'interactive_chart_path' in report and report['interactive_chart_path']:
                     f.write(f"인터랙티브 차트: {report['interactive_chart_path']}\n")
             
@@ -757,7 +732,8 @@ class InvestmentReportGenerator:
             txt_path = self.save_report_to_file(report)
             
             # 3. PDF 파일 생성
-            pdf_path = self.create_pdf_report(report, report.get('chart_path'), report.get('comparison_chart_path'))
+            pdf_path = self.create_pdf_report(report, report.get('chart_path'), report.get('comparison_chart_path'),
+                                              report.get('correlation_chart_path'))
             
             # 4. 결과에 파일 경로 추가
             report['txt_file_path'] = txt_path
@@ -860,7 +836,8 @@ PER 15.5배로 업계 평균 대비 적정 수준을 보이고 있습니다.
         print(f"시장 보고서가 저장되었습니다: {filepath}")
         
         # PDF 생성
-        pdf_path = generator.create_pdf_report(market_report, None, market_report.get('comparison_chart_path'))
+        pdf_path = generator.create_pdf_report(market_report, None, market_report.get('comparison_chart_path'),
+                                               market_report.get('correlation_chart_path'))
         print(f"시장 보고서 PDF가 생성되었습니다: {pdf_path}")
     else:
         print(f"오류: {market_report['error']}")
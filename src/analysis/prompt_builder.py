@@ -0,0 +1,366 @@
+# GPT 투자보고서 프롬프트 구성 모듈
+# 뉴스 기사를 종목 관련도로 정렬하고 중복 제거(MinHash 문자 shingle 유사도)한 뒤 (select_news, 보고서당 한 번),
+# 토큰 예산 안에 들어가는 만큼만 프롬프트에 담음
+# 로컬 뉴스 감성 분석 요약이 있으면 기사는 요약 섹션이 대신하므로 제목만 MAX_PROMPT_HEADLINES개까지 담음
+#
+# 고정 지시문(시스템 프롬프트, 보고서 작성 지침)은 메시지 앞쪽에 두어
+# 요청 간 동일한 접두사가 되도록 하고 토큰 수도 프로세스 단위로 한 번만 계산
+
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+
+# 시스템 프롬프트 + 사용자 프롬프트의 입력 토큰 예산
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "3000"))
+# 프롬프트에 넣을 최대 뉴스 수 (예산이 남아도 이 이상은 넣지 않음)
+MAX_PROMPT_NEWS = int(os.getenv("MAX_PROMPT_NEWS", "10"))
+# 뉴스 감성 분석 요약이 있을 때 넣을 최대 기사 제목 수 (요약 없이 제목만)
+MAX_PROMPT_HEADLINES = int(os.getenv("MAX_PROMPT_HEADLINES", "5"))
+# 뉴스 요약 최대 길이 (문자)
+NEWS_DESCRIPTION_MAX_CHARS = 160
+# 이 값 이상의 추정 Jaccard 유사도를 가진 기사는 중복으로 간주
+NEWS_DUPLICATE_THRESHOLD = 0.6
+
+TOKENIZER_ENCODING = "cl100k_base"  # gpt-4
+
+SYSTEM_PROMPT = """당신은 경험이 풍부하고 보수적인 주식 애널리스트입니다.
+
+주요 분석 능력:
+- 기술적 분석: 차트 패턴, 추세선, 이동평균, 거래량 분석
+- 기본적 분석: 재무지표, 밸류에이션, 산업 분석
+- 시장 심리 분석: 모멘텀, 변동성, 투자자 심리
+
+분석 원칙:
+1. 제공된 기술적 지표를 구체적으로 언급하며 분석
+2. 단기/중기/장기 추세의 일치성과 divergence 해석
+3. 거래량과 가격 움직임의 상관관계 분석
+4. 변동성과 시장 심리를 고려한 위험 평가
+5. 보수적이고 현실적인 목표가 설정
+6. 시나리오별 분석 (상승/하락/횡보)
+
+항상 리스크를 충분히 고려하고, 불확실성을 강조하며, 객관적 데이터에 기반한 분석을 제공합니다."""
+
+REPORT_INSTRUCTIONS = """아래에 제공되는 주가, 기술적 분석, 시장 심리, 최근 뉴스 정보를 바탕으로 다음 구조로 전문적인 투자보고서를 작성해주세요:
+
+1. **종목 개요** (기업 소개 및 현재 주가 상황)
+2. **기술적 분석**
+   - 제공된 기술적 지표를 바탕으로 추세 방향성과 강도 분석
+   - 단기/중기/장기 추세의 일치성 또는 divergence 분석
+   - 현재 변동성 수준과 과거 대비 비교
+   - 거래량 패턴과 가격 움직임의 상관관계
+   - 지지/저항 수준 근처에서의 가격 행동 분석
+3. **기본적 분석** (재무지표, PER, 시가총액 등 분석)
+4. **시장 심리 및 모멘텀 분석**
+   - 현재 시장 심리 상태와 모멘텀 방향
+   - 52주 기준 가격 위치의 의미
+   - 거래량과 변동성 패턴이 시사하는 바
+5. **뉴스 및 시장 동향** (최근 뉴스가 주가에 미치는 영향 분석)
+6. **투자 의견** (매수/매도/보유 추천 및 근거)
+7. **위험 요소** (투자 시 주의해야 할 리스크 - 특히 상세히 작성)
+8. **목표가 및 시나리오 분석**
+   - 기술적 분석을 바탕으로 한 단기 목표가 (1-3개월)
+   - 기본적 분석 기반 중장기 목표가 (3-12개월)
+   - 상승/하락 시나리오별 예상 주가 범위
+
+**중요한 분석 지침:**
+- 제공된 기술적 지표들을 적극 활용하여 차트 패턴과 추세를 구체적으로 분석하세요
+- 추세 강도와 변동성 수준을 고려한 동적인 분석을 제공하세요
+- 단기/중기/장기 추세 간의 상호작용과 시사점을 분석하세요
+- 거래량과 변동성 패턴을 통한 시장 참여자들의 심리 상태를 해석하세요
+- 투자 조언은 보수적이고 신중한 관점에서 제공하되, 기술적 신호도 반영하세요
+- 위험 요소를 충분히 강조하고 구체적으로 설명하세요
+- 목표가는 기술적/기본적 분석을 종합하여 현실적 범위로 설정하세요
+- 시장 변동성과 불확실성을 반드시 고려하세요
+
+각 섹션을 상세하고 전문적으로 작성해주세요. 특히 기술적 분석 부분에서는 제공된 지표들을 구체적으로 언급하며 분석하세요.
+"""
+
+# 메시지 하나당 역할/구분자 토큰
+_MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoder = None
+_encoder_failed = False
+
+
+def _get_encoder():
+    """tiktoken 인코더 (미설치 또는 인코딩 파일을 받을 수 없으면 None)"""
+    global _encoder, _encoder_failed
+    if _encoder is None and not _encoder_failed:
+        try:
+            import tiktoken
+            _encoder = tiktoken.get_encoding(TOKENIZER_ENCODING)
+        except Exception as e:
+            print(f"tiktoken 인코더를 사용할 수 없어 토큰 수를 추정합니다: {e}")
+            _encoder_failed = True
+    return _encoder
+
+
+def count_tokens(text: str) -> int:
+    """
+    텍스트의 토큰 수
+
+    tiktoken을 사용할 수 없으면 한글 등 비 ASCII 문자는 1자당 1토큰,
+    ASCII는 4자당 1토큰으로 추정 (cl100k 기준 한국어 문서에서 약간 많게 추정됨)
+    """
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder is not None:
+        return len(encoder.encode(text))
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return non_ascii + (len(text) - non_ascii + 3) // 4
+
+
+@lru_cache(maxsize=None)
+def _static_tokens() -> Tuple[int, int]:
+    """고정 지시문 토큰 수 (시스템 프롬프트, 보고서 작성 지침)"""
+    return count_tokens(SYSTEM_PROMPT), count_tokens(REPORT_INSTRUCTIONS)
+
+
+# ---------------------------------------------------------------------------
+# 뉴스 중복 제거 / 관련도 정렬 / 압축
+# ---------------------------------------------------------------------------
+
+_NUM_PERM = 64
+_MERSENNE_PRIME = (1 << 31) - 1
+_SHINGLE_SIZE = 3
+_NORMALIZE_PATTERN = re.compile(r'[\s\W_]+', re.UNICODE)
+
+
+@lru_cache(maxsize=1)
+def _permutations():
+    import numpy as np
+    rng = np.random.default_rng(20250801)
+    a = rng.integers(1, _MERSENNE_PRIME, size=_NUM_PERM, dtype=np.uint64)
+    b = rng.integers(0, _MERSENNE_PRIME, size=_NUM_PERM, dtype=np.uint64)
+    return a, b
+
+
+def _article_text(article) -> str:
+    title = article.get('title', '') or ''
+    description = article.get('description', '') or ''
+    return f"{title} {description[:200]}"
+
+
+def shingle_hashes(text: str, size: int = _SHINGLE_SIZE):
+    """공백/문장부호를 제거한 문자 size-gram의 31비트 해시 집합"""
+    normalized = _NORMALIZE_PATTERN.sub('', text.lower())
+    if len(normalized) < size:
+        return {zlib.crc32(normalized.encode('utf-8')) & _MERSENNE_PRIME} if normalized else set()
+    return {
+        zlib.crc32(normalized[i:i + size].encode('utf-8')) & _MERSENNE_PRIME
+        for i in range(len(normalized) - size + 1)
+    }
+
+
+def minhash_signature(hashes):
+    """shingle 해시 집합의 MinHash 서명 (길이 _NUM_PERM)"""
+    import numpy as np
+    a, b = _permutations()
+    values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+    # (a * h + b) mod p, a/h < 2^31 이므로 uint64에서 넘치지 않음
+    return ((np.outer(a, values) + b[:, None]) % _MERSENNE_PRIME).min(axis=1)
+
+
+def deduplicate_articles(articles: List[Any], threshold: float = NEWS_DUPLICATE_THRESHOLD) -> List[Any]:
+    """
+    제목/요약이 거의 같은 기사(통신사 전재 등)를 제거
+
+    앞쪽 기사를 우선 유지하므로 관련도 순으로 정렬된 목록을 넣으면 관련도가 높은 기사가 남음
+    """
+    import numpy as np
+
+    kept, signatures = [], []
+    for article in articles:
+        hashes = shingle_hashes(_article_text(article))
+        if not hashes:
+            continue
+        signature = minhash_signature(hashes)
+        if any(np.mean(signature == other) >= threshold for other in signatures):
+            continue
+        kept.append(article)
+        signatures.append(signature)
+    return kept
+
+
+def rank_articles(articles: List[Any], keywords: List[str]) -> List[Any]:
+    """
+    종목 관련도 순 정렬 (제목 언급 3점, 요약 언급 1점, NewsAPI relevancy 순서로 동점 처리)
+    """
+    keywords = [k.lower() for k in keywords if k]
+
+    def score(item):
+        position, article = item
+        title = (article.get('title', '') or '').lower()
+        description = (article.get('description', '') or '').lower()
+        mentions = sum(3 * title.count(k) + description.count(k) for k in keywords)
+        return (-min(mentions, 6), position)
+
+    return [article for _, article in sorted(enumerate(articles), key=score)]
+
+
+def select_news(articles: List[Any], company_name: str, symbol: Optional[str] = None) -> Tuple[List[Any], int]:
+    """
+    종목 관련도 순으로 정렬한 뒤 중복 기사 제거 (감성 분석과 프롬프트가 같은 기사 목록을 사용하도록 보고서당 한 번 호출)
+
+    Returns:
+    - (관련도 순 고유 기사 목록, 제거한 중복 기사 수)
+    """
+    symbol_code = str(symbol or '').split('.')[0]
+    candidates = rank_articles(list(articles or []), [company_name, symbol_code])
+    unique = deduplicate_articles(candidates)
+    return unique, len(candidates) - len(unique)
+
+
+def compress_description(text: str, max_chars: int = NEWS_DESCRIPTION_MAX_CHARS) -> str:
+    """요약문을 문장 단위로 max_chars 이내로 줄임 (HTML 태그, NewsAPI의 '[+123 chars]' 제거)"""
+    if not text:
+        return ''
+    text = re.sub(r'<[^>]+>', ' ', text)
+    text = re.sub(r'\[\+\d+ chars\]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    if len(text) <= max_chars:
+        return text
+
+    result = ''
+    for sentence in re.split(r'(?<=[.!?다])\s+', text):
+        if len(result) + len(sentence) + 1 > max_chars:
+            break
+        result = f"{result} {sentence}".strip()
+    return result or text[:max_chars].rstrip() + '…'
+
+
+# ---------------------------------------------------------------------------
+# 프롬프트 구성
+# ---------------------------------------------------------------------------
+
+@dataclass(slots=True)
+class BuiltPrompt:
+    """구성된 Chat Completions 메시지와 예산 사용 내역"""
+    messages: List[Dict[str, str]]
+    prompt_tokens: int
+    news_used: int
+    news_candidates: int
+    duplicates_removed: int
+
+
+def _market_sections(company_name, stock_info, technical_analysis, market_sentiment) -> str:
+    return f"""
+## 대상 기업: {company_name}
+
+## 주가 현황:
+- 현재가: {stock_info.get('current_price', 'N/A')}원
+- 전일대비: {stock_info.get('change', 'N/A')}원 ({stock_info.get('change_percent', 'N/A')}%)
+- 거래량: {stock_info.get('volume', 'N/A')}주 (평균 대비 {technical_analysis.get('volume_ratio', 'N/A')})
+- 고가: {stock_info.get('high_price', 'N/A')}원
+- 저가: {stock_info.get('low_price', 'N/A')}원
+- 시가총액: {stock_info.get('market_cap', 'N/A')}
+- PER: {stock_info.get('pe_ratio', 'N/A')}
+- 배당수익률: {stock_info.get('dividend_yield', 'N/A')}
+- 52주 최고가: {stock_info.get('52_week_high', 'N/A')}원
+- 52주 최저가: {stock_info.get('52_week_low', 'N/A')}원
+
+## 기술적 분석 지표:
+- 단기 추세 (5일): {technical_analysis.get('short_trend', 'N/A')}
+- 중기 추세 (20일): {technical_analysis.get('medium_trend', 'N/A')}
+- 장기 추세 (60일): {technical_analysis.get('long_trend', 'N/A')}
+- 추세 강도: {technical_analysis.get('trend_strength', 'N/A')}
+- 변동성 수준: {technical_analysis.get('volatility_level', 'N/A')}
+- 현재가 vs 이동평균: {technical_analysis.get('price_vs_ma', 'N/A')}
+- 지지/저항 수준: {technical_analysis.get('support_resistance', 'N/A')}
+
+## 시장 심리 분석:
+- 전반적 모멘텀: {market_sentiment.get('momentum', 'N/A')}
+- 가격 위치 (52주 기준): {market_sentiment.get('price_position', 'N/A')}
+- 거래량 패턴: {market_sentiment.get('volume_pattern', 'N/A')}
+- 변동성 추세: {market_sentiment.get('volatility_trend', 'N/A')}
+"""
+
+
+def _news_analysis_section(news_analysis: Optional[Dict[str, Any]]) -> str:
+    if not news_analysis or not news_analysis.get('article_count'):
+        return ''
+    topics = ', '.join(f"{name} {count}건" for name, count in news_analysis.get('topics', {}).items()) or '없음'
+    lines = [
+        f"\n## 뉴스 감성 분석 (기사 {news_analysis['article_count']}건):",
+        f"- 종합: {news_analysis['label']} (점수 {news_analysis['score']:+.2f}, "
+        f"긍정 {news_analysis['positive']} / 부정 {news_analysis['negative']} / 중립 {news_analysis['neutral']}건)",
+        f"- 주요 토픽: {topics}",
+    ]
+    if news_analysis.get('top_sentences'):
+        lines.append("- 핵심 문장:")
+        lines.extend(f"  · {sentence}" for sentence in news_analysis['top_sentences'])
+    return '\n'.join(lines) + '\n'
+
+
+def build_analysis_prompt(company_name: str, stock_info, technical_analysis: Dict[str, Any],
+                          market_sentiment: Dict[str, Any], news: List[Any], news_days: int,
+                          token_budget: Optional[int] = None,
+                          news_analysis: Optional[Dict[str, Any]] = None,
+                          duplicates_removed: int = 0) -> BuiltPrompt:
+    """
+    투자보고서 생성용 메시지 구성
+
+    Parameters:
+    - company_name: 회사명
+    - stock_info: 주가 정보 (StockData 또는 딕셔너리)
+    - technical_analysis / market_sentiment: 분석 결과 딕셔너리
+    - news: select_news로 정렬/중복 제거한 뉴스 기사 목록 (NewsArticle 또는 딕셔너리, 앞에서부터 사용)
+    - news_days: 뉴스 검색 기간 (일)
+    - token_budget: 입력 토큰 예산 (None이면 PROMPT_TOKEN_BUDGET)
+    - news_analysis: 로컬 뉴스 감성 분석 결과 (analyze_news), 있으면 요약 섹션을 추가하고 기사는 제목만 넣음
+    - duplicates_removed: select_news가 제거한 중복 기사 수 (BuiltPrompt에 그대로 기록)
+
+    Returns:
+    - BuiltPrompt (messages는 chat_completion에 그대로 전달)
+    """
+    budget = PROMPT_TOKEN_BUDGET if token_budget is None else token_budget
+    system_tokens, instruction_tokens = _static_tokens()
+
+    analysis_section = _news_analysis_section(news_analysis)
+    market = _market_sections(company_name, stock_info, technical_analysis, market_sentiment) + analysis_section
+    headlines_only = bool(analysis_section)
+    if headlines_only:
+        news_header = f"\n## 최근 뉴스 헤드라인 (최근 {news_days}일):\n"
+        max_news = MAX_PROMPT_HEADLINES
+    else:
+        news_header = f"\n## 최근 뉴스 (최근 {news_days}일):\n"
+        max_news = MAX_PROMPT_NEWS
+    used = (system_tokens + instruction_tokens + count_tokens(market) + count_tokens(news_header)
+            + 2 * _MESSAGE_OVERHEAD_TOKENS)
+
+    unique = list(news or [])
+
+    news_lines = []
+    for article in unique[:max_news]:
+        title = (article.get('title', '') or 'N/A').strip()
+        if headlines_only:
+            line = f"{len(news_lines) + 1}. {title}\n"
+        else:
+            line = f"{len(news_lines) + 1}. {title}\n   - {compress_description(article.get('description', '')) or 'N/A'}\n"
+        line_tokens = count_tokens(line)
+        if used + line_tokens > budget:
+            break
+        news_lines.append(line)
+        used += line_tokens
+
+    news_text = ''.join(news_lines) if news_lines else "관련 뉴스를 찾을 수 없습니다.\n"
+    if not news_lines:
+        used += count_tokens(news_text)
+
+    # 고정 지시문을 앞에 두어 요청 간 동일한 접두사를 유지
+    user_prompt = REPORT_INSTRUCTIONS + market + news_header + news_text
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt},
+    ]
+    return BuiltPrompt(
+        messages=messages,
+        prompt_tokens=used,
+        news_used=len(news_lines),
+        news_candidates=len(unique) + duplicates_removed,
+        duplicates_removed=duplicates_removed,
+    )
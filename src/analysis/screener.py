@@ -0,0 +1,275 @@
+# 유니버스 스크리닝 모듈
+# 지원 종목(KOREAN_COMPANIES) 전체의 캐시된 OHLCV를 (종목 x 거래일) 2차원 행렬로 정렬하고
+# 변동성/추세/이동평균 위치/거래량 비율 지표를 한 번의 벡터 연산으로 계산하여
+# "20일 모멘텀 상위 10개" 같은 순위 조회를 지원
+
+import os
+import sys
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+try:
+    from fetch.stock_fetcher import KOREAN_COMPANIES
+    from fetch.ohlcv_cache import get_ohlcv_cache
+    from fetch.trading_calendar import data_unchanged_since
+    from infra.metrics import span
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from fetch.stock_fetcher import KOREAN_COMPANIES
+    from fetch.ohlcv_cache import get_ohlcv_cache
+    from fetch.trading_calendar import data_unchanged_since
+    from infra.metrics import span
+
+# 스크리닝에 사용할 히스토리 기간과 행렬 길이 (거래일)
+SCREENER_PERIOD = os.getenv("SCREENER_PERIOD", "1y")
+SCREENER_WINDOW = int(os.getenv("SCREENER_WINDOW", "250"))
+# 계산 결과 재사용 시간 (초)
+SCREENER_TTL_SECONDS = int(os.getenv("SCREENER_TTL_SECONDS", "600"))
+
+# 지표 이름 -> 설명 (API 응답/오류 메시지용)
+SCREENER_METRICS = {
+    'momentum_5': '5일 수익률 (%)',
+    'momentum_20': '20일 수익률 (%)',
+    'momentum_60': '60일 수익률 (%)',
+    'volatility_20': '20일 연환산 변동성 (%)',
+    'trend_20': '20일 로그 가격 회귀 기울기 (%/일)',
+    'ma20_gap': '20일 이동평균 대비 괴리율 (%)',
+    'ma60_gap': '60일 이동평균 대비 괴리율 (%)',
+    'volume_ratio': '당일 거래량 / 20일 평균 거래량',
+}
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+def _forward_fill(matrix):
+    """행(종목)별로 NaN을 직전 값으로 채움 (첫 거래일 이전은 NaN 유지)"""
+    import numpy as np
+
+    valid = ~np.isnan(matrix)
+    index = np.where(valid, np.arange(matrix.shape[1]), 0)
+    np.maximum.accumulate(index, axis=1, out=index)
+    return matrix[np.arange(matrix.shape[0])[:, None], index]
+
+
+def build_price_matrix(histories: Dict[str, Dict[str, Any]], window: int = SCREENER_WINDOW) -> Dict[str, Any]:
+    """
+    종목별 컬럼형 히스토리를 공통 거래일 축으로 정렬한 행렬로 변환
+
+    Parameters:
+    - histories: {심볼: 컬럼형 히스토리 (최신 데이터가 첫 번째)}
+    - window: 행렬에 포함할 최근 거래일 수
+
+    Returns:
+    - {"symbols", "dates" (오름차순), "close", "volume"} (close/volume은 종목 x 거래일 ndarray,
+      거래가 없던 날의 종가는 직전 종가, 거래량은 0)
+    """
+    import numpy as np
+
+    symbols = list(histories.keys())
+    all_dates = sorted({date for columns in histories.values() for date in columns['date']})[-window:]
+    date_index = {date: i for i, date in enumerate(all_dates)}
+
+    close = np.full((len(symbols), len(all_dates)), np.nan)
+    volume = np.zeros((len(symbols), len(all_dates)))
+    for row, symbol in enumerate(symbols):
+        columns = histories[symbol]
+        positions, keep = [], []
+        for i, date in enumerate(columns['date']):
+            position = date_index.get(date)
+            if position is not None:
+                positions.append(position)
+                keep.append(i)
+        if not positions:
+            continue
+        close[row, positions] = np.asarray(columns['close'], dtype=np.float64)[keep]
+        volume[row, positions] = np.asarray(columns['volume'], dtype=np.float64)[keep]
+
+    # 0 이하 종가(데이터 오류)는 결측으로 처리
+    close[close <= 0] = np.nan
+    return {'symbols': symbols, 'dates': all_dates, 'close': _forward_fill(close), 'volume': volume}
+
+
+def _lookback_return(close, days: int):
+    import numpy as np
+
+    if close.shape[1] <= days:
+        return np.full(close.shape[0], np.nan)
+    return (close[:, -1] / close[:, -1 - days] - 1) * 100
+
+
+def compute_metrics(matrix: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    가격 행렬에서 전 종목 지표를 한 번에 계산
+
+    Returns:
+    - {지표 이름: 종목 순서의 ndarray} (데이터가 부족한 종목은 NaN)
+    """
+    import numpy as np
+
+    close, volume = matrix['close'], matrix['volume']
+    n_days = close.shape[1]
+    if n_days == 0:
+        # 히스토리를 하나도 받지 못한 경우 (예: yfinance 장애로 get_many 전체 실패) → 순위 결과 없음
+        return {name: np.full(close.shape[0], np.nan) for name in SCREENER_METRICS}
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        log_close = np.log(close)
+        log_returns = np.diff(log_close, axis=1)
+
+        recent_returns = log_returns[:, -20:]
+        volatility = np.nanstd(recent_returns, axis=1, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR) * 100 \
+            if n_days > 2 else np.full(close.shape[0], np.nan)
+
+        # 최근 20일 로그 가격의 최소제곱 기울기 (x 중심화 후 내적으로 계산)
+        trend_window = min(20, n_days)
+        x = np.arange(trend_window, dtype=np.float64)
+        x -= x.mean()
+        y = log_close[:, -trend_window:]
+        trend = (y - y.mean(axis=1, keepdims=True)) @ x / (x @ x) * 100 \
+            if trend_window > 1 else np.full(close.shape[0], np.nan)
+
+        ma20 = close[:, -20:].mean(axis=1) if n_days >= 20 else np.full(close.shape[0], np.nan)
+        ma60 = close[:, -60:].mean(axis=1) if n_days >= 60 else np.full(close.shape[0], np.nan)
+        latest = close[:, -1]
+
+        avg_volume = volume[:, -20:].mean(axis=1)
+        volume_ratio = np.where(avg_volume > 0, volume[:, -1] / avg_volume, np.nan)
+
+        return {
+            'momentum_5': _lookback_return(close, 5),
+            'momentum_20': _lookback_return(close, 20),
+            'momentum_60': _lookback_return(close, 60),
+            'volatility_20': volatility,
+            'trend_20': trend,
+            'ma20_gap': (latest / ma20 - 1) * 100,
+            'ma60_gap': (latest / ma60 - 1) * 100,
+            'volume_ratio': volume_ratio,
+        }
+
+
+class UniverseScreener:
+    """지원 종목 전체 지표 스냅샷을 유지하고 순위 조회를 제공"""
+
+    def __init__(self, companies: Optional[Dict[str, str]] = None, period: str = SCREENER_PERIOD,
+                 window: int = SCREENER_WINDOW, ttl_seconds: int = SCREENER_TTL_SECONDS):
+        self.companies = companies if companies is not None else KOREAN_COMPANIES
+        self.period = period
+        self.window = window
+        self.ttl_seconds = ttl_seconds
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def _build_snapshot(self) -> Dict[str, Any]:
+        # 같은 티커가 여러 이름으로 등록되어 있으면 첫 번째 이름 사용
+        names = {}
+        for name, ticker in self.companies.items():
+            names.setdefault(ticker, name)
+
+        cache = get_ohlcv_cache()
+        with span('screener_load'):
+            histories = cache.get_many(list(names.keys()), self.period)
+        ages = [age for age in (cache.age(symbol) for symbol in histories) if age is not None]
+        with span('screener_compute'):
+            matrix = build_price_matrix(histories, self.window)
+            values = compute_metrics(matrix)
+
+        return {
+            'computed_at': time.time(),
+            # 지표 계산에 쓴 히스토리 중 가장 오래전에 받은 시각
+            'data_fetched_at': time.time() - max(ages) if ages else time.time(),
+            'as_of': matrix['dates'][-1] if matrix['dates'] else None,
+            'symbols': matrix['symbols'],
+            'names': [names[symbol] for symbol in matrix['symbols']],
+            'close': matrix['close'][:, -1] if matrix['dates'] else [],
+            'metrics': values,
+            'missing': [names[ticker] for ticker in names if ticker not in histories],
+        }
+
+    def snapshot(self, refresh: bool = False) -> Dict[str, Any]:
+        """지표 스냅샷 반환 (TTL이 지났거나 refresh=True이면 다시 계산, 장 마감 후 데이터로 계산했으면 다음 장 시작까지 유지)"""
+        with self._lock:
+            snapshot = self._snapshot
+            expired = snapshot is None or (time.time() - snapshot['computed_at'] > self.ttl_seconds
+                                           and not data_unchanged_since(snapshot['data_fetched_at']))
+            if refresh or expired:
+                self._snapshot = self._build_snapshot()
+            return self._snapshot
+
+    def screen(self, sort: str = 'momentum_20', top: int = 10, order: str = 'desc',
+               filters: Optional[Dict[str, tuple]] = None, refresh: bool = False) -> Dict[str, Any]:
+        """
+        지표 기준 순위 조회
+
+        Parameters:
+        - sort: 정렬 기준 지표 (SCREENER_METRICS 중 하나)
+        - top: 반환할 종목 수
+        - order: 'desc'(내림차순) 또는 'asc'(오름차순)
+        - filters: {지표 이름: (최솟값 또는 None, 최댓값 또는 None)}
+        - refresh: 캐시된 스냅샷을 무시하고 다시 계산
+
+        Returns:
+        - {"as_of", "sort", "order", "universe_size", "matched", "results": [...], "missing": [...]}
+        """
+        import numpy as np
+
+        if sort not in SCREENER_METRICS:
+            raise ValueError(f"지원하지 않는 정렬 지표입니다: {sort}")
+        if order not in ('asc', 'desc'):
+            raise ValueError(f"order는 asc 또는 desc여야 합니다: {order}")
+        for name in (filters or {}):
+            if name not in SCREENER_METRICS:
+                raise ValueError(f"지원하지 않는 필터 지표입니다: {name}")
+
+        snap = self.snapshot(refresh)
+        values = snap['metrics']
+        key = values[sort]
+
+        mask = ~np.isnan(key)
+        for name, (low, high) in (filters or {}).items():
+            if low is not None:
+                mask &= values[name] >= low
+            if high is not None:
+                mask &= values[name] <= high
+
+        candidates = np.flatnonzero(mask)
+        ranked = candidates[np.argsort(key[candidates], kind='stable')]
+        if order == 'desc':
+            ranked = ranked[::-1]
+
+        results = []
+        for rank, i in enumerate(ranked[:max(0, top)], start=1):
+            item = {
+                'rank': rank,
+                'name': snap['names'][i],
+                'ticker': snap['symbols'][i],
+                'close': round(float(snap['close'][i]), 2),
+            }
+            for name in SCREENER_METRICS:
+                value = float(values[name][i])
+                item[name] = None if np.isnan(value) else round(value, 3)
+            results.append(item)
+
+        return {
+            'as_of': snap['as_of'],
+            'sort': sort,
+            'order': order,
+            'universe_size': len(snap['symbols']),
+            'matched': int(len(candidates)),
+            'results': results,
+            'missing': snap['missing'],
+        }
+
+
+_screener = None
+_screener_lock = threading.Lock()
+
+
+def get_screener() -> UniverseScreener:
+    """프로세스 단위로 공유되는 스크리너 반환"""
+    global _screener
+    if _screener is None:
+        with _screener_lock:
+            if _screener is None:
+                _screener = UniverseScreener()
+    return _screener
@@ -0,0 +1,307 @@
+# 종목 기본 정보(fundamentals) 저장소 모듈
+# yfinance Ticker.info는 가장 느리고 요청 제한에 자주 걸리는 호출이지만 회사명/시가총액/PER/배당수익률/통화는
+# 하루에 한 번 이상 바뀌지 않으므로, 지원 종목 전체를 백그라운드에서 일괄 갱신해 두고
+# 시세 조회 경로에서는 저장된 값만 읽음 (요청 경로에서 .info를 호출하지 않음)
+#
+# 저장 파일(cache/fundamentals.json)은 gunicorn 워커 간에 공유되고, 일괄 갱신은 파일 잠금을 잡은 워커 하나만 수행
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional
+
+try:
+    from .ohlcv_cache import yahoo_symbol
+except ImportError:
+    from ohlcv_cache import yahoo_symbol
+try:
+    from infra.replay import open_ticker
+    from infra.metrics import span
+    from infra.circuit import circuit
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from infra.replay import open_ticker
+    from infra.metrics import span
+    from infra.circuit import circuit
+
+FUNDAMENTALS_PATH = os.getenv("FUNDAMENTALS_PATH", os.path.join("cache", "fundamentals.json"))
+# 기본 정보 유효 기간 (초, 기본 하루)
+FUNDAMENTALS_TTL_SECONDS = int(os.getenv("FUNDAMENTALS_TTL_SECONDS", "86400"))
+# 일괄 갱신 시 동시 .info 호출 수 (요청 제한을 피하기 위해 작게 유지)
+FUNDAMENTALS_FETCH_WORKERS = int(os.getenv("FUNDAMENTALS_FETCH_WORKERS", "4"))
+# 백그라운드 갱신 주기 (초, 만료된 종목만 다시 조회)
+FUNDAMENTALS_CHECK_SECONDS = int(os.getenv("FUNDAMENTALS_CHECK_SECONDS", "3600"))
+# 저장소에 없는 종목의 백그라운드 조회를 다시 시도하기까지의 간격 (초, 조회 실패 시 .info 반복 호출 방지)
+FUNDAMENTALS_RETRY_SECONDS = int(os.getenv("FUNDAMENTALS_RETRY_SECONDS", "300"))
+
+# 저장 필드 -> yfinance info 키
+FUNDAMENTAL_FIELDS = {
+    'company_name': 'longName',
+    'market_cap': 'marketCap',
+    'pe_ratio': 'trailingPE',
+    'dividend_yield': 'dividendYield',
+    'currency': 'currency',
+}
+
+# 아직 조회하지 못한 종목의 기본값 (get_stock_price_yahoo의 기존 기본값과 동일)
+FUNDAMENTAL_DEFAULTS = {
+    'company_name': '알 수 없음',
+    'market_cap': 0,
+    'pe_ratio': 0,
+    'dividend_yield': 0,
+    'currency': 'KRW',
+}
+
+
+def _lock_path(path: str) -> str:
+    return os.path.join(os.path.dirname(path) or '.', '.fundamentals.lock')
+
+
+class FundamentalsStore:
+    """종목별 기본 정보 저장소 (메모리 + JSON 파일, 파일이 바뀌면 다시 읽음)"""
+
+    def __init__(self, path: str = FUNDAMENTALS_PATH, ttl_seconds: int = FUNDAMENTALS_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+        # 저장소에 없는 종목은 요청 경로를 막지 않고 백그라운드에서 한 번만 조회
+        self._pending = set()
+        self._attempted: Dict[str, float] = {}
+        self._background: Optional[ThreadPoolExecutor] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _reload(self):
+        """다른 워커가 파일을 갱신했으면 다시 읽음 (self._lock 보유 상태에서 호출)"""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime != self._mtime:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+                # 이 프로세스가 더 최근에 조회한 항목은 유지
+                for symbol, entry in entries.items():
+                    current = self._entries.get(symbol)
+                    if current is None or current['fetched_at'] <= entry.get('fetched_at', 0):
+                        self._entries[symbol] = entry
+                self._mtime = mtime
+            except (OSError, ValueError) as e:
+                print(f"기본 정보 저장소 로드 실패: {e}")
+
+    def _save(self):
+        """파일에 기록 (self._lock 보유 상태에서 호출, 읽는 워커가 반쯤 쓰인 파일을 보지 않도록 교체)"""
+        self._reload()
+        try:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+            self._mtime = os.path.getmtime(self.path)
+        except OSError as e:
+            print(f"기본 정보 저장 실패: {e}")
+
+    def age(self, symbol: str) -> Optional[float]:
+        """저장된 기본 정보의 경과 시간 (초), 없으면 None"""
+        symbol = yahoo_symbol(symbol)
+        with self._lock:
+            self._reload()
+            entry = self._entries.get(symbol)
+        return time.time() - entry['fetched_at'] if entry is not None else None
+
+    def get(self, symbol: str) -> Dict[str, Any]:
+        """
+        저장된 기본 정보 반환 (.info를 호출하지 않음)
+
+        저장소에 없는 종목은 기본값을 반환하고 백그라운드 조회를 예약,
+        ttl_seconds가 지난 종목은 저장된 값을 그대로 반환하면서 백그라운드 재조회를 예약
+        (일괄 갱신 스레드를 시작하지 않는 CLI/스크립트에서도 오래된 값이 계속 쓰이지 않도록)
+
+        Returns:
+        - {"company_name", "market_cap", "pe_ratio", "dividend_yield", "currency", "fetched_at"}
+          (조회 전이면 fetched_at은 None)
+        """
+        symbol = yahoo_symbol(symbol)
+        with self._lock:
+            self._reload()
+            entry = self._entries.get(symbol)
+        if entry is None:
+            self._schedule(symbol)
+            return dict(FUNDAMENTAL_DEFAULTS, fetched_at=None)
+        if time.time() - entry['fetched_at'] > self.ttl_seconds:
+            self._schedule(symbol)
+        return dict(FUNDAMENTAL_DEFAULTS, **entry)
+
+    def _schedule(self, symbol: str):
+        with self._lock:
+            if symbol in self._pending or time.time() - self._attempted.get(symbol, 0) < FUNDAMENTALS_RETRY_SECONDS:
+                return
+            self._pending.add(symbol)
+            self._attempted[symbol] = time.time()
+            if self._background is None:
+                self._background = ThreadPoolExecutor(max_workers=1, thread_name_prefix='fundamentals')
+            executor = self._background
+
+        def run():
+            try:
+                self.refresh(symbol)
+            finally:
+                with self._lock:
+                    self._pending.discard(symbol)
+
+        executor.submit(run)
+
+    def _fetch(self, symbol: str) -> Optional[Dict[str, Any]]:
+        """yfinance .info 조회 (실패 시 None)"""
+        try:
+            with span('yfinance_info'), circuit('yfinance_info'):
+                info = open_ticker(symbol).info
+        except Exception as e:
+            print(f"기본 정보 조회 실패 ({symbol}): {e}")
+            return None
+        entry = {field: info.get(key, FUNDAMENTAL_DEFAULTS[field]) for field, key in FUNDAMENTAL_FIELDS.items()}
+        entry['fetched_at'] = time.time()
+        return entry
+
+    def refresh(self, symbol: str) -> Dict[str, Any]:
+        """종목 하나의 기본 정보를 다시 조회하여 저장 (실패 시 저장된 값 또는 기본값 반환)"""
+        symbol = yahoo_symbol(symbol)
+        entry = self._fetch(symbol)
+        with self._lock:
+            if entry is not None:
+                self._entries[symbol] = entry
+                self._save()
+            entry = self._entries.get(symbol)
+        return dict(FUNDAMENTAL_DEFAULTS, **entry) if entry else dict(FUNDAMENTAL_DEFAULTS, fetched_at=None)
+
+    def refresh_many(self, symbols: List[str], max_age: Optional[float] = None,
+                     max_workers: int = FUNDAMENTALS_FETCH_WORKERS,
+                     stop_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        여러 종목 기본 정보 일괄 갱신 (max_age보다 최근에 조회한 종목은 건너뜀, 파일은 마지막에 한 번 기록)
+
+        Parameters:
+        - symbols: 종목코드 또는 yfinance 심볼 목록
+        - max_age: 다시 조회할 경과 시간(초), None이면 ttl_seconds (0이면 전부 다시 조회)
+        - max_workers: 동시 .info 호출 수
+        - stop_event: 설정되면 남은 종목은 조회하지 않음
+
+        Returns:
+        - {"refreshed": [...], "skipped": [...], "failed": [...]}
+        """
+        max_age = self.ttl_seconds if max_age is None else max_age
+        symbols = list(dict.fromkeys(yahoo_symbol(symbol) for symbol in symbols))
+        summary = {'refreshed': [], 'skipped': [], 'failed': []}
+        stale = []
+        for symbol in symbols:
+            age = self.age(symbol)
+            if age is not None and age <= max_age:
+                summary['skipped'].append(symbol)
+            else:
+                stale.append(symbol)
+
+        def fetch(symbol):
+            if stop_event is not None and stop_event.is_set():
+                return None
+            return self._fetch(symbol)
+
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            results = list(zip(stale, executor.map(fetch, stale)))
+
+        with self._lock:
+            for symbol, entry in results:
+                if entry is None:
+                    summary['failed'].append(symbol)
+                else:
+                    self._entries[symbol] = entry
+                    summary['refreshed'].append(symbol)
+            if summary['refreshed']:
+                self._save()
+        return summary
+
+    def refresh_universe(self, max_age: Optional[float] = None,
+                         stop_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        지원 종목 전체(KOREAN_COMPANIES) 일괄 갱신 (다른 워커가 갱신 중이면 {"locked": True})
+        """
+        try:
+            from .stock_fetcher import KOREAN_COMPANIES
+        except ImportError:
+            from stock_fetcher import KOREAN_COMPANIES
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        handle = open(_lock_path(self.path), 'w')
+        try:
+            try:
+                import fcntl
+                fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except ImportError:
+                # fcntl이 없는 환경(Windows)에서는 단일 프로세스 실행을 가정
+                pass
+            except OSError:
+                return {'locked': True}
+
+            with span('fundamentals_refresh'):
+                summary = self.refresh_many(list(KOREAN_COMPANIES.values()), max_age, stop_event=stop_event)
+        finally:
+            handle.close()
+
+        print(f"📇 기본 정보 갱신: {len(summary['refreshed'])}개 조회, {len(summary['skipped'])}개 유효, "
+              f"{len(summary['failed'])}개 실패")
+        return summary
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh_universe(stop_event=self._stop)
+            except Exception as e:
+                print(f"기본 정보 백그라운드 갱신 실패: {e}")
+            self._stop.wait(FUNDAMENTALS_CHECK_SECONDS)
+
+    def start(self) -> threading.Thread:
+        """백그라운드 일괄 갱신 시작 (이미 실행 중이면 기존 스레드 반환)"""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='fundamentals', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """백그라운드 갱신 중지"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+        with self._lock:
+            executor, self._background = self._background, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_fundamentals_store() -> FundamentalsStore:
+    """프로세스 단위로 공유되는 기본 정보 저장소 반환"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = FundamentalsStore()
+    return _store
+
+
+if __name__ == '__main__':
+    # cron 등에서 직접 실행: python src/fetch/fundamentals.py [--force]
+    force = '--force' in sys.argv
+    print(json.dumps(get_fundamentals_store().refresh_universe(max_age=0 if force else None),
+                     ensure_ascii=False, indent=2))
@@ -0,0 +1,46 @@
+# HTTP 세션 모듈
+# 외부 API(NewsAPI 등) 호출 시 요청마다 연결을 새로 맺지 않도록
+# 프로세스 단위로 requests.Session을 공유 (fork 이후에는 워커별로 새로 생성)
+
+import os
+import sys
+import threading
+
+import requests
+
+try:
+    from infra.replay import wrap_session
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from infra.replay import wrap_session
+
+# 외부 API 요청 타임아웃 (초)
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """현재 프로세스에서 공유하는 requests.Session 반환 (최초 호출 시 생성)"""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                # 부모 프로세스에서 만든 세션의 소켓은 워커 간에 공유하지 않음
+                # PROVIDER_MODE가 record/replay이면 응답을 카세트로 기록/재생
+                _session = wrap_session(requests.Session())
+                _session_pid = pid
+    return _session
+
+
+def close_session():
+    """공유 세션 종료 (워커 종료 시 호출)"""
+    global _session, _session_pid
+    with _session_lock:
+        if _session is not None and _session_pid == os.getpid():
+            _session.close()
+        _session = None
+        _session_pid = None
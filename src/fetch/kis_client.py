@@ -0,0 +1,375 @@
+# 한국투자증권(KIS) Open API 시세 클라이언트 모듈
+# 접근 토큰은 만료 전에 미리 재발급하고 파일(cache/kis_token.json)에 저장하여 워커 간에 공유
+# (KIS는 토큰 발급을 분당 1회로 제한), 요청은 keep-alive 연결 풀을 가진 프로세스 단위 세션으로 보냄
+#
+# 여러 종목 현재가는 관심종목 멀티 시세(최대 30종목) 한 번으로 조회
+# KIS_BASE_URL을 바꾸면 모의투자 서버나 로컬 목 서버(benchmarks/kis_mock_server.py)로 요청을 보낼 수 있음
+
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from .http_session import HTTP_TIMEOUT_SECONDS
+    from .fundamentals import get_fundamentals_store
+    from .trading_calendar import get_trading_calendar, now_kst, KRX_OPEN
+except ImportError:
+    from http_session import HTTP_TIMEOUT_SECONDS
+    from fundamentals import get_fundamentals_store
+    from trading_calendar import get_trading_calendar, now_kst, KRX_OPEN
+try:
+    from infra.metrics import span
+    from infra.circuit import circuit, CircuitOpenError
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from infra.metrics import span
+    from infra.circuit import circuit, CircuitOpenError
+
+# 실전: https://openapi.koreainvestment.com:9443, 모의투자: https://openapivts.koreainvestment.com:29443
+KIS_BASE_URL = os.getenv("KIS_BASE_URL", "https://openapi.koreainvestment.com:9443")
+KIS_TOKEN_PATH = os.getenv("KIS_TOKEN_PATH", os.path.join("cache", "kis_token.json"))
+# 만료 이 시간(초) 전에 토큰을 미리 재발급
+KIS_TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("KIS_TOKEN_REFRESH_MARGIN_SECONDS", "600"))
+# 프로세스당 유지할 keep-alive 연결 수
+KIS_POOL_SIZE = int(os.getenv("KIS_POOL_SIZE", "10"))
+
+# 관심종목 멀티 시세 한 번에 조회할 수 있는 최대 종목 수
+KIS_MULTI_PRICE_LIMIT = 30
+
+TR_PRICE = 'FHKST01010100'         # 주식현재가 시세
+TR_MULTI_PRICE = 'FHKST11300006'   # 관심종목(멀티종목) 시세
+
+# 접근 토큰이 만료되었을 때의 오류 코드 (재발급 후 한 번 재시도)
+TOKEN_EXPIRED_CODES = {'EGW00123', 'EGW00121'}
+
+
+class KISError(Exception):
+    """KIS API 오류 (rt_cd != '0' 또는 HTTP 오류)"""
+
+    def __init__(self, message: str, code: str = ''):
+        super().__init__(message)
+        self.code = code
+
+
+def _number(value, default=0.0) -> float:
+    try:
+        return float(str(value).replace(',', ''))
+    except (TypeError, ValueError):
+        return default
+
+
+def _signed(value, sign_code: str) -> float:
+    """전일 대비 값에 부호 적용 (sign 1,2: 상승, 3: 보합, 4,5: 하락)"""
+    number = abs(_number(value))
+    return -number if str(sign_code) in ('4', '5') else number
+
+
+def _stock_code(symbol: str) -> str:
+    """'005930.KS' -> '005930'"""
+    return symbol.split('.')[0]
+
+
+def _quote_date() -> str:
+    """현재가가 해당하는 거래일 (오늘 장 시작 전이거나 휴장일이면 직전 거래일)"""
+    calendar = get_trading_calendar()
+    now = now_kst()
+    if calendar.is_session(now.date()) and now.time() >= KRX_OPEN:
+        return now.strftime('%Y-%m-%d')
+    return calendar.last_completed_session(now).isoformat()
+
+
+class KISClient:
+    """KIS 국내주식 시세 클라이언트 (토큰 캐시 + 연결 풀)"""
+
+    def __init__(self, app_key: Optional[str] = None, app_secret: Optional[str] = None,
+                 access_token: Optional[str] = None, base_url: str = KIS_BASE_URL,
+                 token_path: str = KIS_TOKEN_PATH):
+        self.app_key = app_key if app_key is not None else os.getenv("KIS_APP_KEY")
+        self.app_secret = app_secret if app_secret is not None else os.getenv("KIS_APP_SECRET")
+        self.base_url = base_url.rstrip('/')
+        self.token_path = token_path
+        # 환경 변수로 받은 토큰은 만료 시각을 모르므로 만료 오류가 나면 재발급
+        preset = access_token if access_token is not None else os.getenv("KIS_ACCESS_TOKEN")
+        self._token: Optional[str] = preset or None
+        self._token_refresh_at = float('inf') if preset else 0.0
+        self._token_lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+        self._session_pid = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.app_key and self.app_secret)
+
+    # ------------------------------------------------------------------
+    # 연결
+    # ------------------------------------------------------------------
+
+    def session(self) -> requests.Session:
+        """현재 프로세스의 KIS 전용 세션 (keep-alive 연결 풀, fork 이후에는 워커별로 새로 생성)"""
+        pid = os.getpid()
+        if self._session is None or self._session_pid != pid:
+            with self._session_lock:
+                if self._session is None or self._session_pid != pid:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=KIS_POOL_SIZE)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers.update({'content-type': 'application/json; charset=utf-8'})
+                    self._session = session
+                    self._session_pid = pid
+        return self._session
+
+    def close(self):
+        with self._session_lock:
+            if self._session is not None and self._session_pid == os.getpid():
+                self._session.close()
+            self._session = None
+            self._session_pid = None
+
+    # ------------------------------------------------------------------
+    # 접근 토큰
+    # ------------------------------------------------------------------
+
+    def _token_valid(self, token: Optional[str], refresh_at: float) -> bool:
+        return bool(token) and time.time() < refresh_at
+
+    def _load_token_file(self):
+        """다른 워커가 발급해 둔 토큰 (같은 앱 키로 발급한 것만)"""
+        try:
+            with open(self.token_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None, 0.0
+        if data.get('app_key') != self.app_key:
+            return None, 0.0
+        return data.get('access_token'), float(data.get('refresh_at', 0))
+
+    def _save_token_file(self, token: str, refresh_at: float):
+        try:
+            os.makedirs(os.path.dirname(self.token_path) or '.', exist_ok=True)
+            tmp_path = f"{self.token_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'app_key': self.app_key, 'access_token': token, 'refresh_at': refresh_at}, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.token_path)
+        except OSError as e:
+            print(f"KIS 토큰 저장 실패: {e}")
+
+    def _issue_token(self):
+        with span('kis_token'):
+            response = self.session().post(
+                f"{self.base_url}/oauth2/tokenP",
+                json={'grant_type': 'client_credentials', 'appkey': self.app_key, 'appsecret': self.app_secret},
+                timeout=HTTP_TIMEOUT_SECONDS,
+            )
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        if response.status_code != 200 or 'access_token' not in data:
+            raise KISError(f"KIS 접근 토큰 발급 실패 ({response.status_code}): "
+                           f"{data.get('error_description') or data.get('msg1') or response.text[:200]}",
+                           data.get('error_code') or data.get('msg_cd', ''))
+
+        issued_at = time.time()
+        expires_at = issued_at + int(data.get('expires_in', 86400))
+        if data.get('access_token_token_expired'):
+            try:
+                expires_at = min(expires_at, datetime.strptime(
+                    data['access_token_token_expired'], '%Y-%m-%d %H:%M:%S'
+                ).replace(tzinfo=now_kst().tzinfo).timestamp())
+            except ValueError:
+                pass
+        # 재발급 시각: 만료 KIS_TOKEN_REFRESH_MARGIN_SECONDS 전 (유효 기간이 짧으면 절반이 지났을 때)
+        lifetime = max(0.0, expires_at - issued_at)
+        return data['access_token'], expires_at - min(KIS_TOKEN_REFRESH_MARGIN_SECONDS, lifetime / 2)
+
+    def access_token(self, force_refresh: bool = False) -> str:
+        """유효한 접근 토큰 반환 (메모리 → 공유 파일 → 새로 발급 순서, 만료 KIS_TOKEN_REFRESH_MARGIN_SECONDS 전에 재발급)"""
+        if not force_refresh and self._token_valid(self._token, self._token_refresh_at):
+            return self._token
+        if not self.configured:
+            raise KISError("KIS API 키가 설정되지 않았습니다.")
+
+        with self._token_lock:
+            if not force_refresh and self._token_valid(self._token, self._token_refresh_at):
+                return self._token
+
+            token, refresh_at = self._load_token_file()
+            if token and token != self._token and self._token_valid(token, refresh_at):
+                self._token, self._token_refresh_at = token, refresh_at
+                return token
+
+            # 여러 워커가 동시에 발급하지 않도록 파일 잠금 후 다시 확인
+            os.makedirs(os.path.dirname(self.token_path) or '.', exist_ok=True)
+            with open(f"{self.token_path}.lock", 'w') as handle:
+                try:
+                    import fcntl
+                    fcntl.flock(handle, fcntl.LOCK_EX)
+                except ImportError:
+                    pass
+                token, refresh_at = self._load_token_file()
+                if not (token and token != self._token and self._token_valid(token, refresh_at)):
+                    token, refresh_at = self._issue_token()
+                    self._save_token_file(token, refresh_at)
+
+            self._token, self._token_refresh_at = token, refresh_at
+            return token
+
+    # ------------------------------------------------------------------
+    # 시세
+    # ------------------------------------------------------------------
+
+    def _get(self, path: str, tr_id: str, params: Dict[str, str], stage: str) -> Dict[str, Any]:
+        """
+        GET 요청 (토큰 만료 오류면 재발급 후 한 번 재시도)
+
+        Raises:
+        - KISError: 조회 실패
+        - CircuitOpenError: KIS 회로가 열려 있는 경우
+        """
+        for attempt in range(2):
+            headers = {
+                'authorization': f"Bearer {self.access_token(force_refresh=attempt > 0)}",
+                'appkey': self.app_key,
+                'appsecret': self.app_secret,
+                'tr_id': tr_id,
+                'custtype': 'P',
+            }
+            with span(stage) as s, circuit('kis') as c:
+                response = self.session().get(f"{self.base_url}{path}", headers=headers, params=params,
+                                              timeout=HTTP_TIMEOUT_SECONDS)
+                try:
+                    data = response.json()
+                except ValueError:
+                    data = {}
+                ok = response.status_code == 200 and data.get('rt_cd') == '0'
+                if not ok:
+                    s.fail()
+                    # 토큰 만료는 KIS 장애가 아니므로 회로 판단에서 제외
+                    if data.get('msg_cd', '') not in TOKEN_EXPIRED_CODES:
+                        c.fail()
+            if ok:
+                return data
+            code = data.get('msg_cd', '')
+            if code in TOKEN_EXPIRED_CODES and attempt == 0:
+                continue
+            raise KISError(f"KIS 시세 조회 실패 ({response.status_code}): {data.get('msg1', response.text[:200])}",
+                           code)
+        raise KISError("KIS 시세 조회 실패")
+
+    def _quote(self, symbol: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """get_stock_price_yahoo와 같은 형태의 시세 딕셔너리 (없는 항목은 기본 정보 저장소 값 사용)"""
+        fundamentals = get_fundamentals_store().get(symbol)
+        quote = {
+            "symbol": symbol,
+            "company_name": fundamentals['company_name'],
+            "date": _quote_date(),
+            "market_cap": fundamentals['market_cap'],
+            "pe_ratio": fundamentals['pe_ratio'],
+            "dividend_yield": fundamentals['dividend_yield'],
+            "currency": fundamentals['currency'],
+        }
+        quote.update({key: value for key, value in fields.items() if value not in (None, '')})
+        return quote
+
+    def get_price(self, symbol: str) -> Dict[str, Any]:
+        """
+        종목 하나의 현재가 조회
+
+        Args:
+            symbol: 종목코드 또는 yfinance 심볼 (예: "005930", "005930.KS")
+
+        Returns:
+            시세 딕셔너리 (실패 시 KISError 발생)
+        """
+        output = self._get('/uapi/domestic-stock/v1/quotations/inquire-price', TR_PRICE,
+                           {'FID_COND_MRKT_DIV_CODE': 'J', 'FID_INPUT_ISCD': _stock_code(symbol)},
+                           'kis_price')['output']
+        sign = output.get('prdy_vrss_sign', '')
+        fields = {
+            "current_price": _number(output.get('stck_prpr')),
+            "open_price": _number(output.get('stck_oprc')),
+            "high_price": _number(output.get('stck_hgpr')),
+            "low_price": _number(output.get('stck_lwpr')),
+            "volume": int(_number(output.get('acml_vol'))),
+            "change": _signed(output.get('prdy_vrss'), sign),
+            "change_percent": _signed(output.get('prdy_ctrt'), sign),
+        }
+        # 시가총액은 억원 단위
+        if output.get('hts_avls'):
+            fields["market_cap"] = _number(output['hts_avls']) * 100_000_000
+        if output.get('per'):
+            fields["pe_ratio"] = _number(output['per'])
+        return self._quote(symbol, fields)
+
+    def get_prices(self, symbols: List[str]) -> List[Dict[str, Any]]:
+        """
+        여러 종목 현재가를 관심종목 멀티 시세로 일괄 조회 (KIS_MULTI_PRICE_LIMIT개씩 한 번의 요청)
+
+        Returns:
+            symbols 순서의 시세 딕셔너리 리스트 (조회하지 못한 종목은 {"error": ...})
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        codes = [_stock_code(symbol) for symbol in symbols]
+        unique = list(dict.fromkeys(codes))
+        for start in range(0, len(unique), KIS_MULTI_PRICE_LIMIT):
+            batch = unique[start:start + KIS_MULTI_PRICE_LIMIT]
+            params = {}
+            for i, code in enumerate(batch, 1):
+                params[f'FID_COND_MRKT_DIV_CODE_{i}'] = 'J'
+                params[f'FID_INPUT_ISCD_{i}'] = code
+            try:
+                data = self._get('/uapi/domestic-stock/v1/quotations/intstock-multprice', TR_MULTI_PRICE,
+                                 params, 'kis_multi_price')
+            except (KISError, CircuitOpenError, requests.RequestException) as e:
+                for code in batch:
+                    results[code] = {"error": f"KIS 시세 조회 중 오류 발생: {e}"}
+                continue
+
+            for output in data.get('output', []):
+                code = output.get('inter_shrn_iscd', '')
+                sign = output.get('prdy_vrss_sign', '')
+                fields = {
+                    "company_name": output.get('inter_kor_isnm'),
+                    "current_price": _number(output.get('inter2_prpr')),
+                    "open_price": _number(output.get('inter2_oprc')),
+                    "high_price": _number(output.get('inter2_hgpr')),
+                    "low_price": _number(output.get('inter2_lwpr')),
+                    "volume": int(_number(output.get('acml_vol'))),
+                    "change": _signed(output.get('inter2_prdy_vrss'), sign),
+                    "change_percent": _signed(output.get('prdy_ctrt'), sign),
+                }
+                results[code] = self._quote(code, fields)
+
+        return [dict(results[code], symbol=symbol) if code in results and "error" not in results[code]
+                else results.get(code, {"error": f"KIS 시세 응답에 종목이 없습니다: {code}"})
+                for symbol, code in zip(symbols, codes)]
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_kis_client() -> KISClient:
+    """프로세스 단위로 공유되는 KIS 클라이언트 반환 (환경 변수 KIS_APP_KEY/KIS_APP_SECRET/KIS_ACCESS_TOKEN 사용)"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = KISClient()
+    return _client
+
+
+def close_kis_client():
+    """워커 종료 시 연결 풀 정리"""
+    if _client is not None:
+        _client.close()
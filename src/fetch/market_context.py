@@ -0,0 +1,180 @@
+# 시장 지수(KOSPI/KOSDAQ) 컨텍스트 모듈
+# 지수 히스토리를 백그라운드에서 주기적으로 갱신하고(장중에는 짧게, 장외에는 길게)
+# 보고서 생성 시에는 메모리의 스냅샷을 반환하여 보고서마다 같은 지수를 반복 조회하지 않도록 함
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+try:
+    from .trading_calendar import is_trading_hours, data_unchanged_since, get_trading_calendar
+except ImportError:
+    from trading_calendar import is_trading_hours, data_unchanged_since, get_trading_calendar
+try:
+    from infra.replay import open_ticker
+    from infra.metrics import span
+    from infra.circuit import circuit
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from infra.replay import open_ticker
+    from infra.metrics import span
+    from infra.circuit import circuit
+
+# 시장 요약 키 -> 지수 심볼
+MARKET_INDEXES = {
+    'kospi': '^KS11',
+    'kosdaq': '^KQ11',
+}
+
+# 장중/장외 갱신 주기 (초)
+MARKET_REFRESH_SECONDS = int(os.getenv("MARKET_REFRESH_SECONDS", "60"))
+MARKET_IDLE_REFRESH_SECONDS = int(os.getenv("MARKET_IDLE_REFRESH_SECONDS", "1800"))
+
+
+def refresh_interval(now: Optional[datetime] = None) -> int:
+    """현재 시각 기준 지수 갱신 주기 (초)"""
+    return MARKET_REFRESH_SECONDS if is_trading_hours(now) else MARKET_IDLE_REFRESH_SECONDS
+
+
+def _index_summary(hist) -> Dict[str, float]:
+    """최근 일봉에서 현재 지수와 전일 대비 변동 계산"""
+    if hist is None or hist.empty:
+        return {"current": 0, "change": 0, "change_percent": 0}
+    close = hist['Close']
+    current = float(close.iloc[-1])
+    if len(close) < 2:
+        return {"current": current, "change": 0, "change_percent": 0}
+    previous = float(close.iloc[-2])
+    return {
+        "current": current,
+        "change": current - previous,
+        "change_percent": (current - previous) / previous * 100 if previous else 0,
+    }
+
+
+class MarketContext:
+    """KOSPI/KOSDAQ 요약 스냅샷 (백그라운드 갱신 + 요청 시 만료된 경우에만 조회)"""
+
+    def __init__(self, indexes: Optional[Dict[str, str]] = None):
+        self.indexes = indexes or MARKET_INDEXES
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        # 동시에 만료를 발견한 요청들이 한 번만 조회하도록 하는 잠금
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> Dict[str, Any]:
+        """지수 히스토리를 조회하여 스냅샷 갱신 (.info는 사용하지 않음)"""
+        with span('market_summary'):
+            result = {}
+            for key, symbol in self.indexes.items():
+                with circuit('yfinance'):
+                    result[key] = _index_summary(open_ticker(symbol).history(period="5d"))
+        result["date"] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        result["market_open"] = is_trading_hours()
+
+        with self._lock:
+            self._snapshot = result
+            self._fetched_at = time.time()
+        return result
+
+    def age(self) -> Optional[float]:
+        """스냅샷 경과 시간 (초), 없으면 None"""
+        with self._lock:
+            return time.time() - self._fetched_at if self._snapshot is not None else None
+
+    def is_current(self, max_age: float) -> bool:
+        """스냅샷을 그대로 써도 되는지 여부 (max_age 이내이거나, 장 마감 후 조회하여 새 지수가 생길 수 없는 경우)"""
+        with self._lock:
+            if self._snapshot is None:
+                return False
+            fetched_at = self._fetched_at
+        return time.time() - fetched_at <= max_age or data_unchanged_since(fetched_at)
+
+    def get_summary(self, max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        시장 요약 반환 (스냅샷이 max_age보다 오래되었을 때만 조회)
+
+        Parameters:
+        - max_age: 허용할 스냅샷 경과 시간(초), None이면 현재 시각의 갱신 주기
+          (장 마감 후에 조회한 스냅샷은 다음 장 시작 전까지 경과 시간과 무관하게 사용)
+
+        Returns:
+        - {"kospi": {...}, "kosdaq": {...}, "date", "market_open"} (조회 실패 시 이전 스냅샷에 "stale": True,
+          이전 스냅샷도 없으면 {"error": ...})
+        """
+        max_age = refresh_interval() if max_age is None else max_age
+        if self.is_current(max_age):
+            with self._lock:
+                return dict(self._snapshot)
+
+        with self._refresh_lock:
+            # 잠금을 기다리는 동안 다른 요청이 갱신한 경우 재사용
+            if self.is_current(max_age):
+                with self._lock:
+                    return dict(self._snapshot)
+            try:
+                return dict(self.refresh())
+            except Exception as e:
+                with self._lock:
+                    if self._snapshot is not None:
+                        print(f"시장 지수 갱신 실패, 이전 스냅샷 사용: {e}")
+                        return dict(self._snapshot, stale=True)
+                return {"error": f"시장 요약 정보 조회 중 오류 발생: {str(e)}"}
+
+    def _run(self):
+        while not self._stop.is_set():
+            interval = refresh_interval()
+            age = self.age()
+            with self._lock:
+                fetched_at = self._fetched_at
+            if age is not None and data_unchanged_since(fetched_at):
+                # 장 마감 후 이미 마감 지수를 받았으면 다음 장 시작까지 조회하지 않음
+                self._stop.wait(max(1.0, min(interval, get_trading_calendar().seconds_until_change())))
+                continue
+            # 만료 직전(주기의 90%)에 미리 갱신하여 요청 경로에서는 조회가 일어나지 않도록 함
+            if age is None or age >= interval * 0.9:
+                try:
+                    with self._refresh_lock:
+                        self.refresh()
+                except Exception as e:
+                    print(f"시장 지수 백그라운드 갱신 실패: {e}")
+                    self._stop.wait(min(interval, 30))
+                    continue
+                age = 0.0
+            self._stop.wait(max(1.0, interval * 0.9 - age))
+
+    def start(self) -> threading.Thread:
+        """백그라운드 갱신 시작 (이미 실행 중이면 기존 스레드 반환)"""
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='market-context', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """백그라운드 갱신 중지"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._thread = None
+
+
+_context = None
+_context_lock = threading.Lock()
+
+
+def get_market_context() -> MarketContext:
+    """프로세스 단위로 공유되는 시장 컨텍스트 반환"""
+    global _context
+    if _context is None:
+        with _context_lock:
+            if _context is None:
+                _context = MarketContext()
+    return _context
@@ -0,0 +1,136 @@
+# 수집 단계 결과 객체 모듈
+# 파이프라인 단계 사이에는 이 객체들을 그대로 전달하고,
+# JSON 직렬화는 파일 저장/HTTP 응답 경계에서만 수행
+
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional
+
+try:
+    from .ohlcv import empty_columns, trim_columns
+except ImportError:
+    from ohlcv import empty_columns, trim_columns
+
+
+class PipelineError(Exception):
+    """파이프라인 단계 실패 (경계에서 {"error": ...} 딕셔너리로 변환)"""
+
+    def __init__(self, message: str, **details: Any):
+        super().__init__(message)
+        self.details = details
+
+    def to_dict(self) -> Dict[str, Any]:
+        error = {"error": str(self)}
+        error.update(self.details)
+        return error
+
+
+# 기존 JSON 키 -> 속성명 (숫자로 시작하는 키는 속성명으로 쓸 수 없음)
+_STOCK_KEY_ALIASES = {
+    '52_week_high': 'week52_high',
+    '52_week_low': 'week52_low',
+}
+
+
+@dataclass(slots=True)
+class StockData:
+    """주가 정보 + 컬럼형 히스토리"""
+    symbol: str
+    company_name: str
+    current_price: float
+    open_price: float
+    high_price: float
+    low_price: float
+    volume: int
+    change: float
+    change_percent: float
+    date: str
+    market_cap: Any = 0
+    pe_ratio: Any = 0
+    dividend_yield: Any = 0
+    currency: str = 'KRW'
+    historical_data: Dict[str, Any] = field(default_factory=empty_columns)
+    week52_high: Optional[float] = None
+    week52_low: Optional[float] = None
+    # 공급자 장애로 마지막으로 캐시된 시세/히스토리를 사용한 경우
+    stale: bool = False
+
+    @classmethod
+    def from_quote(cls, quote: Dict[str, Any]) -> 'StockData':
+        """get_stock_price_yahoo 결과 딕셔너리로부터 생성"""
+        return cls(
+            symbol=quote['symbol'],
+            company_name=quote.get('company_name', '알 수 없음'),
+            current_price=quote['current_price'],
+            open_price=quote['open_price'],
+            high_price=quote['high_price'],
+            low_price=quote['low_price'],
+            volume=quote['volume'],
+            change=quote['change'],
+            change_percent=quote['change_percent'],
+            date=quote['date'],
+            market_cap=quote.get('market_cap', 0),
+            pe_ratio=quote.get('pe_ratio', 0),
+            dividend_yield=quote.get('dividend_yield', 0),
+            currency=quote.get('currency', 'KRW'),
+            stale=bool(quote.get('stale', False)),
+        )
+
+    def set_history(self, columns: Dict[str, Any]):
+        """컬럼형 히스토리 설정 (기간 내 최고/최저 종가도 함께 갱신)"""
+        self.historical_data = columns
+        if columns['length'] > 0:
+            self.week52_high = max(columns['close'])
+            self.week52_low = min(columns['close'])
+
+    def trim_history(self, period: str):
+        """더 긴 기간으로 조회한 히스토리를 period 구간으로 줄임 (재조회 없이 분석 기간 조정)"""
+        self.set_history(trim_columns(self.historical_data, period))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """딕셔너리와 같은 방식의 조회 (분석 함수가 dict/객체를 모두 받을 수 있도록)"""
+        value = getattr(self, _STOCK_KEY_ALIASES.get(key, key), None)
+        return default if value is None else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        """보고서 JSON의 stock_data 형태로 변환"""
+        data = {
+            'symbol': self.symbol,
+            'company_name': self.company_name,
+            'current_price': self.current_price,
+            'open_price': self.open_price,
+            'high_price': self.high_price,
+            'low_price': self.low_price,
+            'volume': self.volume,
+            'change': self.change,
+            'change_percent': self.change_percent,
+            'date': self.date,
+            'market_cap': self.market_cap,
+            'pe_ratio': self.pe_ratio,
+            'dividend_yield': self.dividend_yield,
+            'currency': self.currency,
+            'historical_data': self.historical_data,
+        }
+        if self.week52_high is not None:
+            data['52_week_high'] = self.week52_high
+            data['52_week_low'] = self.week52_low
+        if self.stale:
+            data['stale'] = True
+        return data
+
+
+@dataclass(slots=True)
+class NewsArticle:
+    """뉴스 기사 (제목 + 요약)"""
+    title: str
+    description: str
+    # 게시 시각 (NewsAPI publishedAt, 넓은 기간으로 한 번 조회한 뒤 날짜로 거를 때 사용)
+    published_at: str = ''
+    # NewsAPI 장애로 마지막으로 받은 기사 목록을 사용한 경우
+    stale: bool = False
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = getattr(self, key, None)
+        return default if value is None else value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'title': self.title, 'description': self.description}
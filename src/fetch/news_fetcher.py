@@ -1,28 +1,74 @@
-from newsapi import NewsApiClient
 import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import replace
 from dotenv import load_dotenv
-import requests
 import json
+from typing import List
+try:
+    from .models import NewsArticle
+    from .http_session import get_session, HTTP_TIMEOUT_SECONDS
+except ImportError:
+    from models import NewsArticle
+    from http_session import get_session, HTTP_TIMEOUT_SECONDS
+try:
+    from infra.metrics import span
+    from infra.circuit import circuit
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from infra.metrics import span
+    from infra.circuit import circuit
 
 load_dotenv()
 
 NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
 
+# 한 번의 요청으로 받을 수 있는 최대 기사 수 (NewsAPI pageSize 상한)
+NEWSAPI_PAGE_SIZE = 100
+
+# NewsAPI 장애 시 대신 사용할 검색어별 마지막 성공 결과 수 (메모리, 오래된 검색어부터 제거)
+NEWS_STALE_CACHE_SIZE = int(os.getenv("NEWS_STALE_CACHE_SIZE", "200"))
+
+_last_articles: "OrderedDict[str, List[NewsArticle]]" = OrderedDict()
+_last_articles_lock = threading.Lock()
+
+
+def _remember_articles(query, articles: List[NewsArticle]):
+    with _last_articles_lock:
+        _last_articles[query] = articles
+        _last_articles.move_to_end(query)
+        while len(_last_articles) > NEWS_STALE_CACHE_SIZE:
+            _last_articles.popitem(last=False)
+
+
+def _stale_articles(query, num_articles, reason) -> List[NewsArticle]:
+    """마지막으로 성공한 같은 검색어의 기사를 stale로 표시하여 반환 (없으면 빈 리스트)"""
+    with _last_articles_lock:
+        articles = _last_articles.get(query)
+    if not articles:
+        print(f"뉴스 조회 실패, 캐시된 기사 없음 ({query}): {reason}")
+        return []
+    print(f"뉴스 조회 실패, 마지막 기사 {len(articles)}개 사용 ({query}): {reason}")
+    return [replace(article, stale=True) for article in articles[:num_articles]]
+
+# 기간(일)에 따른 뉴스 수 계산 (일주일당 5개 기준, 최소 5개, 최대 50개)
+def news_article_limit(days):
+    base_articles_per_week = 5
+    return max(5, min(50, int((days / 7) * base_articles_per_week)))
+
 # 스크래핑 해온 뉴스 기사를 가져오는 함수
 # query: 검색어, from_date: 시작 날짜,
 # to_date: 종료 날짜, num_articles: 가져올 기사 수 (None이면 기간에 따라 자동 계산)
-# 각 기사의 title과 description을 포함한 리스트를 반환
-def get_latest_news(query, from_date, to_date, num_articles=None):
+# 각 기사의 title과 description을 담은 NewsArticle 리스트를 반환
+def fetch_latest_news(query, from_date, to_date, num_articles=None) -> List[NewsArticle]:
     # 날짜 차이를 계산하여 뉴스 수를 동적으로 결정
     if num_articles is None:
         from datetime import datetime
         start_date = datetime.strptime(from_date, '%Y-%m-%d')
         end_date = datetime.strptime(to_date, '%Y-%m-%d')
         date_diff = (end_date - start_date).days
-        
-        # 기간에 따른 뉴스 수 계산 (일주일당 5개 기준, 최소 5개, 최대 50개)
-        base_articles_per_week = 5
-        num_articles = max(5, min(50, int((date_diff / 7) * base_articles_per_week)))
+        num_articles = news_article_limit(date_diff)
         
         print(f"분석 기간: {date_diff}일, 계산된 뉴스 수: {num_articles}개")
     
@@ -32,29 +78,56 @@ def get_latest_news(query, from_date, to_date, num_articles=None):
         f'&from={from_date}'  
         f'&to={to_date}'      
         f'&language=ko'       
+        f'&pageSize={min(num_articles, NEWSAPI_PAGE_SIZE)}'
         # f'&sortBy=publishedAt'
         f'&sortBy=relevancy'
         # f'&sortBy=popularity'
         f'&apiKey={NEWSAPI_KEY}'
     )
-    response = requests.get(url)
+    # 회로가 열려 있거나 조회에 실패하면 마지막으로 받은 기사를 stale로 표시하여 사용
+    try:
+        with span('newsapi') as s, circuit('newsapi') as c:
+            response = get_session().get(url, timeout=HTTP_TIMEOUT_SECONDS)
+            if response.status_code != 200:
+                s.fail()
+                c.fail()
+    except Exception as e:
+        return _stale_articles(query, num_articles, e)
     print(f"Fetching news for query: {query} from {from_date} to {to_date}")
     print(f"response: {response}")
     if response.status_code == 200:
         articles = response.json().get('articles', [])[:num_articles]
-        result_list = [{'title': article['title'], 
-                        'description': article['description'],}
-                        for article in articles]
+        result_list = [NewsArticle(title=article['title'],
+                                   description=article['description'],
+                                   published_at=article.get('publishedAt') or '')
+                       for article in articles]
+        _remember_articles(query, result_list)
     else:
         print(f"Error fetching news: {response.status_code}")
-        result_list = []
+        return _stale_articles(query, num_articles, f"HTTP {response.status_code}")
     
     # 실제 가져온 뉴스 수를 출력
     actual_news_count = len(result_list)
     print(f"실제 가져온 뉴스 수: {actual_news_count}개")
     
-    result_list = json.dumps(result_list, ensure_ascii=False, indent=2)
     return result_list
 
+# 넓은 기간으로 한 번 조회한 기사 중 to_date 기준 최근 days일 기사만 골라내는 함수
+# (관련도 순서 유지, 기사 수는 fetch_latest_news와 같은 기준으로 기간에 맞춰 제한)
+# 게시 시각이 없는 기사는 기간 안에 있는 것으로 간주
+def select_recent_news(articles, days, to_date, num_articles=None) -> List[NewsArticle]:
+    from datetime import datetime, timedelta
+    if num_articles is None:
+        num_articles = news_article_limit(days)
+    from_date = (datetime.strptime(to_date, '%Y-%m-%d') - timedelta(days=days)).strftime('%Y-%m-%d')
+    selected = [article for article in articles
+                if not article.published_at or article.published_at[:10] >= from_date]
+    return selected[:num_articles]
+
+# fetch_latest_news 결과를 JSON 문자열로 반환하는 래퍼 (외부 호출용)
+def get_latest_news(query, from_date, to_date, num_articles=None):
+    articles = fetch_latest_news(query, from_date, to_date, num_articles)
+    return json.dumps([article.to_dict() for article in articles], ensure_ascii=False, indent=2)
+
 # Example usage
 # print(get_latest_news('삼성전자', '2025-07-27', '2025-08-02'))
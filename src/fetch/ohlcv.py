@@ -0,0 +1,293 @@
+# OHLCV 히스토리 데이터 레이아웃 모듈
+# historical_data를 컬럼형(날짜/시가/고가/저가/종가/거래량 병렬 배열)으로 다루고,
+# 기존 행 목록(list of dict) 레이아웃과 NPZ 사이드카 파일도 함께 지원
+
+import json
+import os
+from typing import Dict, List, Any, Optional
+
+OHLCV_COLUMNS = ('date', 'open', 'high', 'low', 'close', 'volume')
+COLUMNAR_LAYOUT = 'columnar'
+
+# 이 개수 이상의 봉은 JSON 대신 NPZ 사이드카 파일로 분리 저장 (0이면 항상 인라인)
+SIDECAR_MIN_BARS = int(os.getenv("HISTORICAL_SIDECAR_MIN_BARS", "120"))
+
+_PLACEHOLDER = '@@OHLCV_{}@@'
+
+
+def empty_columns() -> Dict[str, Any]:
+    """빈 컬럼형 히스토리"""
+    columns = {'layout': COLUMNAR_LAYOUT, 'length': 0}
+    for name in OHLCV_COLUMNS:
+        columns[name] = []
+    return columns
+
+
+def history_to_columns(hist) -> Dict[str, Any]:
+    """
+    yfinance history DataFrame을 컬럼형 히스토리로 변환 (최신 데이터가 첫 번째)
+
+    Parameters:
+    - hist: Open/High/Low/Close/Volume 컬럼을 가진 DataFrame (날짜 오름차순)
+
+    Returns:
+    - 컬럼형 히스토리 딕셔너리
+    """
+    if hist is None or hist.empty:
+        return empty_columns()
+
+    hist = hist.iloc[::-1]
+    return {
+        'layout': COLUMNAR_LAYOUT,
+        'length': len(hist),
+        'date': hist.index.strftime('%Y-%m-%d').tolist(),
+        'open': hist['Open'].astype(float).tolist(),
+        'high': hist['High'].astype(float).tolist(),
+        'low': hist['Low'].astype(float).tolist(),
+        'close': hist['Close'].astype(float).tolist(),
+        'volume': hist['Volume'].astype('int64').tolist(),
+    }
+
+
+def _months_before(day, months: int):
+    """day로부터 months개월 전 날짜 (말일은 해당 월의 마지막 날로 맞춤)"""
+    import calendar
+    month_index = day.year * 12 + day.month - 1 - months
+    year, month = divmod(month_index, 12)
+    month += 1
+    return day.replace(year=year, month=month, day=min(day.day, calendar.monthrange(year, month)[1]))
+
+
+def trim_columns(columns: Dict[str, Any], period: str) -> Dict[str, Any]:
+    """
+    긴 기간의 컬럼형 히스토리에서 yfinance period에 해당하는 최근 구간만 잘라냄
+
+    기간의 기준일은 가장 최근 봉의 날짜 ("5d" 등 일 단위는 최근 봉 개수)
+
+    Parameters:
+    - columns: 컬럼형 히스토리 (최신 데이터가 첫 번째)
+    - period: yfinance period ("5d", "1mo", "3mo", "1y", "ytd", "max" 등)
+
+    Returns:
+    - 잘라낸 컬럼형 히스토리 (잘라낼 필요가 없으면 입력 그대로)
+    """
+    from datetime import date
+
+    length = columns.get('length', 0)
+    if not length or period == 'max':
+        return columns
+
+    latest = date.fromisoformat(columns['date'][0])
+    if period.endswith('d') and period[:-1].isdigit():
+        count = min(length, int(period[:-1]))
+    else:
+        if period == 'ytd':
+            cutoff = latest.replace(month=1, day=1)
+        elif period.endswith('mo') and period[:-2].isdigit():
+            cutoff = _months_before(latest, int(period[:-2]))
+        elif period.endswith('y') and period[:-1].isdigit():
+            cutoff = _months_before(latest, int(period[:-1]) * 12)
+        else:
+            raise ValueError(f"지원하지 않는 기간입니다: {period}")
+        # 날짜는 YYYY-MM-DD 문자열이므로 문자열 비교로 충분 (내림차순)
+        cutoff = cutoff.isoformat()
+        count = 0
+        while count < length and columns['date'][count] >= cutoff:
+            count += 1
+
+    if count == length:
+        return columns
+    trimmed = {'layout': COLUMNAR_LAYOUT, 'length': count}
+    for name in OHLCV_COLUMNS:
+        trimmed[name] = columns[name][:count]
+    return trimmed
+
+
+def merge_columns(newer: Dict[str, Any], older: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    최근 구간 히스토리를 기존 히스토리 앞에 이어 붙임 (겹치는 날짜는 newer 값 사용)
+
+    Parameters:
+    - newer: 새로 받은 최근 구간 (최신 데이터가 첫 번째)
+    - older: 기존 히스토리 (최신 데이터가 첫 번째)
+    """
+    if not newer.get('length'):
+        return older
+    oldest_new = newer['date'][-1]
+    start = 0
+    while start < older.get('length', 0) and older['date'][start] >= oldest_new:
+        start += 1
+    merged = {'layout': COLUMNAR_LAYOUT, 'length': newer['length'] + older.get('length', 0) - start}
+    for name in OHLCV_COLUMNS:
+        merged[name] = list(newer[name]) + list(older.get(name, [])[start:])
+    return merged
+
+
+def rows_to_columns(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """기존 행 목록 레이아웃을 컬럼형으로 변환 (순서 유지)"""
+    columns = empty_columns()
+    for row in rows:
+        for name in OHLCV_COLUMNS:
+            columns[name].append(row.get(name, 0 if name != 'date' else ''))
+    columns['length'] = len(rows)
+    return columns
+
+
+def columns_to_rows(columns: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """컬럼형 히스토리를 행 목록 레이아웃으로 변환 (순서 유지)"""
+    return [
+        dict(zip(OHLCV_COLUMNS, values))
+        for values in zip(*(columns.get(name, []) for name in OHLCV_COLUMNS))
+    ]
+
+
+def is_columnar(historical_data) -> bool:
+    return isinstance(historical_data, dict) and historical_data.get('layout') == COLUMNAR_LAYOUT
+
+
+def get_historical_columns(stock_info: Dict[str, Any], base_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    stock_data의 historical_data를 레이아웃과 무관하게 컬럼형으로 반환
+
+    지원 레이아웃:
+    - 행 목록 (기존 보고서): [{"date": ..., "close": ...}, ...]
+    - 컬럼형 인라인: {"layout": "columnar", "date": [...], "close": [...], ...}
+    - 컬럼형 사이드카: {"layout": "columnar", "sidecar": "xxx_ohlcv.npz"}
+
+    Parameters:
+    - stock_info: 주가 정보 딕셔너리
+    - base_dir: 사이드카 파일의 기준 디렉토리 (JSON 보고서가 있는 디렉토리)
+
+    Returns:
+    - 컬럼형 히스토리 딕셔너리 (최신 데이터가 첫 번째)
+    """
+    historical_data = stock_info.get('historical_data') if stock_info else None
+    if not historical_data:
+        return empty_columns()
+
+    if isinstance(historical_data, list):
+        return rows_to_columns(historical_data)
+
+    if is_columnar(historical_data):
+        if 'sidecar' in historical_data:
+            sidecar_path = historical_data['sidecar']
+            if base_dir and not os.path.isabs(sidecar_path):
+                sidecar_path = os.path.join(base_dir, sidecar_path)
+            return load_sidecar(sidecar_path)
+        return historical_data
+
+    return empty_columns()
+
+
+def get_historical_rows(stock_info: Dict[str, Any], base_dir: Optional[str] = None) -> List[Dict[str, Any]]:
+    """stock_data의 historical_data를 레이아웃과 무관하게 행 목록으로 반환"""
+    historical_data = stock_info.get('historical_data') if stock_info else None
+    if isinstance(historical_data, list):
+        return historical_data
+    return columns_to_rows(get_historical_columns(stock_info, base_dir))
+
+
+def save_sidecar(columns: Dict[str, Any], path: str) -> str:
+    """컬럼형 히스토리를 압축 NPZ 파일로 저장"""
+    import numpy as np
+
+    np.savez_compressed(
+        path,
+        date=np.array(columns['date'], dtype='U10'),
+        open=np.asarray(columns['open'], dtype=np.float64),
+        high=np.asarray(columns['high'], dtype=np.float64),
+        low=np.asarray(columns['low'], dtype=np.float64),
+        close=np.asarray(columns['close'], dtype=np.float64),
+        volume=np.asarray(columns['volume'], dtype=np.int64),
+    )
+    return path
+
+
+def load_sidecar(path: str) -> Dict[str, Any]:
+    """NPZ 사이드카 파일에서 컬럼형 히스토리 로드"""
+    import numpy as np
+
+    try:
+        with np.load(path) as data:
+            columns = {'layout': COLUMNAR_LAYOUT}
+            for name in OHLCV_COLUMNS:
+                columns[name] = data[name].tolist()
+        columns['length'] = len(columns['date'])
+        return columns
+    except Exception as e:
+        print(f"히스토리 사이드카 로드 중 오류 ({path}): {e}")
+        return empty_columns()
+
+
+def externalize_history(report: Dict[str, Any], json_path: str) -> Dict[str, Any]:
+    """
+    긴 히스토리를 NPZ 사이드카로 분리한 파일 저장용 보고서 사본 반환
+
+    Parameters:
+    - report: 인라인 컬럼형 히스토리를 가진 보고서 딕셔너리 (변경하지 않음)
+    - json_path: 보고서 JSON 파일 경로 (사이드카는 같은 디렉토리에 저장)
+
+    Returns:
+    - 파일에 쓸 보고서 딕셔너리
+    """
+    stock_data = report.get('stock_data')
+    if not isinstance(stock_data, dict):
+        return report
+
+    columns = stock_data.get('historical_data')
+    if not is_columnar(columns) or 'sidecar' in columns:
+        return report
+    if SIDECAR_MIN_BARS <= 0 or columns.get('length', 0) < SIDECAR_MIN_BARS:
+        return report
+
+    sidecar_path = f"{os.path.splitext(json_path)[0]}_ohlcv.npz"
+    save_sidecar(columns, sidecar_path)
+
+    stock_copy = dict(stock_data)
+    stock_copy['historical_data'] = {
+        'layout': COLUMNAR_LAYOUT,
+        'length': columns['length'],
+        'sidecar': os.path.basename(sidecar_path),
+    }
+    report_copy = dict(report)
+    report_copy['stock_data'] = stock_copy
+    return report_copy
+
+
+def load_report_file(json_path: str) -> Dict[str, Any]:
+    """JSON 보고서를 읽고 사이드카 히스토리가 있으면 인라인 컬럼형으로 복원"""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        report_data = json.load(f)
+
+    stock_data = report_data.get('stock_data')
+    if isinstance(stock_data, dict) and is_columnar(stock_data.get('historical_data')):
+        stock_data['historical_data'] = get_historical_columns(
+            stock_data, os.path.dirname(os.path.abspath(json_path))
+        )
+    return report_data
+
+
+def dumps_report(data: Any, indent: int = 2) -> str:
+    """
+    보고서를 JSON 문자열로 직렬화 (컬럼형 히스토리 배열은 한 줄로 압축)
+
+    indent=2로 전체를 직렬화하면 배열 원소마다 줄이 생기므로,
+    컬럼형 히스토리 블록만 따로 압축 직렬화하여 끼워 넣음
+    """
+    blocks = []
+
+    def replace(obj):
+        if is_columnar(obj):
+            blocks.append(obj)
+            return _PLACEHOLDER.format(len(blocks) - 1)
+        if isinstance(obj, dict):
+            return {key: replace(value) for key, value in obj.items()}
+        if isinstance(obj, list):
+            return [replace(value) for value in obj]
+        return obj
+
+    text = json.dumps(replace(data), ensure_ascii=False, indent=indent)
+    for i, block in enumerate(blocks):
+        compact = json.dumps(block, ensure_ascii=False, separators=(',', ':'))
+        text = text.replace(json.dumps(_PLACEHOLDER.format(i)), compact, 1)
+    return text
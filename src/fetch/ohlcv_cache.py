@@ -0,0 +1,283 @@
+# OHLCV 히스토리 캐시 모듈
+# 종목별 일봉 히스토리를 메모리와 NPZ 파일(cache/ohlcv/)에 캐시하여
+# 유니버스 스크리닝, 비교 분석, 보고서 생성이 같은 데이터를 반복 다운로드하지 않도록 함
+#
+# 만료는 KRX 거래일 달력 기준: 장 마감 후에 받은 히스토리는 다음 장 시작 전까지 새 봉이 없으므로 TTL과 무관하게 유효하고,
+# 만료된 히스토리는 빠진 거래일 수만큼의 최근 구간만 받아 이어 붙임
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Dict, Any, List, Optional
+
+try:
+    from .ohlcv import (history_to_columns, save_sidecar, load_sidecar, empty_columns,
+                        merge_columns, trim_columns)
+    from .trading_calendar import get_trading_calendar, data_unchanged_since, now_kst
+except ImportError:
+    from ohlcv import (history_to_columns, save_sidecar, load_sidecar, empty_columns,
+                       merge_columns, trim_columns)
+    from trading_calendar import get_trading_calendar, data_unchanged_since, now_kst
+
+try:
+    from infra.replay import open_ticker
+    from infra.circuit import circuit
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from infra.replay import open_ticker
+    from infra.circuit import circuit
+
+OHLCV_CACHE_DIR = os.getenv("OHLCV_CACHE_DIR", os.path.join("cache", "ohlcv"))
+# 캐시 유효 시간 (초)
+OHLCV_CACHE_TTL_SECONDS = int(os.getenv("OHLCV_CACHE_TTL_SECONDS", "3600"))
+# 유니버스 일괄 조회 시 동시 다운로드 수
+OHLCV_FETCH_WORKERS = int(os.getenv("OHLCV_FETCH_WORKERS", "8"))
+
+# yfinance period를 긴 순서 비교용 순위로 변환 (긴 기간의 캐시는 짧은 기간 요청에도 사용 가능)
+PERIOD_ORDER = ['5d', '1mo', '2mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'max']
+
+
+# yfinance period -> 대략적인 거래일 수 (긴 기간 캐시에서 요청 기간만 잘라 쓸 때 사용)
+PERIOD_TRADING_DAYS = {
+    '5d': 5, '1mo': 21, '2mo': 42, '3mo': 63, '6mo': 126,
+    '1y': 252, '2y': 504, '5y': 1260, '10y': 2520,
+}
+
+
+# 만료된 캐시에 이어 붙일 최근 구간으로 쓸 수 있는 기간 (빠진 봉이 이보다 많으면 전체 재조회)
+INCREMENTAL_PERIODS = ['5d', '1mo', '3mo']
+
+
+def period_rank(period: str) -> int:
+    return PERIOD_ORDER.index(period) if period in PERIOD_ORDER else len(PERIOD_ORDER)
+
+
+def yahoo_symbol(symbol: str) -> str:
+    """종목코드를 yfinance 심볼로 변환 ('005930' -> '005930.KS', 지수/접미사가 있는 심볼은 그대로)"""
+    if symbol.startswith('^') or '.' in symbol:
+        return symbol
+    return f"{symbol}.KS"
+
+
+class _CacheEntry:
+    __slots__ = ('columns', 'period', 'fetched_at')
+
+    def __init__(self, columns, period, fetched_at):
+        self.columns = columns
+        self.period = period
+        self.fetched_at = fetched_at
+
+
+class OHLCVCache:
+    """종목별 OHLCV 히스토리 캐시 (컬럼형, 최신 데이터가 첫 번째)"""
+
+    def __init__(self, cache_dir: str = OHLCV_CACHE_DIR, ttl_seconds: int = OHLCV_CACHE_TTL_SECONDS):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._lock = threading.Lock()
+        # 같은 종목을 여러 스레드가 동시에 다운로드하지 않도록 종목별 잠금
+        self._fetch_locks: Dict[str, threading.Lock] = {}
+
+    def _path(self, symbol: str, period: str) -> str:
+        symbol = yahoo_symbol(symbol)
+        return os.path.join(self.cache_dir, f"{symbol}_{period}.npz")
+
+    def _covers(self, entry: Optional[_CacheEntry], period: str) -> bool:
+        return entry is not None and period_rank(entry.period) >= period_rank(period)
+
+    def _is_fresh(self, entry: Optional[_CacheEntry], period: str, max_age: Optional[float]) -> bool:
+        if not self._covers(entry, period):
+            return False
+        if max_age == 0:
+            return False
+        max_age = self.ttl_seconds if max_age is None else max_age
+        # 장 마감 후에 받은 히스토리는 다음 장 시작 전까지 새 봉이 생길 수 없음
+        return time.time() - entry.fetched_at <= max_age or data_unchanged_since(entry.fetched_at)
+
+    def _load_from_disk(self, symbol: str, period: str) -> Optional[_CacheEntry]:
+        """요청 기간 이상을 담은 캐시 파일 중 가장 최근 파일 로드"""
+        best = None
+        for candidate in PERIOD_ORDER[period_rank(period):]:
+            path = self._path(symbol, candidate)
+            if os.path.exists(path):
+                mtime = os.path.getmtime(path)
+                if best is None or mtime > best[1]:
+                    best = (candidate, mtime, path)
+        if best is None:
+            return None
+        columns = load_sidecar(best[2])
+        if columns['length'] == 0:
+            return None
+        return _CacheEntry(columns, best[0], best[1])
+
+    def peek(self, symbol: str, period: str = '1mo') -> Optional[Dict[str, Any]]:
+        """
+        다운로드 없이 캐시된 히스토리만 반환 (만료 여부 무관, period를 덮는 캐시가 없으면 더 짧은 메모리 캐시, 없으면 None)
+        """
+        symbol = yahoo_symbol(symbol)
+        with self._lock:
+            entry = self._entries.get(symbol)
+        if entry is None or period_rank(entry.period) < period_rank(period):
+            disk_entry = self._load_from_disk(symbol, period)
+            if disk_entry is not None:
+                entry = disk_entry
+                with self._lock:
+                    self._entries[symbol] = entry
+        return entry.columns if entry is not None else None
+
+    def age(self, symbol: str) -> Optional[float]:
+        """캐시된 히스토리의 경과 시간 (초), 없으면 None"""
+        symbol = yahoo_symbol(symbol)
+        with self._lock:
+            entry = self._entries.get(symbol)
+        return time.time() - entry.fetched_at if entry is not None else None
+
+    def get(self, symbol: str, period: str = '1mo', max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        종목 히스토리 반환 (캐시가 없거나 만료되었거나 기간이 짧으면 다운로드)
+
+        Parameters:
+        - symbol: 종목코드 또는 yfinance 심볼 (예: '005930', '005930.KS', '^KS11')
+        - period: 필요한 최소 기간 (반환 데이터는 이보다 길 수 있음)
+        - max_age: 허용할 캐시 경과 시간(초), None이면 ttl_seconds
+
+        Returns:
+        - 컬럼형 히스토리 (최신 데이터가 첫 번째), 조회 실패 시 만료된 캐시, 캐시도 없으면 빈 히스토리
+        """
+        symbol = yahoo_symbol(symbol)
+        with self._lock:
+            entry = self._entries.get(symbol)
+            fetch_lock = self._fetch_locks.setdefault(symbol, threading.Lock())
+        if self._is_fresh(entry, period, max_age):
+            return entry.columns
+
+        with fetch_lock:
+            # 다른 스레드가 먼저 받아 둔 경우 재사용
+            with self._lock:
+                entry = self._entries.get(symbol)
+            if self._is_fresh(entry, period, max_age):
+                return entry.columns
+
+            disk_entry = self._load_from_disk(symbol, period)
+            if self._is_fresh(disk_entry, period, max_age):
+                with self._lock:
+                    self._entries[symbol] = disk_entry
+                return disk_entry.columns
+
+            # 만료된 히스토리가 있으면 빠진 최근 구간만 받아 이어 붙임
+            stale = max((e for e in (entry, disk_entry) if self._covers(e, period)),
+                        key=lambda e: e.fetched_at, default=None)
+            if stale is not None and stale.columns['length'] > 0:
+                columns = self.extend(symbol, stale)
+                if columns is not None:
+                    return columns
+
+            columns = self.refresh(symbol, period)
+            if columns['length'] == 0:
+                # 조회 실패 (yfinance 장애/회로 열림) -> 기간이 짧거나 만료되었더라도 마지막 캐시 사용
+                last = max((e for e in (entry, disk_entry) if e is not None and e.columns['length'] > 0),
+                           key=lambda e: e.fetched_at, default=None)
+                if last is not None:
+                    print(f"OHLCV 조회 실패, 마지막 캐시 사용 ({symbol}, {last.period})")
+                    return last.columns
+            return columns
+
+    def extend(self, symbol: str, entry: _CacheEntry) -> Optional[Dict[str, Any]]:
+        """
+        캐시된 히스토리 이후 거래일의 봉만 받아 이어 붙이고 저장
+
+        Returns:
+        - 갱신된 컬럼형 히스토리 (빠진 봉이 INCREMENTAL_PERIODS보다 많거나, 받은 구간이 기존 히스토리와
+          이어지지 않거나, 조회에 실패하면 None → 전체 재조회)
+        """
+        symbol = yahoo_symbol(symbol)
+        calendar = get_trading_calendar()
+        last_bar = date.fromisoformat(entry.columns['date'][0])
+        missing = calendar.sessions_between(last_bar, calendar.session_on_or_before(now_kst().date()))
+        # 마지막 봉은 장중에 받은 미완성 봉일 수 있으므로 함께 다시 받음
+        fetch_period = next((p for p in INCREMENTAL_PERIODS if PERIOD_TRADING_DAYS[p] >= missing + 1), None)
+        if fetch_period is None:
+            return None
+
+        try:
+            with circuit('yfinance') as c:
+                recent = history_to_columns(open_ticker(symbol).history(period=fetch_period))
+                if recent['length'] == 0:
+                    c.fail()
+        except Exception as e:
+            print(f"OHLCV 최근 구간 다운로드 실패 ({symbol}, {fetch_period}): {e}")
+            return None
+        if recent['length'] == 0 or recent['date'][-1] > entry.columns['date'][0]:
+            return None
+
+        columns = trim_columns(merge_columns(recent, entry.columns), entry.period)
+        self.store(symbol, entry.period, columns)
+        return columns
+
+    def refresh(self, symbol: str, period: str = '1mo') -> Dict[str, Any]:
+        """yfinance에서 다시 받아 캐시에 저장"""
+        symbol = yahoo_symbol(symbol)
+        try:
+            with circuit('yfinance') as c:
+                columns = history_to_columns(open_ticker(symbol).history(period=period))
+                if columns['length'] == 0:
+                    c.fail()
+        except Exception as e:
+            print(f"OHLCV 다운로드 실패 ({symbol}, {period}): {e}")
+            return empty_columns()
+
+        if columns['length'] == 0:
+            return columns
+        self.store(symbol, period, columns)
+        return columns
+
+    def store(self, symbol: str, period: str, columns: Dict[str, Any]):
+        """이미 받은 히스토리를 캐시에 저장 (메모리 + NPZ 파일)"""
+        symbol = yahoo_symbol(symbol)
+        entry = _CacheEntry(columns, period, time.time())
+        with self._lock:
+            current = self._entries.get(symbol)
+            # 더 긴 기간의 최신 캐시를 짧은 기간으로 덮어쓰지 않음
+            if current is None or period_rank(period) >= period_rank(current.period) \
+                    or time.time() - current.fetched_at > self.ttl_seconds:
+                self._entries[symbol] = entry
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            save_sidecar(columns, self._path(symbol, period))
+        except Exception as e:
+            print(f"OHLCV 캐시 저장 실패 ({symbol}): {e}")
+
+    def get_many(self, symbols: List[str], period: str = '1y', max_age: Optional[float] = None,
+                 max_workers: int = OHLCV_FETCH_WORKERS) -> Dict[str, Dict[str, Any]]:
+        """
+        여러 종목 히스토리를 병렬로 조회 (캐시가 유효한 종목은 다운로드하지 않음)
+
+        Returns:
+        - {심볼: 컬럼형 히스토리} (데이터가 없는 종목은 제외)
+        """
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            futures = {symbol: executor.submit(self.get, symbol, period, max_age) for symbol in symbols}
+            for symbol, future in futures.items():
+                columns = future.result()
+                if columns['length'] > 0:
+                    results[symbol] = columns
+        return results
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_ohlcv_cache() -> OHLCVCache:
+    """프로세스 단위로 공유되는 OHLCV 캐시 반환"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = OHLCVCache()
+    return _cache
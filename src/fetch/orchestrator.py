@@ -0,0 +1,90 @@
+# 보고서 단위 수집 오케스트레이터 모듈
+# 보고서 하나에 필요한 서로 독립적인 공급자 호출(주가, 뉴스, 시장 요약, 비교 분석 등)을 한꺼번에 시작하고
+# 프롬프트 구성 직전에 합류시켜, 수집 단계의 지연 시간이 호출 시간의 합이 아니라 가장 긴 호출 시간이 되도록 함
+#
+# 호출은 프로세스 단위로 공유되는 스레드 풀에서 실행 (공급자 호출은 대부분 네트워크 대기이므로 스레드로 충분)
+
+import os
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional
+
+try:
+    from infra.metrics import span
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from infra.metrics import span
+
+# 동시에 실행할 공급자 호출 수 (모든 보고서 요청이 공유)
+REPORT_FETCH_WORKERS = int(os.getenv("REPORT_FETCH_WORKERS", "16"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_fetch_executor() -> ThreadPoolExecutor:
+    """공급자 호출용 스레드 풀 (gunicorn fork 이후 워커에서 처음 사용할 때 생성)"""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=max(1, REPORT_FETCH_WORKERS),
+                                               thread_name_prefix='report-fetch')
+    return _executor
+
+
+def shutdown_fetch_executor():
+    """스레드 풀 종료 (대기 중인 호출은 취소)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+class ReportFetch:
+    """
+    보고서 하나의 공급자 호출 묶음
+
+    submit()으로 호출을 바로 시작하고 result()에서 결과를 기다림. 호출 중 발생한 예외는
+    result() 시점에 그대로 다시 발생하므로 기존 순차 코드의 오류 처리를 그대로 쓸 수 있음.
+    with 블록을 빠져나갈 때 아직 시작하지 않은 호출은 취소 (오류로 일찍 반환하는 경우)
+
+    사용 예:
+        with ReportFetch('삼성전자') as fetch:
+            fetch.submit('stock', fetch_stock_data, '삼성전자', period='3mo')
+            fetch.submit('news', fetch_latest_news, '삼성전자', from_date, to_date)
+            stock = fetch.result('stock')
+            news = fetch.result('news')
+    """
+
+    def __init__(self, label: str = ''):
+        self.label = label
+        self._futures: Dict[str, Future] = {}
+
+    def submit(self, key: str, fn: Callable, *args, **kwargs) -> 'ReportFetch':
+        """호출 시작 (같은 key로 다시 제출하면 이전 호출은 결과를 기다리지 않음)"""
+        self._futures[key] = get_fetch_executor().submit(fn, *args, **kwargs)
+        return self
+
+    def result(self, key: str, timeout: Optional[float] = None) -> Any:
+        """호출 결과 대기 (호출이 예외로 끝났으면 예외를 다시 발생)"""
+        future = self._futures[key]
+        if future.done():
+            return future.result()
+        # 다른 호출보다 늦게 끝나서 기다린 시간만 기록
+        with span('report_fetch_wait'):
+            return future.result(timeout)
+
+    def cancel(self):
+        """아직 시작하지 않은 호출 취소 (이미 실행 중인 호출은 끝까지 실행되고 결과는 버려짐)"""
+        for future in self._futures.values():
+            future.cancel()
+
+    def __enter__(self) -> 'ReportFetch':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cancel()
+        return False
@@ -0,0 +1,263 @@
+# 시세 공급자 라우터 모듈
+# 우선순위가 가장 높은 공급자에 먼저 요청하고, 그 공급자의 최근 지연 시간 p95 안에 응답이 없으면
+# 다음 공급자에도 같은 요청을 보내(hedged request) 먼저 도착한 유효한 시세를 사용
+# 공급자가 바로 실패하면 기다리지 않고 다음 공급자로 넘어가며, 모든 응답은 같은 항목으로 정규화
+#
+# 늦게 끝난 요청도 지연 시간 통계에는 반영하므로 hedge 지연은 공급자의 실제 꼬리 지연을 따라감
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Any, Callable, Optional
+
+try:
+    from .fundamentals import get_fundamentals_store
+    from .ohlcv_cache import yahoo_symbol
+except ImportError:
+    from fundamentals import get_fundamentals_store
+    from ohlcv_cache import yahoo_symbol
+try:
+    from infra.metrics import timed, has_error
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from infra.metrics import timed, has_error
+
+# 공급자 우선순위 (쉼표 구분, 설정되지 않은 공급자는 건너뜀)
+QUOTE_PROVIDERS = os.getenv("QUOTE_PROVIDERS", "yahoo,kis,alpha_vantage")
+# hedge 지연 시간 계산에 쓰는 지연 시간 분위수와 범위 (초)
+QUOTE_HEDGE_QUANTILE = float(os.getenv("QUOTE_HEDGE_QUANTILE", "0.95"))
+QUOTE_HEDGE_MIN_DELAY = float(os.getenv("QUOTE_HEDGE_MIN_DELAY", "0.05"))
+QUOTE_HEDGE_MAX_DELAY = float(os.getenv("QUOTE_HEDGE_MAX_DELAY", "3.0"))
+# 표본이 QUOTE_HEDGE_MIN_SAMPLES개 미만일 때 사용할 hedge 지연 시간 (초)
+QUOTE_HEDGE_DEFAULT_DELAY = float(os.getenv("QUOTE_HEDGE_DEFAULT_DELAY", "1.0"))
+QUOTE_HEDGE_MIN_SAMPLES = 20
+# 공급자별로 보관할 최근 지연 시간 표본 수
+QUOTE_LATENCY_WINDOW = int(os.getenv("QUOTE_LATENCY_WINDOW", "200"))
+# 공급자 호출용 스레드 수 (보고서 수집 스레드 풀 안에서 호출되므로 별도 풀 사용)
+QUOTE_ROUTER_WORKERS = int(os.getenv("QUOTE_ROUTER_WORKERS", "8"))
+
+# 정규화된 시세의 숫자 항목
+QUOTE_NUMERIC_FIELDS = ('current_price', 'open_price', 'high_price', 'low_price', 'change', 'change_percent',
+                        'market_cap', 'pe_ratio', 'dividend_yield')
+
+
+def normalize_quote(quote: Dict[str, Any], symbol: str, provider: str) -> Dict[str, Any]:
+    """
+    공급자별 시세 딕셔너리를 get_stock_price_yahoo와 같은 항목으로 정규화
+
+    - symbol은 yfinance 심볼("005930.KS"), 숫자 항목은 float (Alpha Vantage의 "0.71%" 같은 문자열 포함)
+    - 응답에 없는 회사명/시가총액/PER/배당수익률/통화는 기본 정보 저장소 값으로 채움
+    - "provider"에 응답한 공급자 기록
+    """
+    if "error" in quote:
+        return dict(quote, provider=provider)
+    fundamentals = get_fundamentals_store().get(symbol)
+    result = {field: fundamentals[field] for field in
+              ('company_name', 'market_cap', 'pe_ratio', 'dividend_yield', 'currency')}
+    result.update({key: value for key, value in quote.items() if value not in (None, '')})
+    for field in QUOTE_NUMERIC_FIELDS:
+        try:
+            result[field] = float(str(result.get(field, 0)).replace('%', '').replace(',', ''))
+        except ValueError:
+            result[field] = 0.0
+    try:
+        result['volume'] = int(float(result.get('volume', 0)))
+    except (TypeError, ValueError):
+        result['volume'] = 0
+    result['symbol'] = yahoo_symbol(symbol)
+    result['provider'] = provider
+    return result
+
+
+def is_valid_quote(quote: Dict[str, Any]) -> bool:
+    """오류가 없고 현재가가 있는 최신 시세 (장애로 캐시에서 만든 stale 시세는 다른 공급자를 먼저 시도)"""
+    return "error" not in quote and quote.get('current_price', 0) > 0 and not quote.get('stale')
+
+
+class LatencyTracker:
+    """공급자별 최근 지연 시간 표본 (성공/실패 모두, 실패가 빠르면 hedge 지연을 줄이지 않도록 성공만 분위수에 사용)"""
+
+    def __init__(self, window: int = QUOTE_LATENCY_WINDOW):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, seconds: float, ok: bool):
+        with self._lock:
+            counts = self._counts.setdefault(provider, {'ok': 0, 'failed': 0})
+            counts['ok' if ok else 'failed'] += 1
+            if ok:
+                self._samples.setdefault(provider, deque(maxlen=self.window)).append(seconds)
+
+    def quantile(self, provider: str, q: float) -> Optional[float]:
+        """최근 성공 지연 시간의 q 분위수 (표본이 QUOTE_HEDGE_MIN_SAMPLES개 미만이면 None)"""
+        with self._lock:
+            samples = sorted(self._samples.get(provider, ()))
+        if len(samples) < QUOTE_HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def hedge_delay(self, provider: str) -> float:
+        """provider 응답을 기다린 뒤 다음 공급자에 hedge 요청을 보낼 시간 (초)"""
+        p95 = self.quantile(provider, QUOTE_HEDGE_QUANTILE)
+        delay = QUOTE_HEDGE_DEFAULT_DELAY if p95 is None else p95
+        return min(QUOTE_HEDGE_MAX_DELAY, max(QUOTE_HEDGE_MIN_DELAY, delay))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            providers = set(self._samples) | set(self._counts)
+            counts = {p: dict(self._counts.get(p, {})) for p in providers}
+        return {provider: dict(counts[provider],
+                               p50=self.quantile(provider, 0.5),
+                               p95=self.quantile(provider, QUOTE_HEDGE_QUANTILE),
+                               hedge_delay=self.hedge_delay(provider))
+                for provider in sorted(providers)}
+
+
+class QuoteRouter:
+    """
+    공급자 우선순위 + hedged request 시세 조회
+
+    Parameters:
+    - providers: 공급자 이름 -> 시세 함수(symbol -> dict) (우선순위 순서)
+    """
+
+    def __init__(self, providers: Dict[str, Callable[[str], Dict[str, Any]]],
+                 tracker: Optional[LatencyTracker] = None):
+        self.providers = providers
+        self.tracker = tracker or LatencyTracker()
+        self.counts = {'requests': 0, 'hedged': 0, 'failover': 0, 'secondary_wins': 0}
+        self._counts_lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=max(2, QUOTE_ROUTER_WORKERS),
+                                                        thread_name_prefix='quote-router')
+        return self._executor
+
+    def shutdown(self):
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _count(self, key: str):
+        with self._counts_lock:
+            self.counts[key] += 1
+
+    def _call(self, provider: str, symbol: str) -> Dict[str, Any]:
+        """공급자 호출 (지연 시간 기록, 예외는 {"error": ...}로 변환)"""
+        started = time.perf_counter()
+        try:
+            quote = self.providers[provider](symbol)
+        except Exception as e:
+            quote = {"error": f"{provider} 시세 조회 중 오류 발생: {str(e)}"}
+        quote = normalize_quote(quote, symbol, provider)
+        ok = is_valid_quote(quote)
+        self.tracker.record(provider, time.perf_counter() - started, ok)
+        return quote
+
+    @timed('quote_route', is_error=has_error)
+    def get_quote(self, symbol: str) -> Dict[str, Any]:
+        """
+        시세 조회 (우선 공급자가 hedge 지연 안에 응답하지 않으면 다음 공급자에도 요청, 먼저 도착한 유효한 시세 반환)
+
+        Returns:
+        - 정규화된 시세 딕셔너리 (모든 공급자가 실패하면 stale 시세, 그것도 없으면 마지막 {"error": ...})
+        """
+        names = list(self.providers)
+        if not names:
+            return {"error": "사용할 수 있는 시세 공급자가 없습니다."}
+        self._count('requests')
+        if len(names) == 1:
+            return self._call(names[0], symbol)
+
+        executor = self._get_executor()
+        pending = {}
+        errors = []
+        next_index = 0
+
+        def launch():
+            nonlocal next_index
+            name = names[next_index]
+            next_index += 1
+            pending[executor.submit(self._call, name, symbol)] = name
+            return name
+
+        latest = launch()
+        while pending:
+            timeout = self.tracker.hedge_delay(latest) if next_index < len(names) else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                quote = future.result()
+                if is_valid_quote(quote):
+                    if name != names[0]:
+                        self._count('secondary_wins')
+                    return quote
+                errors.append(quote)
+            if next_index >= len(names):
+                continue
+            if not done:
+                # hedge 지연 안에 응답이 없음 -> 다음 공급자에도 요청 (앞선 요청은 계속 기다림)
+                self._count('hedged')
+                latest = launch()
+            elif not pending:
+                # 진행 중인 요청이 모두 실패 -> 기다리지 않고 다음 공급자로
+                self._count('failover')
+                latest = launch()
+        stale = [quote for quote in errors if "error" not in quote and quote.get('stale')]
+        if stale:
+            return stale[0]
+        return errors[-1] if errors else {"error": "시세를 가져오지 못했습니다."}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._counts_lock:
+            counts = dict(self.counts)
+        return dict(counts, providers=list(self.providers), latency=self.tracker.stats())
+
+
+def configured_providers(fetcher) -> Dict[str, Callable[[str], Dict[str, Any]]]:
+    """QUOTE_PROVIDERS 순서의 공급자 중 API 키가 설정된 것만 반환"""
+    available = {
+        'yahoo': (True, lambda symbol: fetcher.get_stock_price_yahoo(symbol, period="5d")),
+        'kis': (bool(fetcher.kis_app_key and fetcher.kis_app_secret), fetcher.get_stock_price_kis),
+        'alpha_vantage': (bool(fetcher.alpha_vantage_key), fetcher.get_stock_price_alpha_vantage),
+    }
+    providers = {}
+    for name in QUOTE_PROVIDERS.split(','):
+        name = name.strip()
+        if name in available and available[name][0]:
+            providers[name] = available[name][1]
+    return providers
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_quote_router() -> QuoteRouter:
+    """프로세스 단위로 공유되는 시세 라우터 반환 (공급자 지연 시간 통계를 요청 간에 공유)"""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                try:
+                    from .stock_fetcher import KoreanStockFetcher
+                except ImportError:
+                    from stock_fetcher import KoreanStockFetcher
+                _router = QuoteRouter(configured_providers(KoreanStockFetcher()))
+    return _router
+
+
+def shutdown_quote_router():
+    if _router is not None:
+        _router.shutdown()
@@ -0,0 +1,499 @@
+# 실시간 시세 허브 모듈
+# 종목별 최신 시세를 메모리에 유지하고, 구독 중인 종목 전체를 백그라운드 폴러 하나가 주기마다 한 번만 조회하여
+# 바뀐 시세를 모든 구독자에게 나눠 줌 (시청자 수와 무관하게 종목당 주기마다 상위 공급자 호출 1회)
+#
+# 구독자마다 종목별 최신 시세 하나만 대기열에 남기므로 느린 클라이언트가 있어도 메모리가 쌓이지 않고,
+# 폴러는 구독자가 있는 종목만 조회하며 장 마감 후 마감 시세를 받은 뒤에는 다음 장 시작까지 조회하지 않음
+#
+# gunicorn pre-fork 워커는 허브를 따로 가지므로, QUOTE_SHARED_DIR이 설정되면 (gunicorn.conf.py)
+# 파일 잠금을 잡은 워커 하나만 상위 공급자를 조회하고 결과를 공유 파일에 씀
+# - 각 워커는 자기 구독 종목을 demand/<pid>.json에 기록하고, 폴러 담당 워커는 모든 워커의 구독 종목을 합쳐 조회
+# - 나머지 워커는 QUOTE_SHARED_READ_SECONDS마다 quotes.json이 바뀌었는지 확인하여 자기 구독자에게 전달
+# - 폴러 담당 워커가 종료되면 잠금이 풀리고 다른 워커가 이어받음
+# (워커 수와 무관하게 서버 전체에서 종목당 주기마다 상위 공급자 호출 1회)
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Iterable, Optional
+
+try:
+    from .stock_fetcher import KoreanStockFetcher, KOREAN_COMPANIES
+    from .trading_calendar import is_trading_hours, data_unchanged_since, get_trading_calendar
+except ImportError:
+    from stock_fetcher import KoreanStockFetcher, KOREAN_COMPANIES
+    from trading_calendar import is_trading_hours, data_unchanged_since, get_trading_calendar
+try:
+    from infra.metrics import span
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from infra.metrics import span
+
+# 시세 공급자 ("kis" 또는 "yahoo", 비우면 KIS 키가 있을 때 kis)
+QUOTE_SOURCE = os.getenv("QUOTE_SOURCE", "")
+# 장중/장외 조회 주기 (초)
+QUOTE_POLL_SECONDS = float(os.getenv("QUOTE_POLL_SECONDS", "5"))
+QUOTE_IDLE_POLL_SECONDS = float(os.getenv("QUOTE_IDLE_POLL_SECONDS", "300"))
+# Yahoo 종목별 동시 조회 스레드 수 (보고서 수집 스레드 풀과 분리하여 폴링이 보고서 생성을 막지 않도록)
+QUOTE_HUB_WORKERS = int(os.getenv("QUOTE_HUB_WORKERS", "4"))
+# 연결 하나가 구독할 수 있는 최대 종목 수
+QUOTE_MAX_SYMBOLS = int(os.getenv("QUOTE_MAX_SYMBOLS", "50"))
+# 스트리밍 연결 유지용 주석 전송 간격 (초, 프록시의 유휴 연결 종료 방지)
+QUOTE_STREAM_HEARTBEAT_SECONDS = float(os.getenv("QUOTE_STREAM_HEARTBEAT_SECONDS", "15"))
+# 스트리밍 연결 하나의 최대 유지 시간 (초, 지나면 서버가 끊고 클라이언트가 재연결하여 워커 스레드를 돌려받음)
+QUOTE_STREAM_MAX_SECONDS = float(os.getenv("QUOTE_STREAM_MAX_SECONDS", "1800"))
+if int(os.getenv("GUNICORN_THREADS", "8")) <= 1:
+    # sync 워커는 요청 처리 중 heartbeat를 보내지 않으므로 워커 timeout(GUNICORN_TIMEOUT)의 80% 이내로 제한
+    # (gthread 워커의 heartbeat는 요청 처리와 무관하므로 제한하지 않음)
+    QUOTE_STREAM_MAX_SECONDS = min(QUOTE_STREAM_MAX_SECONDS, 0.8 * float(os.getenv("GUNICORN_TIMEOUT", "300")))
+# 워커 프로세스당 동시 스트리밍 연결 수 (기본: 워커 스레드의 절반, 나머지 스레드는 일반 요청 처리)
+QUOTE_STREAM_MAX_CONNECTIONS = int(os.getenv("QUOTE_STREAM_MAX_CONNECTIONS",
+                                             str(max(1, int(os.getenv("GUNICORN_THREADS", "8")) // 2))))
+
+# 워커 간 시세 공유 디렉토리 (비우면 워커마다 각자 조회)
+QUOTE_SHARED_DIR = os.getenv("QUOTE_SHARED_DIR", "")
+# 폴러를 맡지 않은 워커가 공유 시세 파일을, 폴러 담당 워커가 다른 워커의 구독 종목을 확인하는 간격 (초)
+QUOTE_SHARED_READ_SECONDS = float(os.getenv("QUOTE_SHARED_READ_SECONDS", "1"))
+# 이 시간(초) 동안 갱신되지 않은 구독 종목 파일은 무시 (비정상 종료한 워커)
+QUOTE_DEMAND_TTL_SECONDS = 30
+
+# 값이 바뀌었는지 비교할 시세 항목 (바뀐 종목만 구독자에게 전달)
+QUOTE_CHANGE_FIELDS = ('current_price', 'change', 'volume', 'high_price', 'low_price', 'date')
+
+
+def quote_source() -> str:
+    if QUOTE_SOURCE:
+        return QUOTE_SOURCE
+    return "kis" if os.getenv("KIS_APP_KEY") and os.getenv("KIS_APP_SECRET") else "yahoo"
+
+
+def normalize_symbols(values: Iterable[str]) -> List[str]:
+    """
+    구독 요청 값을 종목코드 목록으로 변환 (회사명, 종목코드, yfinance 심볼 허용, 순서 유지/중복 제거)
+
+    Raises:
+    - ValueError: 지원하지 않는 종목이거나 QUOTE_MAX_SYMBOLS를 넘는 경우
+    """
+    supported = set(KOREAN_COMPANIES.values())
+    symbols = []
+    for value in values:
+        value = value.strip()
+        if not value:
+            continue
+        code = KOREAN_COMPANIES.get(value, value.split('.')[0])
+        if code not in supported:
+            raise ValueError(f"지원하지 않는 종목입니다: {value}")
+        if code not in symbols:
+            symbols.append(code)
+    if not symbols:
+        raise ValueError("구독할 종목이 없습니다.")
+    if len(symbols) > QUOTE_MAX_SYMBOLS:
+        raise ValueError(f"한 번에 최대 {QUOTE_MAX_SYMBOLS}개 종목까지 구독할 수 있습니다.")
+    return symbols
+
+
+def _write_json(path: str, data: Any):
+    """다른 워커가 읽는 도중 반쯤 쓰인 파일을 보지 않도록 임시 파일에 쓴 뒤 교체"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class QuoteStreamFull(Exception):
+    """워커의 스트리밍 연결 수가 QUOTE_STREAM_MAX_CONNECTIONS에 도달함"""
+
+
+class QuoteSubscription:
+    """
+    구독자 하나의 대기열
+
+    종목별로 아직 전달하지 않은 최신 시세 하나만 보관 (같은 종목의 이전 시세는 덮어씀)
+    """
+
+    def __init__(self, symbols: List[str]):
+        self.symbols = list(symbols)
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._cond = threading.Condition()
+        self.closed = False
+
+    def offer(self, symbol: str, quote: Dict[str, Any]):
+        with self._cond:
+            self._pending[symbol] = quote
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def next(self, timeout: Optional[float] = None) -> Optional[List[Dict[str, Any]]]:
+        """
+        새 시세 대기
+
+        Returns:
+        - 새 시세 리스트 (timeout까지 없으면 빈 리스트, 허브가 종료되었으면 None)
+        """
+        with self._cond:
+            if not self._pending and not self.closed:
+                self._cond.wait(timeout)
+            if self.closed:
+                return None
+            quotes = list(self._pending.values())
+            self._pending.clear()
+            return quotes
+
+
+class QuoteHub:
+    """종목별 최신 시세 캐시 + 구독자 팬아웃 + 공급자별 백그라운드 폴러 하나 (shared_dir이 있으면 워커 전체에서 하나)"""
+
+    def __init__(self, source: Optional[str] = None, max_connections: int = QUOTE_STREAM_MAX_CONNECTIONS,
+                 shared_dir: str = QUOTE_SHARED_DIR):
+        self.source = source or quote_source()
+        self.max_connections = max_connections
+        self.shared_dir = shared_dir
+        # 폴러 담당 잠금 파일 핸들 (잡고 있는 동안 이 허브가 상위 공급자를 조회)
+        self._leader_handle = None
+        self._shared_mtime = None
+        self._demand_written = None
+        self._connections = 0
+        self.fetcher = KoreanStockFetcher()
+        self._quotes: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at: Dict[str, float] = {}
+        # 종목 -> 구독자 목록 (폴러는 구독자가 있는 종목만 조회)
+        self._subscribers: Dict[str, List[QuoteSubscription]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=max(1, QUOTE_HUB_WORKERS),
+                                                        thread_name_prefix='quote-hub')
+        return self._executor
+
+    # ------------------------------------------------------------------
+    # 구독
+    # ------------------------------------------------------------------
+
+    def subscribe(self, symbols: List[str]) -> QuoteSubscription:
+        """
+        종목 구독 시작 (캐시에 있는 시세는 바로 대기열에 넣고, 처음 보는 종목은 폴러를 깨워 즉시 조회)
+
+        Raises:
+        - QuoteStreamFull: 이미 max_connections개의 구독이 열려 있는 경우
+        """
+        subscription = QuoteSubscription(symbols)
+        missing = False
+        with self._lock:
+            if self._connections >= self.max_connections:
+                raise QuoteStreamFull(f"동시 스트리밍 연결이 최대({self.max_connections}개)입니다.")
+            self._connections += 1
+            for symbol in subscription.symbols:
+                self._subscribers.setdefault(symbol, []).append(subscription)
+                quote = self._quotes.get(symbol)
+                if quote is not None:
+                    subscription.offer(symbol, quote)
+                else:
+                    missing = True
+        self.start()
+        if missing:
+            self._wake.set()
+        return subscription
+
+    def unsubscribe(self, subscription: QuoteSubscription):
+        with self._lock:
+            if not subscription.closed:
+                self._connections -= 1
+            for symbol in subscription.symbols:
+                subscribers = self._subscribers.get(symbol, [])
+                if subscription in subscribers:
+                    subscribers.remove(subscription)
+                if not subscribers:
+                    self._subscribers.pop(symbol, None)
+        subscription.close()
+
+    def snapshot(self, symbols: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """캐시된 최신 시세 (조회하지 않음)"""
+        with self._lock:
+            if symbols is None:
+                return dict(self._quotes)
+            return {symbol: self._quotes[symbol] for symbol in symbols if symbol in self._quotes}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            subscriptions = {id(s) for subscribers in self._subscribers.values() for s in subscribers}
+            return {
+                'source': self.source,
+                'symbols': len(self._subscribers),
+                'subscriptions': len(subscriptions),
+                'connections': self._connections,
+                'max_connections': self.max_connections,
+                'cached': len(self._quotes),
+                'shared': bool(self.shared_dir),
+                'leader': self._leader_handle is not None or not self.shared_dir,
+            }
+
+    # ------------------------------------------------------------------
+    # 워커 간 공유
+    # ------------------------------------------------------------------
+
+    def _shared_path(self, *parts: str) -> str:
+        return os.path.join(self.shared_dir, *parts)
+
+    def _try_lead(self) -> bool:
+        """
+        폴러 담당 워커 선출 (공유 디렉토리가 없으면 항상 True)
+
+        잠금은 stop()까지 (또는 프로세스가 종료될 때까지) 유지하고, 다른 워커가 잡고 있으면 False
+        """
+        if not self.shared_dir or self._leader_handle is not None:
+            return True
+        os.makedirs(self.shared_dir, exist_ok=True)
+        handle = open(self._shared_path('leader.lock'), 'w')
+        try:
+            import fcntl
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except ImportError:
+            # fcntl이 없는 환경(Windows)에서는 워커마다 조회
+            pass
+        except OSError:
+            handle.close()
+            return False
+        self._leader_handle = handle
+        # 이전 담당 워커가 쓴 시세를 이어받아 바로 다시 조회하지 않도록
+        self._read_shared()
+        print(f"시세 폴러 담당 워커로 선출 (pid={os.getpid()})")
+        return True
+
+    def _release_lead(self):
+        handle, self._leader_handle = self._leader_handle, None
+        if handle is not None:
+            handle.close()
+
+    def _write_demand(self):
+        """이 워커의 구독 종목을 공유 디렉토리에 기록 (바뀌지 않았으면 수정 시각만 갱신)"""
+        with self._lock:
+            symbols = sorted(self._subscribers)
+        os.makedirs(self._shared_path('demand'), exist_ok=True)
+        path = self._shared_path('demand', f"{os.getpid()}.json")
+        if not symbols:
+            if self._demand_written is not None:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                self._demand_written = None
+            return
+        if symbols == self._demand_written:
+            try:
+                os.utime(path)
+                return
+            except OSError:
+                pass
+        _write_json(path, symbols)
+        self._demand_written = symbols
+
+    def _shared_demand(self) -> List[str]:
+        """모든 워커의 구독 종목 (이 허브의 구독 종목 포함, 오래 갱신되지 않은 파일은 제외)"""
+        with self._lock:
+            symbols = list(self._subscribers)
+        directory = self._shared_path('demand')
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return symbols
+        now = time.time()
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                if now - os.path.getmtime(path) > QUOTE_DEMAND_TTL_SECONDS:
+                    continue
+                with open(path, 'r', encoding='utf-8') as f:
+                    values = json.load(f)
+            except (OSError, ValueError):
+                continue
+            symbols.extend(symbol for symbol in values if symbol not in symbols)
+        return symbols
+
+    def _write_shared(self):
+        with self._lock:
+            quotes = dict(self._quotes)
+        _write_json(self._shared_path('quotes.json'), quotes)
+
+    def _read_shared(self) -> int:
+        """
+        폴러 담당 워커가 쓴 시세를 읽어 캐시 갱신 후 바뀐 시세를 구독자에게 전달 (파일이 그대로면 읽지 않음)
+
+        Returns:
+        - 바뀐 종목 수
+        """
+        path = self._shared_path('quotes.json')
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            if mtime == self._shared_mtime:
+                return 0
+            with open(path, 'r', encoding='utf-8') as f:
+                quotes = json.load(f)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as e:
+            print(f"공유 시세 파일 읽기 실패: {e}")
+            return 0
+        self._shared_mtime = mtime
+        with self._lock:
+            return sum(self._apply(symbol, quote) for symbol, quote in quotes.items())
+
+    # ------------------------------------------------------------------
+    # 조회
+    # ------------------------------------------------------------------
+
+    def _fetch(self, symbols: List[str]) -> List[Dict[str, Any]]:
+        if self.source == "kis":
+            # 멀티 시세로 30종목씩 일괄 조회
+            return self.fetcher.get_multiple_stock_prices(symbols, source="kis")
+        # Yahoo는 종목별 호출이므로 허브 전용 스레드 풀에서 동시에 조회
+        return list(self._get_executor().map(lambda symbol: self.fetcher.get_stock_price_yahoo(symbol, period="5d"),
+                                             symbols))
+
+    def _due(self, now: float, interval: float, symbols: Optional[List[str]] = None) -> List[str]:
+        """
+        다시 조회할 종목 (구독 중이고, 주기가 지났으며, 장 마감 후 마감 시세를 아직 받지 않은 종목)
+
+        Parameters:
+        - symbols: 구독 중인 종목 (기본값: 이 허브의 구독 종목, 폴러 담당 워커는 모든 워커의 구독 종목)
+        """
+        with self._lock:
+            symbols = list(self._subscribers) if symbols is None else list(symbols)
+            fetched = {symbol: self._fetched_at.get(symbol) for symbol in symbols}
+        due = []
+        for symbol in symbols:
+            fetched_at = fetched[symbol]
+            if fetched_at is None:
+                due.append(symbol)
+            elif now - fetched_at >= interval and not data_unchanged_since(fetched_at):
+                due.append(symbol)
+        return due
+
+    def poll(self, symbols: Optional[List[str]] = None) -> int:
+        """
+        종목 시세를 한 번 조회하여 캐시 갱신 후 바뀐 시세를 구독자에게 전달
+
+        Returns:
+        - 구독자에게 전달한 (바뀐) 종목 수
+        """
+        symbols = symbols if symbols is not None else self._due(time.time(), 0)
+        if not symbols:
+            return 0
+        with span('quote_poll') as s:
+            results = self._fetch(symbols)
+            if any("error" in result for result in results):
+                s.fail()
+
+        now = time.time()
+        changed = 0
+        with self._lock:
+            for symbol, quote in zip(symbols, results):
+                if "error" in quote:
+                    print(f"시세 조회 실패 ({symbol}): {quote['error']}")
+                    continue
+                changed += self._apply(symbol, dict(quote, symbol=symbol, updated_at=now, source=self.source))
+        if self.shared_dir:
+            self._write_shared()
+        return changed
+
+    def _apply(self, symbol: str, quote: Dict[str, Any]) -> bool:
+        """캐시 갱신 후 값이 바뀌었으면 구독자에게 전달 (self._lock을 잡은 상태에서 호출)"""
+        previous = self._quotes.get(symbol)
+        self._quotes[symbol] = quote
+        self._fetched_at[symbol] = quote.get('updated_at', 0)
+        if previous is not None and all(previous.get(k) == quote.get(k) for k in QUOTE_CHANGE_FIELDS):
+            return False
+        for subscription in self._subscribers.get(symbol, []):
+            subscription.offer(symbol, quote)
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            interval = QUOTE_POLL_SECONDS if is_trading_hours() else QUOTE_IDLE_POLL_SECONDS
+            self._wake.clear()
+            wait = interval
+            try:
+                if self.shared_dir:
+                    self._write_demand()
+                if self._try_lead():
+                    symbols = self._shared_demand() if self.shared_dir else None
+                    self.poll(self._due(time.time(), interval, symbols))
+                    with self._lock:
+                        fetched = [self._fetched_at.get(symbol)
+                                   for symbol in (self._subscribers if symbols is None else symbols)]
+                    if fetched and all(at is not None and data_unchanged_since(at) for at in fetched):
+                        # 장 마감 후 마감 시세를 모두 받았으면 다음 장 시작까지 (새 종목 구독 시에는 바로) 대기
+                        wait = max(1.0, min(interval, get_trading_calendar().seconds_until_change()))
+                else:
+                    self._read_shared()
+            except Exception as e:
+                print(f"시세 백그라운드 조회 실패: {e}")
+            if self.shared_dir:
+                # 다른 워커의 새 구독 종목/새 시세를 놓치지 않도록 짧은 간격으로 확인 (파일 확인만 하므로 가벼움)
+                wait = min(wait, QUOTE_SHARED_READ_SECONDS)
+            self._wake.wait(wait)
+
+    def start(self) -> threading.Thread:
+        """백그라운드 폴러 시작 (이미 실행 중이면 기존 스레드 반환)"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return self._thread
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='quote-hub', daemon=True)
+            self._thread.start()
+            return self._thread
+
+    def stop(self):
+        """폴러 중지 및 모든 구독 종료 (스트리밍 응답이 끝나도록)"""
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            subscriptions = {id(s): s for subscribers in self._subscribers.values() for s in subscribers}
+            self._subscribers.clear()
+            self._connections = 0
+            thread, self._thread = self._thread, None
+        for subscription in subscriptions.values():
+            subscription.close()
+        if thread is not None:
+            thread.join(timeout=5)
+        if self.shared_dir:
+            # 다른 워커가 폴러를 이어받고, 이 워커의 구독 종목은 더 이상 조회하지 않도록
+            self._release_lead()
+            try:
+                self._write_demand()
+            except OSError:
+                pass
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_quote_hub() -> QuoteHub:
+    """프로세스 단위로 공유되는 시세 허브 반환"""
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = QuoteHub()
+    return _hub
@@ -1,16 +1,39 @@
 # 주식 정보 fetch 모듈
-import requests
 import json
 import os
+import sys
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-import yfinance as yf
-import pandas as pd
 from typing import Dict, List, Optional, Any
 try:
-    from .news_fetcher import get_latest_news
+    from .news_fetcher import fetch_latest_news
+    from .ohlcv import history_to_columns, dumps_report, trim_columns
+    from .ohlcv_cache import get_ohlcv_cache
+    from .models import StockData, PipelineError
+    from .http_session import get_session, HTTP_TIMEOUT_SECONDS
+    from .market_context import get_market_context
+    from .fundamentals import get_fundamentals_store
+    from .kis_client import get_kis_client
+    from .quote_router import get_quote_router
 except ImportError:
-    from news_fetcher import get_latest_news
+    from news_fetcher import fetch_latest_news
+    from ohlcv import history_to_columns, dumps_report, trim_columns
+    from ohlcv_cache import get_ohlcv_cache
+    from models import StockData, PipelineError
+    from http_session import get_session, HTTP_TIMEOUT_SECONDS
+    from market_context import get_market_context
+    from fundamentals import get_fundamentals_store
+    from kis_client import get_kis_client
+    from quote_router import get_quote_router
+try:
+    from infra.metrics import timed, has_error
+    from infra.replay import open_ticker, provider_now
+    from infra.circuit import circuit
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from infra.metrics import timed, has_error
+    from infra.replay import open_ticker, provider_now
+    from infra.circuit import circuit
 
 load_dotenv()
 
@@ -23,13 +46,15 @@ class KoreanStockFetcher:
         self.kis_app_secret = os.getenv("KIS_APP_SECRET")
         self.kis_access_token = os.getenv("KIS_ACCESS_TOKEN")
         
-    def get_stock_price_yahoo(self, symbol: str, period: str = "1mo") -> Dict[str, Any]:
+    @timed('yfinance_quote', is_error=has_error)
+    def get_stock_price_yahoo(self, symbol: str, period: str = "1mo", include_history: bool = False) -> Dict[str, Any]:
         """
         Yahoo Finance API를 사용하여 주가 정보 가져오기
         
         Args:
             symbol: 주식 심볼 (예: "005930.KS" for 삼성전자)
             period: 기간 ("1d", "5d", "1mo", "3mo", "6mo", "1y", "2y", "5y", "10y", "ytd", "max")
+            include_history: 시세 계산에 쓴 히스토리를 "historical_data"(컬럼형)로 함께 반환
         
         Returns:
             주가 정보 딕셔너리
@@ -39,19 +64,29 @@ class KoreanStockFetcher:
             if not symbol.endswith('.KS'):
                 symbol = f"{symbol}.KS"
             
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period=period)
+            # yfinance(pandas 포함)는 import 비용이 커서 open_ticker가 실제 조회 시점에 로드
+            try:
+                with circuit('yfinance') as c:
+                    ticker = open_ticker(symbol)
+                    hist = ticker.history(period=period)
+                    if hist.empty:
+                        c.fail()
+            except Exception as e:
+                # 장애 중(회로 열림 포함)에는 기다리지 않고 캐시된 히스토리로 응답
+                return self._stale_quote_yahoo(symbol, period, include_history,
+                                               f"주가 정보 조회 중 오류 발생: {str(e)}")
             
             if hist.empty:
-                return {"error": "주가 정보를 찾을 수 없습니다."}
+                return self._stale_quote_yahoo(symbol, period, include_history, "주가 정보를 찾을 수 없습니다.")
             
             # 최신 데이터
             latest = hist.iloc[-1]
-            info = ticker.info
+            # 회사명/시가총액/PER 등은 하루 단위로 갱신되는 저장소에서 읽음 (느린 .info를 시세마다 호출하지 않음)
+            info = get_fundamentals_store().get(symbol)
             
             result = {
                 "symbol": symbol,
-                "company_name": info.get('longName', '알 수 없음'),
+                "company_name": info['company_name'],
                 "current_price": float(latest['Close']),
                 "open_price": float(latest['Open']),
                 "high_price": float(latest['High']),
@@ -60,17 +95,57 @@ class KoreanStockFetcher:
                 "change": float(latest['Close'] - hist.iloc[-2]['Close']) if len(hist) > 1 else 0,
                 "change_percent": float(((latest['Close'] - hist.iloc[-2]['Close']) / hist.iloc[-2]['Close']) * 100) if len(hist) > 1 else 0,
                 "date": latest.name.strftime('%Y-%m-%d'),
-                "market_cap": info.get('marketCap', 0),
-                "pe_ratio": info.get('trailingPE', 0),
-                "dividend_yield": info.get('dividendYield', 0),
-                "currency": info.get('currency', 'KRW')
+                "market_cap": info['market_cap'],
+                "pe_ratio": info['pe_ratio'],
+                "dividend_yield": info['dividend_yield'],
+                "currency": info['currency']
             }
+            if include_history:
+                result["historical_data"] = history_to_columns(hist)
+                # 공급자 장애 시 stale 데이터로 쓸 수 있도록 OHLCV 캐시에도 저장
+                get_ohlcv_cache().store(symbol, period, result["historical_data"])
             
             return result
             
         except Exception as e:
             return {"error": f"주가 정보 조회 중 오류 발생: {str(e)}"}
     
+    def _stale_quote_yahoo(self, symbol: str, period: str, include_history: bool, error: str) -> Dict[str, Any]:
+        """
+        Yahoo Finance 조회 실패 시 OHLCV 캐시의 마지막 히스토리로 만든 시세 ("stale": True)
+        
+        Returns:
+            get_stock_price_yahoo와 같은 항목의 딕셔너리 (캐시도 없으면 {"error": error})
+        """
+        columns = get_ohlcv_cache().peek(symbol, period)
+        if not columns or columns['length'] == 0:
+            return {"error": error}
+        print(f"⚠️ {symbol} 시세 조회 실패, 캐시된 히스토리 사용 ({columns['date'][0]}): {error}")
+        
+        info = get_fundamentals_store().get(symbol)
+        close = columns['close']
+        previous = float(close[1]) if columns['length'] > 1 else float(close[0])
+        result = {
+            "symbol": symbol,
+            "company_name": info['company_name'],
+            "current_price": float(close[0]),
+            "open_price": float(columns['open'][0]),
+            "high_price": float(columns['high'][0]),
+            "low_price": float(columns['low'][0]),
+            "volume": int(columns['volume'][0]),
+            "change": float(close[0]) - previous,
+            "change_percent": (float(close[0]) - previous) / previous * 100 if previous else 0,
+            "date": columns['date'][0],
+            "market_cap": info['market_cap'],
+            "pe_ratio": info['pe_ratio'],
+            "dividend_yield": info['dividend_yield'],
+            "currency": info['currency'],
+            "stale": True
+        }
+        if include_history:
+            result["historical_data"] = trim_columns(columns, period)
+        return result
+    
     def get_stock_price_alpha_vantage(self, symbol: str) -> Dict[str, Any]:
         """
         Alpha Vantage API를 사용하여 실시간 주가 정보 가져오기
@@ -92,8 +167,12 @@ class KoreanStockFetcher:
                 "apikey": self.alpha_vantage_key
             }
             
-            response = requests.get(url, params=params)
-            data = response.json()
+            with circuit('alpha_vantage') as c:
+                response = get_session().get(url, params=params, timeout=HTTP_TIMEOUT_SECONDS)
+                data = response.json()
+                # 요청 제한 초과 시에도 200으로 "Note"/"Information"만 응답
+                if "Global Quote" not in data:
+                    c.fail()
             
             if "Global Quote" not in data:
                 return {"error": "주가 정보를 찾을 수 없습니다."}
@@ -118,6 +197,25 @@ class KoreanStockFetcher:
         except Exception as e:
             return {"error": f"Alpha Vantage API 조회 중 오류 발생: {str(e)}"}
     
+    @timed('kis_quote', is_error=has_error)
+    def get_stock_price_kis(self, symbol: str) -> Dict[str, Any]:
+        """
+        한국투자증권(KIS) Open API를 사용하여 현재가 정보 가져오기
+
+        Args:
+            symbol: 주식 심볼 (예: "005930" for 삼성전자)
+
+        Returns:
+            주가 정보 딕셔너리 (get_stock_price_yahoo와 같은 항목)
+        """
+        if not (self.kis_app_key and self.kis_app_secret):
+            return {"error": "KIS API 키가 설정되지 않았습니다."}
+
+        try:
+            return get_kis_client().get_price(symbol)
+        except Exception as e:
+            return {"error": f"KIS API 조회 중 오류 발생: {str(e)}"}
+
     def get_korean_stock_list(self) -> List[Dict[str, str]]:
         """
         주요 한국 주식 목록 반환
@@ -139,21 +237,44 @@ class KoreanStockFetcher:
         ]
         return korean_stocks
     
-    def get_multiple_stock_prices(self, symbols: List[str], source: str = "yahoo") -> List[Dict[str, Any]]:
+    def get_stock_quote(self, symbol: str) -> Dict[str, Any]:
+        """
+        설정된 공급자(QUOTE_PROVIDERS) 중 가장 먼저 응답한 시세 가져오기 (우선 공급자가 늦으면 hedged request)
+
+        Args:
+            symbol: 주식 심볼 (예: "005930")
+
+        Returns:
+            주가 정보 딕셔너리 (get_stock_price_yahoo와 같은 항목 + 응답한 공급자 "provider")
+        """
+        return get_quote_router().get_quote(symbol)
+
+    def get_multiple_stock_prices(self, symbols: List[str], source: str = "auto") -> List[Dict[str, Any]]:
         """
         여러 주식의 가격 정보를 한 번에 가져오기
         
         Args:
             symbols: 주식 심볼 리스트
-            source: 데이터 소스 ("yahoo" 또는 "alpha_vantage")
+            source: 데이터 소스 ("auto", "yahoo", "alpha_vantage" 또는 "kis")
+                    "auto"는 설정된 공급자 간 hedged request + 장애 시 다음 공급자 사용
         
         Returns:
             주가 정보 리스트
         """
+        if source == "kis":
+            # KIS는 멀티 시세 한 번으로 최대 KIS_MULTI_PRICE_LIMIT개 종목을 조회
+            if not (self.kis_app_key and self.kis_app_secret):
+                return [{"error": "KIS API 키가 설정되지 않았습니다."} for _ in symbols]
+            if len(symbols) == 1:
+                return [self.get_stock_price_kis(symbols[0])]
+            return get_kis_client().get_prices(symbols)
+
         results = []
         
         for symbol in symbols:
-            if source == "yahoo":
+            if source == "auto":
+                result = self.get_stock_quote(symbol)
+            elif source == "yahoo":
                 result = self.get_stock_price_yahoo(symbol)
             elif source == "alpha_vantage":
                 result = self.get_stock_price_alpha_vantage(symbol)
@@ -190,30 +311,26 @@ class KoreanStockFetcher:
                 return [{"error": f"주식 심볼 {symbol}에 해당하는 회사를 찾을 수 없습니다."}]
             
             # 날짜 계산
-            end_date = datetime.now()
+            end_date = provider_now()
             start_date = end_date - timedelta(days=days_back)
             
             # NewsAPI를 사용하여 뉴스 가져오기
-            news_json = get_latest_news(
+            news_list = fetch_latest_news(
                 query=company_name,
                 from_date=start_date.strftime('%Y-%m-%d'),
                 to_date=end_date.strftime('%Y-%m-%d'),
                 num_articles=num_articles
             )
             
-            # JSON 문자열을 파싱
-            news_list = json.loads(news_json)
-            
             # 결과 포맷 통일
             result = []
             for article in news_list:
-                if 'title' in article and 'description' in article:
-                    result.append({
-                        "title": article['title'],
-                        "summary": article['description'],
-                        "source": "NewsAPI",
-                        "company": company_name
-                    })
+                result.append({
+                    "title": article.title,
+                    "summary": article.description,
+                    "source": "NewsAPI",
+                    "company": company_name
+                })
             
             return result
             
@@ -225,37 +342,10 @@ class KoreanStockFetcher:
         한국 시장 요약 정보 가져오기
         
         Returns:
-            시장 요약 정보
+            시장 요약 정보 (KOSPI/KOSDAQ 현재 지수와 전일 대비 변동)
         """
-        try:
-            # KOSPI 지수 정보
-            kospi = yf.Ticker("^KS11")
-            kospi_info = kospi.info
-            kospi_hist = kospi.history(period="5d")
-            
-            # KOSDAQ 지수 정보
-            kosdaq = yf.Ticker("^KQ11")
-            kosdaq_info = kosdaq.info
-            kosdaq_hist = kosdaq.history(period="5d")
-            
-            result = {
-                "kospi": {
-                    "current": float(kospi_hist.iloc[-1]['Close']) if not kospi_hist.empty else 0,
-                    "change": float(kospi_hist.iloc[-1]['Close'] - kospi_hist.iloc[-2]['Close']) if len(kospi_hist) > 1 else 0,
-                    "change_percent": float(((kospi_hist.iloc[-1]['Close'] - kospi_hist.iloc[-2]['Close']) / kospi_hist.iloc[-2]['Close']) * 100) if len(kospi_hist) > 1 else 0
-                },
-                "kosdaq": {
-                    "current": float(kosdaq_hist.iloc[-1]['Close']) if not kosdaq_hist.empty else 0,
-                    "change": float(kosdaq_hist.iloc[-1]['Close'] - kosdaq_hist.iloc[-2]['Close']) if len(kosdaq_hist) > 1 else 0,
-                    "change_percent": float(((kosdaq_hist.iloc[-1]['Close'] - kosdaq_hist.iloc[-2]['Close']) / kosdaq_hist.iloc[-2]['Close']) * 100) if len(kosdaq_hist) > 1 else 0
-                },
-                "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-            return result
-            
-        except Exception as e:
-            return {"error": f"시장 요약 정보 조회 중 오류 발생: {str(e)}"}
+        # 지수 조회는 시장 컨텍스트가 주기적으로 갱신한 스냅샷을 공유 (보고서마다 조회하지 않음)
+        return get_market_context().get_summary()
 
 # 사용 예시
 def main():
@@ -397,9 +487,120 @@ KOREAN_COMPANIES = {
     '오리온': '001800'
 }
 
+# 업종 분류 (비교 분석의 업종 대비 성과 계산용, 목록에 없는 기업은 '기타')
+KOREAN_SECTORS = {
+    '반도체/IT': ['삼성전자', '삼성전자우', 'SK하이닉스', '삼성전기', 'LG이노텍', 'LG디스플레이', 'LG전자',
+                  '삼성에스디에스', '현대오토에버'],
+    '2차전지/화학': ['LG에너지솔루션', '삼성SDI', 'LG화학', '포스코케미칼', '롯데케미칼', '한화솔루션', 'SKC', '금호석유'],
+    '바이오': ['삼성바이오로직스', '셀트리온', '한미사이언스', '한미약품', 'SK바이오팜'],
+    '자동차': ['현대차', '기아', '현대모비스', '현대위아', '한온시스템', '한국타이어앤테크놀로지'],
+    '인터넷/게임': ['NAVER', '카카오', '엔씨소프트', '크래프톤', '넷마블', 'CJ ENM'],
+    '금융': ['KB금융', '신한지주', '하나금융지주', '우리금융지주', '카카오뱅크', '삼성생명', '삼성화재', '삼성카드',
+             '한국금융지주', '한화생명', '현대해상', '한화투자증권', '한화손해보험'],
+    '철강/소재': ['포스코홀딩스', '현대제철', '포스코인터내셔널'],
+    '에너지/유틸리티': ['한국전력공사', '한국가스공사', 'SK이노베이션', 'S-Oil', 'GS', '한전KPS', '한전기술', '두산에너빌리티'],
+    '통신': ['SK텔레콤', 'KT', 'LG유플러스'],
+    '조선/기계/방산': ['현대중공업', '한국조선해양', '현대미포조선', '삼성중공업', '두산밥캣', '한화에어로스페이스',
+                   '한화시스템', '한국항공우주', '현대엘리베이터'],
+    '건설': ['현대건설', '삼성엔지니어링', '대우건설', 'GS건설', '현대산업개발'],
+    '소비재/유통': ['KT&G', 'CJ제일제당', '아모레퍼시픽', 'LG생활건강', '오리온', '동서', '현대그린푸드', '동원시스템즈',
+                '롯데쇼핑', '현대백화점', 'GS리테일', '현대홈쇼핑', '한화갤러리아', '현대리바트'],
+    '운송': ['대한항공', 'HMM', '현대글로비스', 'CJ대한통운', '한진'],
+    '지주': ['SK', 'LG', '삼성물산', '롯데지주', '한화', 'SK스퀘어'],
+}
+
+_ticker_sectors = {KOREAN_COMPANIES[name]: sector
+                   for sector, names in KOREAN_SECTORS.items() for name in names if name in KOREAN_COMPANIES}
+
+
+def get_sector(company_or_ticker):
+    """회사명 또는 종목코드('005930', '005930.KS')의 업종 반환"""
+    ticker = KOREAN_COMPANIES.get(company_or_ticker, company_or_ticker).split('.')[0]
+    return _ticker_sectors.get(ticker, '기타')
+
+_company_index = None
+
+def build_company_index():
+    """
+    회사명 조회용 색인 생성 (프로세스 단위로 한 번만 생성)
+    
+    Returns:
+    - {정규화된 회사명 또는 종목코드: (회사명, 종목코드)} 딕셔너리
+    """
+    global _company_index
+    if _company_index is None:
+        index = {}
+        for name, ticker in KOREAN_COMPANIES.items():
+            index[ticker] = (name, ticker)
+            index[_normalize_company_name(name)] = (name, ticker)
+        _company_index = index
+    return _company_index
+
+def _normalize_company_name(company_name):
+    return company_name.replace(' ', '').upper()
+
+def resolve_company(company_name):
+    """
+    회사명을 (정확한 회사명, 종목코드)로 변환 (부분 매칭 지원)
+    
+    Returns:
+    - (회사명, 종목코드) 튜플, 지원하지 않는 기업이면 (입력 회사명, None)
+    """
+    if company_name in KOREAN_COMPANIES:
+        return company_name, KOREAN_COMPANIES[company_name]
+    
+    # 대소문자/공백 차이 또는 종목코드로 입력한 경우
+    normalized = _normalize_company_name(company_name)
+    index = build_company_index()
+    if normalized in index:
+        return index[normalized]
+    
+    # 정확한 회사명이 아닌 경우, 부분 매칭 시도
+    for name, ticker in KOREAN_COMPANIES.items():
+        if company_name in name or name in company_name:
+            return name, ticker
+    
+    return company_name, None
+
+@timed('stock_data')
+def fetch_stock_data(company_name, period='1mo') -> StockData:
+    """
+    회사명으로 주식 데이터를 가져오는 함수 (파이프라인 내부용)
+    
+    Parameters:
+    - company_name: 회사명 (예: '삼성전자')
+    - period: 주가 데이터 기간 (기본값: '1mo')
+    
+    Returns:
+    - StockData 객체 (실패 시 PipelineError 발생)
+    """
+    fetcher = KoreanStockFetcher()
+    
+    # 회사명을 심볼로 변환
+    company_name, symbol = resolve_company(company_name)
+    if not symbol:
+        raise PipelineError(f"지원되지 않는 기업입니다: {company_name}",
+                            supported_companies=list(KOREAN_COMPANIES.keys()))
+    
+    # Yahoo Finance에서 주가 정보 가져오기 (시세 계산에 쓴 히스토리를 그대로 받아 재조회하지 않음)
+    stock_info = fetcher.get_stock_price_yahoo(symbol, period, include_history=True)
+    
+    if 'error' in stock_info:
+        raise PipelineError(stock_info['error'])
+    
+    stock = StockData.from_quote(stock_info)
+    
+    # 히스토리컬 데이터 추가 (기술적 분석을 위해, 컬럼형 레이아웃이며 최신 데이터가 첫 번째)
+    stock.set_history(stock_info['historical_data'])
+    
+    # 회사명 추가
+    stock.company_name = company_name
+    
+    return stock
+
 def get_stock_data(company_name, period='1mo'):
     """
-    회사명으로 주식 데이터를 가져오는 래퍼 함수 (analyze.py에서 사용)
+    회사명으로 주식 데이터를 가져오는 래퍼 함수 (외부 호출용)
     
     Parameters:
     - company_name: 회사명 (예: '삼성전자')
@@ -409,70 +610,11 @@ def get_stock_data(company_name, period='1mo'):
     - JSON 형태의 주가 데이터 (문자열)
     """
     try:
-        fetcher = KoreanStockFetcher()
-        
-        # 회사명을 심볼로 변환
-        symbol = None
-        if company_name in KOREAN_COMPANIES:
-            symbol = KOREAN_COMPANIES[company_name]
-        else:
-            # 정확한 회사명이 아닌 경우, 부분 매칭 시도
-            for name, ticker in KOREAN_COMPANIES.items():
-                if company_name in name or name in company_name:
-                    symbol = ticker
-                    company_name = name  # 정확한 회사명으로 업데이트
-                    break
-        
-        if not symbol:
-            return json.dumps({
-                "error": f"지원되지 않는 기업입니다: {company_name}",
-                "supported_companies": list(KOREAN_COMPANIES.keys())
-            }, ensure_ascii=False)
-        
-        # Yahoo Finance에서 주가 정보 가져오기
-        stock_info = fetcher.get_stock_price_yahoo(symbol, period)
-        
-        if 'error' in stock_info:
-            return json.dumps(stock_info, ensure_ascii=False)
-        
-        # 히스토리컬 데이터 추가 (기술적 분석을 위해)
-        try:
-            import yfinance as yf
-            ticker = yf.Ticker(f"{symbol}.KS")
-            hist = ticker.history(period=period)
-            
-            if not hist.empty:
-                # 최신 데이터부터 정렬 (최신이 첫 번째)
-                hist_data = []
-                for date, row in hist.iterrows():
-                    hist_data.append({
-                        'date': date.strftime('%Y-%m-%d'),
-                        'open': float(row['Open']),
-                        'high': float(row['High']),
-                        'low': float(row['Low']),
-                        'close': float(row['Close']),
-                        'volume': int(row['Volume'])
-                    })
-                
-                # 최신 데이터가 첫 번째가 되도록 역순 정렬
-                hist_data.reverse()
-                stock_info['historical_data'] = hist_data
-                
-                # 52주 최고가/최저가 계산
-                if len(hist_data) > 0:
-                    prices = [data['close'] for data in hist_data]
-                    stock_info['52_week_high'] = max(prices)
-                    stock_info['52_week_low'] = min(prices)
-                
-        except Exception as e:
-            print(f"히스토리컬 데이터 추가 중 오류: {e}")
-            stock_info['historical_data'] = []
-        
-        # 회사명 추가
-        stock_info['company_name'] = company_name
-        
-        return json.dumps(stock_info, ensure_ascii=False, indent=2)
+        stock = fetch_stock_data(company_name, period)
+        return dumps_report(stock.to_dict())
         
+    except PipelineError as e:
+        return json.dumps(e.to_dict(), ensure_ascii=False)
     except Exception as e:
         return json.dumps({
             "error": f"주가 데이터 조회 중 오류 발생: {str(e)}"
@@ -0,0 +1,207 @@
+# KRX 거래일 달력 모듈
+# 주말과 KRX 휴장일을 반영한 거래일 표를 미리 만들어 두고
+# "가장 최근에 마감된 거래일", "지금 장이 열려 있는지", "두 날짜 사이 예상 봉 개수"를 표 조회만으로 계산
+#
+# 캐시(OHLCV, 시장 지수, 스크리너 지표)는 이 달력으로 만료 여부를 판단하여
+# 마지막 조회 이후 새 봉이 생길 수 없는 경우(장 마감 후 야간, 주말, 휴장일)에는 다시 조회하지 않음
+
+import os
+from datetime import date, datetime, timedelta, time as dtime
+from typing import List, Optional
+
+# KRX 정규장 시간 (한국 시간)
+KRX_OPEN = dtime(9, 0)
+KRX_CLOSE = dtime(15, 30)
+
+# 거래일 표 범위 (범위 밖 날짜는 주말만 휴장으로 간주)
+CALENDAR_START = date(2015, 1, 1)
+CALENDAR_END = date(2027, 12, 31)
+
+# KRX 휴장일 (주말 제외, 설/추석 연휴, 대체공휴일, 선거일, 근로자의 날, 연말 휴장일)
+# 매년 말 KRX 공지에 맞춰 다음 해를 추가하고, 임시공휴일은 KRX_EXTRA_HOLIDAYS 환경 변수로 보완
+KRX_HOLIDAYS = {
+    2024: ['01-01', '02-09', '02-12', '03-01', '04-10', '05-01', '05-06', '05-15', '06-06',
+           '08-15', '09-16', '09-17', '09-18', '10-01', '10-03', '10-09', '12-25', '12-31'],
+    2025: ['01-01', '01-27', '01-28', '01-29', '01-30', '03-03', '05-01', '05-05', '05-06', '06-03',
+           '06-06', '08-15', '10-03', '10-06', '10-07', '10-08', '10-09', '12-25', '12-31'],
+    2026: ['01-01', '02-16', '02-17', '02-18', '03-02', '05-01', '05-05', '05-25', '06-03',
+           '08-17', '09-24', '09-25', '09-28', '10-05', '10-09', '12-25', '12-31'],
+    2027: ['01-01', '02-08', '02-09', '03-01', '05-05', '05-13', '08-16', '09-14', '09-15', '09-16',
+           '10-04', '10-11', '12-27', '12-31'],
+}
+
+# 추가 휴장일 (쉼표 구분 YYYY-MM-DD, 예: 임시공휴일)
+KRX_EXTRA_HOLIDAYS = os.getenv("KRX_EXTRA_HOLIDAYS", "")
+
+# 장 마감 후 시세 제공자(Yahoo Finance)에 마감 데이터가 반영되기까지의 여유 시간 (초)
+KRX_DATA_DELAY_SECONDS = int(os.getenv("KRX_DATA_DELAY_SECONDS", "1200"))
+
+
+def now_kst() -> datetime:
+    """현재 한국 시간"""
+    from zoneinfo import ZoneInfo
+    return datetime.now(ZoneInfo("Asia/Seoul"))
+
+
+def _holidays() -> set:
+    holidays = {date.fromisoformat(f"{year}-{day}") for year, days in KRX_HOLIDAYS.items() for day in days}
+    for value in KRX_EXTRA_HOLIDAYS.split(','):
+        if value.strip():
+            holidays.add(date.fromisoformat(value.strip()))
+    return holidays
+
+
+class TradingCalendar:
+    """
+    KRX 거래일 표
+
+    CALENDAR_START부터 CALENDAR_END까지 날짜별 누적 거래일 수를 미리 계산해 두어
+    거래일 여부, 직전 거래일, 두 날짜 사이 거래일 수를 날짜 차이 인덱스 조회로 계산
+    """
+
+    def __init__(self, start: date = CALENDAR_START, end: date = CALENDAR_END, holidays: Optional[set] = None):
+        self.start = start
+        self.end = end
+        holidays = _holidays() if holidays is None else holidays
+        self._sessions: List[date] = []
+        # _count[i]: start + i일까지(포함)의 거래일 수
+        self._count: List[int] = []
+        day = start
+        while day <= end:
+            if day.weekday() < 5 and day not in holidays:
+                self._sessions.append(day)
+            self._count.append(len(self._sessions))
+            day += timedelta(days=1)
+
+    def _offset(self, day: date) -> int:
+        if not self.start <= day <= self.end:
+            raise ValueError(f"거래일 표 범위({self.start} ~ {self.end})를 벗어난 날짜입니다: {day}")
+        return (day - self.start).days
+
+    def _in_range(self, day: date) -> bool:
+        return self.start <= day <= self.end
+
+    def is_session(self, day: date) -> bool:
+        """거래일 여부"""
+        if not self._in_range(day):
+            return day.weekday() < 5
+        offset = self._offset(day)
+        previous = self._count[offset - 1] if offset > 0 else 0
+        return self._count[offset] > previous
+
+    def session_on_or_before(self, day: date) -> date:
+        """day 또는 그 이전의 가장 가까운 거래일"""
+        if not self._in_range(day):
+            while day.weekday() >= 5:
+                day -= timedelta(days=1)
+            return day
+        count = self._count[self._offset(day)]
+        if count == 0:
+            raise ValueError(f"{self.start} 이전 거래일은 거래일 표에 없습니다.")
+        return self._sessions[count - 1]
+
+    def next_session(self, day: date) -> date:
+        """day 이후(day 제외)의 가장 가까운 거래일"""
+        if not self._in_range(day) or self._count[self._offset(day)] >= len(self._sessions):
+            day += timedelta(days=1)
+            while day.weekday() >= 5:
+                day += timedelta(days=1)
+            return day
+        return self._sessions[self._count[self._offset(day)]]
+
+    def sessions_between(self, start: date, end: date) -> int:
+        """
+        start 다음 날부터 end까지(포함) 거래일 수 (예상되는 새 일봉 개수)
+
+        Parameters:
+        - start: 이미 가지고 있는 마지막 봉 날짜
+        - end: 기준 날짜 (보통 last_completed_session())
+        """
+        if end <= start:
+            return 0
+        if self._in_range(start) and self._in_range(end):
+            return self._count[self._offset(end)] - self._count[self._offset(start)]
+        # 표 범위 밖은 평일 수로 계산
+        count, day = 0, start + timedelta(days=1)
+        while day <= end:
+            count += self.is_session(day)
+            day += timedelta(days=1)
+        return count
+
+    def is_open(self, now: Optional[datetime] = None) -> bool:
+        """KRX 정규장 시간(거래일 09:00~15:30 KST) 여부"""
+        now = now or now_kst()
+        return self.is_session(now.date()) and KRX_OPEN <= now.time() <= KRX_CLOSE
+
+    def last_completed_session(self, now: Optional[datetime] = None) -> date:
+        """가장 최근에 장이 마감된 거래일 (오늘 장 마감 전이면 직전 거래일)"""
+        now = now or now_kst()
+        day = now.date()
+        if not self.is_session(day) or now.time() <= KRX_CLOSE:
+            day -= timedelta(days=1)
+        return self.session_on_or_before(day)
+
+    def session_close(self, day: date, tz=None) -> datetime:
+        """거래일 day의 장 마감 시각 (KST)"""
+        from zoneinfo import ZoneInfo
+        return datetime.combine(day, KRX_CLOSE, tzinfo=tz or ZoneInfo("Asia/Seoul"))
+
+    def next_open(self, now: Optional[datetime] = None) -> datetime:
+        """다음 장 시작 시각 (장중이면 now), 이 시각 전에는 새 봉이 생기지 않음"""
+        now = now or now_kst()
+        if self.is_open(now):
+            return now
+        day = now.date()
+        if not (self.is_session(day) and now.time() < KRX_OPEN):
+            day = self.next_session(day)
+        return datetime.combine(day, KRX_OPEN, tzinfo=now.tzinfo)
+
+    def unchanged_since(self, timestamp: float, now: Optional[datetime] = None) -> bool:
+        """
+        timestamp(epoch 초)에 조회한 시세 데이터 이후로 새 데이터가 생길 수 없는지 여부
+
+        장이 닫혀 있고, 조회 시각이 가장 최근 거래일 장 마감(+ KRX_DATA_DELAY_SECONDS) 이후이면 True
+        (야간, 주말, 휴장일의 재조회 생략)
+        """
+        now = now or now_kst()
+        if self.is_open(now):
+            return False
+        close = self.session_close(self.last_completed_session(now), now.tzinfo)
+        return timestamp >= close.timestamp() + KRX_DATA_DELAY_SECONDS
+
+    def seconds_until_change(self, now: Optional[datetime] = None) -> float:
+        """다음에 새 데이터가 생길 수 있는 시각까지 남은 시간 (초, 장중이면 0)"""
+        now = now or now_kst()
+        return max(0.0, (self.next_open(now) - now).total_seconds())
+
+
+_calendar = None
+
+
+def get_trading_calendar() -> TradingCalendar:
+    """프로세스 단위로 공유되는 거래일 달력 반환 (표는 처음 사용할 때 한 번만 생성)"""
+    global _calendar
+    if _calendar is None:
+        _calendar = TradingCalendar()
+    return _calendar
+
+
+def is_trading_hours(now: Optional[datetime] = None) -> bool:
+    """KRX 정규장 시간 여부"""
+    return get_trading_calendar().is_open(now)
+
+
+def last_closed_session(now: Optional[datetime] = None) -> date:
+    """가장 최근에 장이 마감된 거래일"""
+    return get_trading_calendar().last_completed_session(now)
+
+
+def data_unchanged_since(timestamp: float, now: Optional[datetime] = None) -> bool:
+    """timestamp에 조회한 데이터 이후로 새 봉이 생길 수 없는지 여부"""
+    return get_trading_calendar().unchanged_since(timestamp, now)
+
+
+def expected_bars(start: date, end: Optional[date] = None) -> int:
+    """start 이후 end(기본값: 가장 최근 마감 거래일)까지 새로 생겼어야 하는 일봉 개수"""
+    calendar = get_trading_calendar()
+    return calendar.sessions_between(start, end or calendar.last_completed_session())
@@ -0,0 +1,210 @@
+'use client';
+
+import { useState } from 'react';
+import Link from 'next/link';
+import { ArrowLeftIcon, ChartBarIcon, ClockIcon, MagnifyingGlassIcon } from '@heroicons/react/24/outline';
+import { ReportHistoryPage, ReportTimeline } from '@/types';
+
+const API_BASE = 'http://localhost:5001';
+const PAGE_SIZE = 10;
+
+// 가격 시계열을 간단한 SVG 라인으로 표시
+function PriceSparkline({ values }: { values: (number | null)[] }) {
+  const points = values.filter((v): v is number => v !== null);
+  if (points.length < 2) {
+    return <p className="text-sm text-gray-500">차트를 그리기 위한 보고서가 부족합니다.</p>;
+  }
+
+  const width = 600;
+  const height = 160;
+  const min = Math.min(...points);
+  const max = Math.max(...points);
+  const range = max - min || 1;
+  const path = points
+    .map((v, i) => {
+      const x = (i / (points.length - 1)) * width;
+      const y = height - ((v - min) / range) * height;
+      return `${i === 0 ? 'M' : 'L'}${x.toFixed(1)},${y.toFixed(1)}`;
+    })
+    .join(' ');
+
+  return (
+    <svg viewBox={`0 0 ${width} ${height}`} className="w-full h-40">
+      <path d={path} fill="none" stroke="#7c3aed" strokeWidth={2} />
+    </svg>
+  );
+}
+
+export default function ReportTimelinePage() {
+  const [companyName, setCompanyName] = useState('');
+  const [startDate, setStartDate] = useState('');
+  const [endDate, setEndDate] = useState('');
+  const [timeline, setTimeline] = useState<ReportTimeline | null>(null);
+  const [history, setHistory] = useState<ReportHistoryPage | null>(null);
+  const [isLoading, setIsLoading] = useState(false);
+  const [error, setError] = useState('');
+
+  const buildQuery = (extra: { [key: string]: string }) => {
+    const params = new URLSearchParams(extra);
+    if (startDate) params.set('start', startDate);
+    if (endDate) params.set('end', endDate);
+    return params.toString();
+  };
+
+  const loadTimeline = async (page = 1) => {
+    const name = companyName.trim();
+    if (!name) {
+      setError('기업명을 입력해주세요.');
+      return;
+    }
+
+    setIsLoading(true);
+    setError('');
+
+    try {
+      const encoded = encodeURIComponent(name);
+      const [timelineResponse, historyResponse] = await Promise.all([
+        fetch(`${API_BASE}/api/reports/${encoded}/timeline?${buildQuery({ metrics: 'current_price,change_percent,volume' })}`),
+        fetch(`${API_BASE}/api/reports/${encoded}?${buildQuery({ page: String(page), page_size: String(PAGE_SIZE) })}`),
+      ]);
+
+      const timelineData = await timelineResponse.json();
+      const historyData = await historyResponse.json();
+
+      if (timelineResponse.ok && historyResponse.ok) {
+        setTimeline(timelineData);
+        setHistory(historyData);
+      } else {
+        setError(timelineData.error || historyData.error || '보고서 히스토리를 가져오지 못했습니다.');
+      }
+    } catch (error) {
+      console.error('보고서 히스토리 조회 중 오류:', error);
+      setError('서버와 통신 중 오류가 발생했습니다. 백엔드 서버(http://localhost:5001)가 실행 중인지 확인해주세요.');
+    } finally {
+      setIsLoading(false);
+    }
+  };
+
+  return (
+    <div className="min-h-screen bg-gradient-to-br from-purple-50 to-blue-50">
+      {/* 헤더 */}
+      <header className="bg-white shadow-sm border-b border-gray-200">
+        <div className="max-w-7xl mx-auto px-4 sm:px-6 lg:px-8">
+          <div className="flex justify-between items-center h-16">
+            <div className="flex items-center space-x-4">
+              <Link href="/" className="text-gray-500 hover:text-gray-700">
+                <ArrowLeftIcon className="h-6 w-6" />
+              </Link>
+              <h1 className="text-xl font-semibold text-gray-900">보고서 타임라인</h1>
+            </div>
+            <ChartBarIcon className="h-6 w-6 text-purple-600" />
+          </div>
+        </div>
+      </header>
+
+      <main className="max-w-4xl mx-auto px-4 sm:px-6 lg:px-8 py-8 space-y-6">
+        {/* 조회 조건 */}
+        <div className="bg-white rounded-lg shadow-md p-6 grid grid-cols-1 sm:grid-cols-4 gap-4">
+          <input
+            type="text"
+            placeholder="기업명 (예: 현대차)"
+            className="sm:col-span-2 px-3 py-2 border border-gray-300 placeholder:text-gray-300 text-black rounded-lg"
+            value={companyName}
+            onChange={(e) => setCompanyName(e.target.value)}
+            onKeyPress={(e) => {
+              if (e.key === 'Enter' && !isLoading) loadTimeline();
+            }}
+          />
+          <input
+            type="date"
+            className="px-3 py-2 border border-gray-300 text-black rounded-lg"
+            value={startDate}
+            onChange={(e) => setStartDate(e.target.value)}
+          />
+          <input
+            type="date"
+            className="px-3 py-2 border border-gray-300 text-black rounded-lg"
+            value={endDate}
+            onChange={(e) => setEndDate(e.target.value)}
+          />
+          <button
+            onClick={() => loadTimeline()}
+            disabled={isLoading}
+            className="sm:col-span-4 bg-purple-600 text-white py-2 rounded-lg hover:bg-purple-700 disabled:opacity-50 flex items-center justify-center space-x-2"
+          >
+            {isLoading ? <ClockIcon className="h-5 w-5 animate-spin" /> : <MagnifyingGlassIcon className="h-5 w-5" />}
+            <span>히스토리 조회</span>
+          </button>
+        </div>
+
+        {error && (
+          <div className="bg-red-50 border border-red-200 rounded-lg p-4">
+            <p className="text-red-800 text-sm">{error}</p>
+          </div>
+        )}
+
+        {/* 가격 추이 */}
+        {timeline && (
+          <div className="bg-white rounded-lg shadow-md p-6">
+            <h3 className="text-lg font-semibold text-gray-900 mb-4">
+              보고서 시점 주가 추이 ({timeline.total}건)
+            </h3>
+            <PriceSparkline values={timeline.series.current_price || []} />
+          </div>
+        )}
+
+        {/* 보고서 목록 */}
+        {history && (
+          <div className="bg-white rounded-lg shadow-md p-6">
+            <h3 className="text-lg font-semibold text-gray-900 mb-4">과거 보고서</h3>
+            {history.reports.length === 0 ? (
+              <p className="text-sm text-gray-500">조회된 보고서가 없습니다.</p>
+            ) : (
+              <ul className="divide-y divide-gray-200">
+                {history.reports.map((report) => (
+                  <li key={report.json_file} className="py-3 flex justify-between text-sm">
+                    <div>
+                      <p className="font-medium text-gray-900">{report.report_date}</p>
+                      <p className="text-gray-500">
+                        {report.analysis_period} · {report.technical_analysis.short_trend || 'N/A'}
+                      </p>
+                    </div>
+                    <div className="text-right">
+                      <p className="text-gray-900">{report.current_price?.toLocaleString('ko-KR')}원</p>
+                      <p className={(report.change_percent || 0) >= 0 ? 'text-red-600' : 'text-blue-600'}>
+                        {report.change_percent?.toFixed(2)}%
+                      </p>
+                    </div>
+                  </li>
+                ))}
+              </ul>
+            )}
+
+            {/* 페이지네이션 */}
+            {history.total_pages > 1 && (
+              <div className="flex justify-center items-center space-x-4 mt-4 text-sm">
+                <button
+                  disabled={history.page <= 1 || isLoading}
+                  onClick={() => loadTimeline(history.page - 1)}
+                  className="text-purple-600 disabled:text-gray-300"
+                >
+                  이전
+                </button>
+                <span className="text-gray-600">
+                  {history.page} / {history.total_pages}
+                </span>
+                <button
+                  disabled={history.page >= history.total_pages || isLoading}
+                  onClick={() => loadTimeline(history.page + 1)}
+                  className="text-purple-600 disabled:text-gray-300"
+                >
+                  다음
+                </button>
+              </div>
+            )}
+          </div>
+        )}
+      </main>
+    </div>
+  );
+}
@@ -111,4 +111,38 @@ export interface ReportResult {
   pdf_file?: string
   summary?: ReportSummary
   timestamp: string
-} 
\ No newline at end of file
+} 
+// 보고서 히스토리/타임라인 타입
+export interface ReportHistoryItem {
+  report_date: string
+  json_file: string
+  pdf_file: string | null
+  symbol: string | null
+  analysis_period: string | null
+  news_count: number
+  current_price: number | null
+  change: number | null
+  change_percent: number | null
+  volume: number | null
+  technical_analysis: { [key: string]: string }
+  market_sentiment: { [key: string]: string }
+}
+
+export interface ReportHistoryPage {
+  company_name: string
+  reports: ReportHistoryItem[]
+  page: number
+  page_size: number
+  total: number
+  total_pages: number
+}
+
+export interface ReportTimeline {
+  company_name: string
+  dates: string[]
+  series: { [metric: string]: (number | null)[] }
+  page: number
+  page_size: number
+  total: number
+  total_pages: number
+}
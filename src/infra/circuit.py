@@ -0,0 +1,222 @@
+# 외부 의존성별 회로 차단기 모듈
+# 최근 호출의 오류율/지연 호출 비율이 기준을 넘으면 회로를 열어 일정 시간 동안 호출 없이 바로 실패시키고(CircuitOpenError),
+# 시간이 지나면 시험 호출(half-open) 몇 건만 보내 회복 여부를 확인한 뒤 닫음
+#
+# 공급자 장애 시 보고서 요청마다 타임아웃까지 기다리며 워커 스레드를 점유하지 않도록 하기 위한 것으로,
+# 호출하는 쪽은 CircuitOpenError를 받으면 마지막으로 캐시된 데이터를 stale로 표시하여 사용
+#
+# 사용 예:
+#     with circuit('newsapi') as c:
+#         response = session.get(url, timeout=HTTP_TIMEOUT_SECONDS)
+#         if response.status_code != 200:
+#             c.fail()
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+CIRCUIT_ENABLED = os.getenv("CIRCUIT_ENABLED", "1") != "0"
+
+# 판단에 쓰는 최근 호출 수와 최소 호출 수
+CIRCUIT_WINDOW = int(os.getenv("CIRCUIT_WINDOW", "20"))
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", "5"))
+# 회로를 여는 오류율 / 지연 호출 비율
+CIRCUIT_FAILURE_RATE = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+CIRCUIT_SLOW_CALL_RATE = float(os.getenv("CIRCUIT_SLOW_CALL_RATE", "0.8"))
+# 열린 회로를 유지하는 시간 (초, 지나면 half-open)
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+# half-open 상태에서 동시에 보낼 시험 호출 수 (모두 성공하면 닫음)
+CIRCUIT_HALF_OPEN_CALLS = int(os.getenv("CIRCUIT_HALF_OPEN_CALLS", "2"))
+
+# 의존성별 지연 호출 기준 (초, 예: "yfinance=5,newsapi=5,openai=60")
+CIRCUIT_SLOW_CALL_SECONDS = os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "")
+DEFAULT_SLOW_CALL_SECONDS = {
+    'yfinance': 5.0,
+    'yfinance_info': 15.0,
+    'newsapi': 5.0,
+    'openai': 90.0,
+    'kis': 3.0,
+    'alpha_vantage': 5.0,
+}
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+def _parse_thresholds(spec: str) -> Dict[str, float]:
+    thresholds = dict(DEFAULT_SLOW_CALL_SECONDS)
+    for item in spec.split(','):
+        if '=' in item:
+            name, value = item.split('=', 1)
+            try:
+                thresholds[name.strip()] = float(value)
+            except ValueError:
+                print(f"CIRCUIT_SLOW_CALL_SECONDS 값 무시: {item}")
+    return thresholds
+
+
+_slow_thresholds = _parse_thresholds(CIRCUIT_SLOW_CALL_SECONDS)
+
+
+def slow_call_seconds(name: str) -> float:
+    """의존성의 지연 호출 기준 (초, 클라이언트 timeout 기본값으로도 사용)"""
+    return _slow_thresholds.get(name, 10.0)
+
+
+class CircuitOpenError(Exception):
+    """회로가 열려 있어 호출하지 않음"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} 회로가 열려 있습니다 ({retry_after:.0f}초 후 재시도)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """의존성 하나의 회로 차단기 (최근 CIRCUIT_WINDOW개 호출 기준)"""
+
+    def __init__(self, name: str, slow_call_seconds: Optional[float] = None):
+        self.name = name
+        self.slow_call_seconds = slow_call_seconds if slow_call_seconds is not None \
+            else _slow_thresholds.get(name, 10.0)
+        self.state = STATE_CLOSED
+        # (실패 여부, 지연 여부)
+        self._calls: deque = deque(maxlen=CIRCUIT_WINDOW)
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+        self.counts = {'opened': 0, 'rejected': 0}
+
+    def _open(self, now: float):
+        self.state = STATE_OPEN
+        self._opened_at = now
+        self._probes = 0
+        self._probe_successes = 0
+        self.counts['opened'] += 1
+        print(f"⚡ {self.name} 회로 열림 ({CIRCUIT_OPEN_SECONDS:.0f}초 동안 호출 차단)")
+
+    def acquire(self):
+        """
+        호출 허가 (닫힘: 항상, 열림: 차단, half-open: 시험 호출 수 이내만)
+
+        Raises:
+        - CircuitOpenError: 호출하지 않고 바로 실패해야 하는 경우
+        """
+        with self._lock:
+            now = time.monotonic()
+            if self.state == STATE_OPEN:
+                remaining = self._opened_at + CIRCUIT_OPEN_SECONDS - now
+                if remaining > 0:
+                    self.counts['rejected'] += 1
+                    raise CircuitOpenError(self.name, remaining)
+                self.state = STATE_HALF_OPEN
+                self._probes = 0
+                self._probe_successes = 0
+            if self.state == STATE_HALF_OPEN:
+                if self._probes >= CIRCUIT_HALF_OPEN_CALLS:
+                    self.counts['rejected'] += 1
+                    raise CircuitOpenError(self.name, 1.0)
+                self._probes += 1
+
+    def record(self, duration: float, failed: bool):
+        """호출 결과 기록 (acquire() 이후 반드시 호출)"""
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            now = time.monotonic()
+            if self.state == STATE_HALF_OPEN:
+                if failed or slow:
+                    self._open(now)
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= CIRCUIT_HALF_OPEN_CALLS:
+                    self.state = STATE_CLOSED
+                    self._calls.clear()
+                    print(f"✅ {self.name} 회로 닫힘 (시험 호출 성공)")
+                return
+            if self.state == STATE_OPEN:
+                # 회로가 열리기 전에 시작한 호출의 결과
+                return
+            self._calls.append((failed, slow))
+            if len(self._calls) >= CIRCUIT_MIN_CALLS:
+                failures = sum(1 for f, _ in self._calls if f)
+                slow_calls = sum(1 for _, s in self._calls if s)
+                if failures / len(self._calls) >= CIRCUIT_FAILURE_RATE \
+                        or slow_calls / len(self._calls) >= CIRCUIT_SLOW_CALL_RATE:
+                    self._open(now)
+
+    def is_open(self) -> bool:
+        """지금 호출하면 바로 실패하는지 여부 (상태는 바꾸지 않음)"""
+        with self._lock:
+            return self.state == STATE_OPEN and time.monotonic() < self._opened_at + CIRCUIT_OPEN_SECONDS
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = list(self._calls)
+            return {
+                'state': self.state,
+                'calls': len(calls),
+                'failure_rate': sum(1 for f, _ in calls if f) / len(calls) if calls else 0.0,
+                'slow_rate': sum(1 for _, s in calls if s) / len(calls) if calls else 0.0,
+                'slow_call_seconds': self.slow_call_seconds,
+                'opened': self.counts['opened'],
+                'rejected': self.counts['rejected'],
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """의존성 이름별로 프로세스에서 공유되는 회로 차단기"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+def circuit_states() -> Dict[str, Dict[str, Any]]:
+    """의존성별 회로 상태 사본"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.snapshot() for breaker in sorted(breakers, key=lambda b: b.name)}
+
+
+def reset():
+    """모든 회로 초기화"""
+    with _breakers_lock:
+        _breakers.clear()
+
+
+class circuit:
+    """
+    회로 차단기 구간 컨텍스트 매니저
+
+    진입 시 회로가 열려 있으면 CircuitOpenError를 발생시키고, 예외나 c.fail()은 실패로, 소요 시간은 지연 여부로 기록
+    """
+    __slots__ = ('breaker', 'started', 'failed')
+
+    def __init__(self, name: str):
+        self.breaker = get_breaker(name) if CIRCUIT_ENABLED else None
+        self.failed = False
+
+    def fail(self):
+        self.failed = True
+
+    def __enter__(self):
+        if self.breaker is not None:
+            self.breaker.acquire()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.breaker is not None:
+            self.breaker.record(time.perf_counter() - self.started, self.failed or exc_type is not None)
+        return False
@@ -0,0 +1,327 @@
+# 파이프라인 단계별 계측 모듈
+# span(단계 이름) 구간의 소요 시간을 히스토그램으로 집계하고 호출 수/오류 수를 기록하여
+# /api/metrics 엔드포인트에서 Prometheus 텍스트 포맷으로 노출
+#
+# 단계 하나당 perf_counter 두 번과 잠금 한 번만 사용하므로 초 단위의 외부 호출/렌더링에 비해
+# 오버헤드는 무시할 수 있는 수준 (METRICS_ENABLED=0이면 계측 자체를 생략)
+#
+# gunicorn pre-fork 워커는 통계를 따로 가지므로, METRICS_MULTIPROC_DIR이 설정되면 (gunicorn.conf.py)
+# 워커마다 METRICS_FLUSH_SECONDS 간격으로 자기 통계를 파일로 쓰고 /api/metrics는 모든 워커의 파일을 합쳐 노출
+# (어느 워커가 scrape를 받아도 같은 서버 전체 값, 종료된 워커의 누적값은 dead.json에 합쳐 보존)
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, Any, Callable, Optional
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+# 히스토그램 버킷 상한 (초)
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+METRIC_PREFIX = "report_pipeline"
+
+# 워커 간 집계용 디렉토리 (비우면 프로세스 단위로만 집계)
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+# 자기 통계를 집계 디렉토리에 쓰는 간격 (초, 다른 워커가 노출하는 값은 이만큼 늦을 수 있음)
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+_DEAD_FILE = "dead.json"
+
+
+class _StageStats:
+    """단계별 누적 통계 (버킷은 누적이 아닌 구간별 개수로 저장)"""
+    __slots__ = ('count', 'errors', 'total', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(DURATION_BUCKETS) + 1)
+
+
+_stats: Dict[str, _StageStats] = {}
+_stats_lock = threading.Lock()
+
+# 게이지 이름 -> (설명, 현재 값을 읽는 함수), 노출 시점에 값을 읽음
+_gauges: Dict[str, Any] = {}
+
+# 주기적 기록 스레드를 시작한 프로세스 (fork 이후 자식에서는 다시 시작)
+_flusher_pid: Optional[int] = None
+
+
+def record(stage: str, duration: float, error: bool = False):
+    """단계 소요 시간(초)과 성공/실패 기록"""
+    index = bisect_left(DURATION_BUCKETS, duration)
+    with _stats_lock:
+        stats = _stats.get(stage)
+        if stats is None:
+            stats = _stats[stage] = _StageStats()
+            if METRICS_MULTIPROC_DIR and _flusher_pid != os.getpid():
+                _start_flusher()
+        stats.count += 1
+        stats.total += duration
+        stats.buckets[index] += 1
+        if error:
+            stats.errors += 1
+
+
+class span:
+    """
+    단계 구간 계측 컨텍스트 매니저
+
+    예외가 발생하면 오류로 기록하고, 오류를 딕셔너리로 반환하는 함수는
+    s.fail()을 호출하여 오류로 표시할 수 있음
+
+    사용 예:
+        with span('newsapi') as s:
+            response = ...
+            if response.status_code != 200:
+                s.fail()
+    """
+    __slots__ = ('stage', 'started', 'failed')
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.failed = False
+
+    def fail(self):
+        self.failed = True
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if METRICS_ENABLED:
+            record(self.stage, time.perf_counter() - self.started,
+                   self.failed or exc_type is not None)
+        return False
+
+
+def timed(stage: str, is_error: Optional[Callable[[Any], bool]] = None):
+    """
+    함수 전체를 하나의 단계로 계측하는 데코레이터
+
+    Parameters:
+    - stage: 단계 이름
+    - is_error: 반환값으로 실패 여부를 판단하는 함수 (예: {"error": ...} 딕셔너리 반환)
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not METRICS_ENABLED:
+                return func(*args, **kwargs)
+            with span(stage) as s:
+                result = func(*args, **kwargs)
+                if is_error is not None and is_error(result):
+                    s.fail()
+                return result
+        return wrapper
+    return decorator
+
+
+def register_gauge(name: str, help_text: str, read: Callable[[], float]):
+    """
+    /api/metrics에 노출할 게이지 등록 (같은 이름이면 교체)
+
+    Parameters:
+    - name: 지표 이름 (METRIC_PREFIX가 앞에 붙음)
+    - read: 현재 값을 반환하는 함수 (노출할 때마다 호출)
+    """
+    with _stats_lock:
+        _gauges[name] = (help_text, read)
+        if METRICS_MULTIPROC_DIR and _flusher_pid != os.getpid():
+            _start_flusher()
+
+
+def has_error(result) -> bool:
+    """{"error": ...} 형태의 실패 반환값 여부"""
+    return isinstance(result, dict) and 'error' in result
+
+
+def _local_stages() -> Dict[str, list]:
+    """이 프로세스의 단계별 [count, errors, total, buckets]"""
+    with _stats_lock:
+        return {stage: [stats.count, stats.errors, stats.total, list(stats.buckets)]
+                for stage, stats in _stats.items()}
+
+
+def _summarize(stages: Dict[str, list]) -> Dict[str, Dict[str, Any]]:
+    result = {}
+    for stage, (count, errors, total, buckets) in sorted(stages.items()):
+        result[stage] = {
+            'count': count,
+            'errors': errors,
+            'error_rate': errors / count if count else 0.0,
+            'sum_seconds': total,
+            'avg_seconds': total / count if count else 0.0,
+            'buckets': buckets,
+        }
+    return result
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    """이 프로세스의 단계별 통계 사본 (count, errors, error_rate, avg_seconds, buckets)"""
+    return _summarize(_local_stages())
+
+
+def reset():
+    """누적 통계와 등록된 게이지 초기화 (게이지를 다시 노출하려면 register_gauge를 다시 호출)"""
+    with _stats_lock:
+        _stats.clear()
+        _gauges.clear()
+
+
+# ----------------------------------------------------------------------
+# 워커 간 집계 (METRICS_MULTIPROC_DIR)
+# ----------------------------------------------------------------------
+
+def _read_gauges() -> Dict[str, list]:
+    """등록된 게이지의 현재 값 {이름: [설명, 값]}"""
+    with _stats_lock:
+        gauges = sorted(_gauges.items())
+    values = {}
+    for gauge, (help_text, read) in gauges:
+        try:
+            values[gauge] = [help_text, float(read())]
+        except Exception as e:
+            print(f"게이지 값 읽기 실패 ({gauge}): {e}")
+    return values
+
+
+def _write_json(path: str, data: Dict[str, Any]):
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(temporary, path)
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _merge_stages(target: Dict[str, list], stages: Dict[str, list]):
+    for stage, (count, errors, total, buckets) in stages.items():
+        merged = target.setdefault(stage, [0, 0, 0.0, [0] * (len(DURATION_BUCKETS) + 1)])
+        merged[0] += count
+        merged[1] += errors
+        merged[2] += total
+        merged[3] = [a + b for a, b in zip(merged[3], buckets)]
+
+
+def flush():
+    """이 워커의 통계를 집계 디렉토리에 기록 (METRICS_MULTIPROC_DIR이 없으면 아무 것도 하지 않음)"""
+    if not METRICS_MULTIPROC_DIR:
+        return
+    try:
+        os.makedirs(METRICS_MULTIPROC_DIR, exist_ok=True)
+        _write_json(os.path.join(METRICS_MULTIPROC_DIR, f"{os.getpid()}.json"),
+                    {'stages': _local_stages(), 'gauges': _read_gauges()})
+    except OSError as e:
+        print(f"지표 파일 기록 실패: {e}")
+
+
+def _flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_SECONDS)
+        flush()
+
+
+def _start_flusher():
+    """주기적 기록 스레드 시작 (_stats_lock 안에서 호출)"""
+    global _flusher_pid
+    _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_loop, name='metrics-flush', daemon=True).start()
+
+
+def mark_process_dead(pid: int):
+    """
+    종료된 워커의 누적 통계를 dead.json에 합치고 워커 파일 삭제 (gunicorn 마스터의 child_exit에서 호출)
+
+    게이지는 현재 값이므로 버림
+    """
+    if not METRICS_MULTIPROC_DIR:
+        return
+    path = os.path.join(METRICS_MULTIPROC_DIR, f"{pid}.json")
+    data = _read_json(path)
+    if data is None:
+        return
+    dead_path = os.path.join(METRICS_MULTIPROC_DIR, _DEAD_FILE)
+    dead = (_read_json(dead_path) or {}).get('stages', {})
+    _merge_stages(dead, data.get('stages', {}))
+    _write_json(dead_path, {'stages': dead})
+    os.remove(path)
+
+
+def _collect():
+    """노출할 (단계별 통계, 게이지 {이름: [설명, 값]}), 집계 디렉토리가 있으면 모든 워커 합계"""
+    stages = _local_stages()
+    gauges = _read_gauges()
+    if not METRICS_MULTIPROC_DIR or not os.path.isdir(METRICS_MULTIPROC_DIR):
+        return stages, gauges
+
+    own = f"{os.getpid()}.json"
+    for name in os.listdir(METRICS_MULTIPROC_DIR):
+        if not name.endswith('.json') or name == own:
+            continue
+        data = _read_json(os.path.join(METRICS_MULTIPROC_DIR, name))
+        if data is None:
+            continue
+        _merge_stages(stages, data.get('stages', {}))
+        for gauge, (help_text, value) in data.get('gauges', {}).items():
+            gauges.setdefault(gauge, [help_text, 0.0])[1] += value
+    return stages, gauges
+
+
+def _format_le(bound: float) -> str:
+    return f"{bound:g}"
+
+
+def render_prometheus() -> str:
+    """누적 통계를 Prometheus 텍스트 노출 포맷(0.0.4)으로 변환 (집계 디렉토리가 있으면 모든 워커 합계)"""
+    collected_stages, gauges = _collect()
+    stages = _summarize(collected_stages)
+    name = f"{METRIC_PREFIX}_stage_duration_seconds"
+    lines = [
+        f"# HELP {name} Pipeline stage latency in seconds.",
+        f"# TYPE {name} histogram",
+    ]
+    for stage, stats in stages.items():
+        cumulative = 0
+        for bound, count in zip(DURATION_BUCKETS, stats['buckets']):
+            cumulative += count
+            lines.append(f'{name}_bucket{{stage="{stage}",le="{_format_le(bound)}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {stats["count"]}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {stats["sum_seconds"]:.6f}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {stats["count"]}')
+
+    for metric, key, help_text in (
+        ('stage_calls_total', 'count', 'Pipeline stage invocations.'),
+        ('stage_errors_total', 'errors', 'Pipeline stage failures.'),
+    ):
+        full_name = f"{METRIC_PREFIX}_{metric}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} counter")
+        for stage, stats in stages.items():
+            lines.append(f'{full_name}{{stage="{stage}"}} {stats[key]}')
+
+    error_rate = f"{METRIC_PREFIX}_stage_error_ratio"
+    lines.append(f"# HELP {error_rate} Fraction of failed invocations per stage.")
+    lines.append(f"# TYPE {error_rate} gauge")
+    for stage, stats in stages.items():
+        lines.append(f'{error_rate}{{stage="{stage}"}} {stats["error_rate"]:.6f}')
+
+    for gauge, (help_text, value) in sorted(gauges.items()):
+        full_name = f"{METRIC_PREFIX}_{gauge}"
+        lines.append(f"# HELP {full_name} {help_text}")
+        lines.append(f"# TYPE {full_name} gauge")
+        lines.append(f"{full_name} {value:g}")
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,362 @@
+# 외부 데이터 제공자 기록/재생 모듈
+# yfinance(Ticker.history/.info), NewsAPI(HTTP GET), OpenAI(chat.completions.create) 응답을
+# 로컬 카세트 파일에 기록하고, 재생 모드에서는 네트워크 없이 기록된 응답을 돌려줌
+#
+# 모드 (PROVIDER_MODE 환경 변수):
+# - off    : 실제 제공자 호출 (기본값)
+# - record : 실제 제공자를 호출하고 응답을 카세트에 기록
+# - replay : 카세트의 응답만 사용 (기록이 없으면 ReplayMissError), 설정한 지연 시간을 모사
+#
+# 카세트는 제공자별 gzip JSON Lines 파일 (cassettes/yfinance.jsonl.gz 등)
+#
+# NewsAPI 조회 기간(from/to)과 기사 선택은 현재 날짜에 따라 달라지므로, 처음 기록한 시각을 cassettes/clock.json에
+# 저장하고 record/replay 모드의 provider_now()는 그 시각을 반환 (다른 날 재생해도 요청 키와 프롬프트가 같음)
+
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+import types
+from datetime import datetime
+from typing import Dict, Any, Optional
+from urllib.parse import urlparse, parse_qsl, urlencode
+
+MODE_OFF = 'off'
+MODE_RECORD = 'record'
+MODE_REPLAY = 'replay'
+
+PROVIDER_MODE = os.getenv("PROVIDER_MODE", MODE_OFF).lower()
+CASSETTE_DIR = os.getenv("CASSETTE_DIR", "cassettes")
+
+# 재생 시 모사할 제공자별 지연 시간 (예: "yfinance=150,newsapi=300,openai=8000", 단위 ms)
+REPLAY_LATENCY_MS = os.getenv("REPLAY_LATENCY_MS", "")
+# 지연 시간 변동 폭 (0.2 = ±20%)
+REPLAY_LATENCY_JITTER = float(os.getenv("REPLAY_LATENCY_JITTER", "0"))
+
+# 카세트에 기록하지 않는 쿼리 파라미터 (비밀 값)
+_SECRET_PARAMS = {'apikey', 'api_key', 'token'}
+
+
+class ReplayMissError(Exception):
+    """재생 모드에서 기록되지 않은 요청"""
+
+
+def _parse_latencies(spec: str) -> Dict[str, float]:
+    latencies = {}
+    for item in spec.split(','):
+        if '=' in item:
+            name, value = item.split('=', 1)
+            try:
+                latencies[name.strip()] = float(value) / 1000
+            except ValueError:
+                print(f"REPLAY_LATENCY_MS 값 무시: {item}")
+    return latencies
+
+
+_latencies = _parse_latencies(REPLAY_LATENCY_MS)
+
+
+def get_mode() -> str:
+    return PROVIDER_MODE
+
+
+def set_mode(mode: str, cassette_dir: Optional[str] = None, latencies_ms: Optional[Dict[str, float]] = None):
+    """
+    실행 중 모드 변경 (테스트/부하 테스트 스크립트용)
+
+    Parameters:
+    - mode: 'off' | 'record' | 'replay'
+    - cassette_dir: 카세트 디렉토리
+    - latencies_ms: 제공자별 재생 지연 시간 {"openai": 8000, ...}
+    """
+    global PROVIDER_MODE, CASSETTE_DIR, _latencies, _clock
+    if mode not in (MODE_OFF, MODE_RECORD, MODE_REPLAY):
+        raise ValueError(f"지원하지 않는 모드입니다: {mode}")
+    PROVIDER_MODE = mode
+    if cassette_dir:
+        CASSETTE_DIR = cassette_dir
+    if latencies_ms is not None:
+        _latencies = {name: value / 1000 for name, value in latencies_ms.items()}
+    with _stores_lock:
+        _stores.clear()
+        _clock = None
+
+
+class CassetteStore:
+    """제공자 하나의 카세트 (요청 키 -> 응답), 기록은 파일 끝에 추가"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Any]] = None
+
+    def _load(self):
+        entries = {}
+        if os.path.exists(self.path):
+            # 추가 기록마다 gzip 멤버가 이어 붙으므로 gzip.open으로 한 번에 읽을 수 있음
+            with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        entries[entry['key']] = entry['response']
+        self._entries = entries
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            if self._entries is None:
+                self._load()
+            if key not in self._entries:
+                raise ReplayMissError(f"카세트에 기록되지 않은 요청입니다 ({os.path.basename(self.path)}: {key})")
+            return self._entries[key]
+
+    def put(self, key: str, response: Any):
+        with self._lock:
+            if self._entries is None:
+                self._load()
+            self._entries[key] = response
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            line = json.dumps({'key': key, 'response': response}, ensure_ascii=False, separators=(',', ':'))
+            with gzip.open(self.path, 'at', encoding='utf-8') as f:
+                f.write(line + '\n')
+
+
+_stores: Dict[str, CassetteStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(provider: str) -> CassetteStore:
+    with _stores_lock:
+        store = _stores.get(provider)
+        if store is None:
+            store = _stores[provider] = CassetteStore(os.path.join(CASSETTE_DIR, f"{provider}.jsonl.gz"))
+        return store
+
+
+_clock: Optional[datetime] = None
+
+
+def provider_now() -> datetime:
+    """
+    조회 기간 계산에 쓰는 현재 시각
+
+    off 모드에서는 datetime.now(), record/replay 모드에서는 카세트에 고정된 기록 시각
+    (카세트에 시각이 없으면 record 모드는 지금 시각을 저장, replay 모드는 ReplayMissError)
+    """
+    global _clock
+    if PROVIDER_MODE == MODE_OFF:
+        return datetime.now()
+    with _stores_lock:
+        if _clock is None:
+            path = os.path.join(CASSETTE_DIR, 'clock.json')
+            if os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    _clock = datetime.fromisoformat(json.load(f)['now'])
+            elif PROVIDER_MODE == MODE_RECORD:
+                _clock = datetime.now().replace(microsecond=0)
+                os.makedirs(CASSETTE_DIR, exist_ok=True)
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump({'now': _clock.isoformat()}, f)
+            else:
+                raise ReplayMissError(f"카세트에 기록 시각이 없습니다 ({path})")
+        return _clock
+
+
+def _simulate_latency(provider: str):
+    latency = _latencies.get(provider, 0)
+    if latency > 0:
+        if REPLAY_LATENCY_JITTER > 0:
+            latency *= 1 + random.uniform(-REPLAY_LATENCY_JITTER, REPLAY_LATENCY_JITTER)
+        time.sleep(latency)
+
+
+def _digest(value: Any) -> str:
+    text = json.dumps(value, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:24]
+
+
+def _call(provider: str, key: str, fetch, encode=lambda v: v, decode=lambda v: v):
+    """모드에 따라 실제 호출/기록/재생 수행"""
+    if PROVIDER_MODE == MODE_REPLAY:
+        _simulate_latency(provider)
+        return decode(get_store(provider).get(key))
+    result = fetch()
+    if PROVIDER_MODE == MODE_RECORD:
+        get_store(provider).put(key, encode(result))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# yfinance
+# ---------------------------------------------------------------------------
+
+def _encode_history(hist) -> Dict[str, Any]:
+    """history DataFrame -> 컬럼형 딕셔너리 (날짜 오름차순, 타임존 포함 ISO 문자열)"""
+    return {
+        'index': [ts.isoformat() for ts in hist.index],
+        'columns': {name: hist[name].tolist() for name in hist.columns},
+    }
+
+
+def _decode_history(data: Dict[str, Any]):
+    import pandas as pd
+
+    index = pd.DatetimeIndex(pd.to_datetime(data['index']), name='Date')
+    return pd.DataFrame(data['columns'], index=index)
+
+
+class ProviderTicker:
+    """yfinance.Ticker 대체 객체 (history / info만 지원)"""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self._ticker = None
+
+    def _real(self):
+        if self._ticker is None:
+            import yfinance as yf
+            self._ticker = yf.Ticker(self.symbol)
+        return self._ticker
+
+    def history(self, period: str = "1mo", **kwargs):
+        key = f"history|{self.symbol}|{period}|{_digest(kwargs) if kwargs else ''}"
+        return _call('yfinance', key, lambda: self._real().history(period=period, **kwargs),
+                     _encode_history, _decode_history)
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        key = f"info|{self.symbol}"
+        return _call('yfinance', key, lambda: self._real().info,
+                     lambda info: json.loads(json.dumps(info, default=str)))
+
+
+def open_ticker(symbol: str):
+    """
+    종목 조회 객체 반환 (yf.Ticker 대신 사용)
+
+    off 모드에서는 yfinance.Ticker를 그대로 반환하고,
+    record/replay 모드에서는 history/info 응답을 카세트로 기록/재생하는 객체를 반환
+    """
+    if PROVIDER_MODE == MODE_OFF:
+        import yfinance as yf
+        return yf.Ticker(symbol)
+    return ProviderTicker(symbol)
+
+
+# ---------------------------------------------------------------------------
+# HTTP (NewsAPI 등)
+# ---------------------------------------------------------------------------
+
+def _request_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """비밀 파라미터를 제외하고 정렬한 요청 키"""
+    parsed = urlparse(url)
+    query = parse_qsl(parsed.query, keep_blank_values=True)
+    if params:
+        query.extend((k, str(v)) for k, v in params.items())
+    query = sorted((k, v) for k, v in query if k.lower() not in _SECRET_PARAMS)
+    return f"{parsed.netloc}{parsed.path}?{urlencode(query)}"
+
+
+class _RecordedResponse:
+    """requests.Response 중 파이프라인이 사용하는 부분만 구현"""
+
+    def __init__(self, status_code: int, body: Any):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+    @property
+    def text(self):
+        return json.dumps(self._body, ensure_ascii=False)
+
+    def __repr__(self):
+        return f"<Response [{self.status_code}]>"
+
+
+class ProviderSession:
+    """requests.Session 래퍼: GET 응답(JSON)을 기록/재생"""
+
+    def __init__(self, session, provider: str = 'http'):
+        self._session = session
+        self.provider = provider
+
+    def get(self, url, params=None, **kwargs):
+        key = _request_key(url, params)
+        provider = 'newsapi' if 'newsapi.org' in url else self.provider
+
+        def fetch():
+            response = self._session.get(url, params=params, **kwargs)
+            try:
+                body = response.json()
+            except ValueError:
+                body = None
+            return _RecordedResponse(response.status_code, body)
+
+        return _call(provider, key, fetch,
+                     lambda r: {'status_code': r.status_code, 'body': r._body},
+                     lambda d: _RecordedResponse(d['status_code'], d['body']))
+
+    def close(self):
+        self._session.close()
+
+
+def wrap_session(session):
+    """record/replay 모드이면 세션을 기록/재생 래퍼로 감쌈"""
+    if PROVIDER_MODE == MODE_OFF:
+        return session
+    return ProviderSession(session)
+
+
+# ---------------------------------------------------------------------------
+# OpenAI
+# ---------------------------------------------------------------------------
+
+class _ProviderCompletions:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, **kwargs):
+        key = _digest({k: kwargs.get(k) for k in sorted(kwargs)})
+
+        def fetch():
+            return self._client().chat.completions.create(**kwargs)
+
+        def encode(response):
+            return {'choices': [{'message': {'content': choice.message.content}} for choice in response.choices]}
+
+        def decode(data):
+            choices = [types.SimpleNamespace(message=types.SimpleNamespace(**choice['message']))
+                       for choice in data['choices']]
+            return types.SimpleNamespace(choices=choices)
+
+        return _call('openai', key, fetch, encode, decode)
+
+
+class ProviderOpenAI:
+    """OpenAI 클라이언트 래퍼: chat.completions.create 응답을 기록/재생 (재생 모드에서는 실제 클라이언트를 만들지 않음)"""
+
+    def __init__(self, client_factory):
+        self.chat = types.SimpleNamespace(completions=_ProviderCompletions(client_factory))
+
+
+def wrap_openai_client(client_factory):
+    """
+    OpenAI 클라이언트 반환
+
+    Parameters:
+    - client_factory: 실제 클라이언트를 만드는 함수 (off/record 모드에서만 호출)
+    """
+    if PROVIDER_MODE == MODE_OFF:
+        return client_factory()
+    real = {}
+
+    def lazy_client():
+        if 'client' not in real:
+            real['client'] = client_factory()
+        return real['client']
+
+    return ProviderOpenAI(lazy_client)
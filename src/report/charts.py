@@ -0,0 +1,341 @@
+# 투자 전망 보고서 차트 렌더링 모듈
+# 주가/비교/상관계수/인터랙티브 차트를 이미 받아 둔 데이터로만 그리는 함수 모음
+#
+# matplotlib은 스레드 안전하지 않으므로 차트는 별도 워커 프로세스 풀에서 병렬로 렌더링하고,
+# 그동안 호출 측은 GPT 호출 등 다른 작업을 진행 (CHART_WORKERS=0이면 호출 스레드에서 바로 렌더링)
+# 렌더 함수는 프로세스 간에 전달되므로 인자로 리스트/ndarray/딕셔너리만 받음
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+# 차트 렌더링 워커 프로세스 수 (0이면 호출 스레드에서 렌더링)
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", str(min(4, os.cpu_count() or 1))))
+# 워커 프로세스 시작 방식 (스레드가 많은 서버 프로세스에서 fork하지 않도록 기본값 spawn)
+CHART_MP_START = os.getenv("CHART_MP_START", "spawn")
+# PNG 해상도 (PDF에 6인치 폭으로 들어가므로 200dpi면 충분)
+CHART_DPI = int(os.getenv("CHART_DPI", "200"))
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), '..', 'reports')
+
+_style_ready = False
+
+# 프로세스 안에서 pyplot을 쓰는 코드(직접 렌더링, PDF 주가 차트, warm-up)가 함께 잡는 잠금
+# (gthread 워커의 여러 요청 스레드가 pyplot 전역 상태를 동시에 건드리지 않도록)
+PYPLOT_LOCK = threading.RLock()
+
+
+def setup_chart_style():
+    """matplotlib 백엔드/폰트/seaborn 스타일 설정 (프로세스당 한 번)"""
+    global _style_ready
+    if _style_ready:
+        return
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    # matplotlib 한글 폰트 설정
+    plt.rcParams['font.family'] = 'DejaVu Sans'
+    plt.rcParams['axes.unicode_minus'] = False
+
+    # seaborn 스타일 설정
+    sns.set_style("whitegrid")
+    sns.set_palette("husl")
+    _style_ready = True
+
+
+def _chart_path(output_dir: Optional[str], prefix: str, extension: str = 'png') -> str:
+    output_dir = output_dir or DEFAULT_OUTPUT_DIR
+    os.makedirs(output_dir, exist_ok=True)
+    return os.path.join(output_dir, f'{prefix}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{extension}')
+
+
+def _ascending(columns: Dict[str, Any]):
+    """컬럼형 히스토리(최신 우선)를 날짜 오름차순 배열로 변환"""
+    import numpy as np
+    import pandas as pd
+
+    dates = pd.to_datetime(columns['date'][::-1])
+    values = {name: np.asarray(columns[name][::-1], dtype=np.float64)
+              for name in ('open', 'high', 'low', 'close', 'volume')}
+    return dates, values
+
+
+def render_price_chart(title: str, symbol: str, columns: Dict[str, Any], output_dir: str = None) -> Optional[str]:
+    """주가/거래량 차트 PNG 저장 후 경로 반환"""
+    setup_chart_style()
+    import matplotlib.pyplot as plt
+
+    fig = None
+    try:
+        if not columns or columns.get('length', 0) == 0:
+            return None
+        dates, hist = _ascending(columns)
+
+        fig = plt.figure(figsize=(12, 8))
+
+        # 주가 차트
+        plt.subplot(2, 1, 1)
+        plt.plot(dates, hist['close'], linewidth=2, color='blue', label='종가')
+        plt.plot(dates, hist['open'], linewidth=1, color='red', alpha=0.7, label='시가')
+        plt.fill_between(dates, hist['high'], hist['low'], alpha=0.3, color='gray', label='고가-저가')
+
+        plt.title(title, fontsize=14, fontweight='bold')
+        plt.ylabel('주가 (원)', fontsize=12)
+        plt.legend()
+        plt.grid(True, alpha=0.3)
+
+        # 거래량 차트
+        plt.subplot(2, 1, 2)
+        plt.bar(dates, hist['volume'], color='green', alpha=0.7, label='거래량')
+        plt.title('거래량', fontsize=12, fontweight='bold')
+        plt.ylabel('거래량 (주)', fontsize=12)
+        plt.legend()
+        plt.grid(True, alpha=0.3)
+
+        plt.tight_layout()
+
+        chart_path = _chart_path(output_dir, f'chart_{symbol}')
+        plt.savefig(chart_path, dpi=CHART_DPI, bbox_inches='tight')
+        return chart_path
+
+    except Exception as e:
+        print(f"차트 생성 중 오류: {str(e)}")
+        return None
+    finally:
+        # 오류가 나도 figure를 닫음 (차트 프로세스 풀 워커는 오래 살아 있으므로 누적 방지)
+        if fig is not None:
+            plt.close(fig)
+
+
+def render_comparison_chart(data: Dict[str, Any], output_dir: str = None) -> Optional[str]:
+    """
+    여러 주식 비교 차트 (정규화 가격 + 기간 수익률/업종 평균)
+
+    Parameters:
+    - data: ComparisonResult.chart_data() 결과
+    """
+    setup_chart_style()
+    import matplotlib.pyplot as plt
+    import numpy as np
+    import pandas as pd
+
+    fig = None
+    try:
+        symbols = data['symbols']
+        if not symbols:
+            return None
+
+        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(14, 10))
+
+        colors_list = ['blue', 'red', 'green', 'orange', 'purple']
+        dates = pd.to_datetime(data['dates'])
+
+        # 정규화된 가격 (첫날을 100으로 설정), 선 차트는 최대 5개
+        for i, symbol in enumerate(symbols[:5]):
+            ax1.plot(dates, data['normalized'][i], linewidth=2,
+                     color=colors_list[i % len(colors_list)], label=symbol)
+        if data['benchmark_normalized'] is not None:
+            ax1.plot(dates, data['benchmark_normalized'], linewidth=1.5, color='black',
+                     linestyle='--', label=data['benchmark_name'])
+
+        # 기간 수익률과 업종 평균
+        total_return = np.asarray(data['total_return'], dtype=np.float64)
+        positions = np.arange(len(symbols))
+        bar_colors = ['tab:red' if value >= 0 else 'tab:blue' for value in np.nan_to_num(total_return)]
+        ax2.bar(positions, total_return, color=bar_colors, alpha=0.7, label='기간 수익률')
+        ax2.scatter(positions, data['sector_average'], color='black', marker='_', s=300, label='업종 평균')
+        if data['benchmark_return'] is not None:
+            ax2.axhline(data['benchmark_return'], color='gray', linestyle='--', linewidth=1,
+                        label=data['benchmark_name'])
+        ax2.set_xticks(positions)
+        ax2.set_xticklabels(symbols, rotation=90 if len(symbols) > 10 else 0,
+                            fontsize=8 if len(symbols) > 20 else 10)
+
+        # 첫 번째 차트 (정규화된 가격)
+        ax1.set_title('주식 가격 비교 (정규화)', fontsize=14, fontweight='bold')
+        ax1.set_ylabel('정규화된 가격 (첫날=100)', fontsize=12)
+        ax1.legend()
+        ax1.grid(True, alpha=0.3)
+
+        # 두 번째 차트 (기간 수익률)
+        ax2.set_title('기간 수익률 비교 (업종 평균 대비)', fontsize=14, fontweight='bold')
+        ax2.set_ylabel('수익률 (%)', fontsize=12)
+        ax2.legend()
+        ax2.grid(True, alpha=0.3, axis='y')
+
+        plt.tight_layout()
+
+        chart_path = _chart_path(output_dir, 'comparison_chart')
+        plt.savefig(chart_path, dpi=CHART_DPI, bbox_inches='tight')
+        return chart_path
+
+    except Exception as e:
+        print(f"비교 차트 생성 중 오류: {str(e)}")
+        return None
+    finally:
+        if fig is not None:
+            plt.close(fig)
+
+
+def render_correlation_heatmap(data: Dict[str, Any], output_dir: str = None) -> Optional[str]:
+    """종목 간 일간 수익률 상관계수 히트맵 (data: ComparisonResult.chart_data() 결과)"""
+    setup_chart_style()
+    import matplotlib.pyplot as plt
+
+    fig = None
+    try:
+        symbols = data['symbols']
+        count = len(symbols)
+        if count < 2:
+            return None
+        correlation = data['correlation']
+
+        size = min(14, 4 + count * 0.5)
+        fig, ax = plt.subplots(figsize=(size, size))
+        image = ax.imshow(correlation, cmap='RdBu_r', vmin=-1, vmax=1)
+        fig.colorbar(image, ax=ax, fraction=0.046, pad=0.04)
+
+        # 종목이 많으면 라벨/수치 표시 생략
+        if count <= 30:
+            ax.set_xticks(range(count))
+            ax.set_yticks(range(count))
+            ax.set_xticklabels(symbols, rotation=90, fontsize=8)
+            ax.set_yticklabels(symbols, fontsize=8)
+        if count <= 10:
+            for i in range(count):
+                for j in range(count):
+                    ax.text(j, i, f"{correlation[i][j]:.2f}", ha='center', va='center', fontsize=8)
+
+        ax.set_title(f"수익률 상관계수 ({data['dates'][0]} ~ {data['dates'][-1]})", fontsize=14, fontweight='bold')
+        plt.tight_layout()
+
+        chart_path = _chart_path(output_dir, 'correlation_chart')
+        plt.savefig(chart_path, dpi=CHART_DPI, bbox_inches='tight')
+        return chart_path
+
+    except Exception as e:
+        print(f"상관계수 차트 생성 중 오류: {str(e)}")
+        return None
+    finally:
+        if fig is not None:
+            plt.close(fig)
+
+
+def render_interactive_chart(symbol: str, columns: Dict[str, Any], output_dir: str = None) -> Optional[str]:
+    """캔들스틱 + 거래량 인터랙티브 차트 HTML 저장 후 경로 반환 (Plotly)"""
+    try:
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+
+        if not columns or columns.get('length', 0) == 0:
+            return None
+        dates, hist = _ascending(columns)
+
+        # 캔들스틱 차트 생성
+        fig = make_subplots(rows=2, cols=1,
+                            shared_xaxes=True,
+                            vertical_spacing=0.03,
+                            subplot_titles=(f'{symbol} 주가 차트', '거래량'),
+                            row_width=[0.7, 0.3])
+
+        # 캔들스틱 차트
+        fig.add_trace(go.Candlestick(x=dates,
+                                     open=hist['open'],
+                                     high=hist['high'],
+                                     low=hist['low'],
+                                     close=hist['close'],
+                                     name='OHLC'),
+                      row=1, col=1)
+
+        # 거래량 차트
+        fig.add_trace(go.Bar(x=dates, y=hist['volume'],
+                             name='거래량',
+                             marker_color='rgba(0, 128, 0, 0.5)'),
+                      row=2, col=1)
+
+        # 레이아웃 설정
+        fig.update_layout(
+            title=f'{symbol} 주가 분석 차트',
+            yaxis_title='주가 (원)',
+            yaxis2_title='거래량',
+            xaxis_rangeslider_visible=False,
+            height=600
+        )
+
+        # HTML 파일로 저장
+        html_path = _chart_path(output_dir, f'interactive_chart_{symbol}', 'html')
+        fig.write_html(html_path)
+        return html_path
+
+    except Exception as e:
+        print(f"인터랙티브 차트 생성 중 오류: {str(e)}")
+        return None
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_chart_executor() -> Optional[ProcessPoolExecutor]:
+    """차트 렌더링 프로세스 풀 반환 (CHART_WORKERS=0이면 None, 최초 호출 시 생성)"""
+    global _executor, _executor_pid
+    if CHART_WORKERS <= 0:
+        return None
+    pid = os.getpid()
+    if _executor is None or _executor_pid != pid:
+        with _executor_lock:
+            if _executor is None or _executor_pid != pid:
+                context = multiprocessing.get_context(CHART_MP_START)
+                _executor = ProcessPoolExecutor(max_workers=CHART_WORKERS, mp_context=context,
+                                                initializer=setup_chart_style)
+                _executor_pid = pid
+    return _executor
+
+
+def submit_chart(render, *args) -> Future:
+    """
+    렌더 함수를 차트 워커 프로세스에 제출 (풀을 쓸 수 없으면 호출 스레드에서 실행)
+
+    Returns:
+    - 차트 경로(실패 시 None)를 결과로 갖는 Future
+    """
+    global _executor
+    executor = get_chart_executor()
+    if executor is not None:
+        try:
+            return executor.submit(render, *args)
+        except (BrokenProcessPool, RuntimeError) as e:
+            print(f"차트 워커 풀을 사용할 수 없어 직접 렌더링합니다: {e}")
+            with _executor_lock:
+                _executor = None
+
+    future = Future()
+    with PYPLOT_LOCK:
+        future.set_result(render(*args))
+    return future
+
+
+def chart_result(future: Future, timeout: Optional[float] = None) -> Optional[str]:
+    """제출한 차트의 경로 반환 (워커 오류/시간 초과 시 None)"""
+    try:
+        return future.result(timeout=timeout)
+    except Exception as e:
+        print(f"차트 렌더링 작업 실패: {e}")
+        return None
+
+
+def shutdown_chart_executor():
+    """차트 워커 프로세스 종료"""
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+        _executor_pid = None
@@ -11,6 +11,7 @@ from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 import json
 import os
+import sys
 from datetime import datetime
 
 # matplotlib 백엔드를 GUI가 아닌 'Agg'로 설정 (멀티스레딩 환경에서 안전)
@@ -23,6 +24,92 @@ import io
 from reportlab.lib.utils import ImageReader
 import pandas as pd
 
+try:
+    from fetch.ohlcv import get_historical_columns, load_report_file
+    from infra.metrics import timed
+    from report.charts import PYPLOT_LOCK
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from fetch.ohlcv import get_historical_columns, load_report_file
+    from infra.metrics import timed
+    from report.charts import PYPLOT_LOCK
+
+def _pdf_failed(path):
+    return path is None
+
+# 한글 폰트는 프로세스 단위로 한 번만 등록 (TTF 파싱 비용이 커서 보고서마다 반복하지 않음)
+_registered_font_name = None
+_chart_font_family = None
+
+def register_korean_font():
+    """
+    reportlab에 한글 폰트를 등록하고 폰트 이름 반환 (이미 등록된 경우 재사용)
+    
+    Returns:
+    - 'Korean' (등록 성공) 또는 'Helvetica' (기본 폰트)
+    """
+    global _registered_font_name
+    if _registered_font_name is not None:
+        return _registered_font_name
+    
+    try:
+        # 시스템에서 TTF 형식의 한글 폰트 찾기 (TTC 파일은 reportlab에서 지원하지 않음)
+        korean_fonts = [
+            '/System/Library/Fonts/Supplemental/AppleGothic.ttf',  # macOS
+            '/System/Library/Fonts/Supplemental/NotoSansGothic-Regular.ttf',  # macOS
+            'C:/Windows/Fonts/malgun.ttf',  # Windows
+            'C:/Windows/Fonts/gulim.ttc',  # Windows
+            '/usr/share/fonts/truetype/nanum/NanumGothic.ttf',  # Linux
+            '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Linux fallback
+        ]
+        
+        font_registered = False
+        for font_path in korean_fonts:
+            if os.path.exists(font_path):
+                try:
+                    # TTC 파일인지 확인
+                    if font_path.endswith('.ttc'):
+                        print(f"TTC 파일은 지원하지 않음: {font_path}")
+                        continue
+                        
+                    pdfmetrics.registerFont(TTFont('Korean', font_path))
+                    font_registered = True
+                    print(f"한글 폰트 등록 성공: {font_path}")
+                    break
+                except Exception as font_error:
+                    print(f"폰트 등록 실패 {font_path}: {font_error}")
+                    continue
+        
+        if not font_registered:
+            print("한글 폰트를 찾을 수 없어 기본 폰트를 사용합니다.")
+            _registered_font_name = 'Helvetica'
+        else:
+            _registered_font_name = 'Korean'
+            
+    except Exception as e:
+        print(f"폰트 설정 오류: {e}")
+        _registered_font_name = 'Helvetica'
+    
+    return _registered_font_name
+
+def get_chart_font_family():
+    """matplotlib 차트용 폰트 패밀리 반환 (폰트 목록 조회는 한 번만 수행)"""
+    global _chart_font_family
+    if _chart_font_family is None:
+        import warnings
+        warnings.filterwarnings('ignore', category=UserWarning, module='matplotlib.font_manager')
+        
+        # 사용 가능한 폰트 찾기
+        available_fonts = {f.name for f in font_manager.fontManager.ttflist}
+        korean_fonts = ['AppleGothic', 'Apple SD Gothic Neo']
+        
+        _chart_font_family = ['DejaVu Sans']
+        for font in korean_fonts:
+            if font in available_fonts:
+                _chart_font_family = [font]
+                break
+    return _chart_font_family
+
 class PDFReportGenerator:
     def __init__(self):
         self.setup_fonts()
@@ -30,43 +117,7 @@ class PDFReportGenerator:
     
     def setup_fonts(self):
         """한글 폰트 설정"""
-        try:
-            # 시스템에서 TTF 형식의 한글 폰트 찾기 (TTC 파일은 reportlab에서 지원하지 않음)
-            korean_fonts = [
-                '/System/Library/Fonts/Supplemental/AppleGothic.ttf',  # macOS
-                '/System/Library/Fonts/Supplemental/NotoSansGothic-Regular.ttf',  # macOS
-                'C:/Windows/Fonts/malgun.ttf',  # Windows
-                'C:/Windows/Fonts/gulim.ttc',  # Windows
-                '/usr/share/fonts/truetype/nanum/NanumGothic.ttf',  # Linux
-                '/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf',  # Linux fallback
-            ]
-            
-            font_registered = False
-            for font_path in korean_fonts:
-                if os.path.exists(font_path):
-                    try:
-                        # TTC 파일인지 확인
-                        if font_path.endswith('.ttc'):
-                            print(f"TTC 파일은 지원하지 않음: {font_path}")
-                            continue
-                            
-                        pdfmetrics.registerFont(TTFont('Korean', font_path))
-                        font_registered = True
-                        print(f"한글 폰트 등록 성공: {font_path}")
-                        break
-                    except Exception as font_error:
-                        print(f"폰트 등록 실패 {font_path}: {font_error}")
-                        continue
-            
-            if not font_registered:
-                print("한글 폰트를 찾을 수 없어 기본 폰트를 사용합니다.")
-                self.korean_font = 'Helvetica'
-            else:
-                self.korean_font = 'Korean'
-                
-        except Exception as e:
-            print(f"폰트 설정 오류: {e}")
-            self.korean_font = 'Helvetica'
+        self.korean_font = register_korean_font()
     
     def setup_styles(self):
         """PDF 스타일 설정"""
@@ -113,44 +164,31 @@ class PDFReportGenerator:
             textColor=colors.grey
         )
 
+    @timed('pdf_chart')
     def create_stock_chart(self, stock_data):
-        """과거/현재/미래 전망을 포함한 주가 차트 생성"""
+        """과거/현재/미래 전망을 포함한 주가 차트 생성 (pyplot 전역 상태를 쓰므로 PYPLOT_LOCK 안에서 렌더링)"""
+        with PYPLOT_LOCK:
+            return self._render_stock_chart(stock_data)
+
+    def _render_stock_chart(self, stock_data):
         try:
-            if 'historical_data' not in stock_data or not stock_data['historical_data']:
+            historical = get_historical_columns(stock_data)
+            if historical['length'] == 0:
                 return None
             
             # 회사명 추출
             company_name = stock_data.get('company_name', '주식')
                 
-            # 한글 폰트 설정 (matplotlib용)
-            import matplotlib.font_manager as fm
             import numpy as np
             from datetime import datetime, timedelta
             
             # matplotlib용 한글 폰트 설정
-            import warnings
-            warnings.filterwarnings('ignore', category=UserWarning, module='matplotlib.font_manager')
-            
-            # 사용 가능한 폰트 찾기
-            available_fonts = [f.name for f in fm.fontManager.ttflist]
-            korean_fonts = ['AppleGothic', 'Apple SD Gothic Neo']
-            
-            for font in korean_fonts:
-                if font in available_fonts:
-                    plt.rcParams['font.family'] = [font]
-                    break
-            else:
-                plt.rcParams['font.family'] = ['DejaVu Sans']
-                
+            plt.rcParams['font.family'] = get_chart_font_family()
             plt.rcParams['axes.unicode_minus'] = False  # 마이너스 기호 깨짐 방지
             
             # 데이터 준비
-            dates = []
-            prices = []
-            
-            for data in stock_data['historical_data']:
-                dates.append(pd.to_datetime(data['date']))
-                prices.append(data['close'])
+            dates = list(pd.to_datetime(historical['date']))
+            prices = list(historical['close'])
             
             # 데이터를 날짜순으로 정렬
             sorted_data = sorted(zip(dates, prices))
@@ -387,12 +425,12 @@ class PDFReportGenerator:
             traceback.print_exc()
             return None
 
+    @timed('pdf_render', is_error=_pdf_failed)
     def generate_pdf_report(self, json_report_path, output_path=None):
         """JSON 보고서를 PDF로 변환"""
         try:
-            # JSON 보고서 읽기
-            with open(json_report_path, 'r', encoding='utf-8') as f:
-                report_data = json.load(f)
+            # JSON 보고서 읽기 (사이드카 히스토리 포함)
+            report_data = load_report_file(json_report_path)
             
             # 출력 파일명 설정
             if output_path is None:
@@ -548,6 +586,7 @@ class PDFReportGenerator:
             print(f"PDF 생성 중 오류 발생: {e}")
             return None
 
+    @timed('pdf_render', is_error=_pdf_failed)
     def generate_pdf_from_data(self, report_data, output_path):
         """딕셔너리 형태의 보고서 데이터를 직접 PDF로 변환"""
         try:
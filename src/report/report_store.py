@@ -0,0 +1,376 @@
+# 보고서 히스토리 저장소 모듈
+# reports/ 디렉토리의 JSON 보고서를 SQLite 인덱스로 적재하여
+# 기업별 과거 보고서 목록과 주요 지표 시계열을 파일 파싱 없이 조회
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Any, Optional
+
+DEFAULT_REPORTS_DIR = 'reports'
+DEFAULT_DB_PATH = os.path.join(DEFAULT_REPORTS_DIR, '.report_index.sqlite3')
+
+# 디렉토리 재스캔 최소 간격 (초) - 새 파일만 파싱하므로 스캔 자체는 가벼움
+SYNC_INTERVAL_SECONDS = 30
+
+# 시계열로 조회 가능한 지표 (API 이름 -> 컬럼명)
+TIMELINE_METRICS = {
+    'current_price': 'current_price',
+    'change': 'change',
+    'change_percent': 'change_percent',
+    'volume': 'volume',
+    'market_cap': 'market_cap',
+    'pe_ratio': 'pe_ratio',
+    'dividend_yield': 'dividend_yield',
+    '52_week_high': 'week52_high',
+    '52_week_low': 'week52_low',
+    'news_count': 'news_count',
+}
+
+DEFAULT_TIMELINE_METRICS = ['current_price', 'change_percent', 'volume']
+
+MAX_PAGE_SIZE = 200
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    json_file TEXT NOT NULL UNIQUE,
+    pdf_file TEXT,
+    file_mtime REAL NOT NULL,
+    company_name TEXT NOT NULL,
+    symbol TEXT,
+    report_date TEXT NOT NULL,
+    analysis_period TEXT,
+    news_count INTEGER,
+    current_price REAL,
+    change REAL,
+    change_percent REAL,
+    volume INTEGER,
+    market_cap REAL,
+    pe_ratio REAL,
+    dividend_yield REAL,
+    week52_high REAL,
+    week52_low REAL,
+    technical_analysis TEXT,
+    market_sentiment TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_reports_company_date ON reports (company_name, report_date);
+"""
+
+_REPORT_COLUMNS = (
+    'json_file', 'pdf_file', 'file_mtime', 'company_name', 'symbol', 'report_date',
+    'analysis_period', 'news_count', 'current_price', 'change', 'change_percent',
+    'volume', 'market_cap', 'pe_ratio', 'dividend_yield', 'week52_high', 'week52_low',
+    'technical_analysis', 'market_sentiment',
+)
+
+
+def _to_number(value):
+    """숫자로 변환 가능한 값만 float로 반환 (그 외는 None)"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return float(str(value).replace(',', '').replace('%', ''))
+    except (TypeError, ValueError):
+        return None
+
+
+def _date_bounds(start_date: Optional[str], end_date: Optional[str]):
+    """'YYYY-MM-DD' 형태의 시작/종료일을 report_date 비교용 문자열로 변환 (종료일 포함)"""
+    lower = f"{start_date} 00:00:00" if start_date else None
+    upper = f"{end_date} 23:59:59" if end_date else None
+    return lower, upper
+
+
+class ReportStore:
+    """JSON 보고서를 색인하는 SQLite 기반 히스토리 저장소"""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, reports_dir: str = DEFAULT_REPORTS_DIR):
+        self.db_path = db_path
+        self.reports_dir = reports_dir
+        self._lock = threading.Lock()
+        self._last_sync = 0.0
+
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock:
+            self._conn.executescript(_SCHEMA)
+            self._conn.commit()
+
+    def _row_from_report(self, json_file: str, report_data: Dict[str, Any], mtime: float) -> Dict[str, Any]:
+        """보고서 딕셔너리에서 색인할 컬럼만 추출"""
+        stock_data = report_data.get('stock_data', {}) or {}
+
+        pdf_file = os.path.splitext(json_file)[0] + '.pdf'
+        if not os.path.exists(pdf_file):
+            pdf_file = None
+
+        report_date = report_data.get('report_date')
+        if not report_date:
+            report_date = datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M:%S')
+
+        volume = _to_number(stock_data.get('volume'))
+
+        return {
+            'json_file': json_file,
+            'pdf_file': pdf_file,
+            'file_mtime': mtime,
+            'company_name': report_data.get('company_name') or stock_data.get('company_name', 'Unknown'),
+            'symbol': stock_data.get('symbol'),
+            'report_date': report_date,
+            'analysis_period': report_data.get('analysis_period'),
+            'news_count': int(report_data.get('news_count', 0) or 0),
+            'current_price': _to_number(stock_data.get('current_price')),
+            'change': _to_number(stock_data.get('change')),
+            'change_percent': _to_number(stock_data.get('change_percent')),
+            'volume': int(volume) if volume is not None else None,
+            'market_cap': _to_number(stock_data.get('market_cap')),
+            'pe_ratio': _to_number(stock_data.get('pe_ratio')),
+            'dividend_yield': _to_number(stock_data.get('dividend_yield')),
+            'week52_high': _to_number(stock_data.get('52_week_high')),
+            'week52_low': _to_number(stock_data.get('52_week_low')),
+            'technical_analysis': json.dumps(report_data.get('technical_analysis', {}), ensure_ascii=False),
+            'market_sentiment': json.dumps(report_data.get('market_sentiment', {}), ensure_ascii=False),
+        }
+
+    def _upsert(self, row: Dict[str, Any]):
+        placeholders = ', '.join('?' for _ in _REPORT_COLUMNS)
+        updates = ', '.join(f"{col} = excluded.{col}" for col in _REPORT_COLUMNS if col != 'json_file')
+        self._conn.execute(
+            f"INSERT INTO reports ({', '.join(_REPORT_COLUMNS)}) VALUES ({placeholders}) "
+            f"ON CONFLICT(json_file) DO UPDATE SET {updates}",
+            [row[col] for col in _REPORT_COLUMNS]
+        )
+
+    def ingest_report(self, json_file: str, report_data: Dict[str, Any] = None) -> bool:
+        """
+        보고서 하나를 색인에 추가 (이미 있으면 갱신)
+
+        Parameters:
+        - json_file: JSON 보고서 파일 경로
+        - report_data: 이미 메모리에 있는 보고서 딕셔너리 (없으면 파일에서 읽음)
+
+        Returns:
+        - 색인 성공 여부
+        """
+        try:
+            mtime = os.path.getmtime(json_file)
+            if report_data is None:
+                with open(json_file, 'r', encoding='utf-8') as f:
+                    report_data = json.load(f)
+
+            if 'error' in report_data:
+                return False
+
+            row = self._row_from_report(json_file, report_data, mtime)
+            with self._lock:
+                self._upsert(row)
+                self._conn.commit()
+            return True
+
+        except Exception as e:
+            print(f"보고서 색인 중 오류 ({json_file}): {e}")
+            return False
+
+    def sync(self, force: bool = False) -> int:
+        """
+        reports 디렉토리를 스캔하여 새로 생기거나 변경된 JSON 보고서만 색인
+
+        Parameters:
+        - force: True이면 최소 스캔 간격을 무시
+
+        Returns:
+        - 새로 색인된 보고서 수
+        """
+        now = time.time()
+        if not force and now - self._last_sync < SYNC_INTERVAL_SECONDS:
+            return 0
+        self._last_sync = now
+
+        if not os.path.isdir(self.reports_dir):
+            return 0
+
+        with self._lock:
+            known = {
+                row['json_file']: row['file_mtime']
+                for row in self._conn.execute("SELECT json_file, file_mtime FROM reports")
+            }
+
+        ingested = 0
+        seen = set()
+        for entry in os.scandir(self.reports_dir):
+            if not entry.is_file() or not entry.name.endswith('.json'):
+                continue
+            json_file = os.path.join(self.reports_dir, entry.name)
+            seen.add(json_file)
+            if known.get(json_file) == entry.stat().st_mtime:
+                continue
+            if self.ingest_report(json_file):
+                ingested += 1
+
+        # 삭제된 파일은 색인에서도 제거
+        removed = [path for path in known if path not in seen]
+        if removed:
+            with self._lock:
+                self._conn.executemany("DELETE FROM reports WHERE json_file = ?", [(p,) for p in removed])
+                self._conn.commit()
+
+        if ingested:
+            print(f"📚 보고서 색인 갱신: {ingested}개 추가")
+        return ingested
+
+    def list_reports(self, company_name: str, start_date: str = None, end_date: str = None,
+                     page: int = 1, page_size: int = 20) -> Dict[str, Any]:
+        """
+        기업의 과거 보고서 목록 조회 (최신순, 페이지네이션)
+
+        Parameters:
+        - company_name: 회사명
+        - start_date / end_date: 조회 기간 ('YYYY-MM-DD', 종료일 포함)
+        - page: 페이지 번호 (1부터 시작)
+        - page_size: 페이지당 항목 수
+
+        Returns:
+        - 보고서 목록과 페이지 정보를 포함한 딕셔너리
+        """
+        page = max(1, int(page))
+        page_size = max(1, min(MAX_PAGE_SIZE, int(page_size)))
+        where, params = self._where(company_name, start_date, end_date)
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM reports WHERE {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT * FROM reports WHERE {where} ORDER BY report_date DESC LIMIT ? OFFSET ?",
+                params + [page_size, (page - 1) * page_size]
+            ).fetchall()
+
+        reports = []
+        for row in rows:
+            reports.append({
+                'report_date': row['report_date'],
+                'json_file': row['json_file'],
+                'pdf_file': row['pdf_file'],
+                'symbol': row['symbol'],
+                'analysis_period': row['analysis_period'],
+                'news_count': row['news_count'],
+                'current_price': row['current_price'],
+                'change': row['change'],
+                'change_percent': row['change_percent'],
+                'volume': row['volume'],
+                'technical_analysis': json.loads(row['technical_analysis'] or '{}'),
+                'market_sentiment': json.loads(row['market_sentiment'] or '{}'),
+            })
+
+        return {
+            'company_name': company_name,
+            'reports': reports,
+            'page': page,
+            'page_size': page_size,
+            'total': total,
+            'total_pages': (total + page_size - 1) // page_size,
+        }
+
+    def metric_timeline(self, company_name: str, metrics: List[str] = None, start_date: str = None,
+                        end_date: str = None, page: int = 1, page_size: int = MAX_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        기업 보고서들의 주요 지표 시계열 조회 (오래된 순, 지표별 병렬 배열)
+
+        Parameters:
+        - company_name: 회사명
+        - metrics: 조회할 지표 이름 목록 (TIMELINE_METRICS의 키)
+        - start_date / end_date: 조회 기간 ('YYYY-MM-DD', 종료일 포함)
+        - page / page_size: 페이지네이션
+
+        Returns:
+        - 날짜 배열과 지표별 값 배열을 포함한 딕셔너리
+        """
+        metrics = metrics or DEFAULT_TIMELINE_METRICS
+        unknown = [m for m in metrics if m not in TIMELINE_METRICS]
+        if unknown:
+            raise ValueError(f"지원하지 않는 지표입니다: {', '.join(unknown)}")
+
+        page = max(1, int(page))
+        page_size = max(1, min(MAX_PAGE_SIZE, int(page_size)))
+        where, params = self._where(company_name, start_date, end_date)
+        columns = ', '.join(TIMELINE_METRICS[m] for m in metrics)
+
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM reports WHERE {where}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT report_date, {columns} FROM reports WHERE {where} "
+                f"ORDER BY report_date ASC LIMIT ? OFFSET ?",
+                params + [page_size, (page - 1) * page_size]
+            ).fetchall()
+
+        series = {metric: [row[TIMELINE_METRICS[metric]] for row in rows] for metric in metrics}
+
+        return {
+            'company_name': company_name,
+            'dates': [row['report_date'] for row in rows],
+            'series': series,
+            'page': page,
+            'page_size': page_size,
+            'total': total,
+            'total_pages': (total + page_size - 1) // page_size,
+        }
+
+    def _where(self, company_name: str, start_date: Optional[str], end_date: Optional[str]):
+        lower, upper = _date_bounds(start_date, end_date)
+        clauses = ["company_name = ?"]
+        params: List[Any] = [company_name]
+        if lower:
+            clauses.append("report_date >= ?")
+            params.append(lower)
+        if upper:
+            clauses.append("report_date <= ?")
+            params.append(upper)
+        return ' AND '.join(clauses), params
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_report_store() -> ReportStore:
+    """프로세스 단위로 공유되는 보고서 저장소 반환"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ReportStore()
+    return _store
+
+
+def close_report_store():
+    """공유 보고서 저장소 연결 종료 (워커 종료 시 호출)"""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+
+
+# 테스트용 메인 함수
+if __name__ == "__main__":
+    import sys
+
+    store = ReportStore()
+    count = store.sync(force=True)
+    print(f"색인된 보고서: {count}개")
+
+    if len(sys.argv) > 1:
+        history = store.list_reports(sys.argv[1])
+        print(json.dumps(history, ensure_ascii=False, indent=2))
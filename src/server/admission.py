@@ -0,0 +1,173 @@
+# 보고서 생성 요청 수락 제어 모듈
+# 보고서 생성 한 건은 GPT 호출 슬롯과 matplotlib/reportlab용 수백 MB 메모리를 점유하므로
+# 워커 프로세스마다 동시 실행 수(ADMISSION_MAX_IN_FLIGHT)와 대기열 길이(ADMISSION_MAX_QUEUE)를 제한하고,
+# 대기열이 가득 찼거나 ADMISSION_QUEUE_TIMEOUT_SECONDS 안에 차례가 오지 않으면 AdmissionRejected로 바로 거절
+# (호출하는 쪽은 저장된 보고서를 반환하거나 503 + Retry-After로 응답)
+#
+# 대기는 도착 순서(FIFO)대로 처리하고, 대기 시간은 'admission_wait' 단계(거절은 오류)로,
+# 실행 중/대기 중 요청 수는 /api/metrics 게이지로 노출
+
+import math
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional
+
+try:
+    from infra.metrics import record, register_gauge, METRICS_ENABLED
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from infra.metrics import record, register_gauge, METRICS_ENABLED
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1") != "0"
+# 워커 프로세스당 동시에 실행할 보고서 생성 수
+ADMISSION_MAX_IN_FLIGHT = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "2"))
+# 실행 차례를 기다릴 수 있는 요청 수 (넘으면 바로 거절)
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "4"))
+# 대기열에서 기다리는 최대 시간 (초)
+ADMISSION_QUEUE_TIMEOUT_SECONDS = float(os.getenv("ADMISSION_QUEUE_TIMEOUT_SECONDS", "30"))
+# 실행 시간 표본이 없을 때 Retry-After 계산에 쓰는 보고서 생성 시간 (초)
+ADMISSION_DEFAULT_SERVICE_SECONDS = float(os.getenv("ADMISSION_DEFAULT_SERVICE_SECONDS", "30"))
+ADMISSION_MAX_RETRY_AFTER = 300
+
+
+class AdmissionRejected(Exception):
+    """실행 슬롯을 얻지 못해 요청을 거절함"""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"요청이 많아 처리할 수 없습니다 ({reason}, {retry_after}초 후 재시도)")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """동시 실행 수 + 대기열 길이 제한 (FIFO)"""
+
+    def __init__(self, max_in_flight: int = ADMISSION_MAX_IN_FLIGHT, max_queue: int = ADMISSION_MAX_QUEUE):
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_queue = max(0, max_queue)
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self._cond = threading.Condition()
+        # 최근 실행 시간 지수 이동 평균 (Retry-After 추정용)
+        self._service_seconds: Optional[float] = None
+        self.counts = {'admitted': 0, 'queued': 0, 'rejected_queue_full': 0, 'rejected_timeout': 0}
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    def retry_after(self) -> int:
+        """지금 대기열 뒤에 설 경우 차례가 올 때까지의 예상 시간 (초, Retry-After 헤더 값)"""
+        service = self._service_seconds or ADMISSION_DEFAULT_SERVICE_SECONDS
+        estimate = service * (len(self._waiters) + 1) / self.max_in_flight
+        return int(min(ADMISSION_MAX_RETRY_AFTER, max(1, math.ceil(estimate))))
+
+    def _reject(self, reason: str, waited: float) -> AdmissionRejected:
+        self.counts[f'rejected_{reason}'] += 1
+        if METRICS_ENABLED:
+            record('admission_wait', waited, error=True)
+        return AdmissionRejected(reason, self.retry_after())
+
+    def acquire(self, timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS) -> float:
+        """
+        실행 슬롯 획득 (자리가 없으면 대기열에서 차례를 기다림)
+
+        Returns:
+        - 대기한 시간 (초)
+
+        Raises:
+        - AdmissionRejected: 대기열이 가득 찼거나 timeout 안에 차례가 오지 않은 경우
+        """
+        started = time.perf_counter()
+        with self._cond:
+            if self.in_flight < self.max_in_flight and not self._waiters:
+                self.in_flight += 1
+                self.counts['admitted'] += 1
+                if METRICS_ENABLED:
+                    record('admission_wait', 0.0)
+                return 0.0
+            if len(self._waiters) >= self.max_queue:
+                raise self._reject('queue_full', 0.0)
+
+            waiter = object()
+            self._waiters.append(waiter)
+            self.counts['queued'] += 1
+            deadline = time.monotonic() + timeout
+            try:
+                while self._waiters[0] is not waiter or self.in_flight >= self.max_in_flight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise self._reject('timeout', time.perf_counter() - started)
+                    self._cond.wait(remaining)
+                self.in_flight += 1
+                self.counts['admitted'] += 1
+            finally:
+                self._waiters.remove(waiter)
+                # 맨 앞 대기자가 바뀌었으므로 다음 대기자가 다시 확인하도록 깨움
+                self._cond.notify_all()
+
+        waited = time.perf_counter() - started
+        if METRICS_ENABLED:
+            record('admission_wait', waited)
+        return waited
+
+    def release(self, service_seconds: Optional[float] = None):
+        """실행 슬롯 반환 (service_seconds: 실행 시간, Retry-After 추정에 반영)"""
+        with self._cond:
+            self.in_flight -= 1
+            if service_seconds is not None:
+                previous = self._service_seconds
+                self._service_seconds = service_seconds if previous is None else 0.8 * previous + 0.2 * service_seconds
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return dict(self.counts, in_flight=self.in_flight, queued=len(self._waiters),
+                        max_in_flight=self.max_in_flight, max_queue=self.max_queue,
+                        service_seconds=self._service_seconds)
+
+
+class admit:
+    """
+    수락 제어 구간 컨텍스트 매니저 (진입 시 슬롯 획득, 실패하면 AdmissionRejected)
+
+    사용 예:
+        try:
+            with admit():
+                result = generate_investment_report_with_pdf(company_name)
+        except AdmissionRejected as e:
+            ...  # 저장된 보고서 반환 또는 503 + Retry-After
+    """
+    __slots__ = ('controller', 'timeout', 'started')
+
+    def __init__(self, timeout: float = ADMISSION_QUEUE_TIMEOUT_SECONDS,
+                 controller: Optional[AdmissionController] = None):
+        self.controller = controller if controller is not None else (_controller if ADMISSION_ENABLED else None)
+        self.timeout = timeout
+
+    def __enter__(self):
+        if self.controller is not None:
+            self.controller.acquire(self.timeout)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.controller is not None:
+            self.controller.release(time.perf_counter() - self.started)
+        return False
+
+
+_controller = AdmissionController()
+
+# 노출 값은 살아 있는 모든 워커의 합계 (워커별 한도는 ADMISSION_MAX_IN_FLIGHT/ADMISSION_MAX_QUEUE)
+register_gauge('admission_in_flight', 'Report generations running, summed over live workers.',
+               lambda: _controller.in_flight)
+register_gauge('admission_queue_depth', 'Report requests waiting for a generation slot, summed over live workers.',
+               lambda: _controller.queued)
+
+
+def get_admission_controller() -> AdmissionController:
+    return _controller
@@ -0,0 +1,322 @@
+# 인기 종목 보고서 사전 생성 모듈
+# 장 마감 후 한산한 시간대(PREWARM_WINDOW)에 hot-list 기업의 OHLCV 캐시를 갱신하고
+# generate_investment_report_with_pdf 결과(JSON/PDF)를 미리 만들어 매니페스트에 기록
+#
+# /api/generate-report는 요청 기업의 사전 생성 보고서가 최근 마감 거래일 데이터로 만들어졌고
+# 생성 이후 입력이 바뀌지 않았으면(다음 장 시작 전, 장중에는 report_cache의 soft TTL 이내)
+# 보고서를 다시 만들지 않고 기록된 결과를 나이와 함께 바로 반환
+#
+# 매니페스트는 reports/.prewarm_manifest.json 파일이므로 gunicorn 워커 간에 공유되고,
+# 사전 생성 작업은 파일 잠금을 잡은 워커 하나만 수행
+
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime, time as dtime
+from typing import Dict, List, Any, Optional
+
+try:
+    from fetch.stock_fetcher import KOREAN_COMPANIES, resolve_company
+    from fetch.trading_calendar import last_closed_session, now_kst
+    from infra.metrics import span
+    from server.report_cache import is_fresh
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from fetch.stock_fetcher import KOREAN_COMPANIES, resolve_company
+    from fetch.trading_calendar import last_closed_session, now_kst
+    from infra.metrics import span
+    from server.report_cache import is_fresh
+
+# 사전 생성 활성화 여부 (warm-up 단계에서 스케줄러 시작)
+# hot-list 기업마다 GPT 호출이 발생하므로 기본은 끄고, 프로덕션 서버 설정(gunicorn.conf.py)에서만 켬
+PREWARM_ENABLED = os.getenv("PREWARM_ENABLED", "0") == "1"
+# 사전 생성할 기업 (쉼표 구분 회사명, 비우면 시가총액 상위 PREWARM_TOP_N개)
+PREWARM_COMPANIES = os.getenv("PREWARM_COMPANIES", "")
+PREWARM_TOP_N = int(os.getenv("PREWARM_TOP_N", "25"))
+# 사전 생성 시간대 (KST, "시작-종료", 자정을 넘길 수 있음)
+PREWARM_WINDOW = os.getenv("PREWARM_WINDOW", "16:00-08:00")
+# 시간대 확인 주기 (초)
+PREWARM_CHECK_SECONDS = int(os.getenv("PREWARM_CHECK_SECONDS", "300"))
+
+PREWARM_DIR = os.getenv("PREWARM_DIR", "reports")
+MANIFEST_PATH = os.path.join(PREWARM_DIR, '.prewarm_manifest.json')
+LOCK_PATH = os.path.join(PREWARM_DIR, '.prewarm.lock')
+
+
+def hot_list() -> List[str]:
+    """사전 생성 대상 회사명 목록"""
+    if PREWARM_COMPANIES.strip():
+        names = [name.strip() for name in PREWARM_COMPANIES.split(',') if name.strip()]
+    else:
+        # KOREAN_COMPANIES는 시가총액 순서
+        names = list(KOREAN_COMPANIES.keys())[:PREWARM_TOP_N]
+    resolved = []
+    for name in names:
+        company_name, symbol = resolve_company(name)
+        if symbol:
+            resolved.append(company_name)
+        else:
+            print(f"사전 생성 대상에서 제외 (지원되지 않는 기업): {name}")
+    return list(dict.fromkeys(resolved))
+
+
+def _parse_window(spec: str):
+    start, end = spec.split('-', 1)
+    return dtime.fromisoformat(start.strip()), dtime.fromisoformat(end.strip())
+
+
+def in_prewarm_window(now: Optional[datetime] = None) -> bool:
+    """현재 시각이 사전 생성 시간대인지 여부"""
+    now = now or now_kst()
+    start, end = _parse_window(PREWARM_WINDOW)
+    current = now.time()
+    if start <= end:
+        return start <= current < end
+    return current >= start or current < end
+
+
+def report_summary(report_data: Dict[str, Any]) -> Dict[str, Any]:
+    """API 응답용 보고서 요약"""
+    stock_data = report_data.get('stock_data', {})
+    return {
+        'current_price': stock_data.get('current_price', 'N/A'),
+        'change': stock_data.get('change', 'N/A'),
+        'change_percent': stock_data.get('change_percent', 'N/A'),
+        'analysis_period': report_data.get('analysis_period', 'N/A'),
+        'news_count': report_data.get('news_count', 0)
+    }
+
+
+class PrewarmManifest:
+    """사전 생성 결과 매니페스트 (회사명 -> 항목), 파일이 바뀌면 다시 읽음"""
+
+    def __init__(self, path: str = MANIFEST_PATH):
+        self.path = path
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def _reload(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            self._entries, self._mtime = {}, None
+            return
+        if mtime != self._mtime:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+                self._mtime = mtime
+            except (OSError, ValueError) as e:
+                print(f"사전 생성 매니페스트 로드 실패: {e}")
+
+    def get(self, company_name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._reload()
+            entry = self._entries.get(company_name)
+            return dict(entry) if entry else None
+
+    def put(self, company_name: str, entry: Dict[str, Any]):
+        with self._lock:
+            self._reload()
+            self._entries[company_name] = entry
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            # 다른 워커가 읽는 도중 반쯤 쓰인 파일을 보지 않도록 교체
+            os.replace(tmp_path, self.path)
+            self._mtime = os.path.getmtime(self.path)
+
+
+_manifest = PrewarmManifest()
+
+
+def lookup(company_name: str) -> Optional[Dict[str, Any]]:
+    """
+    최근 마감 거래일 데이터로 사전 생성되었고 그 이후 입력이 바뀌지 않은 보고서 조회
+
+    생성 이후 새 시세가 생길 수 없거나(장 마감 후 ~ 다음 장 시작 전) soft TTL(REPORT_FRESH_SECONDS) 이내일 때만 유효하므로
+    장이 열리면 사전 생성 보고서는 만료되고 저장 보고서/재생성 경로로 넘어감
+
+    Returns:
+    - 매니페스트 항목 {"company_name", "json_file", "pdf_file", "summary", "session", "generated_at", "age_seconds"}
+      (없거나 오래되었거나 파일이 삭제되었으면 None)
+    """
+    company_name, symbol = resolve_company(company_name)
+    if not symbol:
+        return None
+    with span('prewarm_lookup'):
+        entry = _manifest.get(company_name)
+        if not entry or entry.get('session') != last_closed_session().isoformat():
+            return None
+        try:
+            age = max(0.0, time.time() - datetime.fromisoformat(entry['generated_at']).timestamp())
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not is_fresh(entry['generated_at'], age):
+            return None
+        if not os.path.exists(entry['json_file']):
+            return None
+        if entry.get('pdf_file') and not os.path.exists(entry['pdf_file']):
+            return None
+        entry['age_seconds'] = round(age, 1)
+        return entry
+
+
+def prewarm_company(company_name: str, session: str) -> Dict[str, Any]:
+    """기업 하나의 OHLCV 캐시 갱신 후 보고서 생성, 매니페스트에 기록"""
+    from analysis.analyze import generate_investment_report_with_pdf
+    from fetch.ohlcv_cache import get_ohlcv_cache
+    from report.report_store import get_report_store
+
+    _, symbol = resolve_company(company_name)
+    with span('prewarm_report'):
+        # 스크리너/비교 분석이 쓰는 히스토리도 마감 데이터로 갱신
+        get_ohlcv_cache().get(symbol, '1y', max_age=0)
+        result = generate_investment_report_with_pdf(company_name)
+    if 'error' in result:
+        return result
+    if result.get('stale_sources'):
+        # 장애 중 캐시 데이터로 만든 보고서는 마감 보고서로 기록하지 않음 (다음 실행에서 다시 생성)
+        return {"error": f"캐시 데이터 사용 ({', '.join(result['stale_sources'])})"}
+
+    with open(result['json_file'], 'r', encoding='utf-8') as f:
+        report_data = json.load(f)
+    try:
+        get_report_store().ingest_report(result['json_file'], report_data)
+    except Exception as e:
+        print(f"보고서 색인 추가 실패 ({company_name}): {e}")
+
+    entry = {
+        'company_name': company_name,
+        'json_file': result['json_file'],
+        'pdf_file': result.get('pdf_file'),
+        'summary': report_summary(report_data),
+        'session': session,
+        'generated_at': datetime.now().isoformat(),
+    }
+    _manifest.put(company_name, entry)
+    return entry
+
+
+def _acquire_lock():
+    """워커 간 사전 생성 작업 잠금 (이미 다른 프로세스가 잡고 있으면 None)"""
+    os.makedirs(os.path.dirname(LOCK_PATH) or '.', exist_ok=True)
+    handle = open(LOCK_PATH, 'w')
+    try:
+        import fcntl
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except ImportError:
+        # fcntl이 없는 환경(Windows)에서는 단일 프로세스 실행을 가정
+        pass
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+def run_prewarm(companies: Optional[List[str]] = None, force: bool = False,
+                stop_event: Optional[threading.Event] = None, respect_window: bool = False) -> Dict[str, Any]:
+    """
+    hot-list 보고서 사전 생성
+
+    Parameters:
+    - companies: 대상 회사명 목록 (None이면 hot_list())
+    - force: 최근 마감 거래일 보고서가 이미 있어도 다시 생성
+    - stop_event: 설정되면 다음 기업부터 중단
+    - respect_window: 사전 생성 시간대를 벗어나면 중단
+
+    Returns:
+    - {"session", "generated": [...], "skipped": [...], "failed": {...}} (다른 프로세스가 실행 중이면 {"locked": True})
+    """
+    handle = _acquire_lock()
+    if handle is None:
+        return {'locked': True}
+
+    session = last_closed_session().isoformat()
+    summary = {'session': session, 'generated': [], 'skipped': [], 'failed': {}}
+    try:
+        for company_name in (companies or hot_list()):
+            if stop_event is not None and stop_event.is_set():
+                break
+            if respect_window and not in_prewarm_window():
+                print("사전 생성 시간대가 끝나 남은 기업은 다음 시간대에 생성합니다.")
+                break
+            if not force and lookup(company_name):
+                summary['skipped'].append(company_name)
+                continue
+
+            print(f"🔥 {company_name} 보고서 사전 생성 중...")
+            try:
+                entry = prewarm_company(company_name, session)
+            except Exception as e:
+                entry = {'error': str(e)}
+            if 'error' in entry:
+                summary['failed'][company_name] = entry['error']
+                print(f"❌ {company_name} 사전 생성 실패: {entry['error']}")
+            else:
+                summary['generated'].append(company_name)
+    finally:
+        handle.close()
+
+    print(f"✅ 사전 생성 완료 (세션 {session}): 생성 {len(summary['generated'])}개, "
+          f"건너뜀 {len(summary['skipped'])}개, 실패 {len(summary['failed'])}개")
+    return summary
+
+
+class PrewarmScheduler:
+    """사전 생성 시간대에 최근 마감 거래일 기준 보고서가 없는 hot-list 기업을 생성하는 백그라운드 스레드"""
+
+    def __init__(self, check_seconds: int = PREWARM_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._completed_session = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            session = last_closed_session().isoformat()
+            if in_prewarm_window() and self._completed_session != session:
+                try:
+                    result = run_prewarm(stop_event=self._stop, respect_window=True)
+                    if not result.get('locked') and not result['failed'] and in_prewarm_window():
+                        self._completed_session = session
+                except Exception as e:
+                    print(f"보고서 사전 생성 중 오류: {e}")
+            self._stop.wait(self.check_seconds)
+
+    def start(self) -> threading.Thread:
+        if self._thread is not None and self._thread.is_alive():
+            return self._thread
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='prewarm', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout: float = 5):
+        """스케줄러 중지 (진행 중인 기업 보고서는 끝까지 생성)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=timeout)
+        self._thread = None
+
+
+_scheduler = PrewarmScheduler()
+
+
+def start_scheduler():
+    if PREWARM_ENABLED:
+        _scheduler.start()
+
+
+def stop_scheduler():
+    _scheduler.stop()
+
+
+if __name__ == '__main__':
+    # cron 등에서 직접 실행: python src/server/prewarm.py [--force] [회사명 ...]
+    args = [arg for arg in sys.argv[1:] if arg != '--force']
+    print(json.dumps(run_prewarm(args or None, force='--force' in sys.argv), ensure_ascii=False, indent=2))
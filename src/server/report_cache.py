@@ -0,0 +1,343 @@
+# 저장된 보고서 즉시 응답(stale-while-revalidate) 모듈
+# /api/generate-report 요청 시 기업의 가장 최근 저장 보고서가 REPORT_FRESH_SECONDS 이내(또는 생성 이후 새 봉이 없음)이면
+# 파이프라인 없이 바로 반환하고, 그보다 오래되었지만 REPORT_MAX_STALE_SECONDS 이내이면 기존 보고서를 반환하면서
+# 백그라운드에서 한 번만 다시 생성 (응답에는 보고서 나이와 재생성 여부를 포함)
+#
+# 재생성은 프로세스 안에서는 기업당 하나만 실행하고, gunicorn 워커 간에는 기업별 파일 잠금으로 하나만 실행하며
+# 잠금을 잡은 뒤 최신 보고서를 다시 확인하므로 같은 기업의 파이프라인은 TTL마다 최대 한 번 실행됨
+#
+# 반환할 보고서가 없어 요청 안에서 생성하는 경우(build)도 같은 잠금을 사용: 프로세스 안의 동시 요청은
+# 먼저 온 요청의 생성 결과를 기다리고, 다른 워커가 생성 중이면 잠금을 기다린 뒤 그 워커가 만든 보고서를 반환
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+try:
+    from fetch.stock_fetcher import resolve_company
+    from fetch.trading_calendar import data_unchanged_since
+    from infra.metrics import span
+    from server.admission import admit, AdmissionRejected
+except ImportError:
+    sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+    from fetch.stock_fetcher import resolve_company
+    from fetch.trading_calendar import data_unchanged_since
+    from infra.metrics import span
+    from server.admission import admit, AdmissionRejected
+
+# 저장 보고서 즉시 응답 활성화 여부
+REPORT_SWR_ENABLED = os.getenv("REPORT_SWR_ENABLED", "1") != "0"
+# 이 시간(초) 이내의 보고서는 그대로 반환 (soft TTL, 지나면 반환 후 백그라운드 재생성)
+REPORT_FRESH_SECONDS = int(os.getenv("REPORT_FRESH_SECONDS", "900"))
+# 이 시간(초)보다 오래된 보고서는 반환하지 않고 요청 안에서 새로 생성
+REPORT_MAX_STALE_SECONDS = int(os.getenv("REPORT_MAX_STALE_SECONDS", "86400"))
+# 재생성이 실패한 기업을 다시 시도하기까지의 간격 (초, 장애 중 요청마다 파이프라인을 돌리지 않도록)
+REPORT_REVALIDATE_RETRY_SECONDS = int(os.getenv("REPORT_REVALIDATE_RETRY_SECONDS", "300"))
+# 백그라운드 재생성 동시 실행 수 (워커 프로세스당)
+REPORT_REVALIDATE_WORKERS = int(os.getenv("REPORT_REVALIDATE_WORKERS", "2"))
+# 요청 안에서 생성할 때 같은 기업을 생성 중인 다른 요청/워커를 기다리는 최대 시간 (초, 지나면 직접 생성)
+REPORT_BUILD_WAIT_SECONDS = float(os.getenv("REPORT_BUILD_WAIT_SECONDS", "180"))
+
+REPORT_LOCK_DIR = os.path.join("reports", ".revalidate")
+
+
+def report_timestamp(report_date: str) -> Optional[float]:
+    """보고서 생성 시각 (epoch 초, report_date 형식이 잘못되었으면 None)"""
+    try:
+        return datetime.strptime(report_date, '%Y-%m-%d %H:%M:%S').timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def report_age(report_date: str, now: Optional[float] = None) -> Optional[float]:
+    """보고서 생성 후 경과 시간 (초, report_date 형식이 잘못되었으면 None)"""
+    generated = report_timestamp(report_date)
+    if generated is None:
+        return None
+    return max(0.0, (now if now is not None else time.time()) - generated)
+
+
+def is_fresh(report_date: str, age: float) -> bool:
+    """soft TTL 이내이거나 생성 이후 새 봉이 생길 수 없으면 (장 마감 후 생성) 최신"""
+    if age <= REPORT_FRESH_SECONDS:
+        return True
+    return data_unchanged_since(time.time() - age)
+
+
+def _latest_report(company_name: str, force_sync: bool = False) -> Optional[Dict[str, Any]]:
+    """색인된 가장 최근 보고서 (파일이 삭제되었으면 None)"""
+    from report.report_store import get_report_store
+    store = get_report_store()
+    store.sync(force=force_sync)
+    reports = store.list_reports(company_name, page_size=1)['reports']
+    if not reports or not os.path.exists(reports[0]['json_file']):
+        return None
+    return reports[0]
+
+
+def _acquire_company_lock(company_name: str, wait: float = 0.0):
+    """워커 간 기업별 생성 잠금 (wait초 안에 잡지 못하면 None, 잠금 파일 핸들을 닫으면 해제)"""
+    os.makedirs(REPORT_LOCK_DIR, exist_ok=True)
+    handle = open(os.path.join(REPORT_LOCK_DIR, f"{company_name}.lock"), 'w')
+    try:
+        import fcntl
+    except ImportError:
+        # fcntl이 없는 환경(Windows)에서는 프로세스 안의 중복 방지만 사용
+        return handle
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return handle
+        except OSError:
+            if time.monotonic() >= deadline:
+                handle.close()
+                return None
+            time.sleep(0.5)
+
+
+class ReportRevalidator:
+    """기업별 백그라운드 보고서 재생성 (프로세스 안에서 기업당 하나만 실행)"""
+
+    def __init__(self, max_workers: int = REPORT_REVALIDATE_WORKERS):
+        self.max_workers = max_workers
+        self._running = set()
+        # 기업 -> 마지막 재생성 시작 시각 (실패 후 재시도 간격 확인용)
+        self._attempted: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=max(1, self.max_workers),
+                                                    thread_name_prefix='report-revalidate')
+            return self._executor
+
+    def is_running(self, company_name: str) -> bool:
+        with self._lock:
+            return company_name in self._running
+
+    def submit(self, company_name: str) -> bool:
+        """
+        재생성 예약 (이미 실행 중이거나 최근에 시도했으면 예약하지 않음)
+
+        Returns:
+        - 재생성이 진행 중인지 여부 (이번에 예약했거나 이미 실행 중이면 True)
+        """
+        now = time.time()
+        with self._lock:
+            if company_name in self._running:
+                return True
+            if now - self._attempted.get(company_name, 0) < REPORT_REVALIDATE_RETRY_SECONDS:
+                return False
+            self._running.add(company_name)
+            self._attempted[company_name] = now
+        try:
+            self._get_executor().submit(self._run, company_name)
+        except RuntimeError:
+            # 종료 중
+            with self._lock:
+                self._running.discard(company_name)
+            return False
+        return True
+
+    def _run(self, company_name: str):
+        try:
+            handle = _acquire_company_lock(company_name)
+            if handle is None:
+                print(f"{company_name} 보고서는 다른 워커가 재생성 중입니다.")
+                return
+            try:
+                # 다른 워커가 방금 만든 보고서가 있으면 다시 만들지 않음
+                latest = _latest_report(company_name, force_sync=True)
+                age = report_age(latest['report_date']) if latest else None
+                if age is not None and is_fresh(latest['report_date'], age):
+                    return
+                # 사용자 요청과 같은 실행 슬롯을 사용 (포화 상태면 건너뛰고 재시도 간격 후 다시 시도)
+                with admit():
+                    regenerate(company_name)
+            finally:
+                handle.close()
+        except AdmissionRejected as e:
+            print(f"{company_name} 보고서 백그라운드 재생성 보류: {e}")
+        except Exception as e:
+            print(f"{company_name} 보고서 백그라운드 재생성 실패: {e}")
+        finally:
+            with self._lock:
+                self._running.discard(company_name)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+_revalidator = ReportRevalidator()
+
+
+def regenerate(company_name: str) -> Dict[str, Any]:
+    """보고서를 새로 생성하고 히스토리 색인에 추가 (generate_investment_report_with_pdf 결과 반환)"""
+    import json
+    from analysis.analyze import generate_investment_report_with_pdf
+    from report.report_store import get_report_store
+
+    with span('report_revalidate'):
+        print(f"🔄 {company_name} 보고서 백그라운드 재생성 중...")
+        result = generate_investment_report_with_pdf(company_name)
+    if 'error' in result:
+        print(f"❌ {company_name} 보고서 재생성 실패: {result['error']}")
+        return result
+    try:
+        with open(result['json_file'], 'r', encoding='utf-8') as f:
+            get_report_store().ingest_report(result['json_file'], json.load(f))
+    except Exception as e:
+        print(f"보고서 색인 추가 실패 ({company_name}): {e}")
+    print(f"✅ {company_name} 보고서 재생성 완료: {result['json_file']}")
+    return result
+
+
+_builds: Dict[str, Future] = {}
+_builds_lock = threading.Lock()
+
+
+def build(company_name: str, wait: float = REPORT_BUILD_WAIT_SECONDS) -> Dict[str, Any]:
+    """
+    요청 안에서 보고서 생성 (같은 기업의 동시 요청은 한 번의 생성을 공유)
+
+    - 같은 프로세스에서 이미 생성 중이면 그 결과를 기다려 반환
+    - 다른 워커(또는 백그라운드 재생성)가 생성 중이면 기업별 잠금을 기다린 뒤,
+      그동안 새로 저장된 보고서가 있으면 파이프라인 없이 그 보고서를 반환 ({"json_file", "pdf_file", "shared": True})
+    - 생성은 수락 제어(admit) 안에서 실행
+
+    Returns:
+    - generate_investment_report_with_pdf 결과
+
+    Raises:
+    - AdmissionRejected: 실행 슬롯을 얻지 못한 경우 (결과를 기다리던 요청도 같은 예외)
+    """
+    with _builds_lock:
+        future = _builds.get(company_name)
+        leader = future is None
+        if leader:
+            future = _builds[company_name] = Future()
+    if not leader:
+        print(f"⏳ {company_name} 보고서를 생성 중인 요청의 결과를 기다립니다.")
+        return future.result(timeout=wait)
+
+    try:
+        result = _build_once(company_name, wait)
+        future.set_result(result)
+        return result
+    except BaseException as e:
+        future.set_exception(e)
+        raise
+    finally:
+        with _builds_lock:
+            _builds.pop(company_name, None)
+
+
+def _build_once(company_name: str, wait: float) -> Dict[str, Any]:
+    from analysis.analyze import generate_investment_report_with_pdf
+    from server import warmup
+
+    started = time.time()
+    handle = _acquire_company_lock(company_name, wait=wait)
+    if handle is None:
+        print(f"{company_name} 보고서 생성 잠금을 {wait:.0f}초 안에 얻지 못해 직접 생성합니다.")
+    try:
+        # 잠금을 기다리는 동안 다른 워커가 만든 보고서 (이 요청 이후에 완성된 것만)
+        latest = _latest_report(company_name, force_sync=True)
+        generated = report_timestamp(latest['report_date']) if latest else None
+        if generated is not None and generated >= int(started):
+            print(f"⚡ {company_name} 다른 워커가 방금 생성한 보고서 반환 ({latest['report_date']})")
+            return {'json_file': latest['json_file'], 'pdf_file': latest.get('pdf_file'), 'shared': True}
+        with admit():
+            # warm-up 중인 워커라면 차트/폰트 초기화와 겹치지 않도록 완료를 기다림
+            # (실행 슬롯을 얻은 뒤에 기다리므로 대기 중인 요청 수도 수락 제어 한도 안에 있음)
+            warmup.wait_until_ready(timeout=60)
+            return generate_investment_report_with_pdf(company_name)
+    finally:
+        if handle is not None:
+            handle.close()
+
+
+def lookup(company_name: str) -> Optional[Dict[str, Any]]:
+    """
+    바로 반환할 수 있는 저장 보고서 조회 (soft TTL이 지났으면 백그라운드 재생성 예약)
+
+    Returns:
+    - {"company_name", "json_file", "pdf_file", "summary", "generated_at", "age_seconds", "fresh", "revalidating"}
+      (보고서가 없거나 REPORT_MAX_STALE_SECONDS보다 오래되었으면 None → 요청 안에서 생성)
+    """
+    if not REPORT_SWR_ENABLED:
+        return None
+    company_name, symbol = resolve_company(company_name)
+    if not symbol:
+        return None
+
+    with span('report_cache_lookup'):
+        latest = _latest_report(company_name)
+        age = report_age(latest['report_date']) if latest else None
+        if age is not None and not is_fresh(latest['report_date'], age):
+            # 다른 워커가 이미 새 보고서를 만들었을 수 있으므로 디렉토리를 다시 확인
+            latest = _latest_report(company_name, force_sync=True)
+            age = report_age(latest['report_date']) if latest else None
+        if age is None or age > REPORT_MAX_STALE_SECONDS:
+            return None
+        if latest.get('pdf_file') and not os.path.exists(latest['pdf_file']):
+            return None
+
+        fresh = is_fresh(latest['report_date'], age)
+        revalidating = _revalidator.is_running(company_name) if fresh else _revalidator.submit(company_name)
+        return _entry(company_name, latest, age, fresh, revalidating)
+
+
+def fallback(company_name: str) -> Optional[Dict[str, Any]]:
+    """
+    과부하로 요청을 처리할 수 없을 때 반환할 저장 보고서 (나이 제한 없음, 재생성을 예약하지 않음)
+
+    Returns:
+    - lookup()과 같은 형태의 항목 (저장된 보고서가 없으면 None)
+    """
+    company_name, symbol = resolve_company(company_name)
+    if not symbol:
+        return None
+    with span('report_cache_fallback'):
+        latest = _latest_report(company_name)
+        age = report_age(latest['report_date']) if latest else None
+        if age is None:
+            return None
+        if latest.get('pdf_file') and not os.path.exists(latest['pdf_file']):
+            return None
+        return _entry(company_name, latest, age, is_fresh(latest['report_date'], age),
+                      _revalidator.is_running(company_name))
+
+
+def _entry(company_name: str, latest: Dict[str, Any], age: float, fresh: bool,
+           revalidating: bool) -> Dict[str, Any]:
+    return {
+        'company_name': company_name,
+        'json_file': latest['json_file'],
+        'pdf_file': latest.get('pdf_file'),
+        'summary': {
+            'current_price': latest['current_price'],
+            'change': latest['change'],
+            'change_percent': latest['change_percent'],
+            'analysis_period': latest['analysis_period'],
+            'news_count': latest['news_count'],
+        },
+        'generated_at': latest['report_date'],
+        'age_seconds': round(age, 1),
+        'fresh': fresh,
+        'revalidating': revalidating,
+    }
+
+
+def shutdown_revalidator():
+    _revalidator.shutdown()
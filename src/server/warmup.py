@@ -0,0 +1,251 @@
+# 워커 warm-up 및 readiness 상태 모듈
+# 프로덕션 서버(gunicorn)의 각 워커가 첫 요청 전에 무거운 초기화를 끝내도록 하고,
+# /api/ready 엔드포인트가 warm-up 완료 여부를 보고할 수 있도록 상태를 관리
+
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+_ready = threading.Event()
+_state_lock = threading.Lock()
+_state = {
+    'status': 'cold',        # cold -> warming -> ready -> stopping
+    'pid': None,
+    'started_at': None,
+    'finished_at': None,
+    'steps': {},
+}
+
+
+def _warm_imports():
+    """지연 로드되는 분석/차트/PDF 라이브러리를 미리 import"""
+    import numpy  # noqa: F401
+    import yfinance  # noqa: F401
+    import analysis.analyze  # noqa: F401
+    import report.pdf_generator  # noqa: F401
+
+
+def _warm_fonts():
+    """reportlab 한글 폰트 등록 및 matplotlib 폰트 목록 로드"""
+    from report.pdf_generator import register_korean_font, get_chart_font_family
+    register_korean_font()
+    get_chart_font_family()
+
+
+def _warm_matplotlib():
+    """Agg 백엔드 초기화 (첫 렌더링에서 발생하는 캐시 생성 비용을 미리 지불)"""
+    import io
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from report.charts import PYPLOT_LOCK
+
+    with PYPLOT_LOCK:
+        fig, ax = plt.subplots(figsize=(2, 2))
+        ax.plot([0, 1], [0, 1])
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png')
+        plt.close(fig)
+
+
+def _warm_company_index():
+    from fetch.stock_fetcher import build_company_index
+    build_company_index()
+
+
+def _warm_http_sessions():
+    """외부 API용 HTTP 세션 및 OpenAI 클라이언트 생성"""
+    from fetch.http_session import get_session
+    get_session()
+    if os.getenv("GPT_KEY"):
+        from analysis.llm import get_client
+        get_client()
+
+
+def _warm_report_store():
+    from report.report_store import get_report_store
+    get_report_store()
+
+
+def _warm_market_context():
+    """KOSPI/KOSDAQ 스냅샷 백그라운드 갱신 시작 (보고서 요청은 메모리 스냅샷 사용)"""
+    from fetch.market_context import get_market_context
+    get_market_context().start()
+
+
+def _warm_fundamentals():
+    """지원 종목 기본 정보(.info) 백그라운드 일괄 갱신 시작 (시세 조회는 저장된 값만 사용)"""
+    from fetch.fundamentals import get_fundamentals_store
+    get_fundamentals_store().start()
+
+
+def _warm_prewarm_scheduler():
+    """hot-list 보고서 사전 생성 스케줄러 시작 (PREWARM_ENABLED=1일 때만)"""
+    from server.prewarm import start_scheduler
+    start_scheduler()
+
+
+WARMUP_STEPS = [
+    ('imports', _warm_imports),
+    ('fonts', _warm_fonts),
+    ('matplotlib', _warm_matplotlib),
+    ('company_index', _warm_company_index),
+    ('http_sessions', _warm_http_sessions),
+    ('report_store', _warm_report_store),
+    ('market_context', _warm_market_context),
+    ('fundamentals', _warm_fundamentals),
+    ('prewarm_scheduler', _warm_prewarm_scheduler),
+]
+
+
+def warm_up() -> Dict[str, Any]:
+    """
+    현재 프로세스의 warm-up 수행 (단계별 실패는 기록만 하고 계속 진행)
+
+    Returns:
+    - readiness() 결과
+    """
+    with _state_lock:
+        _ready.clear()
+        _state.update({
+            'status': 'warming',
+            'pid': os.getpid(),
+            'started_at': datetime.now().isoformat(),
+            'finished_at': None,
+            'steps': {},
+        })
+
+    failed = False
+    for name, step in WARMUP_STEPS:
+        started = time.perf_counter()
+        try:
+            step()
+            result = {'ok': True}
+        except Exception as e:
+            print(f"warm-up 단계 실패 ({name}): {e}")
+            result = {'ok': False, 'error': str(e)}
+            failed = True
+        result['duration_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        with _state_lock:
+            _state['steps'][name] = result
+
+    with _state_lock:
+        # 일부 단계가 실패해도 요청은 지연 초기화로 처리 가능하므로 ready로 전환
+        _state['status'] = 'ready'
+        _state['finished_at'] = datetime.now().isoformat()
+        _state['degraded'] = failed
+    _ready.set()
+    print(f"✅ 워커 warm-up 완료 (pid={os.getpid()})")
+    return readiness()
+
+
+def start_warm_up() -> threading.Thread:
+    """백그라운드 스레드에서 warm-up 시작 (서버는 바로 요청을 받고 /api/ready는 완료 전까지 503)"""
+    with _state_lock:
+        _state['status'] = 'warming'
+        _state['pid'] = os.getpid()
+    thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+    thread.start()
+    return thread
+
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+
+def wait_until_ready(timeout: Optional[float] = None) -> bool:
+    """warm-up 진행 중이면 완료까지 대기 (warm-up을 시작하지 않은 프로세스는 바로 반환)"""
+    with _state_lock:
+        warming = _state['status'] == 'warming'
+    if not warming:
+        return _ready.is_set()
+    return _ready.wait(timeout)
+
+
+def readiness() -> Dict[str, Any]:
+    """readiness 상태 사본 반환"""
+    with _state_lock:
+        state = dict(_state)
+        state['steps'] = {name: dict(step) for name, step in _state['steps'].items()}
+    state['ready'] = _ready.is_set()
+    return state
+
+
+def shutdown():
+    """워커 종료 시 readiness를 내리고 공유 자원 정리"""
+    _ready.clear()
+    with _state_lock:
+        _state['status'] = 'stopping'
+
+    try:
+        from fetch.http_session import close_session
+        close_session()
+    except Exception as e:
+        print(f"HTTP 세션 종료 중 오류: {e}")
+
+    if 'server.prewarm' in sys.modules:
+        try:
+            from server.prewarm import stop_scheduler
+            stop_scheduler()
+        except Exception as e:
+            print(f"사전 생성 스케줄러 중지 중 오류: {e}")
+
+    if 'server.report_cache' in sys.modules:
+        try:
+            from server.report_cache import shutdown_revalidator
+            shutdown_revalidator()
+        except Exception as e:
+            print(f"보고서 재생성 스레드 풀 종료 중 오류: {e}")
+
+    if 'fetch.orchestrator' in sys.modules:
+        try:
+            from fetch.orchestrator import shutdown_fetch_executor
+            shutdown_fetch_executor()
+        except Exception as e:
+            print(f"수집 스레드 풀 종료 중 오류: {e}")
+
+    if 'fetch.quote_stream' in sys.modules:
+        try:
+            from fetch.quote_stream import get_quote_hub
+            get_quote_hub().stop()
+        except Exception as e:
+            print(f"시세 허브 중지 중 오류: {e}")
+
+    if 'fetch.quote_router' in sys.modules:
+        try:
+            from fetch.quote_router import shutdown_quote_router
+            shutdown_quote_router()
+        except Exception as e:
+            print(f"시세 라우터 종료 중 오류: {e}")
+
+    if 'fetch.kis_client' in sys.modules:
+        try:
+            from fetch.kis_client import close_kis_client
+            close_kis_client()
+        except Exception as e:
+            print(f"KIS 세션 종료 중 오류: {e}")
+
+    if 'fetch.fundamentals' in sys.modules:
+        try:
+            from fetch.fundamentals import get_fundamentals_store
+            get_fundamentals_store().stop()
+        except Exception as e:
+            print(f"기본 정보 갱신 중지 중 오류: {e}")
+
+    if 'fetch.market_context' in sys.modules:
+        try:
+            from fetch.market_context import get_market_context
+            get_market_context().stop()
+        except Exception as e:
+            print(f"시장 지수 갱신 중지 중 오류: {e}")
+
+    # 저장소를 한 번도 쓰지 않은 워커라면 새로 만들지 않음
+    if 'report.report_store' in sys.modules:
+        try:
+            from report.report_store import close_report_store
+            close_report_store()
+        except Exception as e:
+            print(f"보고서 저장소 종료 중 오류: {e}")
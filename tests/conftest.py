@@ -0,0 +1,5 @@
+# pytest 공통 설정: src 디렉토리의 모듈을 앱과 같은 방식(fetch.xxx, infra.xxx)으로 import
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
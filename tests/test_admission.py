@@ -0,0 +1,124 @@
+# 보고서 생성 수락 제어 테스트 (대기열 초과/대기 시간 초과 거절, FIFO 순서, Retry-After 추정)
+
+import threading
+import time
+
+import pytest
+
+from server import admission as admission_module
+from server.admission import AdmissionController, AdmissionRejected, admit
+
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "조건을 기다리다 시간 초과"
+        time.sleep(0.005)
+
+
+def test_admits_until_max_in_flight_then_queues():
+    controller = AdmissionController(max_in_flight=2, max_queue=1)
+    assert controller.acquire(timeout=0) == 0.0
+    assert controller.acquire(timeout=0) == 0.0
+    assert controller.in_flight == 2
+
+    with pytest.raises(AdmissionRejected) as e:
+        controller.acquire(timeout=0.01)
+    assert e.value.reason == 'timeout'
+    assert controller.queued == 0
+    assert controller.stats()['rejected_timeout'] == 1
+
+
+def test_rejects_immediately_when_queue_is_full():
+    controller = AdmissionController(max_in_flight=1, max_queue=1)
+    controller.acquire()
+    waiter = threading.Thread(target=lambda: pytest.raises(AdmissionRejected, controller.acquire, 0.5))
+    waiter.start()
+    wait_for(lambda: controller.queued == 1)
+
+    started = time.perf_counter()
+    with pytest.raises(AdmissionRejected) as e:
+        controller.acquire(timeout=5)
+    assert e.value.reason == 'queue_full'
+    assert time.perf_counter() - started < 0.5
+    assert controller.stats()['rejected_queue_full'] == 1
+    waiter.join()
+
+
+def test_waiters_are_admitted_in_arrival_order():
+    controller = AdmissionController(max_in_flight=1, max_queue=3)
+    controller.acquire()
+    order = []
+
+    def worker(name):
+        controller.acquire(timeout=5)
+        order.append(name)
+        controller.release()
+
+    threads = []
+    for i, name in enumerate(['a', 'b', 'c']):
+        thread = threading.Thread(target=worker, args=(name,))
+        thread.start()
+        threads.append(thread)
+        wait_for(lambda: controller.queued == i + 1)
+
+    controller.release()
+    for thread in threads:
+        thread.join(5)
+    assert order == ['a', 'b', 'c']
+    assert controller.in_flight == 0
+    assert controller.stats()['queued'] == 0
+
+
+def test_released_slot_is_not_taken_by_newcomer_ahead_of_queue():
+    controller = AdmissionController(max_in_flight=1, max_queue=2)
+    controller.acquire()
+    admitted = []
+    waiter = threading.Thread(target=lambda: admitted.append(controller.acquire(timeout=5)))
+    waiter.start()
+    wait_for(lambda: controller.queued == 1)
+
+    controller.release()
+    # 대기자가 있으면 새로 온 요청은 빈 슬롯을 바로 가져가지 않고 대기열 뒤에 섬
+    with pytest.raises(AdmissionRejected):
+        controller.acquire(timeout=0.05)
+    waiter.join(5)
+    assert len(admitted) == 1
+
+
+def test_retry_after_uses_service_time_and_queue_depth(monkeypatch):
+    monkeypatch.setattr(admission_module, 'ADMISSION_DEFAULT_SERVICE_SECONDS', 30.0)
+    controller = AdmissionController(max_in_flight=2, max_queue=4)
+    # 실행 시간 표본이 없으면 기본값 기준: 30초 x (대기 0 + 1) / 슬롯 2
+    assert controller.retry_after() == 15
+
+    controller.acquire()
+    controller.release(service_seconds=10.0)
+    assert controller.retry_after() == 5
+    controller.acquire()
+    controller.release(service_seconds=20.0)
+    # 지수 이동 평균: 0.8 x 10 + 0.2 x 20 = 12
+    assert controller.stats()['service_seconds'] == pytest.approx(12.0)
+    assert controller.retry_after() == 6
+
+    controller._service_seconds = 10_000.0
+    assert controller.retry_after() == admission_module.ADMISSION_MAX_RETRY_AFTER
+
+
+def test_rejection_carries_retry_after():
+    controller = AdmissionController(max_in_flight=1, max_queue=0)
+    controller.acquire()
+    controller._service_seconds = 40.0
+    with pytest.raises(AdmissionRejected) as e:
+        controller.acquire()
+    assert e.value.retry_after == 40
+
+
+def test_admit_releases_slot_on_error():
+    controller = AdmissionController(max_in_flight=1, max_queue=0)
+    with pytest.raises(ValueError):
+        with admit(controller=controller):
+            assert controller.in_flight == 1
+            raise ValueError('pipeline failed')
+    assert controller.in_flight == 0
+    assert controller.stats()['service_seconds'] is not None
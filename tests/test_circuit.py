@@ -0,0 +1,127 @@
+# 회로 차단기 상태 전이 테스트 (닫힘 → 열림 → half-open → 닫힘/다시 열림)
+
+import pytest
+
+from infra import circuit as circuit_module
+from infra.circuit import CircuitBreaker, CircuitOpenError, STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN
+
+
+class FakeClock:
+    """circuit 모듈의 time 대체 (monotonic/perf_counter를 직접 진행)"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_module, 'time', fake)
+    monkeypatch.setattr(circuit_module, 'CIRCUIT_MIN_CALLS', 5)
+    monkeypatch.setattr(circuit_module, 'CIRCUIT_FAILURE_RATE', 0.5)
+    monkeypatch.setattr(circuit_module, 'CIRCUIT_SLOW_CALL_RATE', 0.8)
+    monkeypatch.setattr(circuit_module, 'CIRCUIT_OPEN_SECONDS', 30.0)
+    monkeypatch.setattr(circuit_module, 'CIRCUIT_HALF_OPEN_CALLS', 2)
+    return fake
+
+
+def call(breaker, duration=0.1, failed=False):
+    breaker.acquire()
+    breaker.record(duration, failed)
+
+
+def open_breaker(breaker):
+    for _ in range(5):
+        call(breaker, failed=True)
+    assert breaker.state == STATE_OPEN
+
+
+def test_stays_closed_below_min_calls(clock):
+    breaker = CircuitBreaker('test', slow_call_seconds=1.0)
+    for _ in range(4):
+        call(breaker, failed=True)
+    assert breaker.state == STATE_CLOSED
+
+
+def test_opens_on_failure_rate_and_rejects(clock):
+    breaker = CircuitBreaker('test', slow_call_seconds=1.0)
+    for _ in range(3):
+        call(breaker)
+    for _ in range(3):
+        call(breaker, failed=True)
+    assert breaker.state == STATE_OPEN
+    assert breaker.is_open()
+
+    clock.advance(10)
+    with pytest.raises(CircuitOpenError) as e:
+        breaker.acquire()
+    assert e.value.retry_after == pytest.approx(20)
+    assert breaker.counts == {'opened': 1, 'rejected': 1}
+
+
+def test_opens_on_slow_call_rate(clock):
+    breaker = CircuitBreaker('test', slow_call_seconds=1.0)
+    for _ in range(5):
+        call(breaker, duration=2.0)
+    assert breaker.state == STATE_OPEN
+
+
+def test_half_open_probes_close_after_successes(clock):
+    breaker = CircuitBreaker('test', slow_call_seconds=1.0)
+    open_breaker(breaker)
+    clock.advance(30)
+
+    # 시험 호출은 CIRCUIT_HALF_OPEN_CALLS건까지만 허가
+    breaker.acquire()
+    assert breaker.state == STATE_HALF_OPEN
+    breaker.acquire()
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+    breaker.record(0.1, False)
+    assert breaker.state == STATE_HALF_OPEN
+    breaker.record(0.1, False)
+    assert breaker.state == STATE_CLOSED
+    assert breaker.snapshot()['calls'] == 0
+
+
+@pytest.mark.parametrize('duration, failed', [(0.1, True), (2.0, False)])
+def test_half_open_failure_or_slow_probe_reopens(clock, duration, failed):
+    breaker = CircuitBreaker('test', slow_call_seconds=1.0)
+    open_breaker(breaker)
+    clock.advance(30)
+
+    breaker.acquire()
+    breaker.record(duration, failed)
+    assert breaker.state == STATE_OPEN
+    assert breaker.counts['opened'] == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.acquire()
+
+
+def test_context_manager_records_exceptions_and_fail(clock, monkeypatch):
+    monkeypatch.setattr(circuit_module, 'CIRCUIT_ENABLED', True)
+    circuit_module.reset()
+    try:
+        for _ in range(3):
+            with pytest.raises(RuntimeError):
+                with circuit_module.circuit('test-cm'):
+                    raise RuntimeError('boom')
+        for _ in range(2):
+            with circuit_module.circuit('test-cm') as c:
+                c.fail()
+        assert circuit_module.circuit_states()['test-cm']['state'] == STATE_OPEN
+        with pytest.raises(CircuitOpenError):
+            with circuit_module.circuit('test-cm'):
+                pass
+    finally:
+        circuit_module.reset()
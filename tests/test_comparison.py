@@ -0,0 +1,45 @@
+# 종목 비교 지표 테스트 (상장 시점이 다른 종목의 쌍별 상관계수, 베타)
+
+import numpy as np
+import pandas as pd
+
+from analysis.comparison import correlation_matrix, market_beta
+
+
+def staggered_returns(seed=7, n_symbols=5, n_days=120):
+    """종목마다 상장(첫 유효일)이 다르고 중간에 거래 정지 구간이 있는 일간 수익률 행렬"""
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0, 0.01, n_days)
+    returns = 0.8 * market + rng.normal(0.002, 0.02, (n_symbols, n_days))
+    # 평균이 서로 크게 다르도록 (전체 구간 평균으로 중심화하면 틀리는 경우)
+    returns += np.linspace(-0.01, 0.03, n_symbols)[:, None]
+    for i, listed in enumerate([0, 15, 40, 70, 100]):
+        returns[i, :listed] = np.nan
+    returns[1, 50:60] = np.nan
+    returns[3, 90:95] = np.nan
+    return returns, market
+
+
+def test_correlation_matches_pandas_pairwise_complete():
+    returns, _ = staggered_returns()
+    expected = pd.DataFrame(returns.T).corr().to_numpy()
+    np.testing.assert_allclose(correlation_matrix(returns), expected, rtol=0, atol=1e-12)
+
+
+def test_correlation_without_overlap_is_nan():
+    returns = np.array([[0.01, -0.02, 0.03, np.nan, np.nan, np.nan],
+                        [np.nan, np.nan, np.nan, 0.02, -0.01, 0.01]])
+    corr = correlation_matrix(returns)
+    assert np.isnan(corr[0, 1]) and np.isnan(corr[1, 0])
+    assert corr[0, 0] == 1.0
+
+
+def test_beta_matches_polyfit_on_overlap():
+    returns, market = staggered_returns()
+    market = market.copy()
+    market[30:33] = np.nan
+    beta = market_beta(returns, market)
+    for i in range(returns.shape[0]):
+        valid = ~np.isnan(returns[i]) & ~np.isnan(market)
+        slope, _ = np.polyfit(market[valid], returns[i, valid], 1)
+        assert np.isclose(beta[i], slope, rtol=0, atol=1e-10)
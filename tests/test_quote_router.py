@@ -0,0 +1,140 @@
+# 시세 라우터 테스트 (hedge 지연 후 보조 공급자 요청, 즉시 장애 조치, stale 시세만 있는 경우)
+
+import threading
+import time
+
+import pytest
+
+from fetch import quote_router as router_module
+from fetch.quote_router import QuoteRouter, LatencyTracker
+
+
+class FakeFundamentals:
+    def get(self, symbol):
+        return {'company_name': '테스트', 'market_cap': 0, 'pe_ratio': 0, 'dividend_yield': 0, 'currency': 'KRW'}
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch):
+    monkeypatch.setattr(router_module, 'get_fundamentals_store', lambda: FakeFundamentals())
+    monkeypatch.setattr(router_module, 'QUOTE_HEDGE_MIN_DELAY', 0.01)
+    monkeypatch.setattr(router_module, 'QUOTE_HEDGE_DEFAULT_DELAY', 0.1)
+
+
+@pytest.fixture
+def routers():
+    created = []
+
+    def make(providers):
+        router = QuoteRouter(providers)
+        created.append(router)
+        return router
+
+    yield make
+    for router in created:
+        router.shutdown()
+
+
+def quote(price, **extra):
+    return dict(current_price=price, change=0, volume=1, **extra)
+
+
+def test_fast_primary_is_not_hedged(routers):
+    secondary_calls = []
+    router = routers({
+        'primary': lambda symbol: quote(100),
+        'secondary': lambda symbol: secondary_calls.append(symbol) or quote(200),
+    })
+
+    result = router.get_quote('005930')
+
+    assert result['provider'] == 'primary'
+    assert result['current_price'] == 100.0
+    assert result['symbol'] == '005930.KS'
+    assert secondary_calls == []
+    assert router.counts['hedged'] == 0
+
+
+def test_hedges_after_delay_and_returns_first_valid(routers):
+    release = threading.Event()
+    started = time.perf_counter()
+    secondary_started = []
+
+    def slow_primary(symbol):
+        release.wait(5)
+        return quote(100)
+
+    def secondary(symbol):
+        secondary_started.append(time.perf_counter() - started)
+        return quote(200)
+
+    router = routers({'primary': slow_primary, 'secondary': secondary})
+    try:
+        result = router.get_quote('005930')
+    finally:
+        release.set()
+
+    assert result['provider'] == 'secondary'
+    # 보조 공급자는 hedge 지연(QUOTE_HEDGE_DEFAULT_DELAY)이 지난 뒤에만 호출
+    assert secondary_started[0] >= 0.1
+    assert router.counts['hedged'] == 1
+    assert router.counts['secondary_wins'] == 1
+
+
+def test_hedge_delay_follows_primary_latency(monkeypatch):
+    monkeypatch.setattr(router_module, 'QUOTE_HEDGE_MAX_DELAY', 1.0)
+    tracker = LatencyTracker()
+    assert tracker.hedge_delay('primary') == 0.1
+
+    for i in range(router_module.QUOTE_HEDGE_MIN_SAMPLES):
+        tracker.record('primary', 0.2 + i * 0.01, ok=True)
+    # 실패 표본은 분위수에 쓰지 않음
+    tracker.record('primary', 0.001, ok=False)
+    assert tracker.hedge_delay('primary') == pytest.approx(0.39)
+
+    for _ in range(router_module.QUOTE_HEDGE_MIN_SAMPLES):
+        tracker.record('slow', 10.0, ok=True)
+    assert tracker.hedge_delay('slow') == 1.0
+
+
+def test_immediate_failure_fails_over_without_waiting(routers, monkeypatch):
+    monkeypatch.setattr(router_module, 'QUOTE_HEDGE_DEFAULT_DELAY', 2.0)
+
+    def failing(symbol):
+        raise ConnectionError('down')
+
+    router = routers({'primary': failing, 'secondary': lambda symbol: quote(200)})
+    started = time.perf_counter()
+    result = router.get_quote('005930')
+
+    assert result['provider'] == 'secondary'
+    assert time.perf_counter() - started < 1.0
+    assert router.counts['failover'] == 1
+    assert router.counts['hedged'] == 0
+
+
+def test_stale_quote_is_used_only_when_nothing_fresh(routers):
+    router = routers({
+        'primary': lambda symbol: quote(100, stale=True),
+        'secondary': lambda symbol: quote(200),
+    })
+    assert router.get_quote('005930')['provider'] == 'secondary'
+
+    router = routers({
+        'primary': lambda symbol: quote(100, stale=True),
+        'secondary': lambda symbol: {"error": "secondary 실패"},
+    })
+    result = router.get_quote('005930')
+    assert "error" not in result
+    assert result['stale'] is True
+    assert result['provider'] == 'primary'
+
+
+def test_all_providers_failing_returns_last_error(routers):
+    router = routers({
+        'primary': lambda symbol: {"error": "primary 실패"},
+        'secondary': lambda symbol: {"error": "secondary 실패"},
+    })
+    result = router.get_quote('005930')
+    assert result['error'] == "secondary 실패"
+    assert result['provider'] == 'secondary'
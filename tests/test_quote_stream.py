@@ -0,0 +1,85 @@
+# 시세 허브 워커 간 공유 테스트 (잠금을 잡은 허브 하나만 모든 워커의 구독 종목을 조회)
+
+import time
+
+import pytest
+
+from fetch.quote_stream import QuoteHub
+
+
+@pytest.fixture
+def hubs(tmp_path):
+    created = []
+
+    def make(fetch):
+        hub = QuoteHub(source='yahoo', max_connections=10, shared_dir=str(tmp_path))
+        hub._fetch = fetch
+        # 백그라운드 폴러 대신 테스트에서 직접 조회/읽기를 호출
+        hub.start = lambda: None
+        created.append(hub)
+        return hub
+
+    yield make
+    for hub in created:
+        hub.stop()
+
+
+def fake_fetch(calls, price=100):
+    def fetch(symbols):
+        calls.append(list(symbols))
+        return [dict(current_price=price, change=0, volume=1) for _ in symbols]
+    return fetch
+
+
+def test_only_leader_fetches_and_followers_read_shared_quotes(hubs):
+    leader_calls, follower_calls = [], []
+    leader = hubs(fake_fetch(leader_calls))
+    follower = hubs(fake_fetch(follower_calls))
+
+    assert leader._try_lead()
+    assert not follower._try_lead()
+
+    leader_sub = leader.subscribe(['005930'])
+    follower_sub = follower.subscribe(['000660'])
+    follower._write_demand()
+
+    # 폴러 담당 허브는 다른 워커의 구독 종목까지 합쳐 한 번에 조회
+    leader.poll(leader._due(time.time(), 0, leader._shared_demand()))
+    assert sorted(leader_calls[0]) == ['000660', '005930']
+    assert leader_sub.next(timeout=0)[0]['symbol'] == '005930'
+
+    assert follower._read_shared() == 2
+    assert [quote['symbol'] for quote in follower_sub.next(timeout=0)] == ['000660']
+    # 파일이 그대로면 다시 읽지 않음
+    assert follower._read_shared() == 0
+    assert follower_calls == []
+
+
+def test_follower_takes_over_when_leader_stops(hubs):
+    leader_calls, follower_calls = [], []
+    leader = hubs(fake_fetch(leader_calls))
+    follower = hubs(fake_fetch(follower_calls))
+    assert leader._try_lead()
+    leader.subscribe(['005930'])
+    leader.poll(leader._due(time.time(), 0, leader._shared_demand()))
+
+    leader.stop()
+    assert follower._try_lead()
+    # 이전 담당 허브가 쓴 시세를 이어받으므로 주기가 지나기 전에는 다시 조회하지 않음
+    assert follower.snapshot()['005930']['current_price'] == 100
+    follower.subscribe(['005930'])
+    assert follower._due(time.time(), 60, follower._shared_demand()) == []
+
+
+def test_stale_demand_is_ignored(hubs, monkeypatch):
+    from fetch import quote_stream as quote_stream_module
+
+    leader = hubs(fake_fetch([]))
+    follower = hubs(fake_fetch([]))
+    assert leader._try_lead()
+    follower.subscribe(['000660'])
+    follower._write_demand()
+    assert leader._shared_demand() == ['000660']
+
+    monkeypatch.setattr(quote_stream_module, 'QUOTE_DEMAND_TTL_SECONDS', -1)
+    assert leader._shared_demand() == []
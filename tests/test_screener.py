@@ -0,0 +1,49 @@
+# 스크리너 지표 계산 테스트 (히스토리가 없거나 짧은 경우)
+
+import numpy as np
+
+from analysis import screener as screener_module
+from analysis.screener import UniverseScreener, build_price_matrix, compute_metrics, SCREENER_METRICS
+
+
+def history(closes, start_day=1):
+    # 컬럼형 히스토리는 최신 데이터가 첫 번째
+    dates = [f"2026-01-{start_day + i:02d}" for i in range(len(closes))]
+    return {'date': dates[::-1], 'close': list(closes)[::-1], 'volume': [100] * len(closes)}
+
+
+def test_empty_matrix_returns_nan_metrics():
+    values = compute_metrics(build_price_matrix({}))
+    assert set(values) == set(SCREENER_METRICS)
+    assert all(len(v) == 0 for v in values.values())
+
+    values = compute_metrics(build_price_matrix({'A': {'date': [], 'close': [], 'volume': []}}))
+    assert all(np.isnan(v).all() and len(v) == 1 for v in values.values())
+
+
+def test_momentum_and_short_history():
+    matrix = build_price_matrix({'A': history(range(100, 130)), 'B': history([10, 11, 12], start_day=28)})
+    values = compute_metrics(matrix)
+    assert np.isclose(values['momentum_5'][0], (129 / 124 - 1) * 100)
+    # B는 3거래일뿐이므로 20일 지표는 계산하지 않음
+    assert np.isnan(values['momentum_20'][1])
+    assert np.isnan(values['ma20_gap'][1])
+
+
+class FakeCache:
+    def __init__(self, histories):
+        self.histories = histories
+
+    def get_many(self, symbols, period):
+        return {symbol: self.histories[symbol] for symbol in symbols if symbol in self.histories}
+
+    def age(self, symbol):
+        return 0.0
+
+
+def test_screen_with_no_histories_returns_empty_results(monkeypatch):
+    monkeypatch.setattr(screener_module, 'get_ohlcv_cache', lambda: FakeCache({}))
+    result = UniverseScreener(companies={'가': 'A.KS', '나': 'B.KS'}).screen()
+    assert result['results'] == []
+    assert result['as_of'] is None
+    assert sorted(result['missing']) == ['가', '나']